@@ -0,0 +1,113 @@
+"""
+Times HDF5View.write and the HDF5View readers on synthetic datasets.
+
+No server is needed, the dataset is a stand-in exposing the parts of the Dataset API used by HDF5View.write.
+
+    python bench_view_write.py [n_entries ...]
+"""
+import sys
+import tempfile
+import time
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+
+import qcfractal.interface as ptl
+from qcfractal.interface.collections.dataset import MoleculeEntry
+
+n_trials = [int(x) for x in sys.argv[1:]] or [1000, 10000, 50000]
+n_atoms = 6
+
+
+class SyntheticDataset:
+    def __init__(self, n_entries):
+        self.client = None
+        self.units = "hartree"
+
+        names = [f"entry_{i}" for i in range(n_entries)]
+        self._molecules = pd.DataFrame(
+            {
+                "molecule": [
+                    ptl.Molecule(
+                        symbols=["He"] * n_atoms,
+                        geometry=np.random.rand(n_atoms, 3) + i,
+                        id=str(i),
+                        validate=False,
+                    )
+                    for i in range(n_entries)
+                ]
+            }
+        )
+        self._entries = pd.DataFrame({"name": names, "molecule_id": [str(i) for i in range(n_entries)]})
+        self._values = {
+            "energy": pd.DataFrame({"energy": np.random.rand(n_entries)}, index=names),
+            "gradient": pd.DataFrame({"gradient": [np.random.rand(n_atoms, 3) for _ in range(n_entries)]}, index=names),
+        }
+
+        history_keys = ["driver", "program", "method", "basis", "keywords"]
+        self._history = pd.DataFrame(
+            [
+                {"name": name, "driver": name, "program": "p", "method": "m", "basis": "b", "keywords": None}
+                for name in self._values
+            ]
+        ).set_index("name")
+
+        self.data = SimpleNamespace(
+            name="bench",
+            collection="dataset",
+            provenance={},
+            tagline="",
+            tags=[],
+            id="1",
+            history_keys=history_keys,
+            description="",
+            metadata={},
+            contributed_values={},
+            records=[MoleculeEntry(name=name, molecule_id=str(i)) for i, name in enumerate(names)],
+        )
+
+    def get_entries(self, force=False):
+        return self._entries.copy()
+
+    def get_index(self, force=False):
+        return self._entries["name"].tolist()
+
+    def get_molecules(self, force=False):
+        return self._molecules
+
+    def list_values(self, native=True, force=False):
+        if native:
+            return self._history
+        return pd.DataFrame({"name": []})
+
+    def get_values(self, name, force=False, native=True):
+        return self._values[name]
+
+
+print(f"{'entries':>8s} {'write (s)':>10s} {'list_values (s)':>16s} {'get_values (s)':>15s} {'get_molecules (s)':>18s}")
+for trial in n_trials:
+    ds = SyntheticDataset(trial)
+    with tempfile.TemporaryDirectory() as tmpdir:
+        view = ptl.collections.HDF5View(f"{tmpdir}/bench.h5")
+
+        t = time.time()
+        view.write(ds)
+        write_time = time.time() - t
+
+        t = time.time()
+        view.list_values()
+        list_time = time.time() - t
+
+        queries = [{"name": name, "driver": name, "native": True} for name in ds._values]
+        t = time.time()
+        values, _ = view.get_values(queries)
+        get_time = time.time() - t
+        assert np.allclose(values["energy"].to_numpy(), ds._values["energy"]["energy"].to_numpy())
+        assert np.allclose(values["gradient"].iloc[-1], ds._values["gradient"]["gradient"].iloc[-1])
+
+        t = time.time()
+        view.get_molecules(list(range(0, trial, 2)))
+        mol_time = time.time() - t
+
+    print(f"{trial:8d} {write_time:10.3f} {list_time:16.3f} {get_time:15.3f} {mol_time:18.3f}")
@@ -0,0 +1,376 @@
+"""
+A reproducible benchmark suite for the storage socket, the REST interface and full manager cycles.
+
+Every run boots its own temporary Postgres instance (and a FractalSnowflake for the REST and manager groups),
+so results do not depend on whatever database happens to be running locally.
+
+    python run_suite.py --list
+    python run_suite.py --sizes 10 100 --repeat 5 --output results.json
+    python run_suite.py --filter storage --baseline results.json --threshold 0.2
+
+Each benchmark is timed `repeat` times per size with a fresh, untimed setup before each run. With ``--baseline``
+the median times are compared against a previously saved ``--output`` file and the script exits with status 1 if
+any benchmark is slower than the baseline by more than ``--threshold`` (a fraction).
+"""
+import argparse
+import datetime
+import fnmatch
+import itertools
+import json
+import platform
+import statistics
+import sys
+import time
+from collections import OrderedDict
+
+import numpy as np
+from qcelemental.models import AtomicResult
+
+import qcengine as qcng
+import qcfractal
+import qcfractal.interface as ptl
+from qcfractal import FractalSnowflake
+from qcfractal.interface.models import ResultRecord, TaskRecord
+from qcfractal.postgres_harness import TemporaryPostgres
+from qcfractal.storage_sockets import storage_socket_factory
+
+PROJECT_NAME = "qcfractal_benchmarks"
+
+# Known to the server but never found by the Snowflake manager, so tasks from the storage and REST benchmarks are
+# not run. The Snowflake manager claims tasks of any tag, only the manager benchmarks may use "qcfractal_bench".
+IDLE_PROGRAM = "qcfractal_bench_idle"
+
+BENCHMARKS = OrderedDict()
+
+
+def benchmark(group, name):
+    """Registers a benchmark as ``<group>.<name>``.
+
+    The decorated function takes the environment and a size, performs its setup and returns the callable to time.
+    """
+
+    def wrapper(func):
+        BENCHMARKS[f"{group}.{name}"] = func
+        return func
+
+    return wrapper
+
+
+class BenchmarkProgram(qcng.programs.ProgramHarness):
+    """A qcengine program that returns a constant energy, so manager cycles measure QCFractal rather than QC codes."""
+
+    _defaults = {
+        "name": "qcfractal_bench",
+        "scratch": False,
+        "thread_safe": True,
+        "thread_parallel": False,
+        "node_parallel": False,
+        "managed_memory": False,
+    }
+
+    @staticmethod
+    def found(raise_error=False):
+        return True
+
+    def get_version(self):
+        return "0.0.0"
+
+    def compute(self, input_model, config):
+        return AtomicResult(
+            **input_model.dict(exclude={"schema_name", "provenance"}),
+            return_result=0.0,
+            properties={},
+            provenance={"creator": "bench"},
+            success=True,
+        )
+
+
+class UnavailableBenchmarkProgram(BenchmarkProgram):
+    """The same program, reported as not installed so that the manager does not pick up its tasks."""
+
+    _defaults = {**BenchmarkProgram._defaults, "name": IDLE_PROGRAM}
+
+    @staticmethod
+    def found(raise_error=False):
+        return False
+
+
+class Environment:
+    """Lazily built servers shared by all benchmarks of a run."""
+
+    def __init__(self, max_workers=2):
+        self.max_workers = max_workers
+        self.postgres = TemporaryPostgres()
+        self.postgres.psql.create_database(PROJECT_NAME)
+        self.storage_uri = self.postgres.database_uri(safe=False, database="")
+
+        self._storage = None
+        self._snowflake = None
+        self._client = None
+        self._counter = itertools.count()
+
+    @property
+    def storage(self):
+        if self._storage is None:
+            self._storage = storage_socket_factory(self.storage_uri, PROJECT_NAME, skip_version_check=True)
+            self._storage.manager_update("bench_manager")
+        return self._storage
+
+    @property
+    def snowflake(self):
+        if self._snowflake is None:
+            # The program must be registered before the worker processes fork
+            for program in [BenchmarkProgram(), UnavailableBenchmarkProgram()]:
+                if program.name not in qcng.list_all_programs():
+                    qcng.register_program(program)
+
+            self._snowflake = FractalSnowflake(
+                max_workers=self.max_workers,
+                storage_uri=self.storage_uri,
+                storage_project_name=PROJECT_NAME,
+                logging=False,
+            )
+        return self._snowflake
+
+    @property
+    def client(self):
+        if self._client is None:
+            self._client = self.snowflake.client()
+        return self._client
+
+    def molecules(self, size):
+        """Returns `size` molecules never seen before in this run."""
+        ret = []
+        for _ in range(size):
+            i = next(self._counter)
+            ret.append(
+                ptl.Molecule(symbols=["He", "He"], geometry=np.array([0.0, 0.0, 0.0, 0.0, 0.0, 2.0 + i * 1.0e-4]))
+            )
+        return ret
+
+    def results(self, size):
+        """Adds `size` unique molecules and returns unsaved ResultRecords on them."""
+        mol_ids = self.storage.add_molecules(self.molecules(size))["data"]
+        return [
+            ResultRecord(version=1, driver="energy", program=IDLE_PROGRAM, molecule=mol_id, method="m", basis="b")
+            for mol_id in mol_ids
+        ]
+
+    def tasks(self, size, tag="bench"):
+        """Adds `size` unique results and returns unsaved waiting TaskRecords on them, never run by the manager."""
+        result_ids = self.storage.add_results(self.results(size))["data"]
+        return [
+            TaskRecord(
+                spec={"function": "qcengine.compute", "args": [{}, IDLE_PROGRAM], "kwargs": {}},
+                parser="single",
+                program=IDLE_PROGRAM,
+                tag=tag,
+                base_result=result_id,
+            )
+            for result_id in result_ids
+        ]
+
+    def stop(self):
+        if self._snowflake is not None:
+            self._snowflake.stop()
+        self.postgres.stop()
+
+
+### Storage socket
+
+
+@benchmark("storage", "add_molecules")
+def bench_storage_add_molecules(env, size):
+    mols = env.molecules(size)
+    return lambda: env.storage.add_molecules(mols)
+
+
+@benchmark("storage", "get_molecules")
+def bench_storage_get_molecules(env, size):
+    ids = env.storage.add_molecules(env.molecules(size))["data"]
+    return lambda: env.storage.get_molecules(id=ids)
+
+
+@benchmark("storage", "add_results")
+def bench_storage_add_results(env, size):
+    results = env.results(size)
+    return lambda: env.storage.add_results(results)
+
+
+@benchmark("storage", "get_results")
+def bench_storage_get_results(env, size):
+    ids = env.storage.add_results(env.results(size))["data"]
+    return lambda: env.storage.get_results(id=ids)
+
+
+@benchmark("storage", "queue_submit")
+def bench_storage_queue_submit(env, size):
+    tasks = env.tasks(size)
+    return lambda: env.storage.queue_submit(tasks)
+
+
+@benchmark("storage", "queue_get_next")
+def bench_storage_queue_get_next(env, size):
+    # A tag unique to this setup so that tasks left over from other benchmarks are not claimed
+    tag = f"bench_get_next_{next(env._counter)}"
+    env.storage.queue_submit(env.tasks(size, tag=tag))
+    return lambda: env.storage.queue_get_next("bench_manager", [IDLE_PROGRAM], [], limit=size, tag=tag)
+
+
+### REST round trips
+
+
+@benchmark("rest", "add_molecules")
+def bench_rest_add_molecules(env, size):
+    mols = env.molecules(size)
+    return lambda: env.client.add_molecules(mols)
+
+
+@benchmark("rest", "query_molecules")
+def bench_rest_query_molecules(env, size):
+    ids = env.client.add_molecules(env.molecules(size))
+    return lambda: env.client.query_molecules(id=ids)
+
+
+@benchmark("rest", "add_compute")
+def bench_rest_add_compute(env, size):
+    ids = env.client.add_molecules(env.molecules(size))
+    return lambda: env.client.add_compute(IDLE_PROGRAM, "m", "b", "energy", None, ids)
+
+
+@benchmark("rest", "query_results")
+def bench_rest_query_results(env, size):
+    ids = env.client.add_molecules(env.molecules(size))
+    ret = env.client.add_compute(IDLE_PROGRAM, "m", "b", "energy", None, ids)
+    return lambda: env.client.query_results(id=ret.ids)
+
+
+### Manager cycles
+
+
+@benchmark("manager", "compute_cycle")
+def bench_manager_compute_cycle(env, size):
+    ids = env.client.add_molecules(env.molecules(size))
+
+    def run():
+        ret = env.client.add_compute("qcfractal_bench", "m", "b", "energy", None, ids)
+        env.snowflake.await_results()
+        status = [r.status for r in env.client.query_results(id=ret.ids)]
+        if any(x != "COMPLETE" for x in status):
+            raise RuntimeError(f"Manager cycle did not complete: {sorted(set(status))}")
+
+    return run
+
+
+def run_benchmark(env, name, size, repeat):
+    times = []
+    for _ in range(repeat):
+        func = BENCHMARKS[name](env, size)
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+
+    return {
+        "name": name,
+        "size": size,
+        "times": times,
+        "min": min(times),
+        "median": statistics.median(times),
+        "mean": statistics.mean(times),
+    }
+
+
+def compare(results, baseline, threshold):
+    """Compares median times against a baseline, returns the list of regressions."""
+
+    base = {(r["name"], r["size"]): r for r in baseline["results"]}
+    regressions = []
+
+    print()
+    print(f"{'benchmark':40s} {'size':>6s} {'baseline':>10s} {'current':>10s} {'change':>8s}")
+    for r in results:
+        key = (r["name"], r["size"])
+        if key not in base:
+            print(f"{r['name']:40s} {r['size']:6d} {'-':>10s} {r['median']:10.4f} {'new':>8s}")
+            continue
+
+        change = (r["median"] - base[key]["median"]) / base[key]["median"]
+        flag = ""
+        if change > threshold:
+            regressions.append(r["name"])
+            flag = "  REGRESSION"
+        print(f"{r['name']:40s} {r['size']:6d} {base[key]['median']:10.4f} {r['median']:10.4f} {change:+8.1%}{flag}")
+
+    return regressions
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description="Runs the QCFractal benchmark suite on a temporary Postgres.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100], help="Number of items per benchmark.")
+    parser.add_argument("--repeat", type=int, default=3, help="Number of timed runs per benchmark and size.")
+    parser.add_argument(
+        "--filter", type=str, nargs="+", default=["*"], help="Glob patterns of benchmarks to run, e.g. 'storage.*'."
+    )
+    parser.add_argument("--list", action="store_true", help="Lists the available benchmarks and exits.")
+    parser.add_argument("--workers", type=int, default=2, help="Number of Snowflake workers for manager cycles.")
+    parser.add_argument("--output", type=str, help="Writes the results as JSON to this file.")
+    parser.add_argument("--baseline", type=str, help="A previous JSON output to compare against.")
+    parser.add_argument(
+        "--threshold", type=float, default=0.25, help="Slowdown relative to the baseline flagged as a regression."
+    )
+    args = parser.parse_args(args)
+
+    names = [
+        name
+        for name in BENCHMARKS
+        if any(fnmatch.fnmatch(name, pattern) or name.startswith(pattern + ".") for pattern in args.filter)
+    ]
+    if args.list:
+        print("\n".join(names))
+        return 0
+
+    if not names:
+        print(f"No benchmarks match {args.filter}.")
+        return 1
+
+    env = Environment(max_workers=args.workers)
+    results = []
+    try:
+        for name in names:
+            for size in args.sizes:
+                r = run_benchmark(env, name, size, args.repeat)
+                print(f"{name:40s} {size:6d} min {r['min']:10.4f}s  median {r['median']:10.4f}s")
+                results.append(r)
+    finally:
+        env.stop()
+
+    data = {
+        "metadata": {
+            "date": datetime.datetime.utcnow().isoformat(),
+            "qcfractal": qcfractal.__version__,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "sizes": args.sizes,
+            "repeat": args.repeat,
+        },
+        "results": results,
+    }
+
+    if args.output:
+        with open(args.output, "w") as handle:
+            json.dump(data, handle, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, "r") as handle:
+            baseline = json.load(handle)
+
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) above {args.threshold:.0%}.")
+            return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
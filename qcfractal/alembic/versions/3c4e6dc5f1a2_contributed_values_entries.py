@@ -0,0 +1,125 @@
+"""Store contributed values one row per entry
+
+Revision ID: 3c4e6dc5f1a2
+Revises: 5be555fe9dc0
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+import logging
+
+import numpy as np
+import sqlalchemy as sa
+from alembic import op
+
+from qcfractal.storage_sockets.models.sql_base import MsgpackExt
+
+# revision identifiers, used by Alembic.
+revision = "3c4e6dc5f1a2"
+down_revision = "5be555fe9dc0"
+branch_labels = None
+depends_on = None
+
+logger = logging.getLogger("alembic")
+
+contributed_values_table = sa.table(
+    "contributed_values",
+    sa.column("collection_id", sa.Integer),
+    sa.column("name", sa.String),
+    sa.column("values", MsgpackExt),
+    sa.column("index", MsgpackExt),
+)
+
+entry_table = sa.table(
+    "contributed_values_entry",
+    sa.column("collection_id", sa.Integer),
+    sa.column("name", sa.String),
+    sa.column("entry", sa.String),
+    sa.column("position", sa.Integer),
+    sa.column("value", MsgpackExt),
+)
+
+
+def upgrade():
+    op.create_table(
+        "contributed_values_entry",
+        sa.Column("collection_id", sa.Integer(), nullable=False),
+        sa.Column("name", sa.String(), nullable=False),
+        sa.Column("entry", sa.String(), nullable=False),
+        sa.Column("position", sa.Integer(), nullable=False),
+        sa.Column("value", MsgpackExt(), nullable=True),
+        sa.ForeignKeyConstraint(
+            ["collection_id", "name"],
+            ["contributed_values.collection_id", "contributed_values.name"],
+            ondelete="cascade",
+            onupdate="cascade",
+        ),
+        sa.PrimaryKeyConstraint("collection_id", "name", "entry"),
+    )
+
+    connection = op.get_bind()
+    keys = connection.execute(
+        sa.select([contributed_values_table.c.collection_id, contributed_values_table.c.name])
+    ).fetchall()
+
+    logger.info(f"Splitting {len(keys)} contributed values into entries.")
+    for collection_id, name in keys:
+        index, values = connection.execute(
+            sa.select([contributed_values_table.c.index, contributed_values_table.c["values"]]).where(
+                sa.and_(
+                    contributed_values_table.c.collection_id == collection_id, contributed_values_table.c.name == name
+                )
+            )
+        ).fetchone()
+
+        rows = [
+            {
+                "collection_id": collection_id,
+                "name": name,
+                "entry": str(entry),
+                "position": i,
+                "value": value.item() if isinstance(value, np.generic) else value,
+            }
+            for i, (entry, value) in enumerate(zip(index, values))
+        ]
+        if rows:
+            connection.execute(entry_table.insert(), rows)
+
+    op.drop_column("contributed_values", "values")
+    op.drop_column("contributed_values", "index")
+
+
+def downgrade():
+    op.add_column("contributed_values", sa.Column("values", MsgpackExt(), nullable=True))
+    op.add_column("contributed_values", sa.Column("index", MsgpackExt(), nullable=True))
+
+    connection = op.get_bind()
+    rows = connection.execute(
+        sa.select([entry_table.c.collection_id, entry_table.c.name, entry_table.c.entry, entry_table.c.value]).order_by(
+            entry_table.c.collection_id, entry_table.c.name, entry_table.c.position
+        )
+    ).fetchall()
+
+    grouped = {}
+    for collection_id, name, entry, value in rows:
+        index, values = grouped.setdefault((collection_id, name), ([], []))
+        index.append(entry)
+        values.append(value)
+
+    keys = connection.execute(
+        sa.select([contributed_values_table.c.collection_id, contributed_values_table.c.name])
+    ).fetchall()
+    for collection_id, name in keys:
+        index, values = grouped.get((collection_id, name), ([], []))
+        connection.execute(
+            contributed_values_table.update()
+            .where(
+                sa.and_(
+                    contributed_values_table.c.collection_id == collection_id, contributed_values_table.c.name == name
+                )
+            )
+            .values(index=np.array(index), values=values)
+        )
+
+    op.alter_column("contributed_values", "values", nullable=False)
+    op.alter_column("contributed_values", "index", nullable=False)
+    op.drop_table("contributed_values_entry")
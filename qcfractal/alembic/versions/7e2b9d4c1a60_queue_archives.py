@@ -0,0 +1,77 @@
+"""Archive tables for cold tasks and manager logs
+
+Revision ID: 7e2b9d4c1a60
+Revises: 3c4e6dc5f1a2
+Create Date: 2026-10-18 15:00:00.000000
+
+"""
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+from qcfractal.storage_sockets.models.sql_base import MsgpackExt
+
+# revision identifiers, used by Alembic.
+revision = "7e2b9d4c1a60"
+down_revision = "3c4e6dc5f1a2"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    task_status = postgresql.ENUM("running", "waiting", "error", "complete", name="taskstatusenum", create_type=False)
+
+    op.create_table(
+        "task_queue_archive",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("archived_on", sa.DateTime(), nullable=False),
+        sa.Column("spec", MsgpackExt(), nullable=False),
+        sa.Column("tag", sa.String(), nullable=True),
+        sa.Column("parser", sa.String(), nullable=True),
+        sa.Column("program", sa.String(), nullable=True),
+        sa.Column("procedure", sa.String(), nullable=True),
+        sa.Column("status", task_status, nullable=True),
+        sa.Column("priority", sa.Integer(), nullable=True),
+        sa.Column("manager", sa.String(), nullable=True),
+        sa.Column("created_on", sa.DateTime(), nullable=True),
+        sa.Column("modified_on", sa.DateTime(), nullable=True),
+        sa.Column("base_result_id", sa.Integer(), nullable=True),
+        sa.ForeignKeyConstraint(["base_result_id"], ["base_result.id"], ondelete="cascade"),
+        sa.PrimaryKeyConstraint("id", "archived_on"),
+        postgresql_partition_by="RANGE (archived_on)",
+    )
+    op.create_index("ix_task_queue_archive_base_result_id", "task_queue_archive", ["base_result_id"])
+    op.execute("CREATE TABLE task_queue_archive_default PARTITION OF task_queue_archive DEFAULT")
+
+    op.create_table(
+        "queue_manager_logs_archive",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("timestamp", sa.DateTime(), nullable=False),
+        sa.Column("manager_id", sa.Integer(), nullable=False),
+        sa.Column("completed", sa.Integer(), nullable=True),
+        sa.Column("submitted", sa.Integer(), nullable=True),
+        sa.Column("failures", sa.Integer(), nullable=True),
+        sa.Column("total_worker_walltime", sa.Float(), nullable=True),
+        sa.Column("total_task_walltime", sa.Float(), nullable=True),
+        sa.Column("active_tasks", sa.Integer(), nullable=True),
+        sa.Column("active_cores", sa.Integer(), nullable=True),
+        sa.Column("active_memory", sa.Float(), nullable=True),
+        sa.ForeignKeyConstraint(["manager_id"], ["queue_manager.id"]),
+        sa.PrimaryKeyConstraint("id", "timestamp"),
+        postgresql_partition_by="RANGE (timestamp)",
+    )
+    op.create_index("ix_queue_manager_logs_archive_manager_id", "queue_manager_logs_archive", ["manager_id"])
+    op.execute("CREATE TABLE queue_manager_logs_archive_default PARTITION OF queue_manager_logs_archive DEFAULT")
+
+    op.execute(
+        "CREATE INDEX ix_task_queue_waiting_tag_sort ON task_queue (tag, priority DESC, created_on) "
+        "WHERE status = 'waiting'"
+    )
+
+
+def downgrade():
+    op.execute("DROP INDEX ix_task_queue_waiting_tag_sort")
+
+    # Partitions are dropped with their table
+    op.drop_table("queue_manager_logs_archive")
+    op.drop_table("task_queue_archive")
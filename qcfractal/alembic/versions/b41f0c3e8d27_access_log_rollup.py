@@ -0,0 +1,48 @@
+"""Access log rollups and usernames
+
+Revision ID: b41f0c3e8d27
+Revises: 7e2b9d4c1a60
+Create Date: 2026-10-18 16:00:00.000000
+
+"""
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "b41f0c3e8d27"
+down_revision = "7e2b9d4c1a60"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column("access_log", sa.Column("username", sa.String(), nullable=True))
+
+    op.create_table(
+        "access_log_rollup",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("granularity", sa.String(), nullable=False),
+        sa.Column("period_start", sa.DateTime(), nullable=False),
+        sa.Column("access_type", sa.String(), nullable=False),
+        sa.Column("access_method", sa.String(), nullable=False),
+        sa.Column("country_code", sa.String(), nullable=False),
+        sa.Column("username", sa.String(), nullable=False),
+        sa.Column("count", sa.BigInteger(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint(
+            "granularity",
+            "period_start",
+            "access_type",
+            "access_method",
+            "country_code",
+            "username",
+            name="uix_access_log_rollup_key",
+        ),
+    )
+    op.create_index("ix_access_log_rollup_period_start", "access_log_rollup", ["period_start"])
+
+
+def downgrade():
+    op.drop_index("ix_access_log_rollup_period_start", table_name="access_log_rollup")
+    op.drop_table("access_log_rollup")
+    op.drop_column("access_log", "username")
@@ -0,0 +1,62 @@
+"""Procedure dataset entries in their own table
+
+Revision ID: c5e2a7d19f40
+Revises: b41f0c3e8d27
+Create Date: 2026-10-19 10:00:00.000000
+
+"""
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "c5e2a7d19f40"
+down_revision = "b41f0c3e8d27"
+branch_labels = None
+depends_on = None
+
+_collections = "('optimizationdataset', 'torsiondrivedataset', 'gridoptimizationdataset')"
+
+
+def upgrade():
+    op.create_table(
+        "collection_entry",
+        sa.Column("collection_id", sa.Integer(), nullable=False),
+        sa.Column("lname", sa.String(), nullable=False),
+        sa.Column("name", sa.String(), nullable=False),
+        sa.Column("entry", sa.JSON(), nullable=False),
+        sa.ForeignKeyConstraint(["collection_id"], ["collection.id"], ondelete="cascade"),
+        sa.PrimaryKeyConstraint("collection_id", "lname"),
+    )
+
+    # Move the entries out of the extra column of the collections, keyed by lowercase name
+    op.execute(
+        f"""
+        INSERT INTO collection_entry (collection_id, lname, name, entry)
+        SELECT collection.id, records.key, records.value->>'name', records.value
+        FROM collection, json_each(collection.extra->'records') AS records
+        WHERE collection.collection IN {_collections} AND json_typeof(collection.extra->'records') = 'object'
+        """
+    )
+    op.execute(
+        f"""
+        UPDATE collection SET extra = (extra::jsonb - 'records')::json
+        WHERE collection IN {_collections} AND extra IS NOT NULL
+        """
+    )
+
+
+def downgrade():
+    op.execute(
+        f"""
+        UPDATE collection SET extra = (
+            COALESCE(extra::jsonb, '{{}}'::jsonb) || jsonb_build_object('records', COALESCE(
+                (SELECT jsonb_object_agg(lname, entry::jsonb) FROM collection_entry
+                 WHERE collection_entry.collection_id = collection.id),
+                '{{}}'::jsonb
+            ))
+        )::json
+        WHERE collection IN {_collections}
+        """
+    )
+
+    op.drop_table("collection_entry")
@@ -6,7 +6,10 @@ import argparse
 import copy
 import importlib
 import json
+import os
 import signal
+import sys
+import time
 from functools import partial
 
 import yaml
@@ -100,3 +103,93 @@ def install_signal_handlers(loop, cleanup):
 
     for sig in [signal.SIGINT, signal.SIGTERM]:
         old_handlers[sig] = signal.signal(sig, handle_signal)
+
+
+def fork_workers(num_workers, max_failures=5, min_uptime=10.0, max_backoff=30.0):
+    """
+    Forks ``num_workers`` worker processes and returns the index of the current worker.
+
+    The parent process never returns: it forwards SIGINT and SIGTERM to the workers, restarts
+    workers exiting with an error and exits once all workers have stopped.
+
+    A worker failing within ``min_uptime`` seconds of its start is restarted after an exponential
+    backoff of at most ``max_backoff`` seconds. After ``max_failures`` such failures in a row, all
+    workers are stopped and the parent exits with a non-zero status.
+    """
+
+    children = {}
+    started = {}
+    failures = {}
+    stopping = False
+    failed = False
+
+    def forward_signal(sig, frame):
+        nonlocal stopping
+        stopping = True
+        for pid in children:
+            try:
+                os.kill(pid, sig)
+            except ProcessLookupError:
+                pass
+
+    # Installed before forking so that no signal is missed, workers restore the original handlers
+    old_handlers = {sig: signal.signal(sig, forward_signal) for sig in [signal.SIGINT, signal.SIGTERM]}
+
+    def start_worker(task_id):
+        pid = os.fork()
+        if pid == 0:
+            for sig, handler in old_handlers.items():
+                signal.signal(sig, handler)
+
+            # Keeps a terminal interrupt from reaching the workers directly, the parent forwards it once
+            os.setpgid(0, 0)
+            return True
+
+        children[pid] = task_id
+        started[task_id] = time.monotonic()
+        return False
+
+    for task_id in range(num_workers):
+        if start_worker(task_id):
+            return task_id
+
+    while children:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+
+        task_id = children.pop(pid, None)
+        if task_id is None:
+            continue
+
+        exitcode = os.waitstatus_to_exitcode(status)
+        if stopping or exitcode == 0:
+            continue
+
+        # Only failures in quick succession count, a worker which ran for a while starts over
+        if time.monotonic() - started[task_id] < min_uptime:
+            failures[task_id] = failures.get(task_id, 0) + 1
+        else:
+            failures[task_id] = 1
+
+        if failures[task_id] >= max_failures:
+            print(f"Worker {task_id} (pid {pid}) failed {failures[task_id]} times in a row, stopping the server.")
+            failed = True
+            forward_signal(signal.SIGTERM, None)
+            continue
+
+        delay = min(max_backoff, 2 ** (failures[task_id] - 1))
+        print(f"Worker {task_id} (pid {pid}) exited with status {exitcode}, restarting it in {delay}s.")
+
+        # A signal received while waiting stops the server instead
+        deadline = time.monotonic() + delay
+        while not stopping and time.monotonic() < deadline:
+            time.sleep(0.1)
+        if stopping:
+            continue
+
+        if start_worker(task_id):
+            return task_id
+
+    sys.exit(1 if failed else 0)
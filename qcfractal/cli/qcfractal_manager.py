@@ -179,6 +179,53 @@ class QueueManagerSettings(AutodocBaseSettings):
         "itself down to maintain integrity between it and the Fractal Server. Units of seconds",
         gt=0,
     )
+    completion_batch: Optional[int] = Field(
+        None,
+        description="Report finished tasks, and pull new ones, as soon as this many tasks completed instead of "
+        "waiting for the next update. Only the pool, dask and parsl adapters can wake the Manager up early. "
+        "If not set (None/null), the Manager only updates every `update_frequency` seconds.",
+        gt=0,
+    )
+    pipelined: bool = Field(
+        False,
+        description="Upload finished tasks, pull new tasks and hand them to the workers in separate threads, so that "
+        "slow uploads of large results do not leave workers idle while new tasks wait.",
+    )
+    adaptive_prefetch: bool = Field(
+        False,
+        description="Size the number of tasks held by this Manager from the observed task completion rate and "
+        "server round trip time, rather than always filling up to `max_queued_tasks`, which then is an upper "
+        "bound. Unstarted tasks held beyond twice the expected backlog are returned to the Fractal Server. "
+        "Helps keeping workers busy on many short tasks without hoarding long ones.",
+    )
+    upload_chunk_size: Optional[int] = Field(
+        100,
+        description="Maximum number of finished tasks sent to the Fractal Server in one request. Larger batches are "
+        "split over several requests. If not set (None/null), the number of tasks per request is not limited.",
+        gt=0,
+    )
+    upload_chunk_megabytes: Optional[float] = Field(
+        32,
+        description="Finished tasks are split over several requests to the Fractal Server once their size exceeds "
+        "this many megabytes, so that large results (e.g. wavefunctions) are sent, and retried after a failure, "
+        "in bounded requests. If not set (None/null), the size of requests is not limited.",
+        gt=0,
+    )
+    spool_path: Optional[str] = Field(
+        None,
+        description="Full path to a file in which finished tasks which could not be sent to the Fractal Server are "
+        "kept, compressed, until the server accepts them. Unlike the in-memory retries, spooled tasks are never "
+        "dropped and survive a restart of the Manager, which then resumes its previous identity so the server "
+        "still accepts them. Each Manager needs a spool of its own, a Manager refuses to start on a spool held by "
+        "another. Recommended on unreliable networks, or for expensive computations.",
+    )
+    reference_cache_size: int = Field(
+        10000,
+        description="Number of molecules and keyword sets the Manager keeps in memory, so that tasks sent by the "
+        "Fractal Server only reference them. Those missing are fetched from the server in one request per batch of "
+        "tasks. Set to 0 to have the server send them in full with every task.",
+        ge=0,
+    )
     test: bool = Field(
         False,
         description="Turn on testing mode for this Manager. The Manager will not connect to any Fractal Server, and "
@@ -976,6 +1023,10 @@ def main(args=None):
     else:
         max_queued_tasks = settings.manager.max_queued_tasks
 
+    upload_chunk_bytes = None
+    if settings.manager.upload_chunk_megabytes is not None:
+        upload_chunk_bytes = int(settings.manager.upload_chunk_megabytes * 1024 ** 2)
+
     # The queue manager is configured differently for node-parallel and single-node tasks
     manager = qcfractal.queue.QueueManager(
         client,
@@ -984,6 +1035,13 @@ def main(args=None):
         queue_tag=settings.manager.queue_tag,
         manager_name=settings.manager.manager_name,
         update_frequency=settings.manager.update_frequency,
+        completion_batch=settings.manager.completion_batch,
+        pipelined=settings.manager.pipelined,
+        adaptive_prefetch=settings.manager.adaptive_prefetch,
+        upload_chunk_size=settings.manager.upload_chunk_size,
+        upload_chunk_bytes=upload_chunk_bytes,
+        spool_path=settings.manager.spool_path,
+        reference_cache_size=settings.manager.reference_cache_size,
         cores_per_task=cores_per_task,
         memory_per_task=memory_per_task,
         nodes_per_task=settings.common.nodes_per_task,
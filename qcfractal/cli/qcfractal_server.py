@@ -4,6 +4,7 @@ A command line interface to the qcfractal server.
 
 import os
 import argparse
+import datetime
 import shutil
 import sys
 
@@ -12,9 +13,11 @@ import yaml
 import qcfractal
 
 from ..config import DatabaseSettings, FractalConfig, FractalServerSettings, _str2bool
+from ..interface import FractalClient
 from ..postgres_harness import PostgresHarness
+from ..server import _build_ssl
 from ..storage_sockets import storage_socket_factory
-from .cli_utils import install_signal_handlers
+from .cli_utils import fork_workers, install_signal_handlers
 
 
 def ensure_postgres_alive(psql):
@@ -78,7 +81,7 @@ def parse_args():
 
     # Allow some config settings to be altered via the command line
     fractal_args = start.add_argument_group("Server Settings")
-    for field in ["port", "logfile", "loglevel", "cprofile"]:
+    for field in ["port", "workers", "logfile", "loglevel", "cprofile", "sql_profile", "sql_slow_threshold"]:
         cli_name = "--" + field.replace("_", "-")
         fractal_args.add_argument(cli_name, **FractalServerSettings.help_info(field))
 
@@ -121,6 +124,29 @@ def parse_args():
     )
     info.add_argument("--base-folder", **FractalConfig.help_info("base_folder"))
 
+    ### SQL profile subcommands
+    sql_profile = subparsers.add_parser(
+        "sql-profile", help="Shows the SQL statement profile of a running server started with --sql-profile."
+    )
+    sql_profile.add_argument("--base-folder", **FractalConfig.help_info("base_folder"))
+    sql_profile.add_argument(
+        "--address", type=str, default=None, help="The server address, defaults to localhost on the configured port."
+    )
+    sql_profile.add_argument("--username", type=str, default=None, help="An admin username, if security is enabled.")
+    sql_profile.add_argument("--password", type=str, default=None, help="The password of the admin user.")
+    sql_profile.add_argument(
+        "--verify", type=_str2bool, default=False, help="Verify the SSL certificate of the server."
+    )
+    sql_profile.add_argument(
+        "--sort",
+        type=str,
+        default="statement_time",
+        choices=["calls", "statements", "statements_per_call", "statement_time", "wall_time"],
+        help="The column methods are sorted by.",
+    )
+    sql_profile.add_argument("--limit", type=int, default=20, help="The number of methods to show.")
+    sql_profile.add_argument("--reset", action="store_true", help="Clears the profile on the server after reading it.")
+
     ### User subcommands
     user = subparsers.add_parser("user", help="Configure a QCFractal server instance.")
     user.add_argument("--base-folder", **FractalConfig.help_info("base_folder"))
@@ -171,6 +197,33 @@ def parse_args():
     user_remove = user_subparsers.add_parser("remove", help="Remove a user.")
     user_remove.add_argument("username", default=None, type=str, help="The username to remove.")
 
+    ### Archive subcommands
+    archive = subparsers.add_parser("archive", help="Manage the archives of errored tasks and manager logs.")
+    archive.add_argument("--base-folder", **FractalConfig.help_info("base_folder"))
+
+    archive_subparsers = archive.add_subparsers(dest="archive_command")
+
+    archive_run = archive_subparsers.add_parser("run", help="Move errored tasks and old manager logs to the archive.")
+    archive_run.add_argument(
+        "--task-age", type=float, default=None, help="Archive tasks errored this many days ago, defaults to the config."
+    )
+    archive_run.add_argument(
+        "--log-age", type=float, default=None, help="Archive manager logs this many days old, defaults to the config."
+    )
+
+    archive_subparsers.add_parser("list", help="List the archive partitions with their number of rows and size.")
+
+    archive_drop = archive_subparsers.add_parser(
+        "drop", help="Drop the monthly archive partitions, and their rows, of months ending before a date."
+    )
+    archive_drop.add_argument("before", type=str, help="The date, as YYYY-MM-DD.")
+
+    archive_restore = archive_subparsers.add_parser("restore", help="Move archived tasks back to the task queue.")
+    archive_restore.add_argument("--id", nargs="+", type=str, default=None, help="The ids of the archived tasks.")
+    archive_restore.add_argument(
+        "--base-result", nargs="+", type=str, default=None, help="The ids of the results of the archived tasks."
+    )
+
     # Backup
     backup = subparsers.add_parser("backup", help="Creates a postgres backup file of the current database.")
     backup.add_argument(
@@ -324,6 +377,17 @@ def server_start(args, config):
     print("Starting a QCFractal server.\n")
     print(f"QCFractal server base folder: {config.base_folder}")
 
+    workers = config.fractal.workers
+    if workers > 1 and args["local_manager"]:
+        print("A local manager cannot be attached to a server with several workers.")
+        sys.exit(1)
+
+    # The molecule and keyword caches are per process and are not invalidated by deletions in other workers
+    cache_size = config.fractal.cache_size
+    if workers > 1 and cache_size > 0:
+        print("In-process record caches are disabled when running several workers.")
+        cache_size = 0
+
     # Build an optional adapter
     if args["local_manager"]:
         ncores = args["local_manager"]
@@ -353,6 +417,17 @@ def server_start(args, config):
         else:
             raise KeyError("Both tls-cert and tls-key must be passed in.")
 
+        # All workers must share one certificate
+        if ssl_options is True and workers > 1:
+            cert, key = _build_ssl()
+            ssl_options = {
+                "crt": str(config.base_path / "qcfractal_ssl.crt"),
+                "key": str(config.base_path / "qcfractal_ssl.key"),
+            }
+            for filename, data in [(ssl_options["crt"], cert), (ssl_options["key"], key)]:
+                with open(filename, "wb") as handle:
+                    handle.write(data)
+
     # Build the server itself
     if config.fractal.logfile is None:
         logfile = None
@@ -370,11 +445,21 @@ def server_start(args, config):
     # make sure DB is created
     psql.create_database(config.database.database_name)
 
+    # Fork before any database connection, thread or IOLoop is created. The parent process
+    # only supervises the workers, which share the port through SO_REUSEPORT.
+    if workers > 1:
+        print(f"\n>>> Forking {workers} server processes...")
+        task_id = fork_workers(workers)
+
+        if logfile is not None:
+            logfile = f"{logfile}.{task_id}"
+
     print("\n>>> Initializing the QCFractal server...")
     try:
         server = qcfractal.FractalServer(
             name=args.get("server_name", None) or config.fractal.name,
             port=config.fractal.port,
+            reuse_port=workers > 1,
             compress_response=config.fractal.compress_response,
             # Security
             security=config.fractal.security,
@@ -384,18 +469,37 @@ def server_start(args, config):
             storage_uri=config.database_uri(safe=False, database=""),
             storage_project_name=config.database.database_name,
             query_limit=config.fractal.query_limit,
+            cache_size=cache_size,
+            sql_profile=config.fractal.sql_profile,
+            sql_slow_threshold=config.fractal.sql_slow_threshold,
+            storage_pool_size=config.database.pool_size,
+            storage_max_overflow=config.database.max_overflow,
+            read_replica_uris=config.database.read_replicas,
+            replica_pool_size=config.database.replica_pool_size,
+            replica_max_overflow=config.database.replica_max_overflow,
             # Collection views
             view_enabled=config.view.enable,
             view_path=config.view_path,
+            view_cache_size=config.view.cache_size,
+            view_cache_validation=config.view.cache_validation,
+            view_mmap=config.view.mmap,
+            view_update_frequency=config.view.update_frequency,
             # Log options
             logfile_prefix=logfile,
             loglevel=config.fractal.loglevel,
             log_apis=config.fractal.log_apis,
             geo_file_path=config.geo_file_path(),
+            access_log_retention=config.fractal.access_log_retention,
+            access_log_rollup=config.fractal.access_log_rollup,
+            server_stats_retention=config.fractal.server_stats_retention,
             # Queue options
             service_frequency=config.fractal.service_frequency,
             heartbeat_frequency=config.fractal.heartbeat_frequency,
+            archive_frequency=config.fractal.archive_frequency,
+            archive_task_age=config.fractal.archive_task_age,
+            archive_log_age=config.fractal.archive_log_age,
             max_active_services=config.fractal.max_active_services,
+            leader_election=workers > 1,
             queue_socket=adapter,
         )
 
@@ -433,6 +537,40 @@ def server_upgrade(args, config):
         sys.exit(1)
 
 
+def server_sql_profile(args, config):
+
+    address = args["address"] or f"localhost:{config.fractal.port}"
+    client = FractalClient(address, username=args["username"], password=args["password"], verify=args["verify"])
+    profile = client.query_sql_profile(reset=args["reset"])
+
+    if not profile["enabled"]:
+        print("SQL profiling is not enabled on this server, start it with `--sql-profile true`.")
+
+    columns = ["calls", "statements", "statements_per_call", "max_statements", "statement_time", "wall_time"]
+    methods = sorted(profile["methods"].items(), key=lambda x: x[1][args["sort"]] or 0, reverse=True)
+
+    print(f"{'method':40s}" + "".join(f"{x:>20s}" for x in columns))
+    for name, stats in methods[: args["limit"]]:
+        row = []
+        for x in columns:
+            value = stats[x]
+            if value is None:
+                row.append(f"{'-':>20s}")
+            elif isinstance(value, float):
+                row.append(f"{value:20.4f}")
+            else:
+                row.append(f"{value:20d}")
+        print(f"{name:40s}" + "".join(row))
+
+    if profile["slow_queries"]:
+        print(f"\nSlow statements (over {profile['slow_threshold']}s), most recent last:")
+        for query in profile["slow_queries"]:
+            print(f"\n{query['timestamp']} {query['method']} {query['duration']:.3f}s")
+            print(query["statement"])
+            if query["plan"]:
+                print(query["plan"])
+
+
 def server_user(args, config):
     standard_command_startup("user function", config)
 
@@ -486,6 +624,49 @@ def server_user(args, config):
         sys.exit(1)
 
 
+def server_archive(args, config):
+    standard_command_startup("archive function", config)
+
+    storage = storage_socket_factory(config.database_uri(safe=False))
+
+    try:
+        if args["archive_command"] == "run":
+            task_age = args["task_age"] if args["task_age"] is not None else config.fractal.archive_task_age
+            log_age = args["log_age"] if args["log_age"] is not None else config.fractal.archive_log_age
+
+            now = datetime.datetime.utcnow()
+            print(f"\n>>> Archiving tasks errored more than {task_age} days ago...")
+            ntasks = storage.archive_tasks(now - datetime.timedelta(days=task_age))
+            print(f"Archived {ntasks} tasks.")
+
+            print(f"\n>>> Archiving manager logs older than {log_age} days...")
+            nlogs = storage.archive_manager_logs(now - datetime.timedelta(days=log_age))
+            print(f"Archived {nlogs} manager logs.")
+        elif args["archive_command"] == "list":
+            print("\n>>> Archive partitions:")
+            print(f"{'partition':40s} {'rows':>10s} {'size (MB)':>10s}  bounds")
+            for part in storage.list_archive_partitions():
+                size = part["size"] / 1024 ** 2
+                print(f"{part['partition']:40s} {part['rows']:10d} {size:10.2f}  {part['bounds']}")
+        elif args["archive_command"] == "drop":
+            before = datetime.datetime.fromisoformat(args["before"])
+            print(f"\n>>> Dropping the archive partitions of months ending before {before:%Y-%m-%d}...")
+            dropped = storage.drop_archive_partitions(before)
+            print(f"Dropped {len(dropped)} partitions: {', '.join(dropped)}")
+        elif args["archive_command"] == "restore":
+            if args["id"] is None and args["base_result"] is None:
+                print("Either --id or --base-result must be given.")
+                sys.exit(1)
+
+            print("\n>>> Restoring archived tasks...")
+            ntasks = storage.restore_tasks(id=args["id"], base_result=args["base_result"])
+            print(f"Restored {ntasks} tasks.")
+
+    except Exception as e:
+        print(type(e), str(e))
+        sys.exit(1)
+
+
 def server_backup(args, config):
     psql = standard_command_startup("backup", config)
 
@@ -614,6 +795,10 @@ def main(args=None):
         server_upgrade(args, config)
     elif command == "user":
         server_user(args, config)
+    elif command == "sql-profile":
+        server_sql_profile(args, config)
+    elif command == "archive":
+        server_archive(args, config)
     elif command == "backup":
         server_backup(args, config)
     elif command == "restore":
@@ -2,6 +2,8 @@
 Tests for QCFractals CLI
 """
 import os
+import subprocess
+import sys
 import tempfile
 import time
 from typing import Any, Dict
@@ -10,6 +12,7 @@ import pytest
 import yaml
 
 import qcfractal
+import qcfractal.interface as ptl
 from qcfractal import testing
 from qcfractal.cli.cli_utils import read_config_file
 
@@ -75,6 +78,21 @@ def test_cli_user_add(qcfractal_base_init):
     assert testing.run_process(args, **_options) is False
 
 
+@pytest.mark.slow
+def test_cli_archive(qcfractal_base_init):
+    args = ["qcfractal-server", "archive", qcfractal_base_init, "run", "--task-age", "0", "--log-age", "0"]
+    assert testing.run_process(args, **_options)
+
+    args = ["qcfractal-server", "archive", qcfractal_base_init, "list"]
+    assert testing.run_process(args, **_options)
+
+    args = ["qcfractal-server", "archive", qcfractal_base_init, "drop", "2000-01-01"]
+    assert testing.run_process(args, **_options)
+
+    args = ["qcfractal-server", "archive", qcfractal_base_init, "restore"]
+    assert testing.run_process(args, **_options) is False
+
+
 @pytest.mark.slow
 def test_cli_user_show(qcfractal_base_init):
     args = ["qcfractal-server", "user", qcfractal_base_init, "add", "test_user_show", "--permissions", "admin"]
@@ -147,6 +165,53 @@ def active_server(request, qcfractal_base_init):
         yield server
 
 
+@pytest.mark.slow
+def test_cli_server_workers(qcfractal_base_init):
+    port = str(testing.find_open_port())
+    args = ["qcfractal-server", "start", qcfractal_base_init, f"--port={port}", "--workers=2", "--disable-ssl=true"]
+    with testing.popen(args, **_options):
+        time.sleep(3)
+
+        # Requests are spread over the workers, which share the port
+        client = ptl.FractalClient(f"http://localhost:{port}")
+        for _ in range(4):
+            assert "counts" in client.server_information()
+
+
+def test_fork_workers_failing_startup():
+    # Workers exiting right away are restarted a limited number of times, then the parent gives up
+    code = (
+        "import os\n"
+        "from qcfractal.cli.cli_utils import fork_workers\n"
+        "fork_workers(1, max_failures=3, max_backoff=0)\n"
+        "os._exit(3)\n"
+    )
+    proc = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, timeout=30)
+
+    assert proc.returncode == 1
+    assert proc.stdout.count("restarting it") == 2
+    assert "failed 3 times in a row" in proc.stdout
+
+
+@pytest.mark.slow
+def test_cli_sql_profile(qcfractal_base_init):
+    port = str(testing.find_open_port())
+    args = [
+        "qcfractal-server",
+        "start",
+        qcfractal_base_init,
+        f"--port={port}",
+        "--sql-profile=true",
+        "--disable-ssl=true",
+    ]
+    with testing.popen(args, **_options):
+        time.sleep(3)
+
+        address = f"--address=http://localhost:{port}"
+        args = ["qcfractal-server", "sql-profile", qcfractal_base_init, address, "--reset"]
+        assert testing.run_process(args, **_options)
+
+
 @pytest.mark.slow
 @pytest.mark.parametrize("log_apis", [0, 1])
 def test_with_api_logging(postgres_server, log_apis):
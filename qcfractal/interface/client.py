@@ -3,7 +3,7 @@
 import json
 import os
 import re
-from collections import defaultdict
+from collections import OrderedDict, defaultdict
 from typing import TYPE_CHECKING, Any, DefaultDict, Dict, List, Optional, Tuple, Union
 
 import pandas as pd
@@ -11,24 +11,28 @@ import requests
 from pydantic import ValidationError
 
 from .collections import collection_factory, collections_name_map
-from .models import build_procedure
+from .models import Molecule, ResultRecord, build_procedure
 from .models.task_models import PriorityEnum
 from .models.rest_models import rest_model
+from .record_cache import RecordCache
 
 if TYPE_CHECKING:  # pragma: no cover
+    from datetime import datetime
+
     from qcfractal import FractalServer
 
     from .collections.collection import Collection
     from .models import (
         GridOptimizationInput,
         KeywordSet,
-        Molecule,
         ObjectId,
-        ResultRecord,
         TaskRecord,
         TorsionDriveInput,
     )
     from .models.rest_models import (
+        CollectionContributedValuesGETResponse,
+        CollectionEntriesGETResponse,
+        CollectionEntriesPUTResponse,
         CollectionGETResponse,
         ComputeResponse,
         KeywordGETResponse,
@@ -75,6 +79,9 @@ class FractalClient(object):
         username: Optional[str] = None,
         password: Optional[str] = None,
         verify: bool = True,
+        cache_size: int = 128,
+        record_cache: Optional[str] = None,
+        record_cache_size: int = 1024,
     ) -> None:
         """Initializes a FractalClient instance from an address and verification information.
 
@@ -91,6 +98,18 @@ class FractalClient(object):
             Verifies the SSL connection with a third party server. This may be False if a
             FractalServer was not provided a SSL certificate and defaults back to self-signed
             SSL keys.
+        cache_size : int, optional
+            The number of responses to keep for conditional (If-None-Match) re-fetching. Only
+            responses the server marks with an ETag (immutable records) are kept, a repeated query
+            then costs a 304 round trip instead of a full transfer. A size of 0 disables the cache.
+        record_cache : Optional[str], optional
+            Path of an SQLite file in which to persist records between sessions. Molecules, results and
+            procedures are then fetched only if they are not cached yet or, for incomplete records, were
+            modified since they were cached. The file may be shared by clients of several servers. Queries with
+            ``include`` bypass the cache. None disables the record cache.
+        record_cache_size : int, optional
+            The approximate maximum size of the record cache, in MB. The least recently used records are
+            evicted first.
         """
 
         if hasattr(address, "get_address"):
@@ -134,6 +153,15 @@ class FractalClient(object):
 
         self._request_counter: DefaultDict[Tuple[str, str], int] = defaultdict(int)
 
+        # Keyed by (service, encoding, request body), holds (ETag, response)
+        self.cache_size = max(0, cache_size)
+        self._response_cache: "OrderedDict[Tuple[str, str, Any], Tuple[str, requests.Response]]" = OrderedDict()
+        self._response_cache_hits = 0
+
+        self.record_cache: Optional[RecordCache] = None
+        if record_cache is not None:
+            self.record_cache = RecordCache(record_cache, max_size=record_cache_size, server=self.address)
+
         ### Define all attributes before this line
 
         # Try to connect and pull general data
@@ -196,6 +224,10 @@ class FractalClient(object):
 </ul>
 """
 
+    def clear_cache(self) -> None:
+        """Removes all responses held for conditional re-fetching."""
+        self._response_cache.clear()
+
     def _set_encoding(self, encoding: str) -> None:
         self.encoding = encoding
         self._headers["Content-Type"] = f"application/{self.encoding}"
@@ -213,6 +245,14 @@ class FractalClient(object):
         addr = self.address + service
         kwargs = {"data": data, "timeout": timeout, "headers": self._headers, "verify": self._verify}
 
+        cache_key = None
+        cached = None
+        if (method == "get") and self.cache_size and (data is not None):
+            cache_key = (service, self.encoding, data)
+            cached = self._response_cache.get(cache_key)
+            if cached is not None:
+                kwargs["headers"] = {**self._headers, "If-None-Match": cached[0]}
+
         if self._mock_network_error:
             raise requests.exceptions.RequestException("mock_network_error is on, failing by design!")
 
@@ -232,6 +272,19 @@ class FractalClient(object):
         except requests.exceptions.ConnectionError:
             raise ConnectionRefusedError(_connection_error_msg.format(self.address)) from None
 
+        if cache_key is not None:
+            if (r.status_code == 304) and (cached is not None):
+                self._response_cache.move_to_end(cache_key)
+                self._response_cache_hits += 1
+                return cached[1]
+
+            etag = r.headers.get("ETag")
+            if (r.status_code == 200) and etag:
+                self._response_cache[cache_key] = (etag, r)
+                self._response_cache.move_to_end(cache_key)
+                while len(self._response_cache) > self.cache_size:
+                    self._response_cache.popitem(last=False)
+
         if (r.status_code != 200) and (not noraise):
             raise IOError("Server communication failure. Reason: {}".format(r.reason))
 
@@ -280,6 +333,52 @@ class FractalClient(object):
         else:
             return response.data
 
+    def _query_cached_records(self, name: str, payload: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """
+        Runs a result or procedure query through the record cache, returning full records as dictionaries.
+
+        Only the ids, statuses and modification times of the matching records are queried. Completed
+        cached records are used as is, incomplete ones only if unmodified since they were cached, and
+        all other records are fetched by id and cached.
+        """
+
+        index_meta = {**payload["meta"], "include": ["id", "status", "modified_on"]}
+        index = self._automodel_request(name, "get", {"meta": index_meta, "data": payload["data"]})
+
+        index_ids = [str(x["id"]) for x in index]
+        cached = self.record_cache.get_many(name, index_ids)
+
+        records = {}
+        for x in index:
+            record_id = str(x["id"])
+            if record_id not in cached:
+                continue
+            status, modified_on, record = cached[record_id]
+            if status == "COMPLETE" or modified_on == str(x["modified_on"]):
+                records[record_id] = record
+
+        missing = [x for x in index if str(x["id"]) not in records]
+        for i in range(0, len(missing), self.query_limit):
+            chunk = missing[i : i + self.query_limit]
+            fetch_payload = {"meta": {}, "data": {"id": [str(x["id"]) for x in chunk], "status": None}}
+            fetched = {}
+            for record in self._automodel_request(name, "get", fetch_payload):
+                if not isinstance(record, dict):
+                    record = record.dict()
+                fetched[str(record["id"])] = record
+
+            self.record_cache.set_many(
+                name,
+                [
+                    (str(x["id"]), str(x["status"]), str(x["modified_on"]), fetched[str(x["id"])])
+                    for x in chunk
+                    if str(x["id"]) in fetched
+                ],
+            )
+            records.update(fetched)
+
+        return [records[x] for x in index_ids if x in records]
+
     @classmethod
     def from_file(cls, load_path: Optional[str] = None) -> "FractalClient":
         """Creates a new FractalClient from file. If no path is passed in, the
@@ -402,6 +501,28 @@ class FractalClient(object):
             A list of found molecules.
         """
 
+        # Molecules are immutable, those queried only by id are served from the record cache
+        if (
+            (self.record_cache is not None)
+            and (id is not None)
+            and (molecule_hash is None)
+            and (molecular_formula is None)
+            and (limit is None)
+            and (skip == 0)
+            and not full_return
+        ):
+            ids = list(dict.fromkeys(str(x) for x in (id if isinstance(id, (list, tuple)) else [id])))
+            molecules = self.record_cache.get_many("molecule", ids)
+
+            missing = [x for x in ids if x not in molecules]
+            for i in range(0, len(missing), self.query_limit):
+                payload = {"meta": {}, "data": {"id": missing[i : i + self.query_limit]}}
+                fetched = {str(mol.id): mol.dict() for mol in self._automodel_request("molecule", "get", payload)}
+                self.record_cache.set_many("molecule", [(k, None, None, v) for k, v in fetched.items()])
+                molecules.update({k: (None, None, v) for k, v in fetched.items()})
+
+            return [Molecule(**molecules[x][2], validate=False) for x in ids if x in molecules]
+
         payload = {
             "meta": {"limit": limit, "skip": skip},
             "data": {"id": id, "molecule_hash": molecule_hash, "molecular_formula": molecular_formula},
@@ -587,6 +708,8 @@ class FractalClient(object):
         if include is None and exclude is None:
             if collection_type.lower() in ["dataset", "reactiondataset"]:  # XXX
                 payload["meta"]["exclude"] = ["contributed_values", "records"]
+            elif collection_type.lower() in ["optimizationdataset", "torsiondrivedataset", "gridoptimizationdataset"]:
+                payload["meta"]["exclude"] = ["records"]
         else:
             payload["meta"]["include"] = include
             payload["meta"]["exclude"] = exclude
@@ -601,6 +724,121 @@ class FractalClient(object):
         else:
             raise KeyError("Collection '{}:{}' not found.".format(collection_type, name))
 
+    def query_collection_entries(
+        self,
+        collection_id: "ObjectId",
+        subset: Optional["QueryStr"] = None,
+        pattern: Optional[str] = None,
+        limit: Optional[int] = None,
+        skip: int = 0,
+        full_return: bool = False,
+    ) -> Union["CollectionEntriesGETResponse", List[Dict[str, Any]]]:
+        """Queries a page of the entries of a collection, ordered by name.
+
+        Parameters
+        ----------
+        collection_id : ObjectId
+            The id of the collection.
+        subset : Optional[QueryStr], optional
+            Names of the entries to return, all if None.
+        pattern : Optional[str], optional
+            Only return entries whose name matches this case insensitive glob pattern (``*`` and ``?`` wildcards).
+        limit : Optional[int], optional
+            The maximum number of entries to return. Note that the server limit is always obeyed.
+        skip : int, optional
+            The number of entries to skip.
+        full_return : bool, optional
+            Returns the full server response if True that contains additional metadata.
+
+        Returns
+        -------
+        List[Dict[str, Any]]
+            The entries as dictionaries.
+        """
+
+        payload = {"meta": {"limit": limit, "skip": skip}, "data": {"subset": subset, "pattern": pattern}}
+        return self._automodel_request(f"collection/{collection_id}/entries", "get", payload, full_return=full_return)
+
+    def update_collection_entries(
+        self,
+        collection_id: "ObjectId",
+        add_entries: Optional[List[Dict[str, Any]]] = None,
+        remove_entries: Optional[List[str]] = None,
+        object_map: Optional[Dict[str, Dict[str, "ObjectId"]]] = None,
+        history: Optional[List[Any]] = None,
+        full_return: bool = False,
+    ) -> Union["CollectionEntriesPUTResponse", "CollectionEntriesPUTResponse.Data"]:
+        """Updates the entries of a collection on the server without resending the whole collection.
+
+        Parameters
+        ----------
+        collection_id : ObjectId
+            The id of the collection.
+        add_entries : Optional[List[Dict[str, Any]]], optional
+            Entries to add, replacing the existing entries of the same name.
+        remove_entries : Optional[List[str]], optional
+            Names of the entries to remove.
+        object_map : Optional[Dict[str, Dict[str, ObjectId]]], optional
+            Cells of the object maps of the entries to set, as ``{entry name: {specification: id}}``.
+            Only for collections keeping an object map per entry, such as the procedure datasets.
+        history : Optional[List[Any]], optional
+            Items to append to the history of the collection.
+        full_return : bool, optional
+            Returns the full server response if True that contains additional metadata.
+
+        Returns
+        -------
+        CollectionEntriesPUTResponse.Data
+            The number of entries added (``n_added``), removed (``n_removed``), and with an updated object
+            map (``n_updated``).
+        """
+
+        payload = {
+            "meta": {},
+            "data": {
+                "add_entries": add_entries or [],
+                "remove_entries": remove_entries or [],
+                "object_map": object_map or {},
+                "history": history or [],
+            },
+        }
+        return self._automodel_request(f"collection/{collection_id}/entries", "put", payload, full_return=full_return)
+
+    def query_contributed_values(
+        self,
+        collection_id: "ObjectId",
+        name: Optional["QueryStr"] = None,
+        subset: Optional["QueryStr"] = None,
+        include_values: bool = True,
+        full_return: bool = False,
+    ) -> Union["CollectionContributedValuesGETResponse", List[Dict[str, Any]]]:
+        """Queries the contributed values of a collection, optionally for a subset of its entries only.
+
+        Parameters
+        ----------
+        collection_id : ObjectId
+            The id of the collection.
+        name : Optional[QueryStr], optional
+            Names of the contributed values to return (case insensitive), all if None.
+        subset : Optional[QueryStr], optional
+            Entries for which to return values, all if None.
+        include_values : bool, optional
+            Return the ``index`` and ``values`` of the entries. Otherwise both are None and only the
+            metadata of the contributed values is returned.
+        full_return : bool, optional
+            Returns the full server response if True that contains additional metadata.
+
+        Returns
+        -------
+        List[Dict[str, Any]]
+            The contributed values as dictionaries.
+        """
+
+        payload = {"meta": {}, "data": {"name": name, "subset": subset, "include_values": include_values}}
+        return self._automodel_request(
+            f"collection/{collection_id}/contributed_values", "get", payload, full_return=full_return
+        )
+
     def add_collection(
         self, collection: Dict[str, Any], overwrite: bool = False, full_return: bool = False
     ) -> Union["CollectionGETResponse", List["ObjectId"]]:
@@ -715,6 +953,10 @@ class FractalClient(object):
                 "status": status,
             },
         }
+        if (self.record_cache is not None) and not include and not full_return:
+            records = self._query_cached_records("result", payload)
+            return [ResultRecord(**record, client=self) for record in records]
+
         response = self._automodel_request("result", "get", payload, full_return=True)
 
         # Add references back to the client
@@ -783,6 +1025,10 @@ class FractalClient(object):
                 "status": status,
             },
         }
+        if (self.record_cache is not None) and not include and not full_return:
+            records = self._query_cached_records("procedure", payload)
+            return [build_procedure(record, client=self) for record in records]
+
         response = self._automodel_request("procedure", "get", payload, full_return=True)
 
         if not include:
@@ -1203,6 +1449,70 @@ class FractalClient(object):
         }
         return self._automodel_request("manager", "get", payload, full_return=full_return)
 
+    def query_sql_profile(self, reset: bool = False, full_return: bool = False) -> Dict[str, Any]:
+        """Obtains the SQL statement profile of the server's storage methods, requires admin permissions
+
+        The server must have been started with SQL profiling enabled for the profile to contain data.
+
+        Parameters
+        ----------
+        reset : bool, optional
+            Clears the profile on the server after reading it.
+        full_return : bool, optional
+            Returns the full server response if True that contains additional metadata.
+
+        Returns
+        -------
+        Dict[str, Any]
+            The statement counts and times per storage method (``methods``) and the most recent slow
+            statements (``slow_queries``).
+        """
+        payload = {"meta": {}, "data": {"reset": reset}}
+        return self._automodel_request("sql_profile", "get", payload, full_return=full_return)
+
+    def query_access_summary(
+        self,
+        after: Optional["datetime"] = None,
+        before: Optional["datetime"] = None,
+        granularity: str = "day",
+        group_by: Optional[List[str]] = None,
+        access_type: Optional["QueryListStr"] = None,
+        full_return: bool = False,
+    ) -> List[Dict[str, Any]]:
+        """Counts the API accesses to the server per period, requires admin permissions
+
+        Access logging must be enabled on the server for the counts to contain data.
+
+        Parameters
+        ----------
+        after : Optional[datetime], optional
+            Only counts accesses at or after this date.
+        before : Optional[datetime], optional
+            Only counts accesses before this date.
+        granularity : str, optional
+            The period accesses are counted in, one of hour, day, week, month or year.
+        group_by : Optional[List[str]], optional
+            Fields the counts are split by, among access_type, access_method, country_code and username.
+            Defaults to access_type.
+        access_type : Optional[QueryListStr], optional
+            Only counts accesses to these endpoints.
+        full_return : bool, optional
+            Returns the full server response if True that contains additional metadata.
+
+        Returns
+        -------
+        List[Dict[str, Any]]
+            One entry per period and group, with the period, the group fields and the count.
+        """
+        payload = {
+            "meta": {},
+            "data": {"after": after, "before": before, "granularity": granularity, "access_type": access_type},
+        }
+        if group_by is not None:
+            payload["data"]["group_by"] = group_by
+
+        return self._automodel_request("access/summary", "get", payload, full_return=full_return)
+
     # -------------------------------------------------------------------------
     # ------------------   Advanced Queries -----------------------------------
     # -------------------------------------------------------------------------
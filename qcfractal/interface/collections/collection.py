@@ -249,7 +249,8 @@ class Collection(abc.ABC):
                 raise KeyError(f"Error adding collection: \n{response.meta.error_description}")
             self.data.__dict__["id"] = response.data
         else:
-            response = client.add_collection(self.data.dict(), overwrite=True, full_return=True)
+            # Entries are sent on their own when added or changed, see FractalClient.update_collection_entries
+            response = client.add_collection(self.data.dict(exclude={"records"}), overwrite=True, full_return=True)
             if response.meta.success is False:
                 raise KeyError(f"Error updating collection: \n{response.meta.error_description}")
 
@@ -257,6 +258,39 @@ class Collection(abc.ABC):
 
     ### General helpers
 
+    def _query_entries(self, subset: Optional[List[str]] = None) -> List[Any]:
+        """Fetches the entries of the collection, or the subset of them, from the server one page at a time.
+
+        Parameters
+        ----------
+        subset : Optional[List[str]], optional
+            The names of the entries to fetch, all entries if None.
+
+        Returns
+        -------
+        List[Any]
+            The entries, validated as the entry type of the `records` field of the DataModel.
+        """
+        self._check_client()
+        entry_type = self.DataModel.__fields__["records"].type_
+        limit = self.client.query_limit
+
+        entries = []
+        if subset is None:
+            while True:
+                response = self.client.query_collection_entries(
+                    self.data.id, limit=limit, skip=len(entries), full_return=True
+                )
+                entries.extend(response.data)
+                if not response.data or len(entries) >= response.meta.n_found:
+                    break
+        else:
+            subset = list(subset)
+            for i in range(0, len(subset), limit):
+                entries.extend(self.client.query_collection_entries(self.data.id, subset=subset[i : i + limit]))
+
+        return [entry_type(**entry) for entry in entries]
+
     @staticmethod
     def _add_molecules_by_dict(client, molecules):
 
@@ -281,11 +315,16 @@ class BaseProcedureDataset(Collection):
 
         super().__init__(name, client=client, **kwargs)
 
-        self.df = pd.DataFrame(index=self._get_index())
+        # Entries are fetched from the server on demand, a brand new dataset starts without any
+        if self.data.id == "local" and self.data.records is None:
+            self.data.__dict__["records"] = {}
+
+        self._df: Optional[pd.DataFrame] = None
+        self._new_entries: Dict[str, Any] = {}
 
     class DataModel(Collection.DataModel):
 
-        records: Dict[str, Any] = {}
+        records: Optional[Dict[str, Any]] = None
         history: Set[str] = set()
         specs: Dict[str, Any] = {}
 
@@ -293,15 +332,40 @@ class BaseProcedureDataset(Collection):
             pass
 
     @abc.abstractmethod
-    def _internal_compute_add(self, spec: Any, entry: Any, tag: str, priority: str) -> "ObjectId":
-        pass
+    def _internal_compute_add(self, spec: Any, entries: List[Any], tag: str, priority: str) -> List["ObjectId"]:
+        """Submits the computations of a specification for several entries at once, returning their ids in order."""
+
+    @property
+    def df(self) -> pd.DataFrame:
+        if self._df is None:
+            self._df = pd.DataFrame(index=self._get_index())
+        return self._df
+
+    @df.setter
+    def df(self, value: pd.DataFrame) -> None:
+        self._df = value
+
+    def _get_data_records_from_db(self) -> None:
+        self.data.__dict__["records"] = {entry.name.lower(): entry for entry in self._query_entries()}
+
+    def _get_records(self) -> Dict[str, Any]:
+        """Returns all entries of the dataset, fetching them from the server first if needed."""
+        if self.data.records is None:
+            self._get_data_records_from_db()
+        return self.data.records
 
     def _pre_save_prep(self, client: "FractalClient") -> None:
-        pass
+        # New entries of a dataset already on the server are sent on their own
+        if self.data.id != "local":
+            new_entries = list(self._new_entries.values())
+            for i in range(0, len(new_entries), client.query_limit):
+                chunk = new_entries[i : i + client.query_limit]
+                client.update_collection_entries(self.data.id, add_entries=[entry.dict() for entry in chunk])
+        self._new_entries = {}
 
     def _get_index(self):
 
-        return [x.name for x in self.data.records.values()]
+        return [x.name for x in self._get_records().values()]
 
     def _add_specification(self, name: str, spec: Any, overwrite=False) -> None:
         """
@@ -343,8 +407,13 @@ class BaseProcedureDataset(Collection):
 
         spec = self.get_specification(spec)
 
+        if sieve and self.data.records is None:
+            records = self._query_entries(sieve)
+        else:
+            records = self._get_records().values()
+
         mapper = {}
-        for rec in self.data.records.values():
+        for rec in records:
             if sieve and rec.name not in sieve:
                 continue
 
@@ -400,7 +469,14 @@ class BaseProcedureDataset(Collection):
         Checks if an entry exists or not.
         """
 
-        if name.lower() in self.data.records:
+        if name.lower() in self._new_entries:
+            exists = True
+        elif self.data.records is None:
+            exists = len(self.client.query_collection_entries(self.data.id, subset=[name])) > 0
+        else:
+            exists = name.lower() in self.data.records
+
+        if exists:
             raise KeyError(f"Record {name} already in the dataset.")
 
     def _add_entry(self, name, record, save):
@@ -409,7 +485,9 @@ class BaseProcedureDataset(Collection):
         """
 
         self._check_entry_exists(name)
-        self.data.records[name.lower()] = record
+        if self.data.records is not None:
+            self.data.records[name.lower()] = record
+        self._new_entries[name.lower()] = record
         if save:
             self.save()
 
@@ -426,10 +504,16 @@ class BaseProcedureDataset(Collection):
         Record
             The requested record
         """
-        try:
-            return self.data.records[name.lower()]
-        except KeyError:
-            raise KeyError(f"Could not find entry name '{name}' in the dataset.")
+        if self.data.records is None:
+            found = [entry for entry in self._query_entries([name]) if entry.name.lower() == name.lower()]
+            if found:
+                return found[0]
+        else:
+            try:
+                return self.data.records[name.lower()]
+            except KeyError:
+                pass
+        raise KeyError(f"Could not find entry name '{name}' in the dataset.")
 
     def get_record(self, name: str, specification: str) -> Any:
         """Pulls an individual computational record of the requested name and column.
@@ -482,24 +566,37 @@ class BaseProcedureDataset(Collection):
         if subset:
             subset = set(subset)
 
-        submitted = 0
-        for entry in self.data.records.values():
-            if (subset is not None) and (entry.name not in subset):
-                continue
-
-            if spec.name in entry.object_map:
-                continue
+        # Entries added without saving must exist on the server before their object map is updated there
+        if self._new_entries and self.data.id != "local":
+            self._pre_save_prep(self.client)
 
-            entry.object_map[spec.name] = self._internal_compute_add(spec, entry, tag, priority)
-            submitted += 1
+        if (subset is not None) and (self.data.records is None):
+            entries = self._query_entries(subset)
+        else:
+            entries = self._get_records().values()
+        entries = [
+            entry
+            for entry in entries
+            if ((subset is None) or (entry.name in subset)) and (spec.name not in entry.object_map)
+        ]
+
+        object_map = {}
+        for i in range(0, len(entries), self.client.query_limit):
+            chunk = entries[i : i + self.client.query_limit]
+            for entry, object_id in zip(chunk, self._internal_compute_add(spec, chunk, tag, priority)):
+                entry.object_map[spec.name] = object_id
+                object_map[entry.name] = {spec.name: object_id}
 
         self.data.history.add(specification)
 
         # Nothing to save
-        if submitted:
-            self.save()
+        if object_map:
+            if self.data.id == "local":
+                self.save()
+            else:
+                self.client.update_collection_entries(self.data.id, object_map=object_map, history=[specification])
 
-        return submitted
+        return len(object_map)
 
     def query(self, specification: str, force: bool = False) -> pd.Series:
         """Queries a given specification from the server
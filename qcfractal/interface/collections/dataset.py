@@ -36,9 +36,13 @@ class MoleculeEntry(ProtoModel):
 
 class ContributedValues(ProtoModel):
     name: str = Field(..., description="The name of the contributed values.")
-    values: Any = Field(..., description="The values in the contributed values.")
-    index: Array[str] = Field(
-        ..., description="The entry index for the contributed values, matches the order of the `values` array."
+    values: Any = Field(
+        None,
+        description="The values in the contributed values. None if only the metadata of the contributed values was "
+        "fetched from the server, the values are then queried on demand.",
+    )
+    index: Optional[Array[str]] = Field(
+        None, description="The entry index for the contributed values, matches the order of the `values` array."
     )
     values_structure: Dict[str, Any] = Field(
         {}, description="A machine readable description of the values structure. Typically not needed."
@@ -58,7 +62,7 @@ class ContributedValues(ProtoModel):
 
     @validator("values")
     def _make_array(cls, v):
-        if isinstance(v, (list, tuple)) and isinstance(v[0], (float, int, str, bool)):
+        if isinstance(v, (list, tuple)) and len(v) and isinstance(v[0], (float, int, str, bool)):
             v = np.array(v)
 
         return v
@@ -242,30 +246,19 @@ class Dataset(Collection):
             raise NotImplementedError(f"Unsupported encoding: {encoding}")
 
     def _get_data_records_from_db(self):
-        self._check_client()
-        # This is hacky. What we want to do is get records and contributed values correctly unpacked into pydantic
-        # objects. So what we do is call get_collection with include. But we have to also include collection and
-        # name in the query because they are required in the collection DataModel. But we can use these to check that
-        # we got back the right data, so that's nice.
-        response = self.client.get_collection(
-            self.__class__.__name__.lower(),
-            self.name,
-            full_return=False,
-            include=["records", "contributed_values", "collection", "name", "id"],
-        )
-        if not (response.data.id == self.data.id and response.data.name == self.name):
-            raise ValueError("Got the wrong records and contributed values from the server.")
-        # This works because get_collection builds a validated Dataset object
-        self.data.__dict__["records"] = response.data.records
-        self.data.__dict__["contributed_values"] = response.data.contributed_values
+        self.data.__dict__["records"] = self._query_entries()
 
-    def _entry_index(self, subset: Optional[List[str]] = None) -> pd.DataFrame:
-        # TODO: make this fast for subsets
+    def _get_entries(self, subset: Optional[List[str]] = None) -> List[Any]:
+        """Returns the entries of the dataset. If they are not loaded yet, a subset is fetched on its own."""
         if self.data.records is None:
+            if subset is not None:
+                return self._query_entries(subset)
             self._get_data_records_from_db()
+        return self.data.records
 
+    def _entry_index(self, subset: Optional[List[str]] = None) -> pd.DataFrame:
         ret = pd.DataFrame(
-            [[entry.name, entry.molecule_id] for entry in self.data.records], columns=["name", "molecule_id"]
+            [[entry.name, entry.molecule_id] for entry in self._get_entries(subset)], columns=["name", "molecule_id"]
         )
         if subset is None:
             return ret
@@ -278,8 +271,6 @@ class Dataset(Collection):
 
     def _canonical_pre_save(self, client: "FractalClient") -> None:
         self._ensure_contributed_values()
-        if self.data.records is None:
-            self._get_data_records_from_db()
         for k in list(self._new_keywords.keys()):
             ret = client.add_keywords([self._new_keywords[k]])
             assert len(ret) == 1, "KeywordSet added incorrectly"
@@ -294,14 +285,25 @@ class Dataset(Collection):
         mol_ret = self._add_molecules_by_dict(client, self._new_molecules)
 
         # Update internal molecule UUID's to servers UUID's
+        new_records = []
         for record in self._new_records:
             molecule_hash = record.pop("molecule_hash")
-            new_record = MoleculeEntry(molecule_id=mol_ret[molecule_hash], **record)
-            self.data.records.append(new_record)
+            new_records.append(MoleculeEntry(molecule_id=mol_ret[molecule_hash], **record))
+        self._add_entries(client, new_records)
 
         self._new_records = []
         self._new_molecules = {}
 
+    def _add_entries(self, client: "FractalClient", entries: List[Any]) -> None:
+        """Stores new entries, the entries of a dataset already on the server are sent to it on their own."""
+        if self.data.records is not None:
+            self.data.records.extend(entries)
+
+        if self.data.id != "local":
+            for i in range(0, len(entries), client.query_limit):
+                chunk = entries[i : i + client.query_limit]
+                client.update_collection_entries(self.data.id, add_entries=[entry.dict() for entry in chunk])
+
     def get_entries(self, subset: Optional[List[str]] = None, force: bool = False) -> pd.DataFrame:
         """
         Provides a list of entries for the dataset
@@ -1418,7 +1420,27 @@ class Dataset(Collection):
 
     def _ensure_contributed_values(self) -> None:
         if self.data.contributed_values is None:
-            self._get_data_records_from_db()
+            self._check_client()
+            # Only the metadata, values are queried for the requested entries when needed
+            response = self.client.query_contributed_values(self.data.id, include_values=False)
+            self.data.__dict__["contributed_values"] = {cv["name"].lower(): ContributedValues(**cv) for cv in response}
+
+    def _query_contributed_values(self, names: List[str], subset: Set[str]) -> Dict[str, ContributedValues]:
+        """Queries the values of the contributed values `names` for the entries in `subset` only"""
+        self._check_client()
+
+        subset = list(subset)
+        ret: Dict[str, Dict[str, Any]] = {}
+        for i in range(0, len(subset), self.client.query_limit):
+            chunk = subset[i : i + self.client.query_limit]
+            for cv in self.client.query_contributed_values(self.data.id, name=names, subset=chunk):
+                if cv["name"] in ret:
+                    ret[cv["name"]]["index"].extend(cv["index"])
+                    ret[cv["name"]]["values"].extend(cv["values"])
+                else:
+                    ret[cv["name"]] = cv
+
+        return {name.lower(): ContributedValues(**cv) for name, cv in ret.items()}
 
     def _list_contributed_values(self) -> pd.DataFrame:
         """
@@ -1483,12 +1505,29 @@ class Dataset(Collection):
             self._ensure_contributed_values()
             units: Dict[str, str] = {}
 
+            # Values of datasets fetched from the server are only queried for the entries needed
+            cv_data = {}
+            missing = []
             for query in new_queries:
-                data = self.data.contributed_values[query["name"].lower()].copy()
+                data = self.data.contributed_values[query["name"].lower()]
+                if data.values is None:
+                    missing.append(data.name)
+                else:
+                    cv_data[data.name.lower()] = data
+            if missing:
+                cv_data.update(self._query_contributed_values(missing, subset))
+
+            for query in new_queries:
+                data = cv_data.get(query["name"].lower())
+                if data is None:
+                    # No values for any entry of the subset
+                    data = self.data.contributed_values[query["name"].lower()].copy(update={"values": [], "index": []})
+                else:
+                    data = data.copy()
                 column_name = data.name
 
                 # Annoying work around to prevent some pandas magic
-                if isinstance(data.values[0], (int, float, bool, np.number)):
+                if len(data.values) == 0 or isinstance(data.values[0], (int, float, bool, np.number)):
                     values = data.values
                 else:
                     # TODO temporary patch until msgpack collections
@@ -1502,7 +1541,7 @@ class Dataset(Collection):
                     else:
                         values = [np.array(v) for v in data.values]
 
-                new_data[column_name] = pd.Series(values, index=data.index)[subset]
+                new_data[column_name] = pd.Series(values, index=data.index).reindex(list(subset))
                 units[column_name] = data.units
         else:
             for query in new_queries:
@@ -7,19 +7,43 @@ import tarfile
 import tempfile
 import warnings
 from contextlib import contextmanager
-from typing import TYPE_CHECKING, Any, Dict, Iterator, List, NoReturn, Optional, Tuple, Union
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterator, List, NoReturn, Optional, Tuple, Union
 
 import numpy as np
 import pandas as pd
 import h5py
 from qcelemental.util.serialization import deserialize, serialize
 
-from ..models import Molecule, ObjectId
+from ..models import Molecule, ObjectId, ViewDataFormatEnum
 from ..util import normalize_filename
 from .dataset import Dataset, MoleculeEntry
 from .reaction_dataset import ReactionDataset, ReactionEntry
 
+# Above this fraction of a dataset, reading it whole is cheaper than point selections
+_FULL_READ_FRACTION = 0.1
+
+# Maximum number of rows per HDF5 chunk when writing views
+_VIEW_CHUNK_ROWS = 16384
+
+# Collection fields stored as attributes of HDF5 views
+_ATTRIBUTE_FIELDS = (
+    "name",
+    "collection",
+    "provenance",
+    "tagline",
+    "tags",
+    "id",
+    "history_keys",
+    "description",
+    "metadata",
+)
+
+# Arrow field metadata marking view columns of nested lists which are to be read back as ndarrays
+ARROW_NDARRAY_METADATA = {b"qcfractal.type": b"ndarray"}
+
 if TYPE_CHECKING:  # pragma: no cover
+    import pyarrow
+
     from .. import FractalClient
     from ..models.rest_models import CollectionSubresourceGETResponseMeta
 
@@ -107,33 +131,61 @@ class DatasetView(abc.ABC):
 
 
 class HDF5View(DatasetView):
-    def __init__(self, path: Union[str, pathlib.Path]) -> None:
+    def __init__(self, path: Union[str, pathlib.Path], keep_open: bool = False, mmap: bool = False) -> None:
         """
         Parameters
         ----------
         path: Union[str, pathlib.Path]
             File path of view
+        keep_open: bool, optional
+            Keep a single read handle to the file open between calls, until close() is called
+        mmap: bool, optional
+            Read contiguous, unfiltered value columns through a memory map rather than through HDF5. Views written
+            or updated with mmap store their fixed-size value columns (energies, dipoles, ...) in that layout.
         """
         path = pathlib.Path(path)
         self._path = path
         self._entries: pd.DataFrame = None
         self._index: pd.DataFrame = None
 
+        self._keep_open = keep_open
+        self._mmap = mmap
+        self._handle: Optional["h5py.File"] = None
+        self._mmaps: Dict[str, np.ndarray] = {}
+
+    def close(self) -> None:
+        """ Closes the persistent file handle and memory maps, if any """
+        if self._handle is not None:
+            self._handle.close()
+            self._handle = None
+        self._mmaps = {}
+
+    def memory_usage(self) -> int:
+        """ Approximate number of bytes held in memory by the view: cached frames and the open file's chunk cache """
+        nbytes = 0
+        for df in (self._entries, self._index):
+            if df is not None:
+                nbytes += int(df.memory_usage(deep=True).sum())
+        if self._handle is not None:
+            nbytes += self._handle.id.get_access_plist().get_cache()[2]
+        return nbytes
+
     def list_values(self) -> pd.DataFrame:
+        rows = []
         with self._read_file() as f:
             history_keys = self._deserialize_field(f.attrs["history_keys"])
-            df = pd.DataFrame(columns=history_keys + ["name", "native"])
             for dataset in f["value"].values():
                 row = {k: self._deserialize_field(dataset.attrs[k]) for k in history_keys}
                 row["name"] = self._deserialize_field(dataset.attrs["name"])
                 row["native"] = True
-                df = df.append(row, ignore_index=True)
+                rows.append(row)
             for dataset in f["contributed_value"].values():
                 row = dict()
                 row["name"] = self._deserialize_field(dataset.attrs["name"])
                 for k in history_keys:
                     row[k] = "Unknown"
-                # ReactionDataset uses "default" as a default value for stoich, but many contributed datasets lack a stoich field
+                # ReactionDataset uses "default" as a default value for stoich,
+                # but many contributed datasets lack a stoich field
                 if "stoichiometry" in history_keys:
                     row["stoichiometry"] = "default"
                 if "theory_level_details" in dataset.attrs:
@@ -141,9 +193,12 @@ class HDF5View(DatasetView):
                     if isinstance(theory_level_details, dict):
                         row.update(**theory_level_details)
                 row["native"] = False
-                df = df.append(row, ignore_index=True)
-        # for some reason, pandas makes native a float column
-        return df.astype({"native": bool})
+                rows.append(row)
+
+        columns = dict.fromkeys(history_keys + ["name", "native"])
+        for row in rows:
+            columns.update(dict.fromkeys(row))
+        return pd.DataFrame(rows, columns=list(columns)).astype({"native": bool})
 
     def get_values(
         self, queries: List[Dict[str, Union[str, bool]]], subset: Optional[List[str]] = None
@@ -168,26 +223,20 @@ class HDF5View(DatasetView):
                 driver = query["driver"]
 
                 dataset = f[dataset_name]
+                rows = self._read_rows(self._mmap_dataset(dataset) if self._mmap else dataset, indexes)
                 if not h5py.check_dtype(vlen=dataset.dtype):
-                    data = [dataset[i] for i in indexes]
+                    data = rows if rows.ndim == 1 else list(rows)
                 else:
                     if driver.lower() == "gradient":
-                        data = [np.reshape(dataset[i], (-1, 3)) for i in indexes]
+                        data = self._reshape_vlen(rows, lambda n: (-1, 3))
                     elif driver.lower() == "hessian":
-                        data = []
-                        for i in indexes:
-                            n2 = len(dataset[i])
-                            n = int(round(np.sqrt(n2)))
-                            data.append(np.reshape(dataset[i], (n, n)))
+                        data = self._reshape_vlen(rows, lambda n: (int(round(np.sqrt(n))),) * 2)
                     else:
                         warnings.warn(
                             f"Variable length data type not understood, returning flat array " f"(driver = {driver}).",
                             RuntimeWarning,
                         )
-                        try:
-                            data = [np.array(dataset[i]) for i in indexes]
-                        except ValueError:
-                            data = [dataset[i] for i in indexes]
+                        data = list(rows)
                 column_name = query["name"]
                 column_units = self._deserialize_field(dataset.attrs["units"])
                 ret[column_name] = data
@@ -197,16 +246,11 @@ class HDF5View(DatasetView):
 
     def get_molecules(self, indexes: List[Union[ObjectId, int]], keep_serialized: bool = False) -> pd.Series:
         with self._read_file() as f:
-            mol_schema = f["molecule/schema"]
-            if not keep_serialized:
-                mols = [
-                    Molecule(
-                        **self._deserialize_data(mol_schema[int(i) if isinstance(i, ObjectId) else i]), validate=False
-                    )
-                    for i in indexes
-                ]
-            else:
-                mols = [mol_schema[int(i) if isinstance(i, ObjectId) else i].tobytes() for i in indexes]
+            rows = self._read_rows(f["molecule/schema"], [int(i) if isinstance(i, ObjectId) else i for i in indexes])
+        if not keep_serialized:
+            mols = [Molecule(**self._deserialize_data(row), validate=False) for row in rows]
+        else:
+            mols = [row.tobytes() for row in rows]
         return pd.Series(mols, index=indexes)
 
     def get_index(self, subset: Optional[List[str]] = None) -> pd.DataFrame:
@@ -241,63 +285,11 @@ class HDF5View(DatasetView):
             return self._entries.loc[subset].reset_index()
 
     def write(self, ds: Dataset):
-        # For data checksums
-        dataset_kwargs = {"chunks": True, "fletcher32": True}
         ds.get_entries(force=True)
-        n_records = len(ds.data.records)
-        default_shape = (n_records,)
-
-        if h5py.__version__ >= distutils.version.StrictVersion("2.10.0"):
-            vlen_double_t = h5py.vlen_dtype(np.dtype("float64"))
-            utf8_t = h5py.string_dtype(encoding="utf-8")
-            bytes_t = h5py.vlen_dtype(np.dtype("uint8"))
-            vlen_utf8_t = h5py.vlen_dtype(utf8_t)
-        else:
-            vlen_double_t = h5py.special_dtype(vlen=np.dtype("float64"))
-            utf8_t = h5py.special_dtype(vlen=str)
-            bytes_t = h5py.special_dtype(vlen=np.dtype("uint8"))
-            vlen_utf8_t = h5py.special_dtype(vlen=utf8_t)
-
-        driver_dataspec = {
-            "energy": {"dtype": np.dtype("float64"), "shape": default_shape},
-            "gradient": {"dtype": vlen_double_t, "shape": default_shape},
-            "hessian": {"dtype": vlen_double_t, "shape": default_shape},
-            "dipole": {"dtype": np.dtype("float64"), "shape": (n_records, 3)},
-        }
-
-        def _write_dataset(dataset, column, entry_dset):
-            assert column.shape[1] == 1
-            for i, name in enumerate(entry_dset):
-                element = column.loc[name][0]
-                if not h5py.check_dtype(vlen=dataset.dtype):
-                    dataset[i] = element
-                # Variable length datatypes require flattening of the array and special handling of missing values
-                else:
-                    try:
-                        dataset[i] = element.ravel()
-                    except AttributeError:
-                        if np.isnan(element):
-                            pass
-                        else:
-                            raise
+        dtypes = self._h5py_dtypes()
 
         with self._write_file() as f:
-            # Collection attributes
-            for field in {
-                "name",
-                "collection",
-                "provenance",
-                "tagline",
-                "tags",
-                "id",
-                "history_keys",
-                "description",
-                "metadata",
-            }:
-                f.attrs[field] = self._serialize_field(getattr(ds.data, field))
-            if ds.client is not None:
-                f.attrs["server_information"] = self._serialize_field(ds.client.server_information())
-                f.attrs["server_address"] = self._serialize_field(ds.client.address)
+            self._write_attributes(f, ds)
 
             # Export molecules
             molecule_group = f.create_group("molecule")
@@ -306,54 +298,28 @@ class HDF5View(DatasetView):
                 molecules = ds.get_molecules(stoich=list(ds.valid_stoich(force=True)), force=True)
             else:
                 molecules = ds.get_molecules(force=True)
-            mol_shape = (len(molecules),)
-            mol_geometry = molecule_group.create_dataset(
-                "geometry", shape=mol_shape, dtype=vlen_double_t, **dataset_kwargs
-            )
-            mol_symbols = molecule_group.create_dataset("symbols", shape=mol_shape, dtype=vlen_utf8_t, **dataset_kwargs)
-            mol_schema = molecule_group.create_dataset("schema", shape=mol_shape, dtype=bytes_t, **dataset_kwargs)
-            mol_charge = molecule_group.create_dataset(
-                "charge", shape=mol_shape, dtype=np.dtype("float64"), **dataset_kwargs
-            )
-            mol_spin = molecule_group.create_dataset(
-                "multiplicity", shape=mol_shape, dtype=np.dtype("int32"), **dataset_kwargs
-            )
-            mol_id_server_view = {}
-            for i, mol_row in enumerate(molecules.to_dict("records")):
-                molecule = mol_row["molecule"]
-                mol_geometry[i] = molecule.geometry.ravel()
-                mol_schema[i] = self._serialize_data(molecule)
-                mol_symbols[i] = molecule.symbols
-                mol_charge[i] = molecule.molecular_charge
-                mol_spin[i] = molecule.molecular_multiplicity
-                mol_id_server_view[molecule.id] = i
+            mol_id_server_view = self._append_molecules(molecule_group, molecules["molecule"])
 
             # Export entries
             entry_group = f.create_group("entry")
-            entry_dset = entry_group.create_dataset("entry", shape=default_shape, dtype=utf8_t, **dataset_kwargs)
-            entry_dset[:] = ds.get_index(force=True)
+            entry_names = list(ds.get_index(force=True))
+            self._create_dataset(entry_group, "entry", data=entry_names, dtype=dtypes["utf8"])
 
             entries = ds.get_entries(force=True)
             if isinstance(ds.data.records[0], MoleculeEntry):
                 entry_group.attrs["model"] = "MoleculeEntry"
                 entries["hdf5_molecule_id"] = entries["molecule_id"].map(mol_id_server_view)
-                entry_group.create_dataset("name", data=entries["name"], dtype=utf8_t, **dataset_kwargs)
-                entry_group.create_dataset(
-                    "molecule_id", data=entries["hdf5_molecule_id"], dtype=np.dtype("int64"), **dataset_kwargs
+                self._create_dataset(entry_group, "name", data=entries["name"], dtype=dtypes["utf8"])
+                self._create_dataset(
+                    entry_group, "molecule_id", data=entries["hdf5_molecule_id"], dtype=np.dtype("int64")
                 )
             elif isinstance(ds.data.records[0], ReactionEntry):
                 entry_group.attrs["model"] = "ReactionEntry"
                 entries["hdf5_molecule_id"] = entries["molecule"].map(mol_id_server_view)
-                entry_group.create_dataset("name", data=entries["name"], dtype=utf8_t, **dataset_kwargs)
-                entry_group.create_dataset(
-                    "stoichiometry", data=entries["stoichiometry"], dtype=utf8_t, **dataset_kwargs
-                )
-                entry_group.create_dataset(
-                    "molecule", data=entries["hdf5_molecule_id"], dtype=np.dtype("int64"), **dataset_kwargs
-                )
-                entry_group.create_dataset(
-                    "coefficient", data=entries["coefficient"], dtype=np.dtype("float64"), **dataset_kwargs
-                )
+                self._create_dataset(entry_group, "name", data=entries["name"], dtype=dtypes["utf8"])
+                self._create_dataset(entry_group, "stoichiometry", data=entries["stoichiometry"], dtype=dtypes["utf8"])
+                self._create_dataset(entry_group, "molecule", data=entries["hdf5_molecule_id"], dtype=np.dtype("int64"))
+                self._create_dataset(entry_group, "coefficient", data=entries["coefficient"], dtype=np.dtype("float64"))
             else:
                 raise ValueError(f"Unknown entry class ({type(ds.data.records[0])}) while writing HDF5 entries.")
 
@@ -361,67 +327,546 @@ class HDF5View(DatasetView):
             value_group = f.create_group("value")
             history = ds.list_values(native=True, force=True).reset_index().to_dict("records")
             for specification in history:
-                gv_spec = specification.copy()
-                name = gv_spec.pop("name")
-                if "stoichiometry" in gv_spec:
-                    gv_spec["stoich"] = gv_spec.pop("stoichiometry")
+                modified_on = self._get_modified_on(ds, specification)
+                self._write_native_column(value_group, ds, specification, entry_names, modified_on)
+
+            # Export contributed data columns
+            cv_columns = self._get_contributed_values(ds)
+            cv_checksum = self._contributed_values_checksum(ds, cv_columns)
+            self._write_contributed_values(f, ds, entry_names, cv_columns, cv_checksum)
+
+        # Clean up any caches
+        self._entries = None
+
+    def update(self, ds: Dataset, copy_to: Optional[Union[str, pathlib.Path]] = None) -> Optional[bool]:
+        """
+        Brings a view previously written from `ds` up to date, rewriting only what changed.
+
+        New entries and their molecules are appended, and only the rows of native value columns whose records were
+        modified since the view was last written are downloaded and patched in place. Contributed values are
+        rewritten if they changed. The view is written from scratch if it does not exist, belongs to another
+        collection or predates incremental updates, if entries were removed, reordered or point to other molecules,
+        or for ReactionDatasets. Nothing is written if the view is up to date.
+
+        Parameters
+        ----------
+        ds: Dataset
+            The dataset to update the view from.
+        copy_to: Optional[Union[str, pathlib.Path]], optional
+            Leaves this view untouched and writes the updated view to this path instead, starting from a copy of the
+            view. Nothing is copied if the view is up to date.
+
+        Returns
+        -------
+        Optional[bool]
+            True if the view was updated in place, False if it was written from scratch, None if it was up to date.
+        """
+        target = self if copy_to is None else HDF5View(copy_to, mmap=self._mmap)
+
+        entries = ds.get_entries(force=True)
+        entry_names = list(ds.get_index(force=True))
+        if not self._is_updatable(ds, entry_names, entries):
+            target.write(ds)
+            return False
+
+        # Query the server before touching the file, so that failures leave the view intact
+        history = ds.list_values(native=True, force=True).reset_index().to_dict("records")
+        modified_on = {spec["name"]: self._get_modified_on(ds, spec) for spec in history}
+        cv_columns = self._get_contributed_values(ds)
+        cv_checksum = self._contributed_values_checksum(ds, cv_columns)
+        if not self._is_outdated(ds, entry_names, history, modified_on, cv_checksum):
+            return None
+
+        molecule_ids = entries.set_index("name")["molecule_id"].astype(str)
+        dtypes = self._h5py_dtypes()
+        n_entries = len(entry_names)
+
+        if copy_to is None:
+            self.close()
+        else:
+            shutil.copyfile(self._path, copy_to)
+        with h5py.File(target._path, "r+") as f:
+            self._write_attributes(f, ds)
+
+            # Append new entries and any molecules not yet in the view
+            entry_group = f["entry"]
+            molecule_group = f["molecule"]
+            n_old = entry_group["entry"].shape[0]
+            view_names = set(self._read_strings(entry_group["name"]))
+            new_names = [name for name in molecule_ids.index if name not in view_names]
+
+            mol_id_server_view = {mol_id: i for i, mol_id in enumerate(self._read_strings(molecule_group["id"]))}
+            missing = [name for name in new_names if molecule_ids[name] not in mol_id_server_view]
+            if missing:
+                molecules = ds.get_molecules(subset=missing, force=True)
+                mol_id_server_view.update(self._append_molecules(molecule_group, molecules["molecule"]))
+
+            self._append_rows(entry_group, "entry", entry_names[n_old:], dtypes["utf8"])
+            self._append_rows(entry_group, "name", new_names, dtypes["utf8"])
+            self._append_rows(
+                entry_group,
+                "molecule_id",
+                [mol_id_server_view[molecule_ids[name]] for name in new_names],
+                np.dtype("int64"),
+            )
+
+            # Patch native data columns
+            value_group = f["value"]
+            for specification in history:
+                name = specification["name"]
                 dataset_name = self._normalize_hdf5_name(name)
-                df = ds.get_values(name=name, force=True, native=True)
-                assert df.shape[1] == 1
+                column_modified_on = modified_on[name]
 
-                driver = specification["driver"]
-                dataspec = driver_dataspec[driver]
-                dataset = value_group.create_dataset(dataset_name, **dataspec, **dataset_kwargs)
+                if dataset_name in value_group and "modified_on" in value_group[dataset_name].attrs:
+                    dataset = value_group[dataset_name]
+                    since = self._deserialize_field(dataset.attrs["modified_on"])
+                else:
+                    dataset = None
 
-                for key in specification:
-                    dataset.attrs[key] = self._serialize_field(specification[key])
+                if dataset is None or column_modified_on is None:
+                    if dataset_name in value_group:
+                        del value_group[dataset_name]
+                    self._write_native_column(value_group, ds, specification, entry_names, column_modified_on)
+                    continue
+
+                column_modified_on = column_modified_on.reindex(entry_names)
+                if since is None:
+                    changed = column_modified_on.notnull().to_numpy()
+                else:
+                    changed = (column_modified_on > pd.Timestamp(since)).to_numpy()
+                changed[n_old:] = True
+
+                # Contiguous columns can not be resized, they are copied into a new dataset of the right layout
+                contiguous = self._contiguous(dataset.dtype)
+                if (dataset.chunks is None) != contiguous or (contiguous and dataset.shape[0] != n_entries):
+                    dataset = self._rebuild_dataset(value_group, dataset_name, n_entries, contiguous)
+                elif dataset.shape[0] != n_entries:
+                    dataset.resize(n_entries, axis=0)
+                rows = np.flatnonzero(changed)
+                if len(rows):
+                    subset = [entry_names[i] for i in rows]
+                    df = ds.get_values(name=name, subset=subset, force=True, native=True)
+                    assert df.shape[1] == 1
+                    self._write_column(dataset, df.iloc[:, 0].reindex(subset), rows)
+
+                dataset.attrs["modified_on"] = self._serialize_modified_on(column_modified_on)
                 dataset.attrs["units"] = self._serialize_field(ds.units)
 
-                _write_dataset(dataset, df, entry_dset)
+            # Drop columns which no longer exist
+            current = {self._normalize_hdf5_name(spec["name"]) for spec in history}
+            for dataset_name in set(value_group.keys()) - current:
+                del value_group[dataset_name]
 
-            # Export contributed data columns
-            contributed_group = f.create_group("contributed_value")
-            for cv_name in ds.list_values(force=True, native=False)["name"]:
-                cv_df = ds.get_values(name=cv_name, force=True, native=False)
-                cv_model = ds.data.contributed_values[cv_name.lower()]
+            # Contributed values are stored with the collection itself, rewrite them whole
+            contributed_group = f["contributed_value"]
+            if contributed_group.attrs.get("checksum") != cv_checksum or not self._has_layout(contributed_group):
+                del f["contributed_value"]
+                self._write_contributed_values(f, ds, entry_names, cv_columns, cv_checksum)
+
+        # Clean up any caches
+        target._entries = None
+        target._index = None
+        return True
+
+    def _is_updatable(self, ds: Dataset, entry_names: List[str], entries: pd.DataFrame) -> bool:
+        """ Whether the view on disk can be brought up to date with `ds` by appending entries and patching values """
+        if isinstance(ds, ReactionDataset) or len(ds.data.records) == 0 or not self._path.is_file():
+            return False
+        if not isinstance(ds.data.records[0], MoleculeEntry):
+            return False
 
+        with self._read_file() as f:
+            if self._deserialize_field(f.attrs["id"]) != ds.data.id:
+                return False
+
+            # Views written before incremental updates can not be extended
+            if "id" not in f["molecule"] or f["entry/entry"].maxshape[0] is not None:
+                return False
+
+            view_names = self._read_strings(f["entry/entry"])
+            if view_names != entry_names[: len(view_names)]:
+                return False
+
+            mol_ids = np.array(self._read_strings(f["molecule/id"]), dtype=object)
+            view_molecules = pd.Series(mol_ids[f["entry/molecule_id"][()]], index=self._read_strings(f["entry/name"]))
+
+        molecule_ids = entries.set_index("name")["molecule_id"].astype(str).reindex(view_molecules.index)
+        return bool((molecule_ids == view_molecules).all())
+
+    def _is_outdated(
+        self,
+        ds: Dataset,
+        entry_names: List[str],
+        history: List[Dict[str, Any]],
+        modified_on: Dict[str, Optional[pd.Series]],
+        cv_checksum: str,
+    ) -> bool:
+        """ Whether an updatable view differs from `ds`, ignoring the server information stored with it """
+        with self._read_file() as f:
+            if f["entry/entry"].shape[0] != len(entry_names):
+                return True
+            if any(f.attrs[field] != self._serialize_field(getattr(ds.data, field)) for field in _ATTRIBUTE_FIELDS):
+                return True
+
+            value_group = f["value"]
+            if set(value_group.keys()) != {self._normalize_hdf5_name(spec["name"]) for spec in history}:
+                return True
+            if not (self._has_layout(value_group) and self._has_layout(f["contributed_value"])):
+                return True
+            for specification in history:
+                dataset = value_group[self._normalize_hdf5_name(specification["name"])]
+                column_modified_on = modified_on[specification["name"]]
+                if column_modified_on is None or "modified_on" not in dataset.attrs:
+                    return True
+                if dataset.attrs["modified_on"] != self._serialize_modified_on(column_modified_on.reindex(entry_names)):
+                    return True
+                if dataset.attrs["units"] != self._serialize_field(ds.units):
+                    return True
+
+            return f["contributed_value"].attrs.get("checksum") != cv_checksum
+
+    def _has_layout(self, group: "h5py.Group") -> bool:
+        """ Whether the data columns of a group are stored contiguous exactly when they should be, see _contiguous """
+        return all((dataset.chunks is None) == self._contiguous(dataset.dtype) for dataset in group.values())
+
+    def _write_attributes(self, f: "h5py.File", ds: Dataset) -> None:
+        """ Writes the collection attributes """
+        for field in _ATTRIBUTE_FIELDS:
+            f.attrs[field] = self._serialize_field(getattr(ds.data, field))
+        if ds.client is not None:
+            f.attrs["server_information"] = self._serialize_field(ds.client.server_information())
+            f.attrs["server_address"] = self._serialize_field(ds.client.address)
+
+    def _append_molecules(self, molecule_group: "h5py.Group", molecules: pd.Series) -> Dict[str, int]:
+        """
+        Appends molecules to the molecule group, creating its datasets if needed. Returns a server id to row map.
+        """
+        dtypes = self._h5py_dtypes()
+        start = molecule_group["geometry"].shape[0] if "geometry" in molecule_group else 0
+
+        mol_shape = (len(molecules),)
+        mol_geometry = np.empty(mol_shape, dtype=object)
+        mol_schema = np.empty(mol_shape, dtype=object)
+        mol_charge = np.empty(mol_shape, dtype=np.dtype("float64"))
+        mol_spin = np.empty(mol_shape, dtype=np.dtype("int32"))
+        mol_ids = np.empty(mol_shape, dtype=object)
+        mol_id_server_view = {}
+        for i, molecule in enumerate(molecules):
+            mol_geometry[i] = molecule.geometry.ravel()
+            mol_schema[i] = self._serialize_data(molecule)
+            mol_charge[i] = molecule.molecular_charge
+            mol_spin[i] = molecule.molecular_multiplicity
+            mol_ids[i] = str(molecule.id)
+            mol_id_server_view[str(molecule.id)] = start + i
+
+        self._append_rows(molecule_group, "geometry", mol_geometry, dtypes["vlen_double"])
+        self._append_rows(molecule_group, "schema", mol_schema, dtypes["bytes"])
+        self._append_rows(molecule_group, "charge", mol_charge, np.dtype("float64"))
+        self._append_rows(molecule_group, "multiplicity", mol_spin, np.dtype("int32"))
+        self._append_rows(molecule_group, "id", mol_ids, dtypes["utf8"])
+
+        # h5py cannot convert nested string arrays in bulk
+        if "symbols" in molecule_group:
+            mol_symbols = molecule_group["symbols"]
+            mol_symbols.resize(start + len(molecules), axis=0)
+        else:
+            mol_symbols = self._create_dataset(molecule_group, "symbols", shape=mol_shape, dtype=dtypes["vlen_utf8"])
+        for i, molecule in enumerate(molecules):
+            mol_symbols[start + i] = molecule.symbols
+
+        return mol_id_server_view
+
+    def _write_native_column(
+        self,
+        value_group: "h5py.Group",
+        ds: Dataset,
+        specification: Dict[str, Any],
+        entry_names: List[str],
+        modified_on: Optional[pd.Series],
+    ) -> None:
+        """ Downloads and writes a native value column """
+        name = specification["name"]
+        df = ds.get_values(name=name, force=True, native=True)
+        assert df.shape[1] == 1
+
+        dataspec = self._driver_dataspec(len(entry_names))[specification["driver"]]
+        dataset = self._create_dataset(
+            value_group, self._normalize_hdf5_name(name), contiguous=self._contiguous(dataspec["dtype"]), **dataspec
+        )
+
+        for key in specification:
+            dataset.attrs[key] = self._serialize_field(specification[key])
+        dataset.attrs["units"] = self._serialize_field(ds.units)
+        if modified_on is not None:
+            dataset.attrs["modified_on"] = self._serialize_modified_on(modified_on)
+
+        self._write_column(dataset, df.iloc[:, 0].reindex(entry_names))
+
+    @staticmethod
+    def _get_contributed_values(ds: Dataset) -> Dict[str, pd.DataFrame]:
+        """ Downloads all contributed value columns """
+        return {
+            cv_name: ds.get_values(name=cv_name, force=True, native=False)
+            for cv_name in ds.list_values(force=True, native=False)["name"]
+        }
+
+    @staticmethod
+    def _contributed_values_checksum(ds: Dataset, cv_columns: Dict[str, pd.DataFrame]) -> str:
+        """ Checksum of the contributed value columns and their metadata """
+        checksum = hashlib.sha256()
+        for cv_name, cv_df in cv_columns.items():
+            cv_model = ds.data.contributed_values[cv_name.lower()]
+            checksum.update(serialize(cv_model.dict(exclude={"values", "index"}), "msgpack-ext"))
+            checksum.update(serialize([list(cv_df.index), cv_df.iloc[:, 0].tolist()], "msgpack-ext"))
+        return checksum.hexdigest()
+
+    def _write_contributed_values(
+        self,
+        f: "h5py.File",
+        ds: Dataset,
+        entry_names: List[str],
+        cv_columns: Dict[str, pd.DataFrame],
+        cv_checksum: str,
+    ) -> None:
+        """ Writes all contributed value columns, along with their checksum to detect changes """
+        contributed_group = f.create_group("contributed_value")
+        contributed_group.attrs["checksum"] = cv_checksum
+        driver_dataspec = self._driver_dataspec(len(entry_names))
+        for cv_name, cv_df in cv_columns.items():
+            cv_model = ds.data.contributed_values[cv_name.lower()]
+            assert cv_df.shape[1] == 1
+
+            try:
+                dataspec = driver_dataspec[cv_model.theory_level_details["driver"]]
+            except (KeyError, TypeError):
+                if isinstance(cv_df[cv_name][0], float):
+                    dataspec = {"dtype": np.dtype("float64"), "shape": (len(entry_names),)}
+                elif isinstance(cv_df[cv_name][0], np.ndarray):
+                    dataspec = {"dtype": self._h5py_dtypes()["vlen_double"], "shape": (len(entry_names),)}
+                else:
+                    raise ValueError(
+                        f"Unable to guess data specification for contributed value column named {cv_name}."
+                    )
+                warnings.warn(
+                    f"Contributed values column {cv_name} does not provide driver in theory_level_details. "
+                    f"Inferred {dataspec}."
+                )
+
+            dataset = self._create_dataset(
+                contributed_group,
+                self._normalize_hdf5_name(cv_name),
+                contiguous=self._contiguous(dataspec["dtype"]),
+                **dataspec,
+            )
+            for field in [
+                "name",
+                "values_structure",
+                "theory_level",
+                "units",
+                "doi",
+                "external_url",
+                "citations",
+                "comments",
+                "theory_level",
+                "theory_level_details",
+            ]:
+                dataset.attrs[field] = self._serialize_field(getattr(cv_model, field))
+
+            self._write_column(dataset, cv_df.iloc[:, 0].reindex(entry_names))
+
+    @staticmethod
+    def _get_modified_on(ds: Dataset, specification: Dict[str, Any]) -> Optional[pd.Series]:
+        """
+        Last modification time of the records behind a native value column, indexed by entry name. Compound
+        columns (e.g. with a -D3 correction) take the latest time of their parts. None if it can not be queried.
+        """
+        if ds.client is None or isinstance(ds, ReactionDataset):
+            return None
+
+        # The value history stores missing basis and keywords as "None"
+        basis, keywords = [None if specification[k] == "None" else specification[k] for k in ("basis", "keywords")]
+        try:
+            records = ds.get_records(
+                specification["method"],
+                basis,
+                keywords=keywords,
+                program=specification["program"],
+                include=["modified_on"],
+            )
+        except KeyError:
+            return None
+
+        if isinstance(records, pd.DataFrame):
+            records = [records]
+        return pd.concat([pd.to_datetime(df["modified_on"]) for df in records], axis=1).max(axis=1)
+
+    def _serialize_modified_on(self, modified_on: pd.Series) -> str:
+        latest = modified_on.max()
+        return self._serialize_field(None if pd.isnull(latest) else latest.isoformat())
+
+    @staticmethod
+    def _h5py_dtypes() -> Dict[str, Any]:
+        """ The variable length HDF5 types used by views """
+        if h5py.__version__ >= distutils.version.StrictVersion("2.10.0"):
+            vlen_double_t = h5py.vlen_dtype(np.dtype("float64"))
+            utf8_t = h5py.string_dtype(encoding="utf-8")
+            bytes_t = h5py.vlen_dtype(np.dtype("uint8"))
+            vlen_utf8_t = h5py.vlen_dtype(utf8_t)
+        else:
+            vlen_double_t = h5py.special_dtype(vlen=np.dtype("float64"))
+            utf8_t = h5py.special_dtype(vlen=str)
+            bytes_t = h5py.special_dtype(vlen=np.dtype("uint8"))
+            vlen_utf8_t = h5py.special_dtype(vlen=utf8_t)
+        return {"vlen_double": vlen_double_t, "utf8": utf8_t, "bytes": bytes_t, "vlen_utf8": vlen_utf8_t}
+
+    @classmethod
+    def _driver_dataspec(cls, n_records: int) -> Dict[str, Dict[str, Any]]:
+        """ HDF5 dataset shape and type of the value columns of each driver """
+        vlen_double_t = cls._h5py_dtypes()["vlen_double"]
+        return {
+            "energy": {"dtype": np.dtype("float64"), "shape": (n_records,)},
+            "gradient": {"dtype": vlen_double_t, "shape": (n_records,)},
+            "hessian": {"dtype": vlen_double_t, "shape": (n_records,)},
+            "dipole": {"dtype": np.dtype("float64"), "shape": (n_records, 3)},
+        }
+
+    def _contiguous(self, dtype: Any) -> bool:
+        """ Whether value columns of `dtype` are written contiguous and unfiltered, so they can be memory-mapped """
+        return self._mmap and not h5py.check_dtype(vlen=np.dtype(dtype))
+
+    @staticmethod
+    def _create_dataset(
+        group: "h5py.Group",
+        name: str,
+        shape: Optional[Tuple[int, ...]] = None,
+        data: Any = None,
+        contiguous: bool = False,
+        **kwargs,
+    ) -> "h5py.Dataset":
+        if shape is None:
+            shape = (len(data),)
+        # A single unfiltered extent which can be memory-mapped, but not resized
+        if contiguous:
+            return group.create_dataset(name, shape=shape, data=data, **kwargs)
+        # Columns are read whole or in large slices, so prefer few large chunks
+        chunks = (min(shape[0], _VIEW_CHUNK_ROWS),) + tuple(shape[1:]) if shape[0] else True
+        # Rows are unlimited so that update() can extend views in place; fletcher32 for data checksums
+        maxshape = (None,) + tuple(shape[1:])
+        return group.create_dataset(
+            name, shape=shape, data=data, chunks=chunks, maxshape=maxshape, fletcher32=True, **kwargs
+        )
+
+    @classmethod
+    def _rebuild_dataset(cls, group: "h5py.Group", name: str, n_rows: int, contiguous: bool) -> "h5py.Dataset":
+        """ Recreates a fixed-size dataset with `n_rows` rows in the requested layout, keeping its rows and attrs """
+        data = group[name][()]
+        attrs = dict(group[name].attrs)
+        del group[name]
+
+        shape = (n_rows,) + data.shape[1:]
+        dataset = cls._create_dataset(group, name, shape=shape, dtype=data.dtype, contiguous=contiguous)
+        n_kept = min(n_rows, len(data))
+        if n_kept:
+            dataset.write_direct(np.ascontiguousarray(data[:n_kept]), dest_sel=np.s_[:n_kept])
+        dataset.attrs.update(attrs)
+        return dataset
+
+    @classmethod
+    def _append_rows(cls, group: "h5py.Group", name: str, data: Any, dtype: Any) -> "h5py.Dataset":
+        """ Appends rows to a dataset of a group, creating it if needed """
+        if name not in group:
+            return cls._create_dataset(group, name, data=data, dtype=dtype)
+
+        dataset = group[name]
+        start = dataset.shape[0]
+        dataset.resize(start + len(data), axis=0)
+        if len(data):
+            if h5py.check_dtype(vlen=dataset.dtype):
+                rows = np.empty(len(data), dtype=object)
+                rows[:] = list(data)
+            else:
+                rows = np.asarray(data, dtype=dataset.dtype)
+            dataset.write_direct(np.ascontiguousarray(rows), dest_sel=np.s_[start : start + len(data)])
+        return dataset
+
+    @staticmethod
+    def _column_data(column: pd.Series, dataset: "h5py.Dataset") -> np.ndarray:
+        """ Converts a value column to an array which may be written to rows of `dataset` """
+        shape = (len(column),) + dataset.shape[1:]
+        if not h5py.check_dtype(vlen=dataset.dtype):
+            if dataset.ndim == 1:
+                data = column.to_numpy(dtype=dataset.dtype, na_value=np.nan)
+            else:
+                data = np.empty(shape, dtype=dataset.dtype)
+                for i, element in enumerate(column):
+                    data[i] = element
+        # Variable length datatypes require flattening of the array and special handling of missing values
+        else:
+            data = np.empty(shape, dtype=object)
+            empty = np.empty(0, dtype=np.float64)
+            for i, element in enumerate(column):
                 try:
-                    dataspec = driver_dataspec[cv_model.theory_level_details["driver"]]
-                except (KeyError, TypeError):
-                    if isinstance(cv_df[cv_name][0], float):
-                        dataspec = {"dtype": np.dtype("float64"), "shape": default_shape}
-                    elif isinstance(cv_df[cv_name][0], np.ndarray):
-                        dataspec = {"dtype": vlen_double_t, "shape": default_shape}
+                    data[i] = element.ravel()
+                except AttributeError:
+                    if np.isnan(element):
+                        data[i] = empty
                     else:
-                        raise ValueError(
-                            f"Unable to guess data specification for contributed value column named {cv_name}."
-                        )
-                    warnings.warn(
-                        f"Contributed values column {cv_name} does not provide driver in theory_level_details. "
-                        f"Inferred {dataspec}."
-                    )
+                        raise
+        return np.ascontiguousarray(data)
 
-                dataset = contributed_group.create_dataset(
-                    self._normalize_hdf5_name(cv_name), **dataspec, **dataset_kwargs
-                )
-                for field in [
-                    "name",
-                    "values_structure",
-                    "theory_level",
-                    "units",
-                    "doi",
-                    "external_url",
-                    "citations",
-                    "comments",
-                    "theory_level",
-                    "theory_level_details",
-                ]:
-                    dataset.attrs[field] = self._serialize_field(getattr(cv_model, field))
-
-                _write_dataset(dataset, cv_df, entry_dset)
+    @classmethod
+    def _write_column(cls, dataset: "h5py.Dataset", column: pd.Series, rows: Optional[np.ndarray] = None) -> None:
+        """ Writes a value column to all rows of `dataset`, or to the sorted `rows` only """
+        data = cls._column_data(column, dataset)
 
-        # Clean up any caches
-        self._entries = None
+        # write_direct, as __setitem__ would broadcast equal length vlen rows into a 2D array
+        if rows is None:
+            dataset.write_direct(data)
+            return
+
+        # Runs of consecutive rows, such as appended entries, are written as single slices
+        for run in np.split(np.arange(len(rows)), np.flatnonzero(np.diff(rows) != 1) + 1):
+            first, last = run[0], run[-1]
+            dataset.write_direct(data, source_sel=np.s_[first : last + 1], dest_sel=np.s_[rows[first] : rows[last] + 1])
+
+    @staticmethod
+    def _read_strings(dataset: "h5py.Dataset") -> List[str]:
+        return [s.decode() if isinstance(s, bytes) else s for s in dataset[()]]
+
+    @staticmethod
+    def _read_rows(dataset: "h5py.Dataset", indexes: List[int]) -> np.ndarray:
+        """
+        Reads the rows `indexes` (in any order, possibly repeated) of a dataset in a single h5py
+        call: one slice spanning the requested rows when they are contiguous or a large fraction
+        of the dataset, and a sorted fancy-index read otherwise.
+        """
+        indexes = np.asarray(indexes, dtype=np.int64)
+        if len(indexes) == 0:
+            return dataset[0:0]
+
+        unique, inverse = np.unique(indexes, return_inverse=True)
+        lo, hi = int(unique[0]), int(unique[-1]) + 1
+        if (hi - lo) == len(unique) or len(unique) > dataset.shape[0] * _FULL_READ_FRACTION:
+            rows = dataset[lo:hi]
+            unique = unique - lo
+        else:
+            rows = dataset[unique]
+            unique = np.arange(len(unique))
+
+        return rows[unique[inverse]]
+
+    @staticmethod
+    def _reshape_vlen(rows: np.ndarray, shape: Callable[[int], Tuple[int, ...]]) -> List[np.ndarray]:
+        """
+        Decodes variable length rows into a single contiguous buffer, returning per-row views
+        reshaped to shape(len(row)).
+        """
+        lengths = np.fromiter((len(row) for row in rows), dtype=np.int64, count=len(rows))
+        offsets = np.zeros(len(rows) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=offsets[1:])
+        buffer = np.concatenate(rows).astype(np.float64, copy=False) if len(rows) else np.empty(0)
+
+        return [buffer[start:stop].reshape(shape(stop - start)) for start, stop in zip(offsets[:-1], offsets[1:])]
 
     def hash(self) -> str:
         """ Returns the Blake2b hash of the view """
@@ -440,11 +885,36 @@ class HDF5View(DatasetView):
 
     @contextmanager
     def _read_file(self) -> Iterator["h5py.File"]:
-        yield h5py.File(self._path, "r")
+        if not self._keep_open:
+            with h5py.File(self._path, "r") as f:
+                yield f
+            return
+
+        if self._handle is None:
+            self._handle = h5py.File(self._path, "r")
+        yield self._handle
 
     @contextmanager
     def _write_file(self) -> Iterator["h5py.File"]:
-        yield h5py.File(self._path, "w")
+        self.close()
+        with h5py.File(self._path, "w") as f:
+            yield f
+
+    def _mmap_dataset(self, dataset: "h5py.Dataset") -> Union["h5py.Dataset", np.ndarray]:
+        """ Returns a read-only memory map of a contiguous, unfiltered dataset, or the dataset itself otherwise """
+        if dataset.name in self._mmaps:
+            return self._mmaps[dataset.name]
+
+        if dataset.chunks is not None or dataset.dtype.hasobject or h5py.check_dtype(vlen=dataset.dtype):
+            return dataset
+
+        offset = dataset.id.get_offset()
+        if offset is None or dataset.size == 0:
+            return dataset
+
+        mapped = np.memmap(self._path, mode="r", dtype=dataset.dtype, offset=offset, shape=dataset.shape)
+        self._mmaps[dataset.name] = mapped
+        return mapped
 
     # Methods for serializing to strings for storage in HDF5 metadata fields ("attrs")
     @staticmethod
@@ -479,19 +949,25 @@ class RemoteView(DatasetView):
         self._client: FractalClient = client
         self._id: int = collection_id
 
+        # Arrow streams are only sent on request, servers which do not list them only accept an empty meta
+        if ViewDataFormatEnum.arrow_stream in client.server_info.get("view_data_formats", []):
+            self._request_meta = {"data_format": ViewDataFormatEnum.arrow_stream}
+        else:
+            self._request_meta = {}
+
     def get_entries(self, subset: Optional[List[str]] = None) -> pd.DataFrame:
         # TODO: consider adding a cache
-        payload = {"meta": {}, "data": {"subset": subset}}
+        payload = {"meta": self._request_meta, "data": {"subset": subset}}
 
         response = self._client._automodel_request(f"collection/{self._id}/entry", "get", payload, full_return=True)
         self._check_response_meta(response.meta)
-        return self._deserialize(response.data, response.meta.msgpacked_cols)
+        return self._deserialize(response.data, response.meta)
 
     def get_molecules(self, indexes: List[Union[ObjectId, int]]) -> pd.Series:
-        payload = {"meta": {}, "data": {"indexes": indexes}}
+        payload = {"meta": self._request_meta, "data": {"indexes": indexes}}
         response = self._client._automodel_request(f"collection/{self._id}/molecule", "get", payload, full_return=True)
         self._check_response_meta(response.meta)
-        df = self._deserialize(response.data, response.meta.msgpacked_cols)
+        df = self._deserialize(response.data, response.meta)
         return df["molecule"].apply(lambda blob: Molecule(**blob, validate=False))
 
     def get_values(
@@ -505,17 +981,17 @@ class RemoteView(DatasetView):
             List of queries. Fields actually used are native, name, driver
         """
         qlist = [{"name": query["name"], "driver": query["driver"], "native": query["native"]} for query in queries]
-        payload = {"meta": {}, "data": {"queries": qlist, "subset": subset}}
+        payload = {"meta": self._request_meta, "data": {"queries": qlist, "subset": subset}}
 
         response = self._client._automodel_request(f"collection/{self._id}/value", "get", payload, full_return=True)
         self._check_response_meta(response.meta)
-        return self._deserialize(response.data.values, response.meta.msgpacked_cols), response.data.units
+        return self._deserialize(response.data.values, response.meta), response.data.units
 
     def list_values(self) -> pd.DataFrame:
-        payload: Dict[str, Dict[str, Any]] = {"meta": {}, "data": {}}
+        payload: Dict[str, Dict[str, Any]] = {"meta": self._request_meta, "data": {}}
         response = self._client._automodel_request(f"collection/{self._id}/list", "get", payload, full_return=True)
         self._check_response_meta(response.meta)
-        return self._deserialize(response.data, response.meta.msgpacked_cols)
+        return self._deserialize(response.data, response.meta)
 
     def write(self, ds: Dataset) -> NoReturn:
         raise NotImplementedError()
@@ -526,15 +1002,25 @@ class RemoteView(DatasetView):
             raise RuntimeError(f"Remote view query failed with error message: {meta.error_description}")
 
     @staticmethod
-    def _deserialize(data: bytes, msgpacked_cols: List[str]) -> pd.DataFrame:
+    def _deserialize(data: bytes, meta: "CollectionSubresourceGETResponseMeta") -> pd.DataFrame:
         """
-        Data are returned as feather-packed pandas DataFrames.
-        Due to limitations in pyarrow, some objects are msgpacked inside the DataFrame.
+        Data are returned as Arrow IPC streams when requested, or as feather-packed pandas DataFrames otherwise.
+        Array columns are sent as nested Arrow lists and read back zero-copy into ndarrays,
+        other objects unsupported by pyarrow are msgpacked inside the DataFrame.
         """
         import pyarrow
 
-        df = pd.read_feather(pyarrow.BufferReader(data))
-        for col in msgpacked_cols:
+        if meta.data_format == ViewDataFormatEnum.arrow_stream:
+            table = pyarrow.ipc.open_stream(pyarrow.BufferReader(data)).read_all()
+            ndarray_cols = [field.name for field in table.schema if field.metadata == ARROW_NDARRAY_METADATA]
+            df = table.drop(ndarray_cols).to_pandas()
+            for col in ndarray_cols:
+                df[col] = _arrow_to_ndarrays(table.column(col))
+            df = df[table.column_names]
+        else:
+            df = pd.read_feather(pyarrow.BufferReader(data))
+
+        for col in meta.msgpacked_cols:
             df[col] = df[col].apply(lambda element: deserialize(element, "msgpack-ext"))
 
         if "index" in df.columns:
@@ -543,6 +1029,46 @@ class RemoteView(DatasetView):
         return df
 
 
+def _arrow_to_ndarrays(column: "pyarrow.ChunkedArray") -> List[np.ndarray]:
+    """
+    Converts a column of nested Arrow lists back into ndarrays, one nesting level per dimension.
+    Cells are reshaped views into the Arrow buffers, no data is copied.
+    """
+    import pyarrow
+
+    cells = []
+    for chunk in column.chunks:
+        # Walk down the nesting levels, recording fixed sizes or offsets (into the unsliced children)
+        levels = []
+        values = chunk
+        while True:
+            if pyarrow.types.is_fixed_size_list(values.type):
+                levels.append(values.type.list_size)
+            elif pyarrow.types.is_list(values.type):
+                levels.append(values.offsets.to_numpy())
+            else:
+                break
+            values = values.values
+        leaf = values.to_numpy(zero_copy_only=True)
+
+        # List offsets account for slicing of the chunk, fixed-size lists do not
+        base = chunk.offset if pyarrow.types.is_fixed_size_list(chunk.type) else 0
+        for i in range(base, base + len(chunk)):
+            start, stop = i, i + 1
+            shape = []
+            for level in levels:
+                n_lists = stop - start
+                if isinstance(level, int):
+                    shape.append(level)
+                    start, stop = start * level, stop * level
+                else:
+                    start, stop = int(level[start]), int(level[stop])
+                    shape.append((stop - start) // n_lists if n_lists else 0)
+            cells.append(leaf[start:stop].reshape(shape))
+
+    return cells
+
+
 class PlainTextView(DatasetView):
     def __init__(self, path: Union[str, pathlib.Path]) -> None:
         """
@@ -635,10 +1161,12 @@ Description:
 {ds.data.description}
 
 Files included:
-- values.csv: Table of computed values. Rows correspond to entries (e.g. molecules, reactions). Columns correspond to methods.
+- values.csv: Table of computed values. Rows correspond to entries (e.g. molecules, reactions).
+  Columns correspond to methods.
 - value_descriptions.csv: Table of descriptions of columns in values.csv
 - entries.csv: Table of descriptions of rows in values.csv
-- molecules: Folder containing XYZ-formatted geometries of molecules in the dataset. Files are named by the molecule id found in entries.csv
+- molecules: Folder containing XYZ-formatted geometries of molecules in the dataset.
+  Files are named by the molecule id found in entries.csv
 """
 
         return ret
@@ -33,22 +33,25 @@ class GOEntrySpecification(ProtoModel):
 class GridOptimizationDataset(BaseProcedureDataset):
     class DataModel(BaseProcedureDataset.DataModel):
 
-        records: Dict[str, GOEntry] = {}
+        records: Optional[Dict[str, GOEntry]] = None
         history: Set[str] = set()
         specs: Dict[str, GOEntrySpecification] = {}
 
         class Config(BaseProcedureDataset.DataModel.Config):
             pass
 
-    def _internal_compute_add(self, spec: Any, entry: Any, tag: str, priority: str) -> ObjectId:
-        service = GridOptimizationInput(
-            initial_molecule=entry.initial_molecule,
-            keywords=entry.go_keywords,
-            optimization_spec=spec.optimization_spec,
-            qc_spec=spec.qc_spec,
-        )
-
-        return self.client.add_service([service], tag=tag, priority=priority).ids[0]
+    def _internal_compute_add(self, spec: Any, entries: List[Any], tag: str, priority: str) -> List[ObjectId]:
+        services = [
+            GridOptimizationInput(
+                initial_molecule=entry.initial_molecule,
+                keywords=entry.go_keywords,
+                optimization_spec=spec.optimization_spec,
+                qc_spec=spec.qc_spec,
+            )
+            for entry in entries
+        ]
+
+        return self.client.add_service(services, tag=tag, priority=priority).ids
 
     def add_specification(
         self,
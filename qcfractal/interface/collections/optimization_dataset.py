@@ -1,7 +1,7 @@
 """
 QCPortal Database ODM
 """
-from typing import TYPE_CHECKING, Any, Dict, List, Optional, Set, Union
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Set, Tuple, Union
 
 import pandas as pd
 import qcelemental as qcel
@@ -35,35 +35,51 @@ class OptEntrySpecification(ProtoModel):
 class OptimizationDataset(BaseProcedureDataset):
     class DataModel(BaseProcedureDataset.DataModel):
 
-        records: Dict[str, OptEntry] = {}
+        records: Optional[Dict[str, OptEntry]] = None
         history: Set[str] = set()
         specs: Dict[str, OptEntrySpecification] = {}
 
         class Config(BaseProcedureDataset.DataModel.Config):
             pass
 
-    def _internal_compute_add(self, spec: Any, entry: Any, tag: str, priority: str) -> ObjectId:
+    def _internal_compute_add(self, spec: Any, entries: List[Any], tag: str, priority: str) -> List[ObjectId]:
 
         # Form per-procedure keywords dictionary
         general_keywords = spec.optimization_spec.keywords
         if general_keywords is None:
             general_keywords = {}
-        keywords = {**general_keywords, **entry.additional_keywords}
-
-        procedure_parameters = {
-            "keywords": keywords,
-            "qc_spec": spec.qc_spec.dict(),
-            "protocols": spec.protocols.dict(),
-        }
-
-        return self.client.add_procedure(
-            "optimization",
-            spec.optimization_spec.program,
-            procedure_parameters,
-            [entry.initial_molecule],
-            tag=tag,
-            priority=priority,
-        ).ids[0]
+
+        # Entries sharing their keywords are submitted together
+        groups: List[Tuple[Dict[str, Any], List[int]]] = []
+        for i, entry in enumerate(entries):
+            keywords = {**general_keywords, **entry.additional_keywords}
+            for group_keywords, indices in groups:
+                if group_keywords == keywords:
+                    indices.append(i)
+                    break
+            else:
+                groups.append((keywords, [i]))
+
+        ids = [None] * len(entries)
+        for keywords, indices in groups:
+            procedure_parameters = {
+                "keywords": keywords,
+                "qc_spec": spec.qc_spec.dict(),
+                "protocols": spec.protocols.dict(),
+            }
+
+            response = self.client.add_procedure(
+                "optimization",
+                spec.optimization_spec.program,
+                procedure_parameters,
+                [entries[i].initial_molecule for i in indices],
+                tag=tag,
+                priority=priority,
+            )
+            for i, object_id in zip(indices, response.ids):
+                ids[i] = object_id
+
+        return ids
 
     def add_specification(
         self,
@@ -87,11 +87,9 @@ class ReactionDataset(Dataset):
         )
 
     def _entry_index(self, subset: Optional[List[str]] = None) -> None:
-        if self.data.records is None:
-            self._get_data_records_from_db()
         # Unroll the index
         tmp_index = []
-        for rxn in self.data.records:
+        for rxn in self._get_entries(subset):
             name = rxn.name
             for stoich_name in list(rxn.stoichiometry):
                 for mol_hash, coef in rxn.stoichiometry[stoich_name].items():
@@ -173,16 +171,15 @@ class ReactionDataset(Dataset):
         mol_ret = self._add_molecules_by_dict(client, self._new_molecules)
 
         # Update internal molecule UUID's to servers UUID's
+        new_records = []
         for record in self._new_records:
             stoichiometry = replace_dict_keys(record.stoichiometry, mol_ret)
-            new_record = record.copy(update={"stoichiometry": stoichiometry})
-            self.data.records.append(new_record)
+            new_records.append(record.copy(update={"stoichiometry": stoichiometry}))
+        self._add_entries(client, new_records)
 
         self._new_records: List[ReactionEntry] = []
         self._new_molecules = {}
 
-        self._entry_index()
-
     def get_values(
         self,
         method: Optional[Union[str, List[str]]] = None,
@@ -594,8 +591,9 @@ class ReactionDataset(Dataset):
 
         """
 
+        records = self._get_entries()
         found = []
-        for num, x in enumerate(self.data.records):
+        for num, x in enumerate(records):
             if x.name == name:
                 found.append(num)
 
@@ -605,7 +603,7 @@ class ReactionDataset(Dataset):
         if len(found) > 1:
             raise KeyError("Dataset:get_rxn: Multiple reactions of name '{}' found. Dataset failure.".format(name))
 
-        return self.data.records[found[0]]
+        return records[found[0]]
 
     # Visualization
     def ternary(self, cvals=None):
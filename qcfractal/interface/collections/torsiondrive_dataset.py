@@ -35,23 +35,26 @@ class TDEntrySpecification(ProtoModel):
 class TorsionDriveDataset(BaseProcedureDataset):
     class DataModel(BaseProcedureDataset.DataModel):
 
-        records: Dict[str, TDEntry] = {}
+        records: Optional[Dict[str, TDEntry]] = None
         history: Set[str] = set()
         specs: Dict[str, TDEntrySpecification] = {}
 
         class Config(BaseProcedureDataset.DataModel.Config):
             pass
 
-    def _internal_compute_add(self, spec: Any, entry: Any, tag: str, priority: str) -> ObjectId:
+    def _internal_compute_add(self, spec: Any, entries: List[Any], tag: str, priority: str) -> List[ObjectId]:
 
-        service = TorsionDriveInput(
-            initial_molecule=entry.initial_molecules,
-            keywords=entry.td_keywords,
-            optimization_spec=spec.optimization_spec,
-            qc_spec=spec.qc_spec,
-        )
+        services = [
+            TorsionDriveInput(
+                initial_molecule=entry.initial_molecules,
+                keywords=entry.td_keywords,
+                optimization_spec=spec.optimization_spec,
+                qc_spec=spec.qc_spec,
+            )
+            for entry in entries
+        ]
 
-        return self.client.add_service([service], tag=tag, priority=priority).ids[0]
+        return self.client.add_service(services, tag=tag, priority=priority).ids
 
     def add_specification(
         self,
@@ -16,11 +16,20 @@ from .common_models import (
     ProtoModel,
     QCSpecification,
     ResultProtocols,
+    ViewDataFormatEnum,
 )
 from .gridoptimization import GridOptimizationInput, GridOptimizationRecord
 from .model_builder import build_procedure
 from .model_utils import hash_dictionary, json_encoders, prepare_basis
 from .records import OptimizationRecord, ResultRecord
 from .rest_models import ComputeResponse, rest_model
-from .task_models import ManagerStatusEnum, PythonComputeSpec, TaskRecord, TaskStatusEnum
+from .task_models import (
+    ManagerStatusEnum,
+    PythonComputeSpec,
+    TaskRecord,
+    TaskStatusEnum,
+    find_spec_references,
+    resolve_spec_references,
+    spec_reference,
+)
 from .torsiondrive import TorsionDriveInput, TorsionDriveRecord
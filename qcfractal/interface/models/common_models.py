@@ -72,6 +72,15 @@ class CompressionEnum(str, Enum):
     lzma = "lzma"
 
 
+class ViewDataFormatEnum(str, Enum):
+    """
+    Serialization of the DataFrames returned by collection views
+    """
+
+    feather = "feather"
+    arrow_stream = "arrow-stream"
+
+
 class KVStore(ProtoModel):
     """
     Storage of outputs and error messages, with optional compression
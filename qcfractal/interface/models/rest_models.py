@@ -1,6 +1,7 @@
 """
 Models for the REST interface
 """
+import datetime
 import functools
 import re
 import warnings
@@ -9,7 +10,7 @@ from typing import Any, Dict, List, Optional, Tuple, Union
 from pydantic import Field, constr, root_validator, validator
 from qcelemental.util import get_base_docs
 
-from .common_models import KeywordSet, Molecule, ObjectId, ProtoModel, KVStore
+from .common_models import KeywordSet, Molecule, ObjectId, ProtoModel, KVStore, ViewDataFormatEnum
 from .gridoptimization import GridOptimizationInput
 from .records import ResultRecord
 from .task_models import PriorityEnum, TaskRecord
@@ -483,6 +484,23 @@ class CollectionSubresourceGETResponseMeta(ResponseMeta):
     """
 
     msgpacked_cols: List[str] = Field(..., description="Names of columns which were serialized to msgpack-ext.")
+    data_format: ViewDataFormatEnum = Field(
+        ViewDataFormatEnum.feather,
+        description="Serialization of the returned DataFrame, either an Arrow IPC stream ('arrow-stream') "
+        "or a Feather file ('feather').",
+    )
+
+
+class CollectionSubresourceGETBodyMeta(ProtoModel):
+    """
+    Request metadata for collection views functions.
+    """
+
+    data_format: ViewDataFormatEnum = Field(
+        ViewDataFormatEnum.feather,
+        description="Requested serialization of the returned DataFrame, either a Feather file ('feather') "
+        "or an Arrow IPC stream ('arrow-stream').",
+    )
 
 
 class CollectionEntryGETBody(ProtoModel):
@@ -492,7 +510,9 @@ class CollectionEntryGETBody(ProtoModel):
             description="Not implemented. " "See qcfractal.interface.collections.dataset_view.DatasetView.get_entries",
         )
 
-    meta: EmptyMeta = Field(EmptyMeta(), description=common_docs[EmptyMeta])
+    meta: CollectionSubresourceGETBodyMeta = Field(
+        CollectionSubresourceGETBodyMeta(), description=str(get_base_docs(CollectionSubresourceGETBodyMeta))
+    )
     data: Data = Field(..., description="Information about which entries to return.")
 
 
@@ -514,7 +534,9 @@ class CollectionMoleculeGETBody(ProtoModel):
             "See qcfractal.interface.collections.dataset_view.DatasetView.get_molecules",
         )
 
-    meta: EmptyMeta = Field(EmptyMeta(), description=common_docs[EmptyMeta])
+    meta: CollectionSubresourceGETBodyMeta = Field(
+        CollectionSubresourceGETBodyMeta(), description=str(get_base_docs(CollectionSubresourceGETBodyMeta))
+    )
     data: Data = Field(..., description="Information about which molecules to return.")
 
 
@@ -542,7 +564,9 @@ class CollectionValueGETBody(ProtoModel):
         )
         subset: QueryStr
 
-    meta: EmptyMeta = Field(EmptyMeta(), description=common_docs[EmptyMeta])
+    meta: CollectionSubresourceGETBodyMeta = Field(
+        CollectionSubresourceGETBodyMeta(), description=str(get_base_docs(CollectionSubresourceGETBodyMeta))
+    )
     data: Data = Field(..., description="Information about which values to return.")
 
 
@@ -564,7 +588,9 @@ class CollectionListGETBody(ProtoModel):
     class Data(ProtoModel):
         pass
 
-    meta: EmptyMeta = Field(EmptyMeta(), description=common_docs[EmptyMeta])
+    meta: CollectionSubresourceGETBodyMeta = Field(
+        CollectionSubresourceGETBodyMeta(), description=str(get_base_docs(CollectionSubresourceGETBodyMeta))
+    )
     data: Data = Field(..., description="Empty for now.")
 
 
@@ -577,6 +603,91 @@ class CollectionListGETResponse(ProtoModel):
 
 register_model("collection/[0-9]+/list", "GET", CollectionListGETBody, CollectionListGETResponse)
 
+
+class CollectionEntriesGETBody(ProtoModel):
+    class Data(ProtoModel):
+        subset: QueryStr = Field(None, description="Names of the entries to return, all if None.")
+        pattern: Optional[str] = Field(
+            None,
+            description="Only return entries whose name matches this case insensitive glob pattern "
+            "(``*`` and ``?`` wildcards).",
+        )
+
+    meta: QueryMeta = Field(QueryMeta(), description=common_docs[QueryMeta])
+    data: Data = Field(..., description="Information about which entries to return.")
+
+
+class CollectionEntriesGETResponse(ProtoModel):
+    meta: ResponseGETMeta = Field(..., description=common_docs[ResponseGETMeta])
+    data: List[Dict[str, Optional[Any]]] = Field(
+        ..., description="A page of the entries of the collection, ordered by name."
+    )
+
+
+register_model("collection/[0-9]+/entries", "GET", CollectionEntriesGETBody, CollectionEntriesGETResponse)
+
+
+class CollectionEntriesPUTBody(ProtoModel):
+    class Data(ProtoModel):
+        add_entries: List[Dict[str, Any]] = Field(
+            [], description="Entries to add, replacing the existing entries of the same name."
+        )
+        remove_entries: List[str] = Field([], description="Names of the entries to remove.")
+        object_map: Dict[str, Dict[str, ObjectId]] = Field(
+            {},
+            description="Cells of the object maps of the entries to set, as {entry name: {specification: id}}. "
+            "Only for collections keeping an object map per entry, such as the procedure datasets.",
+        )
+        history: List[Any] = Field([], description="Items to append to the history of the collection.")
+
+    meta: EmptyMeta = Field(EmptyMeta(), description=common_docs[EmptyMeta])
+    data: Data = Field(..., description="The changes to apply to the entries of the collection.")
+
+
+class CollectionEntriesPUTResponse(ProtoModel):
+    class Data(ProtoModel):
+        n_added: int = Field(..., description="The number of entries added or replaced.")
+        n_removed: int = Field(..., description="The number of entries removed.")
+        n_updated: int = Field(..., description="The number of entries with an updated object map.")
+
+    meta: ResponseMeta = Field(..., description=common_docs[ResponseMeta])
+    data: Data = Field(..., description="The number of entries which were changed.")
+
+
+register_model("collection/[0-9]+/entries", "PUT", CollectionEntriesPUTBody, CollectionEntriesPUTResponse)
+
+
+class CollectionContributedValuesGETBody(ProtoModel):
+    class Data(ProtoModel):
+        name: QueryStr = Field(
+            None, description="Names of the contributed values to return (case insensitive), all if None."
+        )
+        subset: QueryStr = Field(None, description="Entries for which to return values, all if None.")
+        include_values: bool = Field(
+            True,
+            description="Return the index and values of the entries, otherwise only the contributed values metadata.",
+        )
+
+    meta: EmptyMeta = Field(EmptyMeta(), description=common_docs[EmptyMeta])
+    data: Data = Field(..., description="Information about which contributed values to return.")
+
+
+class CollectionContributedValuesGETResponse(ProtoModel):
+    meta: ResponseGETMeta = Field(..., description=common_docs[ResponseGETMeta])
+    data: List[Dict[str, Optional[Any]]] = Field(
+        ...,
+        description="The contributed values, with an `index` of the requested entries and their `values`, "
+        "or None for both if the values were not requested.",
+    )
+
+
+register_model(
+    "collection/[0-9]+/contributed_values",
+    "GET",
+    CollectionContributedValuesGETBody,
+    CollectionContributedValuesGETResponse,
+)
+
 ### Result
 
 
@@ -1021,6 +1132,11 @@ common_docs[QueueManagerMeta] = str(get_base_docs(QueueManagerMeta))
 class QueueManagerGETBody(ProtoModel):
     class Data(ProtoModel):
         limit: int = Field(..., description="Max number of Queue Managers to get from the server.")
+        spec_references: bool = Field(
+            False,
+            description="If True, the molecules and keywords of the task specs may be references, which the Queue "
+            "Manager resolves through ``queue_manager/references``. Otherwise the server resolves them.",
+        )
 
     meta: QueueManagerMeta = Field(..., description=common_docs[QueueManagerMeta])
     data: Data = Field(
@@ -1040,6 +1156,27 @@ class QueueManagerGETResponse(ProtoModel):
 register_model("queue_manager", "GET", QueueManagerGETBody, QueueManagerGETResponse)
 
 
+class QueueManagerReferencesGETBody(ProtoModel):
+    class Data(ProtoModel):
+        molecule: List[ObjectId] = Field([], description="The ids of the referenced molecules.")
+        keywords: List[ObjectId] = Field([], description="The ids of the referenced keyword sets.")
+
+    meta: EmptyMeta = Field(EmptyMeta(), description=common_docs[EmptyMeta])
+    data: Data = Field(..., description="The references held by task specs to resolve.")
+
+
+class QueueManagerReferencesGETResponse(ProtoModel):
+    meta: ResponseGETMeta = Field(..., description=common_docs[ResponseGETMeta])
+    data: Dict[str, Dict[str, Any]] = Field(
+        ...,
+        description="The referenced objects by kind and id, Molecule dictionaries under ``molecule`` and KeywordSet "
+        "values under ``keywords``.",
+    )
+
+
+register_model("queue_manager/references", "GET", QueueManagerReferencesGETBody, QueueManagerReferencesGETResponse)
+
+
 class QueueManagerPOSTBody(ProtoModel):
     meta: QueueManagerMeta = Field(..., description=common_docs[QueueManagerMeta])
     data: Dict[ObjectId, Any] = Field(..., description="A Dictionary of tasks to return to the server.")
@@ -1057,6 +1194,9 @@ class QueueManagerPUTBody(ProtoModel):
     class Data(ProtoModel):
         operation: str
         configuration: Optional[Dict[str, Any]] = None
+        task_ids: Optional[List[ObjectId]] = Field(
+            None, description="The unstarted tasks the Queue Manager hands back with the return operation."
+        )
 
     meta: QueueManagerMeta = Field(..., description=common_docs[QueueManagerMeta])
     data: Data = Field(
@@ -1175,3 +1315,56 @@ class ManagerInfoGETResponse(ProtoModel):
 
 
 register_model(r"manager", "GET", ManagerInfoGETBody, ManagerInfoGETResponse)
+
+
+### SQL profile
+
+
+class SQLProfileGETBody(ProtoModel):
+    class Data(ProtoModel):
+        reset: bool = Field(False, description="Clear the profile after reading it.")
+
+    meta: EmptyMeta = Field(EmptyMeta(), description=common_docs[EmptyMeta])
+    data: Data = Field(Data(), description="Options for reading the profile.")
+
+
+class SQLProfileGETResponse(ProtoModel):
+    meta: ResponseMeta = Field(..., description=common_docs[ResponseMeta])
+    data: Dict[str, Any] = Field(
+        ...,
+        description="Statement counts and times per storage method (``methods``) and the most recent slow statements "
+        "(``slow_queries``).",
+    )
+
+
+register_model(r"sql_profile", "GET", SQLProfileGETBody, SQLProfileGETResponse)
+
+### Access summary
+
+
+class AccessSummaryGETBody(ProtoModel):
+    class Data(ProtoModel):
+        after: Optional[datetime.datetime] = Field(None, description="Only counts accesses at or after this date.")
+        before: Optional[datetime.datetime] = Field(None, description="Only counts accesses before this date.")
+        granularity: str = Field(
+            "day", description="The period accesses are counted in, one of hour, day, week, month or year."
+        )
+        group_by: List[str] = Field(
+            ["access_type"],
+            description="Fields the counts are split by, among access_type, access_method, country_code and "
+            "username.",
+        )
+        access_type: QueryListStr = Field(None, description="Only counts accesses to these endpoints.")
+
+    meta: EmptyMeta = Field(EmptyMeta(), description=common_docs[EmptyMeta])
+    data: Data = Field(Data(), description="The periods and groups to count accesses in.")
+
+
+class AccessSummaryGETResponse(ProtoModel):
+    meta: ResponseGETMeta = Field(..., description=common_docs[ResponseGETMeta])
+    data: List[Dict[str, Any]] = Field(
+        ..., description="The access counts, one entry per period and group with the period, group fields and count."
+    )
+
+
+register_model(r"access/summary", "GET", AccessSummaryGETBody, AccessSummaryGETResponse)
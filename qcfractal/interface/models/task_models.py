@@ -1,6 +1,7 @@
+import copy
 import datetime
 from enum import Enum
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Set
 
 from pydantic import Field, validator
 from qcelemental.models import ComputeError
@@ -53,6 +54,87 @@ class PythonComputeSpec(ProtoModel):
     kwargs: Dict[str, Any] = Field(..., description="Dictionary of keyword arguments to pass into ``function``.")
 
 
+# Task specs may hold references to stored objects rather than the objects themselves, see spec_reference
+_reference_key = "$ref"
+
+
+def spec_reference(kind: str, id: ObjectId) -> Dict[str, str]:
+    """
+    A reference standing in for a stored object in a task spec.
+
+    Parameters
+    ----------
+    kind : str
+        The kind of object referenced, either "molecule" (a Molecule dictionary) or "keywords" (the values
+        of a KeywordSet).
+    id : ObjectId
+        The id of the object in the database.
+    """
+
+    return {_reference_key: kind, "id": str(id)}
+
+
+def _is_reference(obj: Any) -> bool:
+    return isinstance(obj, dict) and len(obj) == 2 and _reference_key in obj and "id" in obj
+
+
+def _children(obj: Any):
+    if isinstance(obj, dict):
+        return list(obj.items())
+    elif isinstance(obj, list):
+        return list(enumerate(obj))
+    return []
+
+
+def find_spec_references(specs: Any) -> Dict[str, Set[str]]:
+    """
+    Collects the references held anywhere in task specs, or lists and dictionaries of them.
+
+    Returns
+    -------
+    Dict[str, Set[str]]
+        The referenced ids by kind of object.
+    """
+
+    ret = {}
+    stack = [specs]
+    while stack:
+        obj = stack.pop()
+        if _is_reference(obj):
+            ret.setdefault(obj[_reference_key], set()).add(obj["id"])
+        else:
+            stack.extend(v for _, v in _children(obj))
+
+    return ret
+
+
+def resolve_spec_references(specs: Any, objects: Dict[str, Dict[str, Any]]) -> None:
+    """
+    Replaces, in place, the references held in task specs by copies of the objects they reference.
+
+    References to objects missing from `objects` are left in place, the tasks holding them fail validation
+    when computed.
+
+    Parameters
+    ----------
+    specs : Any
+        Task specs, or lists and dictionaries of them.
+    objects : Dict[str, Dict[str, Any]]
+        The referenced objects by kind of object and id.
+    """
+
+    stack = [specs]
+    while stack:
+        obj = stack.pop()
+        for key, value in _children(obj):
+            if _is_reference(value):
+                found = objects.get(value[_reference_key], {}).get(value["id"], None)
+                if found is not None:
+                    obj[key] = copy.deepcopy(found)
+            else:
+                stack.append(value)
+
+
 class TaskRecord(ProtoModel):
 
     id: ObjectId = Field(None, description="The Database assigned Id of the Task, if it has been assigned yet.")
@@ -0,0 +1,176 @@
+"""
+A persistent, size-bounded cache of server records for the FractalClient
+"""
+
+import pathlib
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple, Union
+
+from qcelemental.util.serialization import deserialize, serialize
+
+
+class RecordCache:
+    """
+    An on-disk (SQLite) least-recently-used cache of records, keyed by server, record kind and id.
+
+    Records are stored as msgpack-ext serialized dictionaries together with their status and
+    modification time. Whether a cached record may be used is up to the caller: completed
+    records are immutable, others should be revalidated against their ``modified_on``.
+    The cache is shared safely between sessions, threads and servers, concurrent writers are serialized by SQLite.
+    Records of different servers are kept apart as ids are only unique within a server, the size bound
+    applies to the whole file.
+    """
+
+    # Bumped whenever the schema changes, caches of older versions are dropped
+    _version = 2
+
+    _schema = """
+        CREATE TABLE IF NOT EXISTS records (
+            server TEXT NOT NULL,
+            kind TEXT NOT NULL,
+            id TEXT NOT NULL,
+            status TEXT,
+            modified_on TEXT,
+            data BLOB NOT NULL,
+            nbytes INTEGER NOT NULL,
+            accessed REAL NOT NULL,
+            PRIMARY KEY (server, kind, id)
+        );
+        CREATE INDEX IF NOT EXISTS records_accessed ON records (accessed);
+    """
+
+    def __init__(self, path: Union[str, pathlib.Path], max_size: int = 1024, server: str = ""):
+        """
+        Parameters
+        ----------
+        path : Union[str, pathlib.Path]
+            The SQLite file holding the cache, created if it does not exist.
+        max_size : int, optional
+            The approximate maximum size of the cached records of all servers, in MB.
+        server : str, optional
+            The server the records come from, typically its address.
+        """
+
+        self.path = pathlib.Path(path).expanduser()
+        self.max_bytes = max(0, int(max_size)) * 1024 ** 2
+        self.server = server
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), timeout=30, check_same_thread=False)
+        with self._conn:
+            if self._conn.execute("PRAGMA user_version").fetchone()[0] != self._version:
+                self._conn.execute("DROP TABLE IF EXISTS records")
+                self._conn.execute(f"PRAGMA user_version = {self._version}")
+        self._conn.executescript(self._schema)
+
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM records WHERE server = ?", (self.server,)).fetchone()[0]
+
+    def get_many(self, kind: str, ids: Iterable[str]) -> Dict[str, Tuple[Optional[str], Optional[str], Dict[str, Any]]]:
+        """
+        Returns the cached records of `kind` among `ids` as ``{id: (status, modified_on, record)}``.
+        Missing ids are omitted. Found records are marked as recently used.
+        """
+
+        ids = list(dict.fromkeys(str(x) for x in ids))
+        ret = {}
+        with self._lock:
+            # Stay below the SQLite host parameter limit
+            for i in range(0, len(ids), 500):
+                chunk = ids[i : i + 500]
+                rows = self._conn.execute(
+                    f"SELECT id, status, modified_on, data FROM records WHERE server = ? AND kind = ? AND id IN "
+                    f"({','.join('?' * len(chunk))})",
+                    [self.server, kind] + chunk,
+                ).fetchall()
+                for record_id, status, modified_on, data in rows:
+                    ret[record_id] = (status, modified_on, deserialize(data, "msgpack-ext"))
+
+            if ret:
+                now = time.time()
+                self._conn.executemany(
+                    "UPDATE records SET accessed = ? WHERE server = ? AND kind = ? AND id = ?",
+                    [(now, self.server, kind, x) for x in ret],
+                )
+                self._conn.commit()
+
+            self.hits += len(ret)
+            self.misses += len(ids) - len(ret)
+
+        return ret
+
+    def set_many(self, kind: str, records: List[Tuple[str, Optional[str], Optional[str], Dict[str, Any]]]) -> None:
+        """
+        Inserts or replaces ``(id, status, modified_on, record)`` tuples of `kind`, then evicts the least
+        recently used records, other than those just inserted, until the cache fits in its maximum size.
+        """
+
+        if self.max_bytes == 0 or not records:
+            return
+
+        now = time.time()
+        rows = []
+        for record_id, status, modified_on, record in records:
+            data = serialize(record, "msgpack-ext")
+            rows.append((self.server, kind, str(record_id), status, modified_on, data, len(data), now))
+
+        with self._lock:
+            self._conn.executemany("INSERT OR REPLACE INTO records VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows)
+            self._evict({(self.server, kind, row[2]) for row in rows})
+            self._conn.commit()
+
+    def _evict(self, keep: Set[Tuple[str, str, str]]) -> None:
+        total = self._conn.execute("SELECT COALESCE(SUM(nbytes), 0) FROM records").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+
+        # Walk from the least recently used record until enough bytes are freed, sparing the records in `keep`
+        excess = total - self.max_bytes
+        evicted = []
+        for rowid, server, kind, record_id, nbytes in self._conn.execute(
+            "SELECT rowid, server, kind, id, nbytes FROM records ORDER BY accessed, rowid"
+        ):
+            if (server, kind, record_id) in keep:
+                continue
+
+            evicted.append((rowid,))
+            excess -= nbytes
+            if excess <= 0:
+                break
+
+        self._conn.executemany("DELETE FROM records WHERE rowid = ?", evicted)
+
+    def clear(self) -> None:
+        """Removes all records of this server from the cache."""
+
+        with self._lock:
+            self._conn.execute("DELETE FROM records WHERE server = ?", (self.server,))
+            self._conn.commit()
+            self._conn.execute("VACUUM")
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def stats(self) -> Dict[str, Any]:
+        """Returns the current usage statistics of the cache."""
+
+        with self._lock:
+            count, nbytes = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(nbytes), 0) FROM records WHERE server = ?", (self.server,)
+            ).fetchone()
+
+        return {
+            "path": str(self.path),
+            "size": count,
+            "nbytes": nbytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
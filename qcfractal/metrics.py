@@ -0,0 +1,289 @@
+"""
+Server metrics exposed in the Prometheus text exposition format
+"""
+
+import bisect
+import math
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Seconds, from a millisecond to a minute
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+# Bytes, from 256 B to 64 MB
+SIZE_BUCKETS = tuple(256 * 4 ** i for i in range(10))
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: Sequence[Tuple[str, str]] = ()) -> str:
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ""
+
+    escaped = [(k, str(v).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')) for k, v in pairs]
+    return "{" + ",".join(f'{k}="{v}"' for k, v in escaped) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    return repr(float(value))
+
+
+class Metric:
+    """
+    A named metric, with one sample (or set of samples) per combination of label values.
+    """
+
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+
+        self._lock = threading.Lock()
+        self._values = {}
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        if len(labels) != len(self.labels) or set(labels) != set(self.labels):
+            raise KeyError(f"Metric '{self.name}' requires the labels {self.labels}, found {tuple(labels)}.")
+
+        return tuple(str(labels[k]) for k in self.labels)
+
+    def _samples(self) -> List[str]:
+        raise NotImplementedError()
+
+    def render(self) -> List[str]:
+        """Returns the lines describing this metric."""
+
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"] + self._samples()
+
+
+class Counter(Metric):
+    """A monotonically increasing count."""
+
+    kind = "counter"
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def get(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0)
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+
+        return [f"{self.name}{_format_labels(self.labels, k)} {_format_value(v)}" for k, v in items]
+
+
+class Gauge(Metric):
+    """A value which may go up and down, either set directly or read from a callback when rendered."""
+
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str, labels: Sequence[str] = (), callback: Callable = None):
+        super().__init__(name, documentation, labels)
+        if callback is not None and self.labels:
+            raise ValueError("Gauges read from a callback cannot have labels.")
+
+        self.callback = callback
+
+    def set(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def get(self, **labels) -> float:
+        if self.callback is not None:
+            return self.callback()
+
+        return self._values.get(self._key(labels), 0)
+
+    def _samples(self) -> List[str]:
+        if self.callback is not None:
+            return [f"{self.name} {_format_value(self.callback())}"]
+
+        with self._lock:
+            items = sorted(self._values.items())
+
+        return [f"{self.name}{_format_labels(self.labels, k)} {_format_value(v)}" for k, v in items]
+
+
+class Histogram(Metric):
+    """Counts of observations in cumulative buckets, together with their count and sum."""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labels: Sequence[str] = (), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labels)
+
+        self.buckets = tuple(sorted(float(x) for x in buckets))
+        if self.buckets[-1] != math.inf:
+            self.buckets += (math.inf,)
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            if key not in self._values:
+                self._values[key] = [[0] * len(self.buckets), 0.0]
+
+            counts = self._values[key]
+            counts[0][index] += 1
+            counts[1] += value
+
+    @contextmanager
+    def time(self, **labels):
+        """Observes the wall time spent in the context."""
+
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def get(self, **labels) -> Tuple[int, float]:
+        """Returns the number and the sum of the observations."""
+
+        counts = self._values.get(self._key(labels))
+        if counts is None:
+            return 0, 0.0
+
+        return sum(counts[0]), counts[1]
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            items = sorted((k, (list(v[0]), v[1])) for k, v in self._values.items())
+
+        lines = []
+        for key, (counts, total) in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets, counts):
+                cumulative += count
+                labels = _format_labels(self.labels, key, [("le", _format_value(bound))])
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+
+            labels = _format_labels(self.labels, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+
+        return lines
+
+
+class MetricsRegistry:
+    """
+    A set of metrics sharing a name prefix.
+
+    Metrics are created once, asking for an existing name returns the existing metric.
+    """
+
+    def __init__(self, prefix: str = "qcfractal"):
+        self.prefix = prefix
+
+        self._lock = threading.Lock()
+        self._metrics = {}
+
+    def _register(self, cls, name: str, *args, **kwargs) -> Metric:
+        name = f"{self.prefix}_{name}" if self.prefix else name
+        with self._lock:
+            metric = self._metrics.get(name, None)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, *args, **kwargs)
+            elif not isinstance(metric, cls):
+                raise TypeError(f"Metric '{name}' is already registered as a {metric.kind}.")
+
+        return metric
+
+    def counter(self, name: str, documentation: str, labels: Sequence[str] = ()) -> Counter:
+        return self._register(Counter, name, documentation, labels)
+
+    def gauge(self, name: str, documentation: str, labels: Sequence[str] = (), callback: Callable = None) -> Gauge:
+        return self._register(Gauge, name, documentation, labels, callback=callback)
+
+    def histogram(
+        self, name: str, documentation: str, labels: Sequence[str] = (), buckets=DEFAULT_BUCKETS
+    ) -> Histogram:
+        return self._register(Histogram, name, documentation, labels, buckets=buckets)
+
+    def get(self, name: str) -> Optional[Metric]:
+        """Returns a metric by its name, with or without the prefix."""
+
+        return self._metrics.get(name, self._metrics.get(f"{self.prefix}_{name}", None))
+
+    def render(self) -> str:
+        """Returns all metrics in the Prometheus text exposition format."""
+
+        with self._lock:
+            metrics = [self._metrics[k] for k in sorted(self._metrics)]
+
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+
+        return "\n".join(lines) + "\n"
+
+
+class ServerMetrics(MetricsRegistry):
+    """
+    The metrics of the FractalServer hot paths.
+    """
+
+    def __init__(self, prefix: str = "qcfractal"):
+        super().__init__(prefix)
+
+        # REST API
+        self.request_duration = self.histogram(
+            "http_request_duration_seconds", "Time spent serving API requests.", labels=("handler", "method")
+        )
+        self.request_size = self.histogram(
+            "http_request_size_bytes", "Size of API request bodies.", labels=("handler", "method"), buckets=SIZE_BUCKETS
+        )
+        self.response_size = self.histogram(
+            "http_response_size_bytes",
+            "Size of uncompressed API response bodies.",
+            labels=("handler", "method"),
+            buckets=SIZE_BUCKETS,
+        )
+
+        # Task queue
+        self.queue_get_next_duration = self.histogram(
+            "queue_get_next_seconds", "Time spent claiming tasks for managers."
+        )
+        self.tasks_claimed = self.counter("tasks_claimed_total", "Tasks claimed by managers.", labels=("tag",))
+        self.insert_complete_duration = self.histogram(
+            "insert_complete_tasks_seconds", "Time spent ingesting tasks returned by managers."
+        )
+        self.ingest_duration = self.histogram(
+            "ingest_parser_seconds", "Time spent in the output parsers of returned tasks.", labels=("parser",)
+        )
+        self.tasks_completed = self.counter(
+            "tasks_completed_total", "Tasks returned by managers.", labels=("tag", "status")
+        )
+
+        # Services
+        self.service_iteration_duration = self.histogram(
+            "service_iteration_seconds", "Time spent iterating services.", labels=("service",)
+        )
+
+        # Database
+        self.db_checkout_wait = self.histogram(
+            "db_pool_checkout_wait_seconds", "Time spent waiting for a database connection from the pool."
+        )
+
+    def watch_pool(self, pool, prefix: str = "db_pool") -> None:
+        """Exposes the occupancy of a SQLAlchemy connection pool, under metric names starting with `prefix`."""
+
+        for name, attr, documentation in [
+            (f"{prefix}_size", "size", "Number of connections the pool keeps open."),
+            (f"{prefix}_checked_out", "checkedout", "Number of connections currently checked out of the pool."),
+            (f"{prefix}_overflow", "overflow", "Number of connections opened beyond the pool size."),
+        ]:
+            if hasattr(pool, attr):
+                self.gauge(name, documentation, callback=getattr(pool, attr))
@@ -8,7 +8,15 @@ import qcelemental as qcel
 import qcengine as qcng
 
 from .base import BaseTasks
-from ..interface.models import Molecule, OptimizationRecord, QCSpecification, ResultRecord, TaskRecord, KeywordSet
+from ..interface.models import (
+    Molecule,
+    OptimizationRecord,
+    QCSpecification,
+    ResultRecord,
+    TaskRecord,
+    KeywordSet,
+    spec_reference,
+)
 from ..interface.models.task_models import PriorityEnum
 from .procedures_util import parse_single_tasks, form_qcinputspec_schema
 
@@ -202,12 +210,18 @@ class OptimizationTasks(BaseTasks):
         for rec, mol, kw in zip(records, molecules, qc_keywords):
             inp = self._build_schema_input(rec, mol, kw)
 
+            # The stored molecule and keywords are only referenced, managers resolve them from their cache
+            args = inp.dict()
+            args["initial_molecule"] = spec_reference("molecule", mol.id)
+            if kw is not None:
+                args["input_specification"]["keywords"] = spec_reference("keywords", kw.id)
+
             # Build task object
             task = TaskRecord(
                 **{
                     "spec": {
                         "function": "qcengine.compute_procedure",
-                        "args": [inp.dict(), rec.program],
+                        "args": [args, rec.program],
                         "kwargs": {},
                     },
                     "parser": "optimization",
@@ -8,7 +8,7 @@ import qcelemental as qcel
 import qcengine as qcng
 
 from .base import BaseTasks
-from ..interface.models import Molecule, ResultRecord, TaskRecord, KeywordSet
+from ..interface.models import Molecule, ResultRecord, TaskRecord, KeywordSet, spec_reference
 from ..interface.models.task_models import PriorityEnum
 
 _wfn_return_names = set(qcel.models.results.WavefunctionProperties._return_results_names)
@@ -190,12 +190,18 @@ class SingleResultTasks(BaseTasks):
             inp = self._build_schema_input(rec, mol, kw)
             inp.extras["_qcfractal_tags"] = {"program": rec.program, "keywords": rec.keywords}
 
+            # The stored molecule and keywords are only referenced, managers resolve them from their cache
+            args = inp.dict()
+            args["molecule"] = spec_reference("molecule", mol.id)
+            if rec.keywords:
+                args["keywords"] = spec_reference("keywords", kw.id)
+
             # Build task object
             task = TaskRecord(
                 **{
                     "spec": {
                         "function": "qcengine.compute",  # todo: add defaults in models
-                        "args": [inp.dict(), rec.program],
+                        "args": [args, rec.program],
                         "kwargs": {},  # todo: add defaults in models
                     },
                     "parser": "single",
@@ -3,5 +3,11 @@ Initializer for the queue_handler folder
 """
 
 from .adapters import build_queue_adapter
-from .handlers import QueueManagerHandler, ServiceQueueHandler, TaskQueueHandler, ComputeManagerHandler
+from .handlers import (
+    QueueManagerHandler,
+    QueueManagerReferencesHandler,
+    ServiceQueueHandler,
+    TaskQueueHandler,
+    ComputeManagerHandler,
+)
 from .managers import QueueManager
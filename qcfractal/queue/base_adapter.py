@@ -3,15 +3,21 @@ A BaseAdapter for wrapping compute engines.
 """
 
 import abc
+import functools
 import importlib
 import logging
 import operator
+import threading
+from collections import deque
 from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
 
 
 class BaseAdapter(abc.ABC):
     """A BaseAdapter for wrapping compute engines"""
 
+    # Whether the submitted tasks are futures reporting their completion through `add_done_callback`
+    _completion_callbacks = False
+
     def __init__(
         self,
         client: Any,
@@ -63,6 +69,14 @@ class BaseAdapter(abc.ABC):
 
         self.queue = {}
         self.function_map = {}
+
+        # Futures are pushed here by their completion callbacks, from the threads of the executor
+        self.completion_batch = None
+        self._completed = deque()
+        self._completion_condition = threading.Condition()
+        self._completion_event = threading.Event()
+        self._n_pending = 0
+
         self.cores_per_task = cores_per_task
         self.memory_per_task = memory_per_task
         self.nodes_per_task = nodes_per_task
@@ -164,6 +178,8 @@ class BaseAdapter(abc.ABC):
             self.logger.debug(f"Submitted Task:\n{task_spec}\n")
 
             self.queue[queue_key] = task
+            if self._completion_callbacks:
+                self._track_completion(queue_key, task)
             # self.logger.info("Adapter: Task submitted {}".format(tag))
             ret.append(tag)
         return ret
@@ -271,6 +287,81 @@ class BaseAdapter(abc.ABC):
             Submitted task object for the adapter to look up later after it has formatted it
         """
 
+    def cancel_unstarted(self, limit: int) -> List[Hashable]:
+        """Removes up to `limit` tasks which did not start running yet from the queue, latest submitted first.
+
+        Adapters which cannot tell whether a task started do not cancel any.
+
+        Parameters
+        ----------
+        limit : int
+            The maximum number of tasks to cancel.
+
+        Returns
+        -------
+        list of Hashable
+            The keys of the cancelled tasks.
+        """
+        return []
+
+    def _track_completion(self, key: Hashable, future: Any) -> None:
+        """Registers a callback pushing the future to the completed futures once it is done."""
+
+        with self._completion_condition:
+            self._n_pending += 1
+
+        # Runs the callback right away if the future is already done
+        future.add_done_callback(functools.partial(self._on_complete, key))
+
+    def _on_complete(self, key: Hashable, future: Any) -> None:
+        with self._completion_condition:
+            self._completed.append((key, future))
+            self._n_pending -= 1
+            self._completion_condition.notify_all()
+
+            if self.completion_batch is not None and len(self._completed) >= self.completion_batch:
+                self._completion_event.set()
+
+    def _drain_completed(self) -> List[Tuple[Hashable, Any]]:
+        """Removes the futures completed since the last call from the queue and returns them."""
+
+        with self._completion_condition:
+            completed = list(self._completed)
+            self._completed.clear()
+            self._completion_event.clear()
+
+        ret = []
+        for key, future in completed:
+            # Skips futures no longer in the queue, e.g. those cancelled by close
+            if self.queue.get(key, None) is future:
+                del self.queue[key]
+                ret.append((key, future))
+
+        return ret
+
+    def _await_completions(self) -> None:
+        """Blocks until the completion callbacks of all submitted tasks ran."""
+
+        with self._completion_condition:
+            self._completion_condition.wait_for(lambda: self._n_pending == 0)
+
+    def wait_for_completions(self, timeout: float) -> bool:
+        """Waits until `completion_batch` tasks completed since the last `acquire_complete`.
+
+        Adapters not tracking completions through callbacks wait for the whole timeout.
+
+        Parameters
+        ----------
+        timeout : float
+            The maximum time to wait, in seconds.
+
+        Returns
+        -------
+        bool
+            True if enough tasks completed before the timeout.
+        """
+        return self._completion_event.wait(timeout)
+
     def _task_exists(self, lookup) -> bool:
         """
         Check if the task exists helper function, adapters may use something different
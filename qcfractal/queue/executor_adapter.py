@@ -3,7 +3,7 @@ Queue adapter for Dask
 """
 
 import traceback
-from typing import Any, Dict, Hashable, Tuple
+from typing import Any, Dict, Hashable, List, Tuple
 
 from qcelemental.models import FailedOperation
 
@@ -22,6 +22,8 @@ def _get_future(future):
 class ExecutorAdapter(BaseAdapter):
     """A Queue Adapter for Python Executors"""
 
+    _completion_callbacks = True
+
     def __repr__(self):
 
         return "<ExecutorAdapter client=<{} max_workers={}>>".format(
@@ -37,24 +39,24 @@ class ExecutorAdapter(BaseAdapter):
         return self.client._max_workers
 
     def acquire_complete(self) -> Dict[str, Any]:
-        ret = {}
-        del_keys = []
-        for key, future in self.queue.items():
-            if future.done():
-                ret[key] = _get_future(future)
-                del_keys.append(key)
-
-        for key in del_keys:
-            del self.queue[key]
-
-        return ret
+        return {key: _get_future(future) for key, future in self._drain_completed()}
 
     def await_results(self) -> bool:
-        from concurrent.futures import wait
+        self._await_completions()
+        return True
 
-        wait(list(self.queue.values()))
+    def cancel_unstarted(self, limit: int) -> List[Hashable]:
+        ret = []
+        for key in reversed(list(self.queue.keys())):
+            if len(ret) >= limit:
+                break
 
-        return True
+            # Only futures still pending in the executor can be cancelled
+            if self.queue[key].cancel():
+                del self.queue[key]
+                ret.append(key)
+
+        return ret
 
     def close(self) -> bool:
         for future in self.queue.values():
@@ -88,11 +90,9 @@ class DaskAdapter(ExecutorAdapter):
         else:
             return len(self.client.cluster.scheduler.workers)
 
-    def await_results(self) -> bool:
-        from dask.distributed import wait
-
-        wait(list(self.queue.values()))
-        return True
+    def cancel_unstarted(self, limit: int) -> List[Hashable]:
+        # Cancelling a Dask future also stops it once running
+        return []
 
     def close(self) -> bool:
 
@@ -3,12 +3,18 @@ Queue backend abstraction manager.
 """
 
 import collections
+import time
 import traceback
 
 import tornado.web
 
 from ..interface.models.rest_models import rest_model
-from ..interface.models.task_models import PriorityEnum, TaskStatusEnum
+from ..interface.models.task_models import (
+    PriorityEnum,
+    TaskStatusEnum,
+    find_spec_references,
+    resolve_spec_references,
+)
 from ..interface.models.records import RecordStatusEnum
 from ..interface.models.model_builder import build_procedure
 from ..procedures import check_procedure_available, get_procedure_parser
@@ -52,8 +58,10 @@ class TaskQueueHandler(APIHandler):
         body_model, response_model = rest_model("task_queue", "get")
         body = self.parse_bodymodel(body_model)
 
-        tasks = self.storage.get_queue(**{**body.data.dict(), **body.meta.dict()})
+        raw = self.encoding == "msgpack-ext"
+        tasks = self.storage.get_queue(**{**body.data.dict(), **body.meta.dict()}, raw_msgpack=raw)
         response = response_model(**tasks)
+        self.msgpack_passthrough = raw
 
         self.logger.info("GET: TaskQueue - {} pulls.".format(len(response.data)))
         self.write(response)
@@ -199,6 +207,9 @@ class QueueManagerHandler(APIHandler):
 
     _required_auth = "queue"
 
+    # Claiming tasks is a GET request
+    _read_your_writes = True
+
     @staticmethod
     def _get_name_from_metadata(meta):
         """
@@ -208,7 +219,7 @@ class QueueManagerHandler(APIHandler):
         return ret
 
     @staticmethod
-    def insert_complete_tasks(storage_socket, body, logger):
+    def insert_complete_tasks(storage_socket, body, logger, metrics=None):
 
         results = body.data
         meta = body.meta
@@ -221,8 +232,11 @@ class QueueManagerHandler(APIHandler):
         # Pivot data so that we group all results in categories
         new_results = collections.defaultdict(list)
 
-        queue = storage_socket.get_queue(id=task_ids)["data"]
-        queue = {v.id: v for v in queue}
+        # Only the bookkeeping fields are needed, avoid pulling and decoding the task specs
+        queue = storage_socket.get_queue(
+            id=task_ids, include=["id", "status", "manager", "parser", "base_result_id", "tag"], limit=len(task_ids)
+        )["data"]
+        queue = {v["id"]: v for v in queue}
 
         error_data = []
 
@@ -246,13 +260,13 @@ class QueueManagerHandler(APIHandler):
                     task_failures += 1
 
                 # Is the task in the running state
-                elif existing_task_data.status != TaskStatusEnum.running:
+                elif existing_task_data["status"] != TaskStatusEnum.running:
                     logger.warning(f"Task id {task_id} is not in the running state.")
                     task_failures += 1
 
                 # Was the manager that sent the data the one that was assigned?
-                elif existing_task_data.manager != manager_name:
-                    logger.warning(f"Task id {task_id} belongs to {existing_task_data.manager}, not this manager")
+                elif existing_task_data["manager"] != manager_name:
+                    logger.warning(f"Task id {task_id} belongs to {existing_task_data['manager']}, not this manager")
                     task_failures += 1
 
                 # Failed task
@@ -272,9 +286,9 @@ class QueueManagerHandler(APIHandler):
 
                 # Success!
                 else:
-                    parser = queue[task_id].parser
+                    parser = existing_task_data["parser"]
                     new_results[parser].append(
-                        {"result": result, "task_id": task_id, "base_result": queue[task_id].base_result}
+                        {"result": result, "task_id": task_id, "base_result": existing_task_data["base_result_id"]}
                     )
                     task_success += 1
 
@@ -296,10 +310,19 @@ class QueueManagerHandler(APIHandler):
         completed = []
         for k, v in new_results.items():
             procedure_parser = get_procedure_parser(k, storage_socket, logger)
+            start = time.perf_counter()
             com = procedure_parser.handle_completed_output(v)
+            if metrics is not None:
+                metrics.ingest_duration.observe(time.perf_counter() - start, parser=k)
             completed.extend(com)
 
         storage_socket.queue_mark_error(error_data)
+
+        if metrics is not None:
+            for task_ids, status in [(completed, "COMPLETE"), ([x[0] for x in error_data], "ERROR")]:
+                for task_id in task_ids:
+                    metrics.tasks_completed.inc(tag=queue[task_id]["tag"], status=status)
+
         return len(completed), len(error_data)
 
     def get(self):
@@ -312,9 +335,20 @@ class QueueManagerHandler(APIHandler):
         name = self._get_name_from_metadata(body.meta)
 
         # Grab new tasks and write out
-        new_tasks = self.storage.queue_get_next(
-            name, body.meta.programs, body.meta.procedures, limit=body.data.limit, tag=body.meta.tag
-        )
+        with self.metrics.queue_get_next_duration.time():
+            new_tasks = self.storage.queue_get_next(
+                name, body.meta.programs, body.meta.procedures, limit=body.data.limit, tag=body.meta.tag
+            )
+        for task in new_tasks:
+            self.metrics.tasks_claimed.inc(tag=task.tag)
+
+        # Managers which do not resolve references themselves receive the referenced objects in the specs
+        if not body.data.spec_references:
+            args = [task.spec.args for task in new_tasks]
+            references = find_spec_references(args)
+            if references:
+                resolve_spec_references(args, self.storage.get_referenced_objects(references))
+
         response = response_model(
             **{
                 "meta": {
@@ -340,7 +374,8 @@ class QueueManagerHandler(APIHandler):
         body_model, response_model = rest_model("queue_manager", "post")
         body = self.parse_bodymodel(body_model)
 
-        success, error = self.insert_complete_tasks(self.storage, body, self.logger)
+        with self.metrics.insert_complete_duration.time():
+            success, error = self.insert_complete_tasks(self.storage, body, self.logger, metrics=self.metrics)
 
         completed = success + error
 
@@ -392,6 +427,16 @@ class QueueManagerHandler(APIHandler):
 
             ret = {"nshutdown": nshutdown}
 
+        elif op == "return":
+            nreturned = 0
+            if body.data.task_ids:
+                nreturned = self.storage.queue_reset_status(id=body.data.task_ids, manager=name, reset_running=True)
+            self.storage.manager_update(name, returned=nreturned)
+
+            self.logger.info("QueueManager: Manager {} returned {} unstarted tasks.".format(name, nreturned))
+
+            ret = {"nreturned": nreturned}
+
         elif op == "heartbeat":
             self.storage.manager_update(name, status="ACTIVE", **body.meta.dict(), log=True)
             self.logger.debug("QueueManager: Heartbeat of manager {} detected.".format(name))
@@ -407,6 +452,38 @@ class QueueManagerHandler(APIHandler):
         # TODO: ????
 
 
+class QueueManagerReferencesHandler(APIHandler):
+    """
+    Serves the molecules and keywords referenced by task specs to compute managers.
+    """
+
+    _required_auth = "queue"
+
+    def get(self):
+
+        body_model, response_model = rest_model("queue_manager/references", "get")
+        body = self.parse_bodymodel(body_model)
+
+        objects = self.storage.get_referenced_objects(body.data.dict())
+        missing = [x for kind, ids in body.data.dict().items() for x in ids if x not in objects[kind]]
+
+        response = response_model(
+            **{
+                "meta": {
+                    "n_found": sum(len(v) for v in objects.values()),
+                    "success": True,
+                    "errors": [],
+                    "error_description": "",
+                    "missing": missing,
+                },
+                "data": objects,
+            }
+        )
+        self.write(response)
+
+        self.logger.info("QueueManager: Served {} referenced objects.".format(response.meta.n_found))
+
+
 class ComputeManagerHandler(APIHandler):
     """
     Handles management/status querying of managers
@@ -4,20 +4,29 @@ Queue backend abstraction manager.
 
 import json
 import logging
+from collections import OrderedDict
+import math
+import queue
 import sched
 import socket
+import threading
 import time
 import uuid
-from typing import Any, Callable, Dict, List, Optional, Union
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
 
+import msgpack
 from pydantic import BaseModel, validator
+from qcelemental.util import serialize
+from qcelemental.util.serialization import msgpackext_encode
 
 import qcengine as qcng
 from qcfractal.extras import get_information
 
 from ..interface.data import get_molecule
+from ..interface.models import find_spec_references, resolve_spec_references
 from .adapters import build_queue_adapter
 from .compress import compress_results
+from .spool import ResultSpool
 
 __all__ = ["QueueManager"]
 
@@ -34,6 +43,8 @@ class QueueStatistics(BaseModel):
     total_task_walltime: float = 0.0
     maximum_possible_walltime: float = 0.0  # maximum_workers * time_delta, experimental
     active_task_slots: int = 0
+    completion_rate: float = 0.0  # tasks per second, smoothed
+    fetch_round_trip: float = 0.0  # seconds, smoothed
 
     # Static Quantities
     max_concurrent_tasks: int = 0
@@ -87,6 +98,12 @@ class QueueManager:
         A logger for the QueueManager
     """
 
+    # Number of result batches waiting for upload, and of task batches waiting for submission, in pipelined mode
+    _pipeline_depth = 2
+
+    # Weight of the latest observation in the smoothed completion rate and fetch round trip
+    _prefetch_smoothing = 0.3
+
     def __init__(
         self,
         client: "FractalClient",
@@ -96,6 +113,13 @@ class QueueManager:
         queue_tag: Optional[Union[str, List[str]]] = None,
         manager_name: str = "unlabeled",
         update_frequency: Union[int, float] = 2,
+        completion_batch: Optional[int] = None,
+        pipelined: bool = False,
+        adaptive_prefetch: bool = False,
+        upload_chunk_size: Optional[int] = 100,
+        upload_chunk_bytes: Optional[int] = 32 * 1024 ** 2,
+        spool_path: Optional[str] = None,
+        reference_cache_size: int = 10000,
         verbose: bool = True,
         server_error_retries: Optional[int] = 1,
         stale_update_limit: Optional[int] = 10,
@@ -124,6 +148,31 @@ class QueueManager:
             The cluster the manager belongs to
         update_frequency : Union[int, float], optional
             The frequency to check for new tasks in seconds
+        completion_batch : Optional[int], optional
+            Runs the next update as soon as this many tasks completed, rather than at the next update period.
+            Only adapters tracking their futures through completion callbacks wake the manager up early.
+        pipelined : bool, optional
+            Uploads results, fetches new tasks and submits them to the adapter in separate threads, so that
+            slow result uploads do not delay new tasks. Applies to managers run with `start`.
+        adaptive_prefetch : bool, optional
+            Holds as many tasks as there are task slots, plus those expected to complete before newly requested
+            tasks arrive, from the observed completion rate and server round trip, up to `max_tasks`. Unstarted
+            tasks beyond twice that backlog are returned to the server.
+        upload_chunk_size : Optional[int], optional
+            The maximum number of completed tasks posted to the server per request, None for no limit.
+        upload_chunk_bytes : Optional[int], optional
+            The size, in bytes, above which completed tasks are split over several requests, None for no limit.
+            Each request is retried on its own after a server communication error.
+        spool_path : Optional[str], optional
+            A file in which completed tasks which could not be posted are kept until the server accepts them,
+            instead of in memory. They are retried on every update, without the `server_error_retries` and
+            `stale_update_limit` limits, and after a restart: a manager starting with undelivered tasks in its
+            spool resumes the identity they were assigned to. A spool is held by one manager at a time, a manager
+            refuses to start on a spool held by another.
+        reference_cache_size : int, optional
+            The number of molecules and keyword sets kept to resolve the references held by task specs. Objects
+            missing from the cache are fetched from the server in one request per batch of new tasks. If 0, the
+            server resolves the references, sending the full objects with every task.
         verbose : bool, optional
             Whether or not to have the manager be verbose (logger level debug and up)
         server_error_retries : Optional[int], optional
@@ -164,6 +213,18 @@ class QueueManager:
             self.logger = logging.getLogger("QueueManager")
 
         self.name_data = {"cluster": manager_name, "hostname": socket.gethostname(), "uuid": str(uuid.uuid4())}
+
+        self.spool = None
+        if spool_path is not None:
+            self.spool = ResultSpool(spool_path)
+
+            # The server only accepts the results of a task from the manager it was assigned to
+            spooled_name = self.spool.get_meta("name_data")
+            if len(self.spool) and spooled_name is not None:
+                self.name_data = json.loads(spooled_name)
+            else:
+                self.spool.set_meta("name_data", json.dumps(self.name_data))
+
         self._name = self.name_data["cluster"] + "-" + self.name_data["hostname"] + "-" + self.name_data["uuid"]
 
         self.client = client
@@ -185,6 +246,7 @@ class QueueManager:
             retries=self.retries,
             verbose=verbose,
         )
+        self.queue_adapter.completion_batch = completion_batch
         self.max_tasks = max_tasks
         self.queue_tag = queue_tag
         self.verbose = verbose
@@ -198,8 +260,18 @@ class QueueManager:
 
         self.scheduler = None
         self.update_frequency = update_frequency
+        self.completion_batch = completion_batch
+        self.pipelined = pipelined
+        self.adaptive_prefetch = adaptive_prefetch
+        self.upload_chunk_size = upload_chunk_size
+        self.upload_chunk_bytes = upload_chunk_bytes
+        self.reference_cache_size = reference_cache_size
+        self._reference_cache = OrderedDict()
         self.periodic = {}
         self.active = 0
+        self._active_lock = threading.Lock()
+        self._adapter_lock = threading.Lock()
+        self._pipeline_threads = []
         self.exit_callbacks = []
 
         # Server response/stale job handling
@@ -232,6 +304,11 @@ class QueueManager:
             self.logger.info("        Hostname:    {}".format(self.name_data["hostname"]))
             self.logger.info("        UUID:        {}\n".format(self.name_data["uuid"]))
 
+        if self.spool is not None:
+            self.logger.info("    Result Spool:")
+            self.logger.info("        Path:        {}".format(self.spool.path))
+            self.logger.info("        Undelivered: {}\n".format(len(self.spool)))
+
         self.logger.info("    Queue Adapter:")
         self.logger.info("        {}\n".format(self.queue_adapter))
 
@@ -333,17 +410,36 @@ class QueueManager:
 
         self.assert_connected()
 
-        self.scheduler = sched.scheduler(time.time, time.sleep)
         heartbeat_time = int(0.4 * self.heartbeat_frequency)
+        next_update = None
 
         def scheduler_update():
-            self.update()
-            self.scheduler.enter(self.update_frequency, 1, scheduler_update)
+            nonlocal next_update
+            if self.pipelined:
+                self._pipeline_update()
+            else:
+                self.update()
+            next_update = self.scheduler.enter(self.update_frequency, 1, scheduler_update)
+
+        def scheduler_delay(seconds):
+            nonlocal next_update
+            if self.completion_batch is None or seconds <= 0:
+                time.sleep(seconds)
+
+            # Brings the next update forward once enough tasks completed
+            elif self.queue_adapter.wait_for_completions(seconds) and next_update in self.scheduler.queue:
+                self.scheduler.cancel(next_update)
+                next_update = self.scheduler.enter(0, 1, scheduler_update)
+
+        self.scheduler = sched.scheduler(time.time, scheduler_delay)
 
         def scheduler_heartbeat():
             self.heartbeat()
             self.scheduler.enter(heartbeat_time, 1, scheduler_heartbeat)
 
+        if self.pipelined:
+            self._start_pipeline()
+
         self.logger.info("QueueManager successfully started.\n")
 
         self.scheduler.enter(0, 1, scheduler_update)
@@ -368,6 +464,9 @@ class QueueManager:
         # Close down the adapter
         self.close_adapter()
 
+        if self.spool is not None:
+            self.spool.close()
+
         # Call exit callbacks
         for func, args, kwargs in self.exit_callbacks:
             func(*args, **kwargs)
@@ -404,6 +503,7 @@ class QueueManager:
         """
         self.assert_connected()
 
+        self._stop_pipeline()
         self.update(new_tasks=False, allow_shutdown=False)
 
         payload = self._payload_template()
@@ -448,13 +548,30 @@ class QueueManager:
         """
         self.exit_callbacks.append((callback, args, kwargs))
 
+    def _encode_payload(self, payload_data: Dict[str, Union[bytes, str]]) -> Union[bytes, str]:
+        """Builds the body of a results post around completed tasks already serialized by _encode_results."""
+
+        meta = self._payload_template()["meta"]
+        encoding = self.client.encoding
+
+        if encoding == "msgpack-ext":
+            packer = msgpack.Packer(default=msgpackext_encode, use_bin_type=True)
+            chunks = [packer.pack_map_header(2), packer.pack("meta"), packer.pack(meta), packer.pack("data")]
+            chunks.append(packer.pack_map_header(len(payload_data)))
+            for key, result in payload_data.items():
+                chunks.append(packer.pack(key))
+                chunks.append(result)
+            return b"".join(chunks)
+
+        data = ", ".join(f"{json.dumps(key)}: {result}" for key, result in payload_data.items())
+        return f'{{"meta": {serialize(meta, encoding)}, "data": {{{data}}}}}'
+
     def _post_update(self, payload_data, allow_shutdown=True):
-        """Internal function to post payload update"""
-        payload = self._payload_template()
-        # Update with data
-        payload["data"] = payload_data
+        """Internal function to post payload update, of completed tasks serialized by _encode_results"""
+
+        self.client._request_counter[("queue_manager", "post")] += 1
         try:
-            self.client._automodel_request("queue_manager", "post", payload, full_return=True)
+            self.client._request("post", "queue_manager", data=self._encode_payload(payload_data))
         except IOError:
 
             # Trapped behavior elsewhere
@@ -479,14 +596,19 @@ class QueueManager:
         """
         Attempt to post the previous payload failures
         """
+        if self.spool is not None:
+            self._replay_spool(allow_shutdown=allow_shutdown)
+
         clear_indices = []
         for index, (results, attempts) in enumerate(self._stale_payload_tracking):
-            try:
-                self._post_update(results)
+            failed = self._post_chunks(results)
+            if not failed:
                 self.logger.info(f"Successfully pushed jobs from {attempts+1} updates ago")
                 self.logger.info(f"Tasks pushed: " + str(list(results.keys())))
                 clear_indices.append(index)
-            except IOError:
+            else:
+                # Only the tasks of the chunks which failed again are kept
+                results = self._stale_payload_tracking[index][0] = failed
 
                 # Tried and failed
                 attempts += 1
@@ -524,27 +646,169 @@ class QueueManager:
             finally:
                 raise RuntimeError("Exceeded number of stale updates allowed!")
 
-    def update(self, new_tasks: bool = True, allow_shutdown=True) -> bool:
-        """Examines the queue for completed tasks and adds successful completions to the database
-        while unsuccessful are logged for future inspection.
+    def _acquire_results(self) -> Dict[str, Any]:
+        """Pulls the completed tasks out of the adapter and compresses their outputs."""
 
-        Parameters
-        ----------
-        new_tasks: bool, optional, Default: True
-            Try to get new tasks from the server
-        allow_shutdown: bool, optional, Default: True
-            Allow function to attempt graceful shutdowns in the case of stale job or fatal error limits.
-            Does not prevent errors from being raise, but mostly used to prevent infinite loops when update is
-            called from `shutdown` itself
+        with self._adapter_lock:
+            results = self.queue_adapter.acquire_complete()
+
+        # Compress the stdout/stderr/error outputs
+        return compress_results(results)
+
+    def _encode_results(self, results: Dict[str, Any]) -> Dict[str, Union[bytes, str]]:
+        """Serializes each completed task once, in the encoding of the request body."""
+
+        encoding = self.client.encoding
+        return {
+            key: result.serialize(encoding) if hasattr(result, "serialize") else serialize(result, encoding)
+            for key, result in results.items()
+        }
+
+    def _chunk_results(self, encoded: Dict[str, Union[bytes, str]]) -> List[Dict[str, Union[bytes, str]]]:
+        """Splits serialized completed tasks into chunks within the upload count and size limits.
+
+        A task larger than the size limit is uploaded in a chunk of its own.
         """
 
-        self.assert_connected()
-        self._update_stale_jobs(allow_shutdown=allow_shutdown)
+        if self.upload_chunk_size is None and self.upload_chunk_bytes is None:
+            return [encoded] if encoded else []
 
-        results = self.queue_adapter.acquire_complete()
+        chunks = []
+        chunk, chunk_bytes = {}, 0
+        for key, result in encoded.items():
+            nbytes = len(result)
 
-        # Compress the stdout/stderr/error outputs
-        results = compress_results(results)
+            if chunk and (
+                (self.upload_chunk_size is not None and len(chunk) >= self.upload_chunk_size)
+                or (self.upload_chunk_bytes is not None and chunk_bytes + nbytes > self.upload_chunk_bytes)
+            ):
+                chunks.append(chunk)
+                chunk, chunk_bytes = {}, 0
+
+            chunk[key] = result
+            chunk_bytes += nbytes
+
+        if chunk:
+            chunks.append(chunk)
+
+        return chunks
+
+    def _post_chunks(self, results: Dict[str, Any], allow_shutdown=True) -> Dict[str, Any]:
+        """Posts completed tasks in chunks, returns the tasks which could not be posted.
+
+        Posting stops at the first chunk which fails, as the server is likely unreachable, and the tasks of the
+        remaining chunks are returned without being attempted.
+        """
+
+        chunks = self._chunk_results(self._encode_results(results))
+        for index, chunk in enumerate(chunks):
+            try:
+                self._post_update(chunk, allow_shutdown=allow_shutdown)
+            except IOError:
+                unposted = {key for chunk in chunks[index:] for key in chunk}
+                return {key: result for key, result in results.items() if key in unposted}
+
+        return {}
+
+    def _replay_spool(self, allow_shutdown=True) -> int:
+        """Posts the spooled tasks, oldest first, until the spool is empty or a post fails.
+
+        Returns the number of posted tasks.
+        """
+
+        limit = self.upload_chunk_size or 100
+
+        posted = 0
+        while True:
+            chunk = self.spool.read(limit, max_bytes=self.upload_chunk_bytes)
+            if not chunk:
+                break
+
+            try:
+                self._post_update(self._encode_results(chunk), allow_shutdown=allow_shutdown)
+            except IOError:
+                self.logger.warning(f"Could not post spooled tasks, {len(self.spool)} left to retry on next update.")
+                break
+
+            self.spool.remove(list(chunk.keys()))
+            posted += len(chunk)
+
+        if posted:
+            self.logger.info(f"Posted {posted} spooled tasks, {len(self.spool)} left in the spool.")
+
+        return posted
+
+    def _upload_results(self, results: Dict[str, Any], allow_shutdown=True) -> Dict[str, str]:
+        """Posts completed tasks to the server, keeping those which could not be posted for a later attempt.
+
+        Returns the submission status of each task.
+        """
+
+        failed = self._post_chunks(results, allow_shutdown=allow_shutdown)
+        if not failed:
+            return {k: "sent" for k in results.keys()}
+
+        if self.spool is not None or self.server_error_retries is None or self.server_error_retries > 0:
+            failed_status = self._keep_results(failed)
+            self.logger.warning(
+                f"Post of {len(failed)}/{len(results)} complete tasks was not successful. "
+                f"{failed_status.capitalize()} them to attempt again on next update."
+            )
+        else:
+            self.logger.warning(
+                f"Post of {len(failed)}/{len(results)} complete tasks was not successful. Data may be lost."
+            )
+            self.n_stale_jobs += len(failed)
+            failed_status = "unknown_error"
+
+        return {k: (failed_status if k in failed else "sent") for k in results.keys()}
+
+    def _keep_results(self, results: Dict[str, Any]) -> str:
+        """Keeps completed tasks which could not be posted for the next update, in the spool if there is one.
+
+        Returns the submission status of the kept tasks.
+        """
+
+        if self.spool is not None:
+            self.spool.add(results)
+            return "spooled"
+
+        self._stale_payload_tracking.append([results, 0])
+        return "deferred"
+
+    def _log_results(self, results: Dict[str, Any], task_status: Dict[str, str]) -> None:
+        """Logs the submission and calculation status of completed tasks."""
+
+        # For logging
+        failure_messages = {}
+
+        n_success = 0
+        for key, result in results.items():
+            if result.success:
+                n_success += 1
+                task_status[key] += " / success"
+            else:
+                task_status[key] += f" / failed: {result.error.error_type}"
+                failure_messages[key] = result.error
+        n_fail = len(results) - n_success
+
+        # Now print out all the info
+        self.logger.info(f"Processed {len(results)} tasks: {n_success} succeeded / {n_fail} failed).")
+        self.logger.info(f"Task ids, submission status, calculation status below")
+        for task_id, status_msg in task_status.items():
+            self.logger.info(f"    Task {task_id} : {status_msg}")
+        if n_fail:
+            self.logger.info("The following tasks failed with the errors:")
+            for task_id, error_info in failure_messages.items():
+                self.logger.info(f"Error message for task id {task_id}")
+                self.logger.info("    Error type: " + str(error_info.error_type))
+                self.logger.info("    Backtrace: \n" + str(error_info.error_message))
+
+    def _update_statistics(self, results: Dict[str, Any]) -> bool:
+        """Accounts the worker time since the last update and the task time of completed tasks.
+
+        Returns whether the adapter can count its task slots, and thus whether efficiencies can be computed.
+        """
 
         # Stats fetching for running tasks, as close to the time we got the jobs as we can
         last_time = self.statistics.last_update_time
@@ -564,78 +828,44 @@ class QueueManager:
         self.statistics.total_worker_walltime += timedelta_worker_walltime
         self.statistics.maximum_possible_walltime += timedelta_maximum_walltime
 
+        if time_delta_seconds > 0:
+            rate = len(results) / time_delta_seconds
+            self.statistics.completion_rate += self._prefetch_smoothing * (rate - self.statistics.completion_rate)
+
         # Process jobs
         n_success = 0
-        n_fail = 0
-        n_result = len(results)
         task_cpu_hours = 0
-        error_payload = []
-
-        if n_result:
-            # For logging
-            failure_messages = {}
-
-            try:
-                self._post_update(results, allow_shutdown=allow_shutdown)
-                task_status = {k: "sent" for k in results.keys()}
-            except IOError:
-                if self.server_error_retries is None or self.server_error_retries > 0:
-                    self.logger.warning("Post complete tasks was not successful. Attempting again on next update.")
-                    self._stale_payload_tracking.append([results, 0])
-                    task_status = {k: "deferred" for k in results.keys()}
-                else:
-                    self.logger.warning("Post complete tasks was not successful. Data may be lost.")
-                    self.n_stale_jobs += len(results)
-                    task_status = {k: "unknown_error" for k in results.keys()}
-
-            self.active -= n_result
-            for key, result in results.items():
-                wall_time_seconds = 0
-                if result.success:
-                    n_success += 1
-                    if hasattr(result.provenance, "wall_time"):
-                        wall_time_seconds = float(result.provenance.wall_time)
-
-                    task_status[key] += " / success"
-                else:
-                    task_status[key] += f" / failed: {result.error.error_type}"
-                    failure_messages[key] = result.error
-
-                    # Try to get the wall time in the most fault-tolerant way
-                    try:
-                        wall_time_seconds = float(result.input_data.get("provenance", {}).get("wall_time", 0))
-                    except AttributeError:
-                        # Trap the result.input_data is None, but let other attribute errors go
-                        if result.input_data is None:
-                            wall_time_seconds = 0
-                        else:
-                            raise
-                    except TypeError:
-                        # Trap wall time corruption, e.g. float(None)
-                        # Other Result corruptions will raise an error correctly
+        for result in results.values():
+            wall_time_seconds = 0
+            if result.success:
+                n_success += 1
+                if hasattr(result.provenance, "wall_time"):
+                    wall_time_seconds = float(result.provenance.wall_time)
+            else:
+                # Try to get the wall time in the most fault-tolerant way
+                try:
+                    wall_time_seconds = float(result.input_data.get("provenance", {}).get("wall_time", 0))
+                except AttributeError:
+                    # Trap the result.input_data is None, but let other attribute errors go
+                    if result.input_data is None:
                         wall_time_seconds = 0
+                    else:
+                        raise
+                except TypeError:
+                    # Trap wall time corruption, e.g. float(None)
+                    # Other Result corruptions will raise an error correctly
+                    wall_time_seconds = 0
 
-                task_cpu_hours += wall_time_seconds * self.statistics.cores_per_task / 3600
-            n_fail = n_result - n_success
-
-            # Now print out all the info
-            self.logger.info(f"Processed {len(results)} tasks: {n_success} succeeded / {n_fail} failed).")
-            self.logger.info(f"Task ids, submission status, calculation status below")
-            for task_id, status_msg in task_status.items():
-                self.logger.info(f"    Task {task_id} : {status_msg}")
-            if n_fail:
-                self.logger.info("The following tasks failed with the errors:")
-                for task_id, error_info in failure_messages.items():
-                    self.logger.info(f"Error message for task id {task_id}")
-                    self.logger.info("    Error type: " + str(error_info.error_type))
-                    self.logger.info("    Backtrace: \n" + str(error_info.error_message))
-
-        open_slots = max(0, self.max_tasks - self.active)
+            task_cpu_hours += wall_time_seconds * self.statistics.cores_per_task / 3600
 
         # Crunch Statistics
-        self.statistics.total_failed_tasks += n_fail
+        self.statistics.total_failed_tasks += len(results) - n_success
         self.statistics.total_successful_tasks += n_success
         self.statistics.total_task_walltime += task_cpu_hours
+
+        return log_efficiency
+
+    def _log_statistics(self, log_efficiency: bool) -> None:
         na_format = ""
         float_format = ",.2f"
         if self.statistics.total_completed_tasks == 0:
@@ -680,27 +910,313 @@ class QueueManager:
         if worker_stats_str is not None:
             self.logger.info(worker_stats_str)
 
-        if (new_tasks is False) or (open_slots == 0):
-            return True
+    def _fetch_tasks(self, limit: int) -> Optional[List[Dict[str, Any]]]:
+        """Gets up to `limit` new tasks from the server, returns None if the server could not be reached."""
 
-        # Get new tasks
         payload = self._payload_template()
-        payload["data"]["limit"] = open_slots
+        payload["data"]["limit"] = limit
+        payload["data"]["spec_references"] = self.reference_cache_size > 0
 
+        start = time.perf_counter()
         try:
             new_tasks = self.client._automodel_request("queue_manager", "get", payload)
         except IOError:
             # TODO something as we didnt successfully get data
             self.logger.warning("Acquisition of new tasks was not successful.")
-            return False
+            return None
+
+        round_trip = time.perf_counter() - start
+        self.statistics.fetch_round_trip += self._prefetch_smoothing * (round_trip - self.statistics.fetch_round_trip)
 
         self.logger.info("Acquired {} new tasks.".format(len(new_tasks)))
 
+        if not self._resolve_references(new_tasks):
+            self.logger.warning("Fetching the molecules and keywords of new tasks was not successful.")
+            self._return_tasks([task["id"] for task in new_tasks])
+            return None
+
+        return new_tasks
+
+    def _resolve_references(self, new_tasks: List[Dict[str, Any]]) -> bool:
+        """
+        Replaces the references held by the specs of new tasks by the objects they reference, fetching those
+        missing from the cache in a single request. Returns False if the server could not be reached.
+        """
+
+        specs = [task["spec"] for task in new_tasks]
+
+        objects = {}
+        missing = {}
+        for kind, ids in find_spec_references(specs).items():
+            objects[kind] = {}
+            for x in ids:
+                obj = self._reference_cache.get((kind, x), None)
+                if obj is None:
+                    missing.setdefault(kind, []).append(x)
+                else:
+                    self._reference_cache.move_to_end((kind, x))
+                    objects[kind][x] = obj
+
+        if missing:
+            try:
+                fetched = self.client._automodel_request("queue_manager/references", "get", {"data": missing})
+            except IOError:
+                return False
+
+            nfetched = 0
+            for kind, found in fetched.items():
+                objects.setdefault(kind, {}).update(found)
+                for x, obj in found.items():
+                    self._reference_cache[(kind, x)] = obj
+                nfetched += len(found)
+
+            while len(self._reference_cache) > self.reference_cache_size:
+                self._reference_cache.popitem(last=False)
+
+            nmissing = sum(len(v) for v in missing.values())
+            self.logger.info(f"Fetched {nfetched} of {nmissing} referenced objects missing from the cache.")
+
+        resolve_spec_references(specs, objects)
+        return True
+
+    def _submit_tasks(self, new_tasks: List[Dict[str, Any]]) -> None:
+        """Adds new tasks to the adapter queue."""
+
+        with self._adapter_lock:
+            self.queue_adapter.submit_tasks(new_tasks)
+
+        with self._active_lock:
+            self.active += len(new_tasks)
+
+    def _prefetch_limits(self) -> Tuple[int, int]:
+        """The number of tasks to hold, and the number beyond which unstarted tasks are returned to the server."""
+
+        concurrency = self.statistics.active_task_slots or self.statistics.max_concurrent_tasks
+
+        # Tasks expected to complete before newly requested tasks arrive
+        interval = self.update_frequency + self.statistics.fetch_round_trip
+        backlog = math.ceil(self.statistics.completion_rate * interval)
+
+        return min(self.max_tasks, concurrency + backlog), min(self.max_tasks, concurrency + 2 * backlog)
+
+    def _open_slots(self, pending: int = 0) -> int:
+        """The number of tasks to request, given `pending` tasks fetched but not yet submitted to the adapter."""
+
+        limit = self._prefetch_limits()[0] if self.adaptive_prefetch else self.max_tasks
+        with self._active_lock:
+            return max(0, limit - self.active - pending)
+
+    def _return_excess_tasks(self) -> int:
+        """Returns the unstarted tasks held beyond the adaptive prefetch quota to the server."""
+
+        if not self.adaptive_prefetch:
+            return 0
+
+        quota = self._prefetch_limits()[1]
+        if self.active <= quota:
+            return 0
+
+        with self._adapter_lock:
+            task_ids = self.queue_adapter.cancel_unstarted(self.active - quota)
+
+        if not task_ids:
+            return 0
+
+        with self._active_lock:
+            self.active -= len(task_ids)
+
+        return self._return_tasks(task_ids)
+
+    def _return_tasks(self, task_ids: List[str]) -> int:
+        """Hands tasks this manager claimed back to the server queue, returns the number of returned tasks."""
+
+        payload = self._payload_template()
+        payload["data"]["operation"] = "return"
+        payload["data"]["task_ids"] = task_ids
+
+        try:
+            nreturned = self.client._automodel_request("queue_manager", "put", payload)["nreturned"]
+        except IOError:
+            self.logger.warning("Returning unstarted tasks was not successful, they are recycled at shutdown.")
+            return 0
+
+        self.logger.info(f"Returned {nreturned} unstarted tasks over the prefetch quota.")
+        return nreturned
+
+    def update(self, new_tasks: bool = True, allow_shutdown=True) -> bool:
+        """Examines the queue for completed tasks and adds successful completions to the database
+        while unsuccessful are logged for future inspection.
+
+        Parameters
+        ----------
+        new_tasks: bool, optional, Default: True
+            Try to get new tasks from the server
+        allow_shutdown: bool, optional, Default: True
+            Allow function to attempt graceful shutdowns in the case of stale job or fatal error limits.
+            Does not prevent errors from being raise, but mostly used to prevent infinite loops when update is
+            called from `shutdown` itself
+        """
+
+        self.assert_connected()
+        self._update_stale_jobs(allow_shutdown=allow_shutdown)
+
+        results = self._acquire_results()
+        log_efficiency = self._update_statistics(results)
+
+        if results:
+            task_status = self._upload_results(results, allow_shutdown=allow_shutdown)
+
+            with self._active_lock:
+                self.active -= len(results)
+
+            self._log_results(results, task_status)
+
+        self._log_statistics(log_efficiency)
+
+        if new_tasks is False:
+            return True
+
+        self._return_excess_tasks()
+
+        open_slots = self._open_slots()
+        if open_slots == 0:
+            return True
+
+        # Get new tasks
+        new_tasks = self._fetch_tasks(open_slots)
+        if new_tasks is None:
+            return False
+
         # Add new tasks to queue
-        self.queue_adapter.submit_tasks(new_tasks)
-        self.active += len(new_tasks)
+        self._submit_tasks(new_tasks)
         return True
 
+    ## Pipelined updates
+
+    def _start_pipeline(self) -> None:
+        """Starts the threads uploading results, fetching tasks and submitting them to the adapter."""
+
+        self._pipeline_error = None
+        self._pipeline_stopping = False
+        self._n_fetched = 0
+        self._upload_queue = queue.Queue(maxsize=self._pipeline_depth)
+        self._submit_queue = queue.Queue(maxsize=self._pipeline_depth)
+        self._fetch_event = threading.Event()
+
+        self._pipeline_threads = [
+            threading.Thread(target=target, name=f"QueueManager-{name}", daemon=True)
+            for name, target in [
+                ("upload", self._upload_stage),
+                ("fetch", self._fetch_stage),
+                ("submit", self._submit_stage),
+            ]
+        ]
+        for thread in self._pipeline_threads:
+            thread.start()
+
+        self._fetch_event.set()
+
+    def _stop_pipeline(self) -> None:
+        """Stops the pipeline threads once the results queued for upload are posted."""
+
+        if not self._pipeline_threads:
+            return
+
+        upload_thread, fetch_thread, submit_thread = self._pipeline_threads
+        self._pipeline_threads = []
+
+        # Stops fetching first, so that the submit stage receives no more tasks
+        self._pipeline_stopping = True
+        self._fetch_event.set()
+        fetch_thread.join()
+
+        self._submit_queue.put(None)
+        submit_thread.join()
+
+        self._upload_queue.put(None)
+        upload_thread.join()
+
+    def _pipeline_update(self) -> None:
+        """Hands completed tasks to the upload stage and wakes the fetch stage up, without waiting on the server."""
+
+        self.assert_connected()
+
+        if self._pipeline_error is not None:
+            error, self._pipeline_error = self._pipeline_error, None
+            self.logger.error(f"A stage of the manager pipeline failed, shutting down: {error}")
+            try:
+                self.shutdown()
+            finally:
+                raise error
+
+        results = self._acquire_results()
+        log_efficiency = self._update_statistics(results)
+
+        if results:
+            with self._active_lock:
+                self.active -= len(results)
+
+            # Blocks once the uploads fall behind by more than the pipeline depth
+            self._upload_queue.put(results)
+
+        self._log_statistics(log_efficiency)
+        self._return_excess_tasks()
+        self._fetch_event.set()
+
+    def _upload_stage(self) -> None:
+        while True:
+            results = self._upload_queue.get()
+            if results is None:
+                break
+
+            task_status = None
+            try:
+                self._update_stale_jobs(allow_shutdown=False)
+                task_status = self._upload_results(results, allow_shutdown=False)
+                self._log_results(results, task_status)
+            except Exception as err:
+                # Results which did not make it through the upload are retried, before the manager shuts down
+                if task_status is None:
+                    self._keep_results(results)
+                self._pipeline_error = err
+
+    def _fetch_stage(self) -> None:
+        while True:
+            self._fetch_event.wait()
+            self._fetch_event.clear()
+            if self._pipeline_stopping:
+                break
+
+            # Tasks fetched but not submitted yet hold their slots
+            open_slots = self._open_slots(pending=self._n_fetched)
+            if open_slots == 0:
+                continue
+
+            try:
+                new_tasks = self._fetch_tasks(open_slots)
+            except Exception as err:
+                self._pipeline_error = err
+                continue
+
+            if new_tasks:
+                with self._active_lock:
+                    self._n_fetched += len(new_tasks)
+                self._submit_queue.put(new_tasks)
+
+    def _submit_stage(self) -> None:
+        while True:
+            new_tasks = self._submit_queue.get()
+            if new_tasks is None:
+                break
+
+            try:
+                self._submit_tasks(new_tasks)
+            except Exception as err:
+                self._pipeline_error = err
+            finally:
+                with self._active_lock:
+                    self._n_fetched -= len(new_tasks)
+
     def await_results(self) -> bool:
         """A synchronous method for testing or small launches
         that awaits task completion.
@@ -3,7 +3,6 @@ Queue adapter for Parsl
 """
 
 import logging
-import time
 import traceback
 from typing import Any, Callable, Dict, Hashable, Optional, Tuple
 
@@ -25,6 +24,8 @@ def _get_future(future):
 class ParslAdapter(BaseAdapter):
     """An Adapter for Parsl."""
 
+    _completion_callbacks = True
+
     def __init__(self, client: Any, logger: Optional[logging.Logger] = None, **kwargs):
         BaseAdapter.__init__(self, client, logger, **kwargs)
 
@@ -104,23 +105,10 @@ class ParslAdapter(BaseAdapter):
         return running
 
     def acquire_complete(self) -> Dict[str, Any]:
-        ret = {}
-        del_keys = []
-        for key, future in self.queue.items():
-            if future.done():
-                ret[key] = _get_future(future)
-                del_keys.append(key)
-
-        for key in del_keys:
-            del self.queue[key]
-
-        return ret
+        return {key: _get_future(future) for key, future in self._drain_completed()}
 
     def await_results(self) -> bool:
-        for future in list(self.queue.values()):
-            while future.done() is False:
-                time.sleep(0.1)
-
+        self._await_completions()
         return True
 
     def close(self) -> bool:
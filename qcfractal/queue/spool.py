@@ -0,0 +1,140 @@
+"""
+An on-disk spool of completed tasks which could not be delivered to the server
+"""
+
+import fcntl
+import sqlite3
+import threading
+import time
+import zlib
+from typing import Any, Dict, List, Optional
+
+from qcelemental.util import deserialize, serialize
+
+_schema = """
+CREATE TABLE IF NOT EXISTS results (
+    task_id TEXT PRIMARY KEY,
+    data BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    spooled_on REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+
+class ResultSpool:
+    """
+    Completed tasks stored, compressed, in a SQLite database so that they survive server outages and manager restarts.
+
+    Tasks are read back in the order they were spooled, in batches, so that only a batch is held in memory. A spool
+    is held by a single manager at a time, through an exclusive lock on a ``.lock`` file next to it.
+    """
+
+    def __init__(self, path: str, compression_level: int = 6):
+        """
+        Parameters
+        ----------
+        path : str
+            The SQLite database file, created if it does not exist.
+        compression_level : int, optional
+            The zlib compression level of the spooled tasks.
+
+        Raises
+        ------
+        RuntimeError
+            If the spool is held by another manager.
+        """
+
+        self.path = path
+        self.compression_level = compression_level
+
+        # Managers resume the identity stored in their spool, so two managers sharing one would impersonate each other
+        self._lock_file = open(path + ".lock", "a")
+        try:
+            fcntl.flock(self._lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            self._lock_file.close()
+            raise RuntimeError(f"The spool {path} is held by another manager, each manager needs a spool of its own.")
+
+        # Shared by the threads of a pipelined manager
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_schema)
+
+    def __repr__(self) -> str:
+        return f"<ResultSpool path='{self.path}' tasks={len(self)}>"
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT count(*) FROM results").fetchone()[0]
+
+    def add(self, results: Dict[str, Any]) -> None:
+        """Spools completed tasks, replacing previously spooled versions of the same tasks."""
+
+        rows = []
+        for task_id, result in results.items():
+            if hasattr(result, "dict"):
+                result = result.dict()
+
+            data = zlib.compress(serialize(result, "msgpack-ext"), self.compression_level)
+            rows.append((str(task_id), data, len(data), time.time()))
+
+        with self._lock, self._conn:
+            self._conn.executemany("INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?)", rows)
+
+    def read(self, limit: int, max_bytes: Optional[int] = None) -> Dict[str, Dict[str, Any]]:
+        """Returns up to `limit` of the oldest spooled tasks, without removing them.
+
+        Parameters
+        ----------
+        limit : int
+            The maximum number of tasks returned.
+        max_bytes : Optional[int], optional
+            Stops adding tasks once their compressed size exceeds this. At least one task is returned.
+
+        Returns
+        -------
+        Dict[str, Dict[str, Any]]
+            The spooled tasks by task id, as dictionaries.
+        """
+
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT task_id, data, size FROM results ORDER BY spooled_on, rowid LIMIT ?", (limit,)
+            )
+
+            ret = {}
+            nbytes = 0
+            for task_id, data, size in rows:
+                if ret and max_bytes is not None and nbytes + size > max_bytes:
+                    break
+
+                ret[task_id] = deserialize(zlib.decompress(data), "msgpack-ext")
+                nbytes += size
+
+        return ret
+
+    def remove(self, task_ids: List[str]) -> None:
+        """Removes delivered tasks from the spool."""
+
+        with self._lock, self._conn:
+            self._conn.executemany("DELETE FROM results WHERE task_id = ?", [(str(x),) for x in task_ids])
+
+    def get_meta(self, key: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+
+        return row[0] if row is not None else None
+
+    def set_meta(self, key: str, value: str) -> None:
+        with self._lock, self._conn:
+            self._conn.execute("INSERT OR REPLACE INTO meta VALUES (?, ?)", (key, value))
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+            self._lock_file.close()
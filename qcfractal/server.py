@@ -5,6 +5,7 @@ The FractalServer class
 import asyncio
 import datetime
 import logging
+import os
 import ssl
 import time
 import traceback
@@ -19,22 +20,40 @@ import tornado.web
 
 from .extras import get_information
 from .interface import FractalClient
-from .queue import QueueManager, QueueManagerHandler, ServiceQueueHandler, TaskQueueHandler, ComputeManagerHandler
+from .interface.collections import HDF5View
+from .interface.models import ViewDataFormatEnum
+from .metrics import ServerMetrics
+from .queue import (
+    QueueManager,
+    QueueManagerHandler,
+    QueueManagerReferencesHandler,
+    ServiceQueueHandler,
+    TaskQueueHandler,
+    ComputeManagerHandler,
+)
 from .services import construct_service
 from .storage_sockets import ViewHandler, storage_socket_factory
 from .storage_sockets.api_logger import API_AccessLogger
 from .web_handlers import (
+    AccessSummaryHandler,
     CollectionHandler,
     InformationHandler,
     KeywordHandler,
     KVStoreHandler,
+    MetricsHandler,
     MoleculeHandler,
     OptimizationHandler,
     ProcedureHandler,
     ResultHandler,
+    SQLProfileHandler,
     WavefunctionStoreHandler,
 )
 
+# Read-only user of the background jobs which query the server through a client when security is enabled
+_INTERNAL_USER = "qcfractal_server"
+# File in the view path holding the password of the internal user, readable by the server's user only
+_INTERNAL_PASSWORD_FILE = ".qcfractal_server_password"
+
 
 def _build_ssl():
     from cryptography import x509
@@ -93,6 +112,7 @@ class FractalServer:
         # Server info options
         name: str = "QCFractal Server",
         port: int = 7777,
+        reuse_port: bool = False,
         loop: "IOLoop" = None,
         compress_response: bool = True,
         # Security
@@ -103,20 +123,39 @@ class FractalServer:
         storage_uri: str = "postgresql://localhost:5432",
         storage_project_name: str = "qcfractal_default",
         query_limit: int = 1000,
+        cache_size: int = 5000,
+        sql_profile: bool = False,
+        sql_slow_threshold: float = 0.5,
+        storage_pool_size: int = 5,
+        storage_max_overflow: int = 10,
+        read_replica_uris: Optional[List[str]] = None,
+        replica_pool_size: int = 5,
+        replica_max_overflow: int = 10,
         # View options
         view_enabled: bool = False,
         view_path: Optional[str] = None,
+        view_cache_size: int = 512,
+        view_cache_validation: str = "mtime",
+        view_mmap: bool = False,
+        view_update_frequency: float = 0,
         # Log options
         logfile_prefix: str = None,
         loglevel: str = "info",
         log_apis: bool = False,
         geo_file_path: str = None,
+        access_log_retention: float = 0,
+        access_log_rollup: str = "hour",
+        server_stats_retention: float = 0,
         # Queue options
         queue_socket: "BaseAdapter" = None,
         heartbeat_frequency: float = 1800,
+        archive_frequency: float = 0,
+        archive_task_age: float = 30,
+        archive_log_age: float = 30,
         # Service options
         max_active_services: int = 20,
         service_frequency: float = 60,
+        leader_election: bool = False,
         # Testing functions
         skip_storage_version_check=True,
     ):
@@ -128,6 +167,8 @@ class FractalServer:
             The name of the server itself, provided when users query information
         port : int, optional
             The port the server will listen on.
+        reuse_port : bool, optional
+            Listen with SO_REUSEPORT, so that several server processes share the port.
         loop : IOLoop, optional
             Provide an IOLoop to use for the server
         compress_response : bool, optional
@@ -146,19 +187,66 @@ class FractalServer:
             The project name to use on the database.
         query_limit : int, optional
             The maximum number of entries a query will return.
+        cache_size : int, optional
+            The maximum number of entries in each of the storage socket's caches of immutable records.
+            Use 0 when several server processes share the database, as caches are per process.
+        sql_profile : bool, optional
+            Count and time the SQL statements of each storage method, served to admins on /sql_profile.
+        sql_slow_threshold : float, optional
+            When profiling, SQL statements taking longer than this (in seconds) are logged with their query plan.
+        storage_pool_size : int, optional
+            The number of connections kept open to the database.
+        storage_max_overflow : int, optional
+            The number of connections opened to the database beyond ``storage_pool_size`` under load.
+        read_replica_uris : Optional[List[str]], optional
+            URIs of read replicas of the database. GET requests which do not write are served from the replicas,
+            everything else, including task claims, ingestion and services, from the primary.
+        replica_pool_size : int, optional
+            The number of connections kept open to each replica.
+        replica_max_overflow : int, optional
+            The number of connections opened to each replica beyond ``replica_pool_size`` under load.
+        view_enabled : bool, optional
+            Serve frozen-views of collections.
+        view_path : str, optional
+            Directory containing the frozen-views.
+        view_cache_size : int, optional
+            Approximate memory, in MB, used to keep frozen-views open between requests.
+        view_cache_validation : str, optional
+            How open frozen-views are checked against their files, "mtime" or "checksum".
+        view_mmap : bool, optional
+            Memory-map contiguous frozen-view data columns. Views updated by the server are given that layout.
+        view_update_frequency : float, optional
+            Frequency, in seconds, at which dataset frozen-views are incrementally updated. 0 disables updates.
         logfile_prefix : str, optional
             The logfile to use for logging.
         loglevel : str, optional
             The level of logging to output
+        access_log_retention : float, optional
+            Access log rows are rolled up into per period counts, and deleted, after this many days.
+            0 keeps them forever.
+        access_log_rollup : str, optional
+            The period access log rows are counted in, "hour" or "day".
+        server_stats_retention : float, optional
+            Server stats older than this many days are thinned out to one row per day. 0 keeps them all.
         queue_socket : BaseAdapter, optional
             An optional Adapter to provide for server to have limited local compute.
             Should only be used for testing and interactive sessions.
         heartbeat_frequency : float, optional
             The time (in seconds) of the heartbeat manager frequency.
+        archive_frequency : float, optional
+            The time (in seconds) between moves of errored tasks and manager logs to the archive tables.
+            0 disables archival.
+        archive_task_age : float, optional
+            Errored tasks are archived this many days after they last changed.
+        archive_log_age : float, optional
+            Manager logs are archived after this many days.
         max_active_services : int, optional
             The maximum number of active Services that can be running at any given time.
         service_frequency : float, optional
             The time (in seconds) before checking and updating services.
+        leader_election : bool, optional
+            Several servers share the database. Services, heartbeat checks, server logs and view updates then
+            only run in the server holding the database leadership lock.
         """
 
         # Save local options
@@ -172,6 +260,15 @@ class FractalServer:
         self.max_active_services = max_active_services
         self.service_frequency = service_frequency
         self.heartbeat_frequency = heartbeat_frequency
+        self.view_update_frequency = view_update_frequency
+        self.view_mmap = view_mmap
+        self.archive_frequency = archive_frequency
+        self.archive_task_age = archive_task_age
+        self.archive_log_age = archive_log_age
+        self.access_log_retention = access_log_retention
+        self.access_log_rollup = access_log_rollup
+        self.server_stats_retention = server_stats_retention
+        self.leader_election = leader_election
 
         # Setup logging.
         if logfile_prefix is not None:
@@ -240,6 +337,9 @@ class FractalServer:
         else:
             raise KeyError("ssl_options not understood")
 
+        # Hot path timings and counters, served on /metrics
+        self.metrics = ServerMetrics()
+
         # Setup the database connection
         self.storage_database = storage_project_name
         self.storage_uri = storage_uri
@@ -250,12 +350,27 @@ class FractalServer:
             allow_read=allow_read,
             max_limit=query_limit,
             skip_version_check=skip_storage_version_check,
+            cache_size=cache_size,
+            metrics=self.metrics,
+            sql_profile=sql_profile,
+            sql_slow_threshold=sql_slow_threshold,
+            pool_size=storage_pool_size,
+            max_overflow=storage_max_overflow,
+            read_replica_uris=read_replica_uris,
+            replica_pool_size=replica_pool_size,
+            replica_max_overflow=replica_max_overflow,
         )
 
         if view_enabled:
-            self.view_handler = ViewHandler(view_path)
+            self.view_handler = ViewHandler(
+                view_path,
+                max_cache_bytes=view_cache_size * 1024 ** 2,
+                validation=view_cache_validation,
+                mmap=view_mmap,
+            )
         else:
             self.view_handler = None
+        self._internal_password = None
 
         # Pull the current loop if we need it
         self.loop = loop or tornado.ioloop.IOLoop.current()
@@ -266,6 +381,7 @@ class FractalServer:
             "logger": self.logger,
             "api_logger": self.api_logger,
             "view_handler": self.view_handler,
+            "metrics": self.metrics,
         }
 
         # Public information
@@ -276,6 +392,7 @@ class FractalServer:
             "query_limit": self.storage.get_limit(1.0e9),
             "client_lower_version_limit": "0.14.0",  # Must be XX.YY.ZZ
             "client_upper_version_limit": "0.15.99",  # Must be XX.YY.ZZ
+            "view_data_formats": [data_format.value for data_format in ViewDataFormatEnum],
         }
         self.update_public_information()
 
@@ -285,7 +402,11 @@ class FractalServer:
             (r"/kvstore", KVStoreHandler, self.objects),
             (r"/molecule", MoleculeHandler, self.objects),
             (r"/keyword", KeywordHandler, self.objects),
-            (r"/collection(?:/([0-9]+)(?:/(value|entry|list|molecule))?)?", CollectionHandler, self.objects),
+            (
+                r"/collection(?:/([0-9]+)(?:/(value|entry|entries|list|molecule|contributed_values))?)?",
+                CollectionHandler,
+                self.objects,
+            ),
             (r"/result", ResultHandler, self.objects),
             (r"/wavefunctionstore", WavefunctionStoreHandler, self.objects),
             (r"/procedure/?", ProcedureHandler, self.objects),
@@ -294,7 +415,12 @@ class FractalServer:
             (r"/task_queue", TaskQueueHandler, self.objects),
             (r"/service_queue", ServiceQueueHandler, self.objects),
             (r"/queue_manager", QueueManagerHandler, self.objects),
+            (r"/queue_manager/references", QueueManagerReferencesHandler, self.objects),
             (r"/manager", ComputeManagerHandler, self.objects),
+            # Monitoring
+            (r"/metrics", MetricsHandler, self.objects),
+            (r"/sql_profile", SQLProfileHandler, self.objects),
+            (r"/access/summary", AccessSummaryHandler, self.objects),
         ]
 
         # Build the app
@@ -304,7 +430,7 @@ class FractalServer:
 
         self.http_server = tornado.httpserver.HTTPServer(self.app, ssl_options=ssl_ctx)
 
-        self.http_server.listen(self.port)
+        self.http_server.listen(self.port, reuse_port=reuse_port)
 
         # Add periodic callback holders
         self.periodic = {}
@@ -360,6 +486,26 @@ class FractalServer:
         fut = self.loop.run_in_executor(self.executor, func)
         return fut
 
+    def _as_leader(self, func):
+        """
+        Wraps a periodic job so that it only runs in the leader when several servers share the database.
+        """
+
+        if not self.leader_election:
+            return func
+
+        def leader_only():
+            try:
+                leader = self.storage.acquire_leadership()
+            except Exception:
+                self.logger.error("Could not check the database leadership:\n{}".format(traceback.format_exc()))
+                return
+
+            if leader:
+                return func()
+
+        return leader_only
+
     ## Start/stop functionality
 
     def start(self, start_loop: bool = True, start_periodics: bool = True) -> None:
@@ -385,13 +531,15 @@ class FractalServer:
 
         # Add services callback
         if start_periodics:
-            nanny_services = tornado.ioloop.PeriodicCallback(self.update_services, self.service_frequency * 1000)
+            nanny_services = tornado.ioloop.PeriodicCallback(
+                self._as_leader(self.update_services), self.service_frequency * 1000
+            )
             nanny_services.start()
             self.periodic["update_services"] = nanny_services
 
             # Check Manager heartbeats, 5x heartbeat frequency
             heartbeats = tornado.ioloop.PeriodicCallback(
-                self.check_manager_heartbeats, self.heartbeat_frequency * 1000 * 0.2
+                self._as_leader(self.check_manager_heartbeats), self.heartbeat_frequency * 1000 * 0.2
             )
             heartbeats.start()
             self.periodic["heartbeats"] = heartbeats
@@ -400,12 +548,49 @@ class FractalServer:
             def run_log_update_in_thread():
                 self._run_in_thread(self.update_server_log)
 
-            server_log = tornado.ioloop.PeriodicCallback(run_log_update_in_thread, self.heartbeat_frequency * 1000)
+            server_log = tornado.ioloop.PeriodicCallback(
+                self._as_leader(run_log_update_in_thread), self.heartbeat_frequency * 1000
+            )
 
             server_log.start()
             self.periodic["server_log"] = server_log
 
-        # Build callbacks which are always required
+            if self.access_log_retention > 0 or self.server_stats_retention > 0:
+
+                def run_log_retention_in_thread():
+                    self._run_in_thread(self.apply_log_retention)
+
+                log_retention = tornado.ioloop.PeriodicCallback(
+                    self._as_leader(run_log_retention_in_thread), self.heartbeat_frequency * 1000
+                )
+                log_retention.start()
+                self.periodic["log_retention"] = log_retention
+
+            # Views of large datasets take a while to update
+            if self.view_handler is not None and self.view_update_frequency > 0:
+
+                def run_view_update_in_thread():
+                    self._run_in_thread(self.update_views)
+
+                view_updates = tornado.ioloop.PeriodicCallback(
+                    self._as_leader(run_view_update_in_thread), self.view_update_frequency * 1000
+                )
+                view_updates.start()
+                self.periodic["view_updates"] = view_updates
+
+            # Moves cold rows out of the hot tables
+            if self.archive_frequency > 0:
+
+                def run_archive_in_thread():
+                    self._run_in_thread(self.archive)
+
+                archive = tornado.ioloop.PeriodicCallback(
+                    self._as_leader(run_archive_in_thread), self.archive_frequency * 1000
+                )
+                archive.start()
+                self.periodic["archive"] = archive
+
+        # Build callbacks which are always required, the public information is kept by each server
         public_info = tornado.ioloop.PeriodicCallback(self.update_public_information, self.heartbeat_frequency * 1000)
         public_info.start()
         self.periodic["public_info"] = public_info
@@ -438,6 +623,10 @@ class FractalServer:
         for func, args, kwargs in self.exit_callbacks:
             func(*args, **kwargs)
 
+        # Hand the periodic jobs over to another server
+        if self.leader_election:
+            self.storage.release_leadership()
+
         # Shutdown executor and futures
         for k, v in self.futures.items():
             v.cancel()
@@ -500,6 +689,12 @@ class FractalServer:
     def update_services(self) -> int:
         """Runs through all active services and examines their current status."""
 
+        # Services read back the tasks and procedures they write
+        with self.storage.read_your_writes():
+            return self._update_services()
+
+    def _update_services(self) -> int:
+
         # Grab current services
         current_services = self.storage.get_services(status="RUNNING")["data"]
 
@@ -527,7 +722,8 @@ class FractalServer:
             # Attempt to iteration and get message
             try:
                 service = construct_service(self.storage, self.logger, data)
-                finished = service.iterate()
+                with self.metrics.service_iteration_duration.time(service=service.service):
+                    finished = service.iterate()
             except Exception:
                 error_message = "FractalServer Service Build and Iterate Error:\n{}".format(traceback.format_exc())
                 self.logger.error(error_message)
@@ -564,6 +760,97 @@ class FractalServer:
 
         return self.storage.log_server_stats()
 
+    def apply_log_retention(self) -> Dict[str, int]:
+        """
+        Rolls up the access log and thins out the server stats past their retention periods.
+        """
+
+        now = datetime.datetime.utcnow()
+
+        ret = {"access_log": 0, "server_stats_log": 0}
+        if self.access_log_retention > 0:
+            before = now - datetime.timedelta(days=self.access_log_retention)
+            ret["access_log"] = self.storage.rollup_access_log(before, granularity=self.access_log_rollup)
+
+        if self.server_stats_retention > 0:
+            before = now - datetime.timedelta(days=self.server_stats_retention)
+            ret["server_stats_log"] = self.storage.rollup_server_stats_log(before)
+
+        return ret
+
+    def archive(self) -> Dict[str, int]:
+        """
+        Moves errored tasks and manager logs older than the archive ages to the archive tables.
+        """
+
+        now = datetime.datetime.utcnow()
+        tasks = self.storage.archive_tasks(now - datetime.timedelta(days=self.archive_task_age))
+        logs = self.storage.archive_manager_logs(now - datetime.timedelta(days=self.archive_log_age))
+
+        return {"tasks": tasks, "manager_logs": logs}
+
+    def _internal_client(self) -> FractalClient:
+        """
+        Builds a client for the background jobs of this server. With security enabled it authenticates as a
+        read-only internal user. The user is created once and its password is kept in the view path for later calls
+        and restarts.
+        """
+
+        if self.storage._bypass_security:
+            return FractalClient(self)
+
+        if self._internal_password is None:
+            path = self.view_handler._path / _INTERNAL_PASSWORD_FILE
+            if path.is_file():
+                self._internal_password = path.read_text().strip()
+            else:
+                success, password = self.storage.add_user(_INTERNAL_USER, permissions=["read"])
+                if not success:
+                    raise ValueError(
+                        f"The internal user {_INTERNAL_USER} already exists but its password is not stored in {path}. "
+                        "Remove the user (qcfractal-server user remove) to have it recreated."
+                    )
+
+                fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+                with os.fdopen(fd, "w") as handle:
+                    handle.write(password)
+                self._internal_password = password
+
+        return FractalClient(self, username=_INTERNAL_USER, password=self._internal_password)
+
+    def update_views(self) -> int:
+        """
+        Incrementally updates the frozen-views of all datasets which have one in the view path.
+
+        Each outdated view is updated on a copy which then atomically replaces the served file, so views are never
+        modified underneath open readers. Views which are up to date are left untouched.
+        """
+
+        client = self._internal_client()
+        collections = self.storage.get_collections(collection="dataset", include=["id", "name"])["data"]
+
+        updated = 0
+        for col in collections:
+            path = self.view_handler.view_path(col["id"])
+            if not path.is_file():
+                continue
+
+            tmp_path = path.with_name(path.name + ".update")
+            try:
+                ds = client.get_collection("dataset", col["name"])
+                if HDF5View(path, mmap=self.view_mmap).update(ds, copy_to=tmp_path) is None:
+                    continue
+                os.replace(tmp_path, path)
+                updated += 1
+            except Exception:
+                self.logger.error(f"Failed to update the view of dataset {col['name']}:\n{traceback.format_exc()}")
+                if tmp_path.exists():
+                    tmp_path.unlink()
+
+        if updated:
+            self.logger.info(f"Updated {updated} dataset views.")
+        return updated
+
     def update_public_information(self) -> None:
         """
         Updates the public information data
@@ -586,7 +873,8 @@ class FractalServer:
         """
 
         dt = datetime.datetime.utcnow() - datetime.timedelta(seconds=self.heartbeat_frequency)
-        ret = self.storage.get_managers(status="ACTIVE", modified_before=dt)
+        with self.storage.read_your_writes():
+            ret = self.storage.get_managers(status="ACTIVE", modified_before=dt)
 
         for blob in ret["data"]:
             nshutdown = self.storage.queue_reset_status(manager=blob["name"], reset_running=True)
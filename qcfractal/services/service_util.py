@@ -45,17 +45,13 @@ class TaskManager(ProtoModel):
             return True
 
         elif "ERROR" in status_values:
-            for x in task_query["data"]:
-                if x["status"] != "ERROR":
-                    continue
+            # Only pull the stored errors of the failed records, not the (large) task specs
+            error_ids = [x["error"] for x in task_query["data"] if x["status"] == "ERROR" and x.get("error")]
 
             self.logger.debug("Error in service compute as follows:")
-            tasks = self.storage_socket.get_queue()["data"]
-            for x in tasks:
-                if "error" not in x:
-                    continue
-
-                self.logger.debug(x["error"]["error_message"])
+            errors = self.storage_socket.get_kvstore(error_ids)["data"] if error_ids else {}
+            for err in errors.values():
+                self.logger.debug(err.get_json().get("error_message"))
 
             raise KeyError("All tasks did not execute successfully.")
         else:
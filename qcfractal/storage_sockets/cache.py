@@ -0,0 +1,117 @@
+"""
+In-process caches used by the storage sockets.
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Iterable, Optional
+
+
+class LRUCache:
+    """
+    A thread-safe, size-bounded least-recently-used mapping with hit/miss accounting.
+
+    Only immutable database rows (molecules, keywords, ...) should be stored, as the
+    cache is never revalidated against the database. Deletions only invalidate the cache
+    of the process making them, so caches must not be used by several server processes.
+    """
+
+    def __init__(self, maxsize: int = 1024):
+        """
+        Parameters
+        ----------
+        maxsize : int, optional
+            The maximum number of entries to hold. A size of 0 disables the cache.
+        """
+
+        self.maxsize = max(0, int(maxsize))
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._data
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Returns the value for `key` and marks it as recently used, or `default` if not present."""
+
+        with self._lock:
+            try:
+                value = self._data[key]
+            except KeyError:
+                self.misses += 1
+                return default
+
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def get_many(self, keys: Iterable[Hashable]) -> Dict[Hashable, Any]:
+        """Returns a dictionary of all `keys` found in the cache. Missing keys are omitted."""
+
+        ret = {}
+        with self._lock:
+            for key in keys:
+                try:
+                    ret[key] = self._data[key]
+                except KeyError:
+                    self.misses += 1
+                    continue
+
+                self._data.move_to_end(key)
+                self.hits += 1
+
+        return ret
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """Inserts or refreshes `key`, evicting the least recently used entries if over capacity."""
+
+        if self.maxsize == 0:
+            return
+
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def set_many(self, items: Dict[Hashable, Any]) -> None:
+        """Inserts all key/value pairs of `items`."""
+
+        for key, value in items.items():
+            self.set(key, value)
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        """Removes `key` from the cache, returning its value or `default`."""
+
+        with self._lock:
+            return self._data.pop(key, default)
+
+    def clear(self) -> None:
+        """Removes all entries. Statistics are kept."""
+
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Returns the current usage statistics of the cache."""
+
+        lookups = self.hits + self.misses
+        hit_rate: Optional[float] = (self.hits / lookups) if lookups else None
+
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": hit_rate,
+        }
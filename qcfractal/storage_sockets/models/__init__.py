@@ -1,6 +1,15 @@
 # ORM Base
 # Collections ORMs
-from .collections_models import CollectionORM, DatasetORM, ReactionDatasetORM
+from .collections_models import (
+    CollectionEntryORM,
+    CollectionORM,
+    ContributedValuesEntryORM,
+    ContributedValuesORM,
+    DatasetEntryORM,
+    DatasetORM,
+    ReactionDatasetEntryORM,
+    ReactionDatasetORM,
+)
 
 # Results and procedures ORMs
 from .results_models import (
@@ -13,18 +22,21 @@ from .results_models import (
     Trajectory,
     WavefunctionStoreORM,
 )
-from .sql_base import Base, MsgpackExt
+from .sql_base import Base, MsgpackExt, MsgpackExtBlob
 
 # ORM general models
 from .sql_models import (
     AccessLogORM,
+    AccessLogRollupORM,
     KeywordsORM,
     KVStoreORM,
     MoleculeORM,
+    QueueManagerLogArchiveORM,
     QueueManagerLogORM,
     QueueManagerORM,
     ServerStatsLogORM,
     ServiceQueueORM,
+    TaskQueueArchiveORM,
     TaskQueueORM,
     UserORM,
     VersionsORM,
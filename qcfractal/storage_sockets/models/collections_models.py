@@ -1,4 +1,5 @@
-from sqlalchemy import JSON, Boolean, Column, ForeignKey, Index, Integer, String
+import numpy as np
+from sqlalchemy import JSON, Boolean, Column, ForeignKey, ForeignKeyConstraint, Index, Integer, String
 from sqlalchemy.dialects import postgresql
 from sqlalchemy.ext.hybrid import hybrid_property
 from sqlalchemy.orm import relationship
@@ -58,6 +59,19 @@ class CollectionORM(Base):
     __mapper_args__ = {"polymorphic_on": "collection_type"}
 
 
+class CollectionEntryORM(Base):
+    """The entries of collections without an entry table of their own, such as the procedure datasets
+    Stored one row per entry so that entries can be paged and updated on their own"""
+
+    __tablename__ = "collection_entry"
+
+    collection_id = Column(Integer, ForeignKey("collection.id", ondelete="cascade"), primary_key=True)
+    lname = Column(String, primary_key=True)
+
+    name = Column(String, nullable=False)
+    entry = Column(JSON, nullable=False)
+
+
 # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
 
 
@@ -78,6 +92,30 @@ class DatasetMixin:
     history = Column(JSON)
 
 
+class ContributedValuesEntryORM(Base):
+    """The value of a single entry in a group of contributed values
+    Stored one row per entry so that subsets of entries can be read on their own"""
+
+    __tablename__ = "contributed_values_entry"
+
+    collection_id = Column(Integer, primary_key=True)
+    name = Column(String, primary_key=True)
+    entry = Column(String, primary_key=True)
+
+    # Order of the entry in the contributed values index
+    position = Column(Integer, nullable=False)
+    value = Column(MsgpackExt)
+
+    __table_args__ = (
+        ForeignKeyConstraint(
+            ["collection_id", "name"],
+            ["contributed_values.collection_id", "contributed_values.name"],
+            ondelete="cascade",
+            onupdate="cascade",
+        ),
+    )
+
+
 class ContributedValuesORM(Base):
     """One group of a contibuted values per dataset
     Each dataset can have multiple rows in this table"""
@@ -87,8 +125,6 @@ class ContributedValuesORM(Base):
     collection_id = Column(Integer, ForeignKey("collection.id", ondelete="cascade"), primary_key=True)
 
     name = Column(String, nullable=False, primary_key=True)
-    values = Column(MsgpackExt, nullable=False)
-    index = Column(MsgpackExt, nullable=False)
     values_structure = Column(JSON, nullable=False)
 
     theory_level = Column(JSON, nullable=False)
@@ -101,6 +137,73 @@ class ContributedValuesORM(Base):
 
     comments = Column(String)
 
+    # Only loaded when the values themselves are requested
+    entries_obj = relationship(
+        ContributedValuesEntryORM,
+        lazy="select",
+        cascade="all, delete-orphan",
+        order_by=ContributedValuesEntryORM.position,
+    )
+
+    def to_dict(self, exclude=None):
+        ret = super().to_dict(exclude=exclude)
+        ret["index"] = [e.entry for e in self.entries_obj]
+        ret["values"] = [e.value for e in self.entries_obj]
+        return ret
+
+    def _to_dict_metadata(self):
+        """Dictionary of the contributed values without their index and values, which are not loaded"""
+        ret = super().to_dict(exclude=["collection_id"])
+        ret["index"] = None
+        ret["values"] = None
+        return ret
+
+    def set_values(self, index, values) -> None:
+        """Replaces the values of all entries"""
+
+        if len(index) != len(values):
+            raise ValueError(f"Contributed values {self.name} has {len(values)} values for {len(index)} entries.")
+
+        self.entries_obj = [
+            ContributedValuesEntryORM(
+                name=self.name,
+                entry=str(entry),
+                position=i,
+                value=value.item() if isinstance(value, np.generic) else value,
+            )
+            for i, (entry, value) in enumerate(zip(index, values))
+        ]
+
+
+def update_contributed_values(collection, contributed_values) -> None:
+    """
+    Updates the contributed values of a dataset or reaction dataset ORM from their dictionaries.
+
+    Contributed values sent without values (their metadata only) keep their stored values.
+    """
+
+    existing = {obj.name: obj for obj in collection.contributed_values_obj}
+
+    new_objs = []
+    for rec_dict in (contributed_values or {}).values():
+        rec_dict = dict(rec_dict)
+        index = rec_dict.pop("index", None)
+        values = rec_dict.pop("values", None)
+
+        obj = existing.get(rec_dict["name"])
+        if obj is None:
+            obj = ContributedValuesORM(collection_id=int(collection.id))
+            if values is None:
+                raise ValueError(f"Contributed values {rec_dict['name']} are new and must be sent with their values.")
+
+        for key, value in rec_dict.items():
+            setattr(obj, key, value)
+        if values is not None:
+            obj.set_values(index, values)
+        new_objs.append(obj)
+
+    collection.contributed_values_obj = new_objs
+
 
 class DatasetEntryORM(Base):
     """Association table for many to many"""
@@ -125,11 +228,10 @@ class DatasetORM(CollectionORM, DatasetMixin):
 
     id = Column(Integer, ForeignKey("collection.id", ondelete="CASCADE"), primary_key=True)
 
-    contributed_values_obj = relationship(ContributedValuesORM, lazy="selectin", cascade="all, delete-orphan")
+    contributed_values_obj = relationship(ContributedValuesORM, lazy="select", cascade="all, delete-orphan")
 
-    records_obj = relationship(
-        DatasetEntryORM, lazy="selectin", cascade="all, delete-orphan", backref="dataset"  # lazy='noload',
-    )
+    # Entries are only loaded on access, they are served in pages by SQLAlchemySocket.get_collection_entries
+    records_obj = relationship(DatasetEntryORM, lazy="select", cascade="all, delete-orphan", backref="dataset")
 
     @hybrid_property
     def contributed_values(self):
@@ -142,19 +244,18 @@ class DatasetORM(CollectionORM, DatasetMixin):
 
         if not isinstance(contributed_values_obj, list):
             contributed_values_obj = [contributed_values_obj]
-        ret = {}
-        try:
-            for obj in contributed_values_obj:
-                ret[obj.name.lower()] = obj.to_dict(exclude=["collection_id"])
-        except Exception as err:
-            pass
 
-        return ret
+        # Only the metadata, the values are loaded when explicitly requested, see SQLAlchemySocket.get_collections
+        return {obj.name.lower(): obj._to_dict_metadata() for obj in contributed_values_obj}
 
     @contributed_values.setter
     def contributed_values(self, dict_values):
         return dict_values
 
+    @contributed_values.expression
+    def contributed_values(cls):
+        return cls.contributed_values_obj
+
     @hybrid_property
     def records(self):
         """calculated property when accessed, not saved in the DB
@@ -187,17 +288,11 @@ class DatasetORM(CollectionORM, DatasetMixin):
 
     def update_relations(self, records=None, contributed_values=None, **kwarg):
 
-        self.records_obj = []
-        records = [] if not records else records
-        for rec_dict in records:
-            rec = DatasetEntryORM(dataset_id=int(self.id), **rec_dict)
-            self.records_obj.append(rec)
+        # Without records, the stored entries are kept, they are updated incrementally
+        if records is not None:
+            self.records_obj = [DatasetEntryORM(dataset_id=int(self.id), **rec_dict) for rec_dict in records]
 
-        self.contributed_values_obj = []
-        contributed_values = {} if not contributed_values else contributed_values
-        for key, rec_dict in contributed_values.items():
-            rec = ContributedValuesORM(collection_id=int(self.id), **rec_dict)
-            self.contributed_values_obj.append(rec)
+        update_contributed_values(self, contributed_values)
 
     __table_args__ = (
         # Index('ix_results_molecule', 'molecule'),  # b-tree index
@@ -240,10 +335,10 @@ class ReactionDatasetORM(CollectionORM, DatasetMixin):
     ds_type = Column(String)
 
     records_obj = relationship(
-        ReactionDatasetEntryORM, lazy="selectin", cascade="all, delete-orphan", backref="reaction_dataset"
+        ReactionDatasetEntryORM, lazy="select", cascade="all, delete-orphan", backref="reaction_dataset"
     )
 
-    contributed_values_obj = relationship(ContributedValuesORM, lazy="selectin", cascade="all, delete-orphan")
+    contributed_values_obj = relationship(ContributedValuesORM, lazy="select", cascade="all, delete-orphan")
 
     @hybrid_property
     def contributed_values(self):
@@ -257,19 +352,19 @@ class ReactionDatasetORM(CollectionORM, DatasetMixin):
     def contributed_values(self, dict_values):
         return dict_values
 
+    @contributed_values.expression
+    def contributed_values(cls):
+        return cls.contributed_values_obj
+
     def update_relations(self, records=None, contributed_values=None, **kwarg):
 
-        self.records_obj = []
-        records = records or []
-        for rec_dict in records:
-            rec = ReactionDatasetEntryORM(reaction_dataset_id=int(self.id), **rec_dict)
-            self.records_obj.append(rec)
-
-        self.contributed_values_obj = []
-        contributed_values = {} if not contributed_values else contributed_values
-        for key, rec_dict in contributed_values.items():
-            rec = ContributedValuesORM(collection_id=int(self.id), **rec_dict)
-            self.contributed_values_obj.append(rec)
+        # Without records, the stored entries are kept, they are updated incrementally
+        if records is not None:
+            self.records_obj = [
+                ReactionDatasetEntryORM(reaction_dataset_id=int(self.id), **rec_dict) for rec_dict in records
+            ]
+
+        update_contributed_values(self, contributed_values)
 
     @hybrid_property
     def records(self):
@@ -12,6 +12,31 @@ from sqlalchemy.types import TypeDecorator
 # from sqlalchemy.dialects.postgresql import aggregate_order_by
 
 
+class MsgpackExtBlob:
+    """
+    The raw msgpack-ext bytes of a MsgpackExt column, decoded only on first access of ``value``.
+
+    Allows rows to be passed through to msgpack-ext clients without a deserialize/serialize round trip.
+    """
+
+    __slots__ = ("raw", "_value", "_decoded")
+
+    def __init__(self, raw: bytes):
+        self.raw = bytes(raw)
+        self._value = None
+        self._decoded = False
+
+    @property
+    def value(self):
+        if not self._decoded:
+            self._value = msgpackext_loads(self.raw)
+            self._decoded = True
+        return self._value
+
+    def __repr__(self):
+        return f"MsgpackExtBlob(nbytes={len(self.raw)})"
+
+
 class MsgpackExt(TypeDecorator):
     """Converts JSON-like data to msgpack with full NumPy Array support."""
 
@@ -107,6 +132,12 @@ class Base:
 
         return cls.__columns, cls.__hybrids, cls.__relationships
 
+    @classmethod
+    def _get_msgpack_cols(cls):
+        """Names of the attributes stored as MsgpackExt columns"""
+
+        return [k for k, col in inspect(cls).columns.items() if isinstance(col.type, MsgpackExt)]
+
     @classmethod
     def _all_col_names(cls):
         all_cols, hybrid, _ = cls._get_col_types()
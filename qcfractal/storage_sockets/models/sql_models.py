@@ -12,6 +12,7 @@ from sqlalchemy import (
     JSON,
     BigInteger,
     Boolean,
+    DDL,
     Column,
     DateTime,
     Enum,
@@ -21,6 +22,8 @@ from sqlalchemy import (
     Integer,
     LargeBinary,
     String,
+    UniqueConstraint,
+    event,
 )
 from sqlalchemy.ext.hybrid import hybrid_property
 from sqlalchemy.orm import relationship
@@ -31,6 +34,12 @@ from qcfractal.interface.models.common_models import CompressionEnum
 from qcfractal.storage_sockets.models.sql_base import Base, MsgpackExt
 
 
+def _add_default_partition(table) -> None:
+    """Creates the partition catching the rows of a range partitioned table outside of its other partitions."""
+
+    event.listen(table, "after_create", DDL(f"CREATE TABLE {table.name}_default PARTITION OF {table.name} DEFAULT"))
+
+
 class AccessLogORM(Base):
     __tablename__ = "access_log"
 
@@ -46,6 +55,7 @@ class AccessLogORM(Base):
     # user info
     ip_address = Column(String)
     user_agent = Column(String)
+    username = Column(String)
 
     # extra computed geo data
     city = Column(String)
@@ -59,6 +69,39 @@ class AccessLogORM(Base):
     __table_args__ = (Index("access_type", "access_date"),)
 
 
+class AccessLogRollupORM(Base):
+    """Counts of access log rows per period, see SQLAlchemySocket.rollup_access_log
+
+    Missing countries and users are stored as empty strings, so that they take part in the unique constraint.
+    """
+
+    __tablename__ = "access_log_rollup"
+
+    id = Column(Integer, primary_key=True)
+    granularity = Column(String, nullable=False)
+    period_start = Column(DateTime, nullable=False)
+
+    access_type = Column(String, nullable=False)
+    access_method = Column(String, nullable=False)
+    country_code = Column(String, nullable=False, default="")
+    username = Column(String, nullable=False, default="")
+
+    count = Column(BigInteger, nullable=False)
+
+    __table_args__ = (
+        UniqueConstraint(
+            "granularity",
+            "period_start",
+            "access_type",
+            "access_method",
+            "country_code",
+            "username",
+            name="uix_access_log_rollup_key",
+        ),
+        Index("ix_access_log_rollup_period_start", "period_start"),
+    )
+
+
 class ServerStatsLogORM(Base):
     __tablename__ = "server_stats_log"
 
@@ -249,9 +292,53 @@ class TaskQueueORM(Base):
         Index("ix_task_queue_manager", "manager"),
         Index("ix_task_queue_base_result_id", "base_result_id"),
         Index("ix_task_waiting_sort", text("priority desc,  created_on")),
+        # Only holds the working set scanned when claiming tasks
+        Index(
+            "ix_task_queue_waiting_tag_sort",
+            tag,
+            priority.desc(),
+            created_on,
+            postgresql_where=(status == TaskStatusEnum.waiting),
+        ),
+    )
+
+
+class TaskQueueArchiveORM(Base):
+    """Cold tasks moved out of the task queue, see SQLAlchemySocket.archive_tasks
+
+    Range partitioned by the month of archival, so that old archives are dropped a partition at a time.
+    """
+
+    __tablename__ = "task_queue_archive"
+
+    # The partition key must be part of the primary key
+    id = Column(Integer, primary_key=True)
+    archived_on = Column(DateTime, primary_key=True, default=datetime.datetime.utcnow)
+
+    spec = Column(MsgpackExt, nullable=False)
+
+    tag = Column(String, default=None)
+    parser = Column(String, default="")
+    program = Column(String)
+    procedure = Column(String)
+    status = Column(Enum(TaskStatusEnum), default=TaskStatusEnum.error)
+    priority = Column(Integer, default=int(PriorityEnum.NORMAL))
+    manager = Column(String, default=None)
+
+    created_on = Column(DateTime)
+    modified_on = Column(DateTime)
+
+    base_result_id = Column(Integer, ForeignKey("base_result.id", ondelete="cascade"))
+
+    __table_args__ = (
+        Index("ix_task_queue_archive_base_result_id", "base_result_id"),
+        {"postgresql_partition_by": "RANGE (archived_on)"},
     )
 
 
+_add_default_partition(TaskQueueArchiveORM.__table__)
+
+
 # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
 
 
@@ -319,6 +406,38 @@ class QueueManagerLogORM(Base):
     __table_args__ = (Index("ix_queue_manager_log_timestamp", "timestamp"),)
 
 
+class QueueManagerLogArchiveORM(Base):
+    """Old manager logs moved out of the manager logs, see SQLAlchemySocket.archive_manager_logs
+
+    Range partitioned by the month of the log timestamp.
+    """
+
+    __tablename__ = "queue_manager_logs_archive"
+
+    id = Column(Integer, primary_key=True)
+    timestamp = Column(DateTime, primary_key=True)
+
+    manager_id = Column(Integer, ForeignKey("queue_manager.id"), nullable=False)
+
+    completed = Column(Integer, nullable=True)
+    submitted = Column(Integer, nullable=True)
+    failures = Column(Integer, nullable=True)
+
+    total_worker_walltime = Column(Float, nullable=True)
+    total_task_walltime = Column(Float, nullable=True)
+    active_tasks = Column(Integer, nullable=True)
+    active_cores = Column(Integer, nullable=True)
+    active_memory = Column(Float, nullable=True)
+
+    __table_args__ = (
+        Index("ix_queue_manager_logs_archive_manager_id", "manager_id"),
+        {"postgresql_partition_by": "RANGE (timestamp)"},
+    )
+
+
+_add_default_partition(QueueManagerLogArchiveORM.__table__)
+
+
 class QueueManagerORM(Base):
     """"""
 
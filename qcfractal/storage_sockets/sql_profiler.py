@@ -0,0 +1,217 @@
+"""
+Attributes the SQL statements issued through an engine to the storage socket methods issuing them
+"""
+
+import datetime
+import functools
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Dict, List, Union
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+_explainable = ("SELECT", "INSERT", "UPDATE", "DELETE", "WITH")
+
+
+class SQLProfiler:
+    """
+    Counts and times the SQL statements executed by engines, through their cursor execution events.
+
+    Statements are attributed to the outermost instrumented method running on the same thread, so that nested
+    socket calls count towards the method the caller invoked. Statements slower than ``slow_threshold``
+    are logged together with their query plan.
+    """
+
+    unattributed = "<unattributed>"
+
+    def __init__(
+        self,
+        engine: Union[Engine, List[Engine]],
+        logger,
+        slow_threshold: float = 0.5,
+        explain: bool = True,
+        max_slow_queries: int = 100,
+    ):
+        """
+        Parameters
+        ----------
+        engine : Union[Engine, List[Engine]]
+            The SQLAlchemy engine, or engines, to listen to.
+        logger : Logger
+            The logger slow statements are reported to.
+        slow_threshold : float, optional
+            Statements taking longer than this, in seconds, are logged.
+        explain : bool, optional
+            Log the query plan (``EXPLAIN``, the statement is not executed again) of slow statements.
+        max_slow_queries : int, optional
+            The number of most recent slow statements kept for reports.
+        """
+
+        self.engines = list(engine) if isinstance(engine, (list, tuple)) else [engine]
+        self.logger = logger
+        self.slow_threshold = slow_threshold
+        self.explain = explain
+
+        self.enabled = False
+        self.slow_queries = deque(maxlen=max_slow_queries)
+
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._methods = {}
+
+    def enable(self) -> None:
+        if not self.enabled:
+            for engine in self.engines:
+                event.listen(engine, "before_cursor_execute", self._before_cursor_execute)
+                event.listen(engine, "after_cursor_execute", self._after_cursor_execute)
+            self.enabled = True
+
+    def disable(self) -> None:
+        if self.enabled:
+            for engine in self.engines:
+                event.remove(engine, "before_cursor_execute", self._before_cursor_execute)
+                event.remove(engine, "after_cursor_execute", self._after_cursor_execute)
+            self.enabled = False
+
+    def instrument(self, obj: Any, names: List[str]) -> None:
+        """Replaces the given methods of an object by wrappers attributing their statements to them."""
+
+        for name in names:
+            setattr(obj, name, self.wrap(name, getattr(obj, name)))
+
+    def wrap(self, name: str, func: Callable) -> Callable:
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            local = self._local
+
+            # Nested calls are attributed to the outer method
+            if getattr(local, "method", None) is not None:
+                return func(*args, **kwargs)
+
+            local.method = name
+            local.statements = 0
+            local.statement_time = 0.0
+            local.slow_statements = 0
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                wall_time = time.perf_counter() - start
+                self._record(name, 1, local.statements, local.statement_time, wall_time, local.slow_statements)
+                local.method = None
+
+        return wrapper
+
+    def _record(
+        self, name: str, calls: int, statements: int, statement_time: float, wall_time: float, slow_statements: int
+    ) -> None:
+        with self._lock:
+            stats = self._methods.get(name, None)
+            if stats is None:
+                stats = self._methods[name] = {
+                    "calls": 0,
+                    "statements": 0,
+                    "max_statements": 0,
+                    "statement_time": 0.0,
+                    "wall_time": 0.0,
+                    "slow_statements": 0,
+                }
+
+            stats["calls"] += calls
+            stats["statements"] += statements
+            stats["max_statements"] = max(stats["max_statements"], statements)
+            stats["statement_time"] += statement_time
+            stats["wall_time"] += wall_time
+            stats["slow_statements"] += slow_statements
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("qcfractal_query_start", []).append(time.perf_counter())
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        duration = time.perf_counter() - conn.info["qcfractal_query_start"].pop()
+
+        slow = duration > self.slow_threshold
+
+        method = getattr(self._local, "method", None)
+        if method is None:
+            method = self.unattributed
+            self._record(method, 0, 1, duration, duration, int(slow))
+        else:
+            self._local.statements += 1
+            self._local.statement_time += duration
+            self._local.slow_statements += int(slow)
+
+        if slow:
+            self._log_slow(conn, statement, parameters, executemany, duration, method)
+
+    def _log_slow(self, conn, statement, parameters, executemany, duration, method) -> None:
+
+        plan = None
+        if self.explain and not executemany and statement.lstrip()[:6].upper().startswith(_explainable):
+            plan = self._explain(conn, statement, parameters)
+
+        with self._lock:
+            self.slow_queries.append(
+                {
+                    "timestamp": datetime.datetime.utcnow().isoformat(),
+                    "method": method,
+                    "duration": duration,
+                    "statement": statement,
+                    "plan": plan,
+                }
+            )
+
+        msg = f"SQL: Slow statement ({duration:.3f}s) in {method}:\n{statement}"
+        if plan:
+            msg += f"\nQuery plan:\n{plan}"
+        self.logger.warning(msg)
+
+    @staticmethod
+    def _explain(conn, statement, parameters) -> str:
+        # The raw DBAPI connection does not emit engine events and shares the current transaction.
+        # A savepoint keeps a failing EXPLAIN from aborting that transaction.
+        cursor = conn.connection.cursor()
+        try:
+            cursor.execute("SAVEPOINT qcfractal_explain")
+            try:
+                cursor.execute("EXPLAIN " + statement, parameters)
+                plan = "\n".join(row[0] for row in cursor.fetchall())
+                cursor.execute("RELEASE SAVEPOINT qcfractal_explain")
+            except Exception as err:
+                cursor.execute("ROLLBACK TO SAVEPOINT qcfractal_explain")
+                plan = f"EXPLAIN failed: {err}"
+        except Exception as err:
+            plan = f"EXPLAIN failed: {err}"
+        finally:
+            cursor.close()
+
+        return plan
+
+    def report(self, reset: bool = False) -> Dict[str, Any]:
+        """
+        Returns the statement counts and times per method, and the most recent slow statements.
+
+        Parameters
+        ----------
+        reset : bool, optional
+            Clears the aggregates and slow statements after reading them.
+        """
+
+        with self._lock:
+            methods = {k: v.copy() for k, v in self._methods.items()}
+            slow_queries = list(self.slow_queries)
+            if reset:
+                self._methods.clear()
+                self.slow_queries.clear()
+
+        for stats in methods.values():
+            stats["statements_per_call"] = stats["statements"] / stats["calls"] if stats["calls"] else None
+
+        return {
+            "enabled": self.enabled,
+            "slow_threshold": self.slow_threshold,
+            "methods": methods,
+            "slow_queries": slow_queries,
+        }
@@ -3,8 +3,22 @@ SQLAlchemy Database class to handle access to Pstgres through ORM
 """
 
 try:
-    from sqlalchemy import create_engine, and_, or_, case, func
-    from sqlalchemy.exc import IntegrityError
+    from sqlalchemy import (
+        create_engine,
+        and_,
+        or_,
+        case,
+        exists,
+        func,
+        literal,
+        literal_column,
+        select,
+        text,
+        tuple_,
+        type_coerce,
+    )
+    from sqlalchemy.dialects.postgresql import BYTEA
+    from sqlalchemy.exc import DBAPIError, IntegrityError
     from sqlalchemy.orm import sessionmaker, with_polymorphic
     from sqlalchemy.sql.expression import desc
     from sqlalchemy.sql.expression import case as expression_case
@@ -13,9 +27,15 @@ except ImportError:
         "SQLAlchemy_socket requires sqlalchemy, please install this python " "module or try a different db_socket."
     )
 
+import inspect
+import itertools
 import json
 import logging
+import re
 import secrets
+import threading
+import time
+import zlib
 from collections.abc import Iterable
 from contextlib import contextmanager
 from datetime import datetime as dt
@@ -43,20 +63,29 @@ from qcfractal.interface.models.records import RecordStatusEnum
 from qcfractal.storage_sockets.db_queries import QUERY_CLASSES
 from qcfractal.storage_sockets.models import (
     AccessLogORM,
+    AccessLogRollupORM,
     BaseResultORM,
+    CollectionEntryORM,
     CollectionORM,
+    ContributedValuesEntryORM,
+    ContributedValuesORM,
+    DatasetEntryORM,
     DatasetORM,
     GridOptimizationProcedureORM,
     KeywordsORM,
     KVStoreORM,
     MoleculeORM,
+    MsgpackExtBlob,
     OptimizationProcedureORM,
+    QueueManagerLogArchiveORM,
     QueueManagerLogORM,
     QueueManagerORM,
+    ReactionDatasetEntryORM,
     ReactionDatasetORM,
     ResultORM,
     ServerStatsLogORM,
     ServiceQueueORM,
+    TaskQueueArchiveORM,
     TaskQueueORM,
     TorsionDriveProcedureORM,
     UserORM,
@@ -65,9 +94,12 @@ from qcfractal.storage_sockets.models import (
 )
 from qcfractal.storage_sockets.storage_utils import add_metadata_template, get_metadata_template
 
+from .cache import LRUCache
 from .models import Base
+from .sql_profiler import SQLProfiler
 
 if TYPE_CHECKING:
+    from ..metrics import ServerMetrics
     from ..services.service_util import BaseService
 
 # for version checking
@@ -114,6 +146,40 @@ def format_query(ORMClass, **query: Dict[str, Union[str, List[str]]]) -> Dict[st
     return ret
 
 
+# Collections whose entries are stored in their own table, along with the column referencing the collection
+_collection_entry_classes = {
+    "dataset": (DatasetEntryORM, "dataset_id"),
+    "reactiondataset": (ReactionDatasetEntryORM, "reaction_dataset_id"),
+}
+
+# Collections whose entries are stored as documents keyed by lowercase name, one row each in CollectionEntryORM
+_collection_entry_documents = {"optimizationdataset", "torsiondrivedataset", "gridoptimizationdataset"}
+
+
+def _append_history(history: Optional[List[Any]], new_items: List[Any]) -> List[Any]:
+    """Appends the items not present yet to a history stored as JSON."""
+
+    history = list(history or [])
+    for item in new_items:
+        item = list(item) if isinstance(item, (list, tuple)) else item
+        if item not in history:
+            history.append(item)
+    return history
+
+
+def _collection_entry_row(collection_id: int, entry: Dict[str, Any]) -> Dict[str, Any]:
+    """The CollectionEntryORM row of an entry stored as a document."""
+
+    return {"collection_id": int(collection_id), "lname": entry["name"].lower(), "name": entry["name"], "entry": entry}
+
+
+def _glob_to_like(pattern: str) -> str:
+    """Translates a glob pattern (``*`` and ``?`` wildcards) into a SQL LIKE pattern escaped with a backslash."""
+
+    pattern = pattern.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return pattern.replace("*", "%").replace("?", "_")
+
+
 def get_count_fast(query):
     """
     returns total count of the query using:
@@ -170,10 +236,42 @@ class SQLAlchemySocket:
         sql_echo: bool = False,
         max_limit: int = 1000,
         skip_version_check: bool = False,
+        cache_size: int = 5000,
+        metrics: Optional["ServerMetrics"] = None,
+        sql_profile: bool = False,
+        sql_slow_threshold: float = 0.5,
+        pool_size: int = 5,
+        max_overflow: int = 10,
+        read_replica_uris: Optional[List[str]] = None,
+        replica_pool_size: int = 5,
+        replica_max_overflow: int = 10,
     ):
         """
         Constructs a new SQLAlchemy socket
 
+        Parameters
+        ----------
+        cache_size : int, optional
+            The maximum number of entries held by each of the in-process molecule and keyword caches.
+            A size of 0 disables caching.
+        metrics : Optional[ServerMetrics], optional
+            Server metrics recording the connection pool occupancy and checkout waits.
+        sql_profile : bool, optional
+            Count and time the SQL statements issued by each public method, see get_sql_profile.
+        sql_slow_threshold : float, optional
+            When profiling, statements taking longer than this (in seconds) are logged with their query plan.
+        pool_size : int, optional
+            The number of connections kept open to the primary database, 0 means unlimited.
+        max_overflow : int, optional
+            The number of connections opened to the primary beyond ``pool_size`` under load.
+        read_replica_uris : Optional[List[str]], optional
+            URIs of read replicas of the primary, in the same format as ``uri``. Read-only methods are spread over
+            the replicas unless reads are pinned to the primary, see read_your_writes. Replicas may lag behind
+            the primary.
+        replica_pool_size : int, optional
+            The number of connections kept open to each replica, 0 means unlimited.
+        replica_max_overflow : int, optional
+            The number of connections opened to each replica beyond ``replica_pool_size`` under load.
         """
 
         # Logging data
@@ -190,13 +288,7 @@ class SQLAlchemySocket:
 
         # disconnect from any active default connection
         # disconnect()
-        if "psycopg2" not in uri:
-            uri = uri.replace("postgresql", "postgresql+psycopg2")
-
-        if project and not uri.endswith("/"):
-            uri = uri + "/"
-
-        uri = uri + project
+        uri = self._project_uri(uri, project)
         self.logger.info(f"SQLAlchemy attempt to connect to {uri}.")
 
         # Connect to DB and create session
@@ -204,7 +296,8 @@ class SQLAlchemySocket:
         self.engine = create_engine(
             uri,
             echo=sql_echo,  # echo for logging into python logging
-            pool_size=5,  # 5 is the default, 0 means unlimited
+            pool_size=pool_size,  # 5 is the default, 0 means unlimited
+            max_overflow=max_overflow,
         )
         self.logger.info(
             "Connected SQLAlchemy to DB dialect {} with driver {}".format(self.engine.dialect.name, self.engine.driver)
@@ -212,6 +305,36 @@ class SQLAlchemySocket:
 
         self.Session = sessionmaker(bind=self.engine)
 
+        # Read replicas, used by read-only sessions in turn
+        self.replica_engines = []
+        for replica_uri in read_replica_uris or []:
+            replica_uri = self._project_uri(replica_uri, project)
+            self.logger.info(f"SQLAlchemy adding the read replica {replica_uri}.")
+            self.replica_engines.append(
+                create_engine(
+                    replica_uri, echo=sql_echo, pool_size=replica_pool_size, max_overflow=replica_max_overflow
+                )
+            )
+
+        self._replica_sessions = [sessionmaker(bind=engine) for engine in self.replica_engines]
+        self._replica_counter = itertools.count()
+
+        # Per-thread count of read_your_writes scopes
+        self._routing = threading.local()
+
+        self.metrics = metrics
+        if self.metrics is not None:
+            self.metrics.watch_pool(self.engine.pool)
+            for i, engine in enumerate(self.replica_engines):
+                self.metrics.watch_pool(engine.pool, prefix=f"db_replica_{i}_pool")
+
+        self.profiler = SQLProfiler(
+            [self.engine] + self.replica_engines, self.logger, slow_threshold=sql_slow_threshold
+        )
+        if sql_profile:
+            self.profiler.enable()
+            self.profiler.instrument(self, self._profiled_methods())
+
         # check version compatibility
         db_ver = self.check_lib_versions()
         self.logger.info(f"DB versions: {db_ver}")
@@ -260,15 +383,178 @@ class SQLAlchemySocket:
         self._project_name = project
         self._max_limit = max_limit
 
+        # Dedicated connections holding leadership advisory locks, see acquire_leadership
+        self._leader_connections = {}
+
+        # Caches of immutable rows. Hash -> id and id -> object
+        self._caches = {
+            "molecule_hash": LRUCache(cache_size),
+            "molecule": LRUCache(cache_size),
+            "keywords_hash": LRUCache(cache_size),
+            "keywords": LRUCache(cache_size),
+        }
+
     def __str__(self) -> str:
         return f"<SQLAlchemySocket: address='{self.uri}`>"
 
+    @staticmethod
+    def _project_uri(uri: str, project: str) -> str:
+        if "psycopg2" not in uri:
+            uri = uri.replace("postgresql", "postgresql+psycopg2")
+
+        if project and not uri.endswith("/"):
+            uri = uri + "/"
+
+        return uri + project
+
+    @classmethod
+    def _profiled_methods(cls) -> List[str]:
+        """The public methods whose SQL statements are attributed to them when profiling."""
+
+        return [
+            name
+            for name, func in inspect.getmembers(cls, inspect.isfunction)
+            if not name.startswith("_")
+            and name not in {"session_scope", "get_sql_profile", "read_your_writes", "pin_reads", "unpin_reads"}
+        ]
+
+    def get_sql_profile(self, reset: bool = False) -> Dict[str, Any]:
+        """
+        Returns the SQL statement counts and times per socket method, and the most recent slow statements.
+
+        Parameters
+        ----------
+        reset : bool, optional
+            Clears the aggregates after reading them.
+
+        Returns
+        -------
+        Dict[str, Any]
+            The profile, with ``enabled`` False and no methods when profiling is disabled.
+        """
+
+        return self.profiler.report(reset=reset)
+
+    @staticmethod
+    def _advisory_lock_key(name: str) -> int:
+        return zlib.crc32(f"qcfractal_leader:{name}".encode())
+
+    def acquire_leadership(self, name: str = "periodics") -> bool:
+        """
+        Tries to become the leader for `name` among all processes sharing this database.
+
+        Leadership is a session-level Postgres advisory lock held on a dedicated connection, so it is released
+        when the leader stops, dies or loses its connection. Another process then acquires it on its next call.
+
+        Parameters
+        ----------
+        name : str, optional
+            The name of the leadership, processes compete independently for each name.
+
+        Returns
+        -------
+        bool
+            True if this process is the leader.
+        """
+
+        key = self._advisory_lock_key(name)
+
+        conn = self._leader_connections.get(name, None)
+        if conn is not None:
+            try:
+                conn.execute(select([1]))
+                return True
+            except Exception:
+                self.logger.warning(f"SQL: Lost the connection holding the '{name}' leadership.")
+                self._leader_connections.pop(name)
+                conn.invalidate()
+                conn.close()
+
+        # Autocommit keeps the idle connection outside of a transaction
+        conn = self.engine.connect().execution_options(isolation_level="AUTOCOMMIT")
+        try:
+            acquired = conn.execute(select([func.pg_try_advisory_lock(key)])).scalar()
+        except Exception:
+            conn.close()
+            raise
+
+        if acquired:
+            self._leader_connections[name] = conn
+            self.logger.info(f"SQL: Acquired the '{name}' leadership.")
+            return True
+
+        conn.close()
+        return False
+
+    def release_leadership(self, name: str = "periodics") -> None:
+        """Releases the leadership for `name` if this process holds it, see acquire_leadership."""
+
+        conn = self._leader_connections.pop(name, None)
+        if conn is None:
+            return
+
+        try:
+            conn.execute(select([func.pg_advisory_unlock(self._advisory_lock_key(name))]))
+        finally:
+            conn.close()
+
+    def pin_reads(self) -> None:
+        """
+        Routes the read-only sessions of the current thread to the primary until unpin_reads is called.
+        Calls nest, see read_your_writes.
+        """
+
+        self._routing.pinned = getattr(self._routing, "pinned", 0) + 1
+
+    def unpin_reads(self) -> None:
+        """Undoes one pin_reads call of the current thread."""
+
+        self._routing.pinned = max(0, getattr(self._routing, "pinned", 0) - 1)
+
     @contextmanager
-    def session_scope(self):
-        """Provide a transactional scope"""
+    def read_your_writes(self):
+        """
+        Routes the read-only sessions of the current thread to the primary within the context,
+        so that reads see the writes made before them regardless of the replication lag.
+        """
 
-        session = self.Session()
+        self.pin_reads()
         try:
+            yield
+        finally:
+            self.unpin_reads()
+
+    def _new_session(self, read_only: bool):
+        if read_only and self._replica_sessions and not getattr(self._routing, "pinned", 0):
+            index = next(self._replica_counter) % len(self._replica_sessions)
+            session = self._replica_sessions[index]()
+            try:
+                # Check the connection out now, to fall back to the primary if the replica is down
+                session.connection()
+                return session
+            except DBAPIError as err:
+                session.close()
+                self.logger.warning(f"SQL: Read replica {index} is unavailable, reading from the primary: {err}")
+
+        return self.Session()
+
+    @contextmanager
+    def session_scope(self, read_only: bool = False):
+        """
+        Provide a transactional scope
+
+        Read-only scopes are served by a read replica when there are any, unless reads are pinned
+        to the primary on the current thread.
+        """
+
+        start = time.perf_counter()
+        session = self._new_session(read_only)
+        try:
+            if self.metrics is not None:
+                # Check the connection out now rather than on the first query, to time the wait for it
+                session.connection()
+                self.metrics.db_checkout_wait.observe(time.perf_counter() - start)
+
             yield session
             session.commit()
         except:
@@ -288,6 +574,8 @@ class SQLAlchemySocket:
         # create the tables again
         Base.metadata.create_all(self.engine)
 
+        self.clear_caches()
+
         # self.client.drop_database(db_name)
 
     def _delete_DB_data(self, db_name):
@@ -298,7 +586,9 @@ class SQLAlchemySocket:
             session.query(VersionsORM).delete(synchronize_session=False)
             # Task and services
             session.query(TaskQueueORM).delete(synchronize_session=False)
+            session.query(TaskQueueArchiveORM).delete(synchronize_session=False)
             session.query(QueueManagerLogORM).delete(synchronize_session=False)
+            session.query(QueueManagerLogArchiveORM).delete(synchronize_session=False)
             session.query(QueueManagerORM).delete(synchronize_session=False)
             session.query(ServiceQueueORM).delete(synchronize_session=False)
 
@@ -317,6 +607,21 @@ class SQLAlchemySocket:
             session.query(KVStoreORM).delete(synchronize_session=False)
             session.query(MoleculeORM).delete(synchronize_session=False)
 
+        self.clear_caches()
+
+    def clear_caches(self) -> None:
+        """Empties all in-process caches of database rows."""
+
+        for cache in self._caches.values():
+            cache.clear()
+
+    def get_cache_stats(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Returns the usage statistics (size, hits, misses, evictions, hit_rate) of each in-process cache.
+        """
+
+        return {name: cache.stats() for name, cache in self._caches.items()}
+
     def get_project_name(self) -> str:
         return self._project_name
 
@@ -328,7 +633,16 @@ class SQLAlchemySocket:
 
         return limit if limit is not None and limit < self._max_limit else self._max_limit
 
-    def get_query_projection(self, className, query, *, limit=None, skip=0, include=None, exclude=None):
+    def get_query_projection(
+        self, className, query, *, limit=None, skip=0, include=None, exclude=None, raw_msgpack=False, columns=None
+    ):
+        """
+        Runs a query, returning the found rows as dictionaries along with the total number of matches.
+
+        If `raw_msgpack` is True, MsgpackExt columns are not deserialized but returned as
+        MsgpackExtBlob objects holding the stored bytes, which are decoded only on access.
+        `columns` maps projected column names to SQL expressions to select in their place.
+        """
 
         if include and exclude:
             raise AttributeError(
@@ -343,17 +657,28 @@ class SQLAlchemySocket:
         _projection = []
         if include:
             _projection = set(include)
-        elif exclude:
-            _projection = set(className._all_col_names()) - set(exclude) - set(className.db_related_fields)
+        elif exclude or raw_msgpack:
+            _projection = set(className._all_col_names()) - set(exclude or []) - set(className.db_related_fields)
         _projection = list(_projection)
 
+        # Extra fields are always expanded, so they must be decoded
+        raw_cols = set(className._get_msgpack_cols()) - {"extra"} if raw_msgpack else set()
+
         proj = []
         join_attrs = {}
         callbacks = []
 
         # prepare hybrid attributes for callback and joins
         for key in _projection:
-            if key in prop:  # normal column
+            if columns and key in columns:  # expression replacing the column
+                proj.append(columns[key])
+            elif key in raw_cols:  # msgpack column, skip the deserialization
+                proj.append(type_coerce(getattr(className, key), BYTEA))
+            elif key in prop:  # normal column
+                proj.append(getattr(className, key))
+
+            # hybrid alias of a column (no callback), query the column expression directly
+            elif key in hybrids and not hasattr(className, "_" + key):
                 proj.append(getattr(className, key))
 
             # if hybrid property, save callback, and relation if any
@@ -371,7 +696,7 @@ class SQLAlchemySocket:
         for key in join_attrs:
             _projection.remove(key)
 
-        with self.session_scope() as session:
+        with self.session_scope(read_only=True) as session:
             if _projection or join_attrs:
 
                 if join_attrs and "id" not in _projection:  # if the id is need for joins
@@ -385,6 +710,13 @@ class SQLAlchemySocket:
                 data = data.limit(self.get_limit(limit)).offset(skip)
                 rdata = [dict(zip(_projection, row)) for row in data]
 
+                raw_keys = raw_cols.intersection(_projection)
+                if raw_keys:
+                    for d in rdata:
+                        for key in raw_keys:
+                            if d[key] is not None:
+                                d[key] = MsgpackExtBlob(d[key])
+
                 # query for joins if any (relationships and hybrids)
                 if join_attrs:
                     res_ids = [d.get("id", d.get("_id")) for d in rdata]
@@ -427,7 +759,7 @@ class SQLAlchemySocket:
                     # transform ids from int into str
                     for key in id_fields:
                         if key in d.keys() and d[key] is not None:
-                            if isinstance(d[key], Iterable):
+                            if isinstance(d[key], Iterable) and not isinstance(d[key], str):
                                 d[key] = [str(i) for i in d[key]]
                             else:
                                 d[key] = str(d[key])
@@ -475,8 +807,8 @@ class SQLAlchemySocket:
             if class_name not in self._query_classes:
                 raise AttributeError(f"Class name {class_name} is not found.")
 
-            session = self.Session()
-            ret["data"] = self._query_classes[class_name].query(session, query_key, **kwargs)
+            with self.session_scope(read_only=True) as session:
+                ret["data"] = self._query_classes[class_name].query(session, query_key, **kwargs)
             ret["meta"]["success"] = True
             try:
                 ret["meta"]["n_found"] = len(ret["data"])
@@ -496,6 +828,168 @@ class SQLAlchemySocket:
             session.add(log)
             session.commit()
 
+    # Periods access logs are rolled up into, and fields they are summarized by
+    _access_rollup_granularities = ("hour", "day")
+    _access_summary_granularities = ("hour", "day", "week", "month", "year")
+    _access_summary_fields = ("access_type", "access_method", "country_code", "username")
+
+    def rollup_access_log(self, before: dt, granularity: str = "hour", batch_size: int = 10000) -> int:
+        """
+        Adds the access log rows older than `before` to the counts of their period, and deletes them.
+
+        Parameters
+        ----------
+        before : datetime
+            Access log rows before this date are rolled up.
+        granularity : str, optional
+            The period rows are counted in, "hour" or "day".
+        batch_size : int, optional
+            The number of rows rolled up per transaction.
+
+        Returns
+        -------
+        int
+            The number of rolled up (and deleted) access log rows.
+        """
+
+        if granularity not in self._access_rollup_granularities:
+            raise ValueError(f"Access logs are rolled up by {self._access_rollup_granularities}, not '{granularity}'.")
+
+        # Rows are deleted and counted in the same statement, so that no row is counted twice
+        sql = f"""
+            WITH moved AS (
+                DELETE FROM access_log WHERE id IN (
+                    SELECT id FROM access_log WHERE access_date < :before LIMIT :batch_size FOR UPDATE SKIP LOCKED
+                )
+                RETURNING access_date, access_type, access_method, country_code, username
+            ), upserted AS (
+                INSERT INTO access_log_rollup
+                    (granularity, period_start, access_type, access_method, country_code, username, count)
+                SELECT '{granularity}', date_trunc('{granularity}', access_date), access_type, access_method,
+                       coalesce(country_code, ''), coalesce(username, ''), count(*)
+                FROM moved
+                GROUP BY 2, 3, 4, 5, 6
+                ON CONFLICT ON CONSTRAINT uix_access_log_rollup_key
+                DO UPDATE SET count = access_log_rollup.count + excluded.count
+                RETURNING 1
+            )
+            SELECT count(*) FROM moved
+        """
+
+        total = 0
+        while True:
+            with self.session_scope() as session:
+                n = session.execute(text(sql), {"before": before, "batch_size": batch_size}).scalar()
+
+            total += n
+            if n < batch_size:
+                break
+
+        if total:
+            self.logger.info(f"SQL: Rolled up {total} access log rows from before {before} by {granularity}.")
+
+        return total
+
+    def get_access_summary(
+        self,
+        after: Optional[dt] = None,
+        before: Optional[dt] = None,
+        granularity: str = "day",
+        group_by: Optional[List[str]] = None,
+        access_type: Optional[List[str]] = None,
+    ) -> Dict[str, Any]:
+        """
+        Counts the API accesses per period, from the rollups and the access log rows not rolled up yet.
+
+        Periods finer than the granularity of the rollups are reported at the start of the rollup period.
+
+        Parameters
+        ----------
+        after : Optional[datetime], optional
+            Only counts accesses at or after this date.
+        before : Optional[datetime], optional
+            Only counts accesses before this date.
+        granularity : str, optional
+            The period accesses are counted in, one of hour, day, week, month or year.
+        group_by : Optional[List[str]], optional
+            Fields the counts are split by, among access_type, access_method, country_code and username.
+            Defaults to access_type.
+        access_type : Optional[List[str]], optional
+            Only counts accesses to these endpoints.
+
+        Returns
+        -------
+        Dict[str, Any]
+            Dict with keys: data, meta. Data holds one entry per period and group, with the period,
+            the group fields and the count.
+        """
+
+        meta = get_metadata_template()
+
+        if group_by is None:
+            group_by = ["access_type"]
+
+        if granularity not in self._access_summary_granularities:
+            meta["error_description"] = f"Granularity must be one of {self._access_summary_granularities}."
+            return {"data": [], "meta": meta}
+
+        unknown = set(group_by) - set(self._access_summary_fields)
+        if unknown:
+            meta["error_description"] = f"Cannot group accesses by {sorted(unknown)}."
+            return {"data": [], "meta": meta}
+
+        rollup = AccessLogRollupORM.__table__
+        raw = AccessLogORM.__table__
+
+        rolled = select(
+            [
+                rollup.c.period_start,
+                rollup.c.access_type,
+                rollup.c.access_method,
+                rollup.c.country_code,
+                rollup.c.username,
+                rollup.c.count,
+            ]
+        )
+        recent = select(
+            [
+                raw.c.access_date.label("period_start"),
+                raw.c.access_type,
+                raw.c.access_method,
+                func.coalesce(raw.c.country_code, "").label("country_code"),
+                func.coalesce(raw.c.username, "").label("username"),
+                literal(1).label("count"),
+            ]
+        )
+        for query, table, date in [(rolled, rollup, rollup.c.period_start), (recent, raw, raw.c.access_date)]:
+            if after is not None:
+                query.append_whereclause(date >= after)
+            if before is not None:
+                query.append_whereclause(date < before)
+            if access_type is not None:
+                query.append_whereclause(table.c.access_type.in_(access_type))
+
+        accesses = rolled.union_all(recent).alias("accesses")
+
+        # Inlined so that the selected and grouped expressions are identical
+        period = func.date_trunc(literal_column(f"'{granularity}'"), accesses.c.period_start).label("period")
+        fields = [accesses.c[x] for x in group_by]
+        query = (
+            select([period] + fields + [func.sum(accesses.c.count).label("count")])
+            .group_by(period, *fields)
+            .order_by(period, *fields)
+        )
+
+        with self.session_scope(read_only=True) as session:
+            rows = session.execute(query).fetchall()
+
+        data = [{"period": row[0].isoformat(), **dict(zip(group_by, row[1:-1])), "count": int(row[-1])} for row in rows]
+
+        meta["success"] = True
+        meta["n_found"] = len(data)
+
+        return {"data": data, "meta": meta}
+
     # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~ Logs (KV store) ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
 
     def add_kvstore(self, outputs: List[KVStore]):
@@ -611,9 +1105,15 @@ class SQLAlchemySocket:
         id_mols.update({k: v for k, v in zip(flat_mol_keys, flat_mols)})
 
         # Get molecules by index and translate back to dict
-        tmp = self.get_molecules(list(id_mols.values()))
-        id_mols_list = tmp["data"]
-        meta["errors"].extend(tmp["meta"]["errors"])
+        # Molecules are immutable, so only those not already cached are pulled from the database
+        mol_cache = self._caches["molecule"]
+        id_mols_list = list(mol_cache.get_many(set(id_mols.values())).values())
+        missing_ids = set(id_mols.values()) - {mol.id for mol in id_mols_list}
+        if missing_ids:
+            tmp = self.get_molecules(list(missing_ids))
+            mol_cache.set_many({mol.id: mol for mol in tmp["data"]})
+            id_mols_list.extend(tmp["data"])
+            meta["errors"].extend(tmp["meta"]["errors"])
 
         # TODO - duplicate ids get removed on the line below. Some
         # code may depend on this behavior, so careful changing it
@@ -680,11 +1180,15 @@ class SQLAlchemySocket:
                 # search by index keywords not by all keys, much faster
                 orm_molecules.append(MoleculeORM(**mol_dict))
 
-            # Check if we have duplicates
+            # Check if we have duplicates, first in the cache and then in the database
             hash_list = [x.molecule_hash for x in orm_molecules]
-            query = format_query(MoleculeORM, molecule_hash=hash_list)
-            indices = session.query(MoleculeORM.molecule_hash, MoleculeORM.id).filter(*query)
-            previous_id_map = {k: v for k, v in indices}
+            previous_id_map = self._caches["molecule_hash"].get_many(set(hash_list))
+
+            uncached_hashes = list(set(hash_list) - previous_id_map.keys())
+            if uncached_hashes:
+                query = format_query(MoleculeORM, molecule_hash=uncached_hashes)
+                indices = session.query(MoleculeORM.molecule_hash, MoleculeORM.id).filter(*query)
+                previous_id_map.update({k: v for k, v in indices})
 
             # For a bulk add there must be no pre-existing and there must be no duplicates in the add list
             bulk_ok = len(hash_list) == len(set(hash_list))
@@ -733,6 +1237,8 @@ class SQLAlchemySocket:
             assert "placeholder_id" not in results
             meta["n_inserted"] = n_inserted
 
+        self._caches["molecule_hash"].set_many({h: id_map[h] for h in hash_list})
+
         meta["success"] = True
 
         ret = {"data": results, "meta": meta}
@@ -789,8 +1295,13 @@ class SQLAlchemySocket:
         query = format_query(MoleculeORM, id=id, molecule_hash=molecule_hash)
 
         with self.session_scope() as session:
+            deleted = session.query(MoleculeORM.id, MoleculeORM.molecule_hash).filter(*query).all()
             ret = session.query(MoleculeORM).filter(*query).delete(synchronize_session=False)
 
+        for mol_id, mol_hash in deleted:
+            self._caches["molecule"].pop(str(mol_id))
+            self._caches["molecule_hash"].pop(mol_hash)
+
         return ret
 
     # ~~~~~~~~~~~~~~~~~~~~~~~ Keywords ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
@@ -818,23 +1329,34 @@ class SQLAlchemySocket:
 
         meta = add_metadata_template()
 
+        hash_cache = self._caches["keywords_hash"]
+
         keywords = []
         with self.session_scope() as session:
             for kw in keyword_sets:
 
                 kw_dict = kw.dict(exclude={"id"})
 
-                # search by index keywords not by all keys, much faster
-                found = session.query(KeywordsORM).filter_by(hash_index=kw_dict["hash_index"]).first()
-                if not found:
+                # KeywordSets are immutable, skip the database if the hash is already known
+                found_id = hash_cache.get(kw_dict["hash_index"])
+                if found_id is None:
+                    # search by index keywords not by all keys, much faster
+                    found = session.query(KeywordsORM.id).filter_by(hash_index=kw_dict["hash_index"]).first()
+                    if found:
+                        found_id = str(found.id)
+
+                if found_id is None:
                     doc = KeywordsORM(**kw_dict)
                     session.add(doc)
                     session.commit()
-                    keywords.append(str(doc.id))
+                    found_id = str(doc.id)
+                    keywords.append(found_id)
                     meta["n_inserted"] += 1
                 else:
-                    meta["duplicates"].append(str(found.id))  # TODO
-                    keywords.append(str(found.id))
+                    meta["duplicates"].append(found_id)  # TODO
+                    keywords.append(found_id)
+
+                hash_cache.set(kw_dict["hash_index"], found_id)
                 meta["success"] = True
 
         ret = {"data": keywords, "meta": meta}
@@ -929,11 +1451,14 @@ class SQLAlchemySocket:
                 missing.append(idx)
                 continue
 
-            tmp = self.get_keywords(id=id)["data"]
-            if tmp:
-                ret.append(tmp[0])
-            else:
-                ret.append(None)
+            kw = self._caches["keywords"].get(str(id))
+            if kw is None:
+                tmp = self.get_keywords(id=id)["data"]
+                if tmp:
+                    kw = tmp[0]
+                    self._caches["keywords"].set(kw.id, kw)
+
+            ret.append(kw)
 
         meta["success"] = True
         meta["n_found"] = len(ret) - len(missing)
@@ -958,8 +1483,13 @@ class SQLAlchemySocket:
 
         count = 0
         with self.session_scope() as session:
+            deleted = session.query(KeywordsORM.hash_index).filter_by(id=id).all()
             count = session.query(KeywordsORM).filter_by(id=id).delete(synchronize_session=False)
 
+        self._caches["keywords"].pop(str(id))
+        for (hash_index,) in deleted:
+            self._caches["keywords_hash"].pop(hash_index)
+
         return count
 
     # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~`
@@ -1013,6 +1543,11 @@ class SQLAlchemySocket:
             if field in data:
                 update_fields[field] = data.pop(field)
 
+        # Collections sent without their entries keep the stored ones
+        records = None
+        if collection in _collection_entry_documents:
+            records = data.pop("records", None)
+
         update_fields["extra"] = data  # todo: check for sql injection
 
         with self.session_scope() as session:
@@ -1028,6 +1563,15 @@ class SQLAlchemySocket:
                 session.add(col)
                 session.commit()
                 col.update_relations(**update_fields)
+
+                if records is not None:
+                    session.query(CollectionEntryORM).filter(CollectionEntryORM.collection_id == col.id).delete(
+                        synchronize_session=False
+                    )
+                    session.bulk_insert_mappings(
+                        CollectionEntryORM, [_collection_entry_row(col.id, entry) for entry in records.values()]
+                    )
+
                 session.commit()
 
                 col_id = str(col.id)
@@ -1064,7 +1608,8 @@ class SQLAlchemySocket:
         limit: Optional[int], optional
             Maximum number of results to return
         include: Optional[List[str]], optional
-            Columns to return
+            Columns to return. Contributed values are returned with their index and values only if
+            ``contributed_values`` is explicitly included, their metadata otherwise.
         exclude: Optional[List[str]], optional
             Return all but these columns
         skip: int, optional
@@ -1086,17 +1631,293 @@ class SQLAlchemySocket:
         collection_class = get_collection_class(collection)
         query = format_query(collection_class, lname=name, collection=collection, id=col_id)
 
+        # Entries stored as documents are added to the collections after the query
+        with_documents = "records" not in (exclude or []) and (not include or "records" in include)
+        with_values = bool(include) and "contributed_values" in include
+        extra_keys = set()
+        if include and "records" in include and "records" not in collection_class._all_col_names():
+            include = [x for x in include if x != "records"]
+            extra_keys = {"id", "collection"} - set(include)
+        if with_values:
+            extra_keys |= {"id"} - set(include)
+        if extra_keys:
+            include = include + list(extra_keys)
+
         # try:
         rdata, meta["n_found"] = self.get_query_projection(
             collection_class, query, include=include, exclude=exclude, limit=limit, skip=skip
         )
 
+        if with_documents:
+            col_ids = [int(d["id"]) for d in rdata if d.get("collection") in _collection_entry_documents]
+            if col_ids:
+                records = {x: {} for x in col_ids}
+                with self.session_scope(read_only=True) as session:
+                    query = (
+                        session.query(CollectionEntryORM)
+                        .filter(CollectionEntryORM.collection_id.in_(col_ids))
+                        .order_by(CollectionEntryORM.collection_id, CollectionEntryORM.lname)
+                    )
+                    for row in query:
+                        records[row.collection_id][row.lname] = row.entry
+
+                for d in rdata:
+                    if d.get("collection") in _collection_entry_documents:
+                        d["records"] = records[int(d["id"])]
+
+        if with_values:
+            for d in rdata:
+                if d.get("contributed_values"):
+                    cvs = self.get_contributed_values(int(d["id"]))["data"]
+                    d["contributed_values"] = {cv["name"].lower(): cv for cv in cvs}
+
+        for d in rdata:
+            for key in extra_keys:
+                d.pop(key, None)
+
         meta["success"] = True
         # except Exception as err:
         #     meta['error_description'] = str(err)
 
         return {"data": rdata, "meta": meta}
 
+    def get_collection_entries(
+        self,
+        collection_id: int,
+        subset: Optional[Union[str, List[str]]] = None,
+        pattern: Optional[str] = None,
+        limit: Optional[int] = None,
+        skip: int = 0,
+    ) -> Dict[str, Any]:
+        """Get a page of the entries of a collection, ordered by name
+
+        Parameters
+        ----------
+        collection_id: int
+            Database id of the collection
+        subset: Optional[Union[str, List[str]]], optional
+            Names of the entries to return, all if None
+        pattern: Optional[str], optional
+            Only return entries whose name matches this case insensitive glob pattern (``*`` and ``?`` wildcards)
+        limit: Optional[int], optional
+            Maximum number of entries to return
+        skip: int, optional
+            Skip the first `skip` entries
+
+        Returns
+        -------
+        Dict[str, Any]
+            A dict with keys: 'data' and 'meta'
+            The data is a list of entry dictionaries, n_found the number of entries matching the filters
+        """
+
+        meta = get_metadata_template()
+        if isinstance(subset, str):
+            subset = [subset]
+        limit = self.get_limit(limit)
+
+        with self.session_scope(read_only=True) as session:
+            collection = session.query(CollectionORM.collection).filter(CollectionORM.id == int(collection_id)).scalar()
+            if collection is None:
+                meta["error_description"] = f"Collection {collection_id} not found."
+                return {"data": [], "meta": meta}
+
+            if collection in _collection_entry_classes:
+                entry_class, parent_key = _collection_entry_classes[collection]
+                query = session.query(entry_class).filter(getattr(entry_class, parent_key) == int(collection_id))
+                if subset is not None:
+                    query = query.filter(entry_class.name.in_(subset))
+                if pattern is not None:
+                    query = query.filter(entry_class.name.ilike(_glob_to_like(pattern), escape="\\"))
+
+                meta["n_found"] = get_count_fast(query)
+                query = query.order_by(entry_class.name).limit(limit).offset(skip)
+                data = [entry.to_dict(exclude=[parent_key]) for entry in query]
+
+            else:
+                # Entries stored as documents, collections without entries (e.g., Generic) have no rows
+                query = session.query(CollectionEntryORM.entry).filter(
+                    CollectionEntryORM.collection_id == int(collection_id)
+                )
+                if subset is not None:
+                    query = query.filter(CollectionEntryORM.lname.in_({x.lower() for x in subset}))
+                if pattern is not None:
+                    query = query.filter(CollectionEntryORM.name.ilike(_glob_to_like(pattern), escape="\\"))
+
+                meta["n_found"] = get_count_fast(query)
+                query = query.order_by(CollectionEntryORM.lname).limit(limit).offset(skip)
+                data = [entry for (entry,) in query]
+
+        meta["success"] = True
+
+        return {"data": data, "meta": meta}
+
+    def update_collection_entries(
+        self,
+        collection_id: int,
+        add_entries: Optional[List[Dict[str, Any]]] = None,
+        remove_entries: Optional[List[str]] = None,
+        object_map: Optional[Dict[str, Dict[str, str]]] = None,
+        history: Optional[List[Any]] = None,
+    ) -> Dict[str, int]:
+        """Applies incremental changes to the entries of a collection, leaving the rest of the collection untouched
+
+        Parameters
+        ----------
+        collection_id: int
+            Database id of the collection
+        add_entries: Optional[List[Dict[str, Any]]], optional
+            Entries to add, replacing the existing entries of the same name
+        remove_entries: Optional[List[str]], optional
+            Names of the entries to remove
+        object_map: Optional[Dict[str, Dict[str, str]]], optional
+            Cells of the object maps of the entries to set, as {entry name: {specification: id}}.
+            Only for collections keeping an object map per entry, such as the procedure datasets.
+        history: Optional[List[Any]], optional
+            Items to append to the history of the collection, if not present yet
+
+        Returns
+        -------
+        Dict[str, int]
+            The number of entries added, removed and with an updated object map
+        """
+
+        add_entries = add_entries or []
+        remove_entries = remove_entries or []
+        object_map = object_map or {}
+        history = history or []
+        ret = {"n_added": len(add_entries), "n_removed": 0, "n_updated": 0}
+
+        with self.session_scope() as session:
+            # Locking the collection serializes concurrent updates
+            col = session.query(CollectionORM).filter(CollectionORM.id == int(collection_id)).with_for_update().first()
+            if col is None:
+                raise KeyError(f"Collection {collection_id} not found.")
+
+            if col.collection in _collection_entry_classes:
+                if object_map:
+                    raise ValueError(f"Entries of a {col.collection} do not have an object map.")
+
+                entry_class, parent_key = _collection_entry_classes[col.collection]
+                entries = session.query(entry_class).filter(getattr(entry_class, parent_key) == col.id)
+                if remove_entries:
+                    ret["n_removed"] = entries.filter(entry_class.name.in_(remove_entries)).delete(
+                        synchronize_session=False
+                    )
+                if add_entries:
+                    names = [entry["name"] for entry in add_entries]
+                    entries.filter(entry_class.name.in_(names)).delete(synchronize_session=False)
+
+                    add_entries = [{**entry, parent_key: col.id} for entry in add_entries]
+                    if entry_class is DatasetEntryORM:
+                        for entry in add_entries:
+                            entry["molecule_id"] = int(entry["molecule_id"])
+                    session.bulk_insert_mappings(entry_class, add_entries)
+
+                if history:
+                    col.history = _append_history(col.history, history)
+
+            elif col.collection in _collection_entry_documents:
+                entries = session.query(CollectionEntryORM).filter(CollectionEntryORM.collection_id == col.id)
+                if remove_entries:
+                    ret["n_removed"] = entries.filter(
+                        CollectionEntryORM.lname.in_({x.lower() for x in remove_entries})
+                    ).delete(synchronize_session=False)
+                if add_entries:
+                    rows = {x["lname"]: x for x in (_collection_entry_row(col.id, entry) for entry in add_entries)}
+                    entries.filter(CollectionEntryORM.lname.in_(list(rows))).delete(synchronize_session=False)
+                    session.bulk_insert_mappings(CollectionEntryORM, list(rows.values()))
+
+                # Only the rows of the entries with new object map cells are read and rewritten
+                if object_map:
+                    cells = {name.lower(): (name, value) for name, value in object_map.items()}
+                    found = {x.lname: x for x in entries.filter(CollectionEntryORM.lname.in_(list(cells)))}
+                    for entry_lname, (name, value) in cells.items():
+                        if entry_lname not in found:
+                            raise KeyError(f"Entry {name} not found in collection {collection_id}.")
+
+                        row = found[entry_lname]
+                        row.entry = {**row.entry, "object_map": {**row.entry.get("object_map", {}), **value}}
+                        ret["n_updated"] += 1
+
+                if history:
+                    extra = dict(col.extra or {})
+                    extra["history"] = _append_history(extra.get("history"), history)
+                    col.extra = extra
+
+            else:
+                raise ValueError(f"A {col.collection} does not have entries.")
+
+        return ret
+
+    def get_contributed_values(
+        self,
+        collection_id: int,
+        name: Optional[Union[str, List[str]]] = None,
+        subset: Optional[Union[str, List[str]]] = None,
+        include_values: bool = True,
+    ) -> Dict[str, Any]:
+        """Get the contributed values of a collection, optionally for a subset of its entries only
+
+        Parameters
+        ----------
+        collection_id: int
+            Database id of the collection
+        name: Optional[Union[str, List[str]]], optional
+            Names of the contributed values (case insensitive), all if None
+        subset: Optional[Union[str, List[str]]], optional
+            Entries for which to return values, all if None
+        include_values: bool, optional
+            Return the index and values of the entries. If False, only the metadata is returned and
+            ``index`` and ``values`` are None.
+
+        Returns
+        -------
+        Dict[str, Any]
+            A dict with keys: 'data' and 'meta'
+            The data is a list of contributed values dictionaries
+        """
+
+        meta = get_metadata_template()
+        if isinstance(name, str):
+            name = [name]
+        if isinstance(subset, str):
+            subset = [subset]
+
+        with self.session_scope(read_only=True) as session:
+            query = session.query(ContributedValuesORM).filter(ContributedValuesORM.collection_id == int(collection_id))
+            if name is not None:
+                query = query.filter(func.lower(ContributedValuesORM.name).in_([x.lower() for x in name]))
+
+            data = {}
+            for obj in query.all():
+                cv = obj._to_dict_metadata()
+                if include_values:
+                    cv["index"] = []
+                    cv["values"] = []
+                data[obj.name] = cv
+
+            if include_values and data:
+                query = session.query(
+                    ContributedValuesEntryORM.name, ContributedValuesEntryORM.entry, ContributedValuesEntryORM.value
+                ).filter(
+                    ContributedValuesEntryORM.collection_id == int(collection_id),
+                    ContributedValuesEntryORM.name.in_(list(data)),
+                )
+                if subset is not None:
+                    query = query.filter(ContributedValuesEntryORM.entry.in_(subset))
+
+                for cv_name, entry, value in query.order_by(
+                    ContributedValuesEntryORM.name, ContributedValuesEntryORM.position
+                ):
+                    data[cv_name]["index"].append(entry)
+                    data[cv_name]["values"].append(value)
+
+        meta["n_found"] = len(data)
+        meta["success"] = True
+
+        return {"data": list(data.values()), "meta": meta}
+
     def del_collection(
         self, collection: Optional[str] = None, name: Optional[str] = None, col_id: Optional[int] = None
     ) -> bool:
@@ -1358,6 +2179,7 @@ class SQLAlchemySocket:
         skip: int = 0,
         return_json=True,
         with_ids=True,
+        raw_msgpack=False,
     ):
         """
 
@@ -1397,6 +2219,8 @@ class SQLAlchemySocket:
         with_ids : bool, optional
             Include the ids in the returned objects/dicts
             default is True
+        raw_msgpack : bool, optional
+            Return MsgpackExt columns as undecoded MsgpackExtBlob objects, default is False
 
         Returns
         -------
@@ -1428,7 +2252,7 @@ class SQLAlchemySocket:
         )
 
         data, meta["n_found"] = self.get_query_projection(
-            ResultORM, query, include=include, exclude=exclude, limit=limit, skip=skip
+            ResultORM, query, include=include, exclude=exclude, limit=limit, skip=skip, raw_msgpack=raw_msgpack
         )
         meta["success"] = True
 
@@ -1537,6 +2361,7 @@ class SQLAlchemySocket:
         exclude: Optional[List[str]] = None,
         limit: int = None,
         skip: int = 0,
+        raw_msgpack: bool = False,
     ) -> Dict[str, Any]:
         """
         Pulls from the wavefunction key/value store table.
@@ -1555,6 +2380,9 @@ class SQLAlchemySocket:
         skip : int, optional
             Skips a number of results in the query, used for pagination
             Default is set to 0
+        raw_msgpack : bool, optional
+            Return the wavefunction arrays as undecoded MsgpackExtBlob objects
+            Default is False
 
         Returns
         -------
@@ -1566,7 +2394,13 @@ class SQLAlchemySocket:
 
         query = format_query(WavefunctionStoreORM, id=id)
         rdata, meta["n_found"] = self.get_query_projection(
-            WavefunctionStoreORM, query, limit=limit, skip=skip, include=include, exclude=exclude
+            WavefunctionStoreORM,
+            query,
+            limit=limit,
+            skip=skip,
+            include=include,
+            exclude=exclude,
+            raw_msgpack=raw_msgpack,
         )
 
         meta["success"] = True
@@ -1639,6 +2473,7 @@ class SQLAlchemySocket:
         skip: int = 0,
         return_json=True,
         with_ids=True,
+        raw_msgpack=False,
     ):
         """
 
@@ -1670,6 +2505,9 @@ class SQLAlchemySocket:
         with_ids : bool, optional
             Include the ids in the returned objects/dicts
             Default is True
+        raw_msgpack : bool, optional
+            Return MsgpackExt columns as undecoded MsgpackExtBlob objects. Only applies
+            if the procedure type is given. Default is False
 
         Returns
         -------
@@ -1712,8 +2550,15 @@ class SQLAlchemySocket:
         try:
             # TODO: decide a way to find the right type
 
+            # Polymorphic queries need the full ORM objects to load the subclass columns
             data, meta["n_found"] = self.get_query_projection(
-                className, query, limit=limit, skip=skip, include=include, exclude=exclude
+                className,
+                query,
+                limit=limit,
+                skip=skip,
+                include=include,
+                exclude=exclude,
+                raw_msgpack=raw_msgpack and className is not BaseResultORM,
             )
             meta["success"] = True
         except Exception as err:
@@ -1893,7 +2738,7 @@ class SQLAlchemySocket:
         meta = get_metadata_template()
         query = format_query(ServiceQueueORM, id=id, hash_index=hash_index, procedure_id=procedure_id, status=status)
 
-        with self.session_scope() as session:
+        with self.session_scope(read_only=True) as session:
             data = (
                 session.query(ServiceQueueORM)
                 .filter(*query)
@@ -2213,6 +3058,35 @@ class SQLAlchemySocket:
 
         return found
 
+    def get_referenced_objects(self, references: Dict[str, List[str]]) -> Dict[str, Dict[str, Any]]:
+        """Obtain the objects referenced by task specs
+
+        Parameters
+        ----------
+        references : Dict[str, List[str]]
+            The ids of the referenced objects by kind, either "molecule" or "keywords".
+
+        Returns
+        -------
+        Dict[str, Dict[str, Any]]
+            The Molecule dictionaries and KeywordSet values found, by kind and id. Unknown kinds and ids are omitted.
+        """
+
+        ret = {"molecule": {}, "keywords": {}}
+        limit = self.get_limit(None)
+
+        ids = sorted(set(references.get("molecule", [])))
+        for i in range(0, len(ids), limit):
+            for mol in self.get_molecules(id=ids[i : i + limit], limit=limit)["data"]:
+                ret["molecule"][mol.id] = mol.dict()
+
+        ids = sorted(set(references.get("keywords", [])))
+        for i in range(0, len(ids), limit):
+            for kw in self.get_keywords(id=ids[i : i + limit], limit=limit)["data"]:
+                ret["keywords"][kw.id] = kw.values
+
+        return ret
+
     def get_queue(
         self,
         id=None,
@@ -2228,6 +3102,7 @@ class SQLAlchemySocket:
         skip: int = 0,
         return_json=False,
         with_ids=True,
+        raw_msgpack=False,
     ):
         """
         TODO: check what query keys are needs
@@ -2254,9 +3129,12 @@ class SQLAlchemySocket:
         skip : int, optional
             skip the first 'skip' results. Used to paginate, default is 0
         return_json : bool, optional
-            Return the results as a list of json inseated of objects, deafult is True
+            Return the results as a list of json inseated of objects, deafult is False.
+            Projections (include/exclude) and raw_msgpack always return json.
         with_ids : bool, optional
             Include the ids in the returned objects/dicts, default is True
+        raw_msgpack : bool, optional
+            Return the task spec as an undecoded MsgpackExtBlob, default is False
 
         Returns
         -------
@@ -2279,13 +3157,14 @@ class SQLAlchemySocket:
         data = []
         try:
             data, meta["n_found"] = self.get_query_projection(
-                TaskQueueORM, query, limit=limit, skip=skip, include=include, exclude=exclude
+                TaskQueueORM, query, limit=limit, skip=skip, include=include, exclude=exclude, raw_msgpack=raw_msgpack
             )
             meta["success"] = True
         except Exception as err:
             meta["error_description"] = str(err)
 
-        data = [TaskRecord(**task) for task in data]
+        if not (return_json or include or exclude or raw_msgpack):
+            data = [TaskRecord(**task) for task in data]
 
         return {"data": data, "meta": meta}
 
@@ -2462,6 +3341,10 @@ class SQLAlchemySocket:
         if sum(x is not None for x in [id, base_result, manager]) == 0:
             raise ValueError("All query fields are None, reset_status must specify queries.")
 
+        # Errored tasks may have been archived
+        if reset_error and (id is not None or base_result is not None):
+            self.restore_tasks(id=id, base_result=base_result)
+
         status = []
         if reset_running:
             status.append(TaskStatusEnum.running)
@@ -2641,6 +3524,266 @@ class SQLAlchemySocket:
         ret = {"data": task_ids, "meta": meta}
         return ret
 
+    ### Archives of cold tasks and manager logs
+
+    # Archive tables and the column they are range partitioned on, by month
+    _archive_tables = {"task_queue_archive": "archived_on", "queue_manager_logs_archive": "timestamp"}
+
+    @staticmethod
+    def _month_start(date: dt) -> dt:
+        return dt(date.year, date.month, 1)
+
+    @staticmethod
+    def _next_month(date: dt) -> dt:
+        return dt(date.year + date.month // 12, date.month % 12 + 1, 1)
+
+    def _move_rows(self, source, target, where, batch_size: int, extra: Optional[Dict[str, Any]] = None) -> int:
+        """
+        Moves the rows of the `source` table matching `where` to the `target` table, `batch_size` rows
+        per transaction. Columns of `target` missing from `source` are given in `extra`.
+        """
+
+        extra = extra or {}
+        columns = [c.name for c in target.columns if c.name not in extra]
+        pkey = list(source.primary_key.columns)
+
+        total = 0
+        while True:
+            with self.session_scope() as session:
+                batch = select(pkey).where(where).limit(batch_size).with_for_update(skip_locked=True)
+                moved = (
+                    source.delete()
+                    .where(tuple_(*pkey).in_(batch))
+                    .returning(*[source.c[x] for x in columns])
+                    .cte("moved")
+                )
+                values = [moved.c[x] for x in columns] + [literal(v, type_=target.c[k].type) for k, v in extra.items()]
+                n = session.execute(target.insert().from_select(columns + list(extra), select(values))).rowcount
+
+            total += n
+            if n < batch_size:
+                return total
+
+    def create_archive_partitions(self, start: dt, end: Optional[dt] = None) -> List[str]:
+        """
+        Creates the monthly partitions of the archive tables covering the months from `start` to `end`.
+
+        Rows outside of all monthly partitions land in the default partition of each archive table,
+        which cannot be dropped by month.
+
+        Parameters
+        ----------
+        start : datetime
+            A date in the first month to create.
+        end : Optional[datetime], optional
+            A date in the last month to create, defaults to the month of `start`.
+
+        Returns
+        -------
+        List[str]
+            The names of the created partitions, existing partitions are skipped.
+        """
+
+        end = end or start
+        existing = {x["partition"] for x in self.list_archive_partitions(count=False)}
+
+        created = []
+        with self.session_scope() as session:
+            for table in self._archive_tables:
+                month = self._month_start(start)
+                while month <= end:
+                    upper = self._next_month(month)
+                    name = f"{table}_{month:%Y_%m}"
+                    if name not in existing:
+                        session.execute(
+                            f"CREATE TABLE {name} PARTITION OF {table} "
+                            f"FOR VALUES FROM ('{month.isoformat()}') TO ('{upper.isoformat()}')"
+                        )
+                        created.append(name)
+                    month = upper
+
+        if created:
+            self.logger.info(f"SQL: Created the archive partitions {created}.")
+
+        return created
+
+    def list_archive_partitions(self, count: bool = True) -> List[Dict[str, Any]]:
+        """
+        Lists the partitions of the archive tables.
+
+        Parameters
+        ----------
+        count : bool, optional
+            Count the rows of each partition.
+
+        Returns
+        -------
+        List[Dict[str, Any]]
+            The table, partition name, bounds, size in bytes and number of rows (if counted) of each partition.
+        """
+
+        sql = """
+            SELECT parent.relname, child.relname, pg_get_expr(child.relpartbound, child.oid),
+                   pg_total_relation_size(child.oid)
+            FROM pg_inherits
+            JOIN pg_class parent ON pg_inherits.inhparent = parent.oid
+            JOIN pg_class child ON pg_inherits.inhrelid = child.oid
+            WHERE parent.relname IN :tables
+            ORDER BY parent.relname, child.relname
+        """
+
+        ret = []
+        with self.session_scope() as session:
+            rows = session.execute(text(sql).bindparams(tables=tuple(self._archive_tables))).fetchall()
+            for table, partition, bounds, size in rows:
+                info = {"table": table, "partition": partition, "bounds": bounds, "size": size}
+                if count:
+                    info["rows"] = session.execute(f"SELECT count(*) FROM {partition}").scalar()
+                ret.append(info)
+
+        return ret
+
+    def drop_archive_partitions(self, before: dt) -> List[str]:
+        """
+        Drops the monthly archive partitions holding only rows older than `before`, along with their rows.
+
+        Parameters
+        ----------
+        before : datetime
+            Partitions of months ending before this date are dropped.
+
+        Returns
+        -------
+        List[str]
+            The names of the dropped partitions.
+        """
+
+        partitions = self.list_archive_partitions(count=False)
+
+        dropped = []
+        with self.session_scope() as session:
+            for info in partitions:
+                match = re.fullmatch(r"(.+)_(\d{4})_(\d{2})", info["partition"])
+                if match is None or match.group(1) != info["table"]:
+                    continue
+
+                upper = self._next_month(dt(int(match.group(2)), int(match.group(3)), 1))
+                if upper <= before:
+                    session.execute(f"DROP TABLE {info['partition']}")
+                    dropped.append(info["partition"])
+
+        if dropped:
+            self.logger.info(f"SQL: Dropped the archive partitions {dropped}.")
+
+        return dropped
+
+    def archive_tasks(self, before: dt, status: Optional[List[str]] = None, batch_size: int = 1000) -> int:
+        """
+        Moves tasks last modified before `before` out of the task queue into the archive.
+
+        Archived tasks are not returned by get_queue, resetting them with queue_reset_status or
+        restore_tasks brings them back.
+
+        Parameters
+        ----------
+        before : datetime
+            Tasks last modified before this date are archived.
+        status : Optional[List[str]], optional
+            The statuses of the tasks to archive, ERROR by default. Waiting and running tasks cannot be archived.
+        batch_size : int, optional
+            The number of tasks moved per transaction.
+
+        Returns
+        -------
+        int
+            The number of archived tasks.
+        """
+
+        status = [TaskStatusEnum(x) for x in (status or [TaskStatusEnum.error])]
+        if {TaskStatusEnum.waiting, TaskStatusEnum.running} & set(status):
+            raise ValueError("Waiting and running tasks cannot be archived.")
+
+        now = dt.utcnow()
+        self.create_archive_partitions(now)
+
+        task = TaskQueueORM.__table__
+        where = and_(task.c.status.in_(status), task.c.modified_on < before)
+        n = self._move_rows(task, TaskQueueArchiveORM.__table__, where, batch_size, extra={"archived_on": now})
+
+        if n:
+            self.logger.info(f"QUEUE: Archived {n} tasks modified before {before}.")
+
+        return n
+
+    def restore_tasks(
+        self, id: Union[str, List[str]] = None, base_result: Union[str, List[str]] = None, batch_size: int = 1000
+    ) -> int:
+        """
+        Moves archived tasks back into the task queue, with their archived status.
+
+        Tasks whose result has a new task in the queue are left in the archive.
+
+        Parameters
+        ----------
+        id : Union[str, List[str]], optional
+            The ids of the archived tasks.
+        base_result : Union[str, List[str]], optional
+            The ids of the results of the archived tasks.
+        batch_size : int, optional
+            The number of tasks moved per transaction.
+
+        Returns
+        -------
+        int
+            The number of restored tasks.
+        """
+
+        if id is None and base_result is None:
+            raise ValueError("Either id or base_result must be given to restore tasks.")
+
+        archive = TaskQueueArchiveORM.__table__
+        task = TaskQueueORM.__table__
+
+        query = format_query(TaskQueueArchiveORM, id=id, base_result_id=base_result)
+        where = and_(*query, ~exists().where(task.c.base_result_id == archive.c.base_result_id))
+
+        return self._move_rows(archive, task, where, batch_size)
+
+    def archive_manager_logs(self, before: dt, batch_size: int = 1000) -> int:
+        """
+        Moves manager logs older than `before` into the archive.
+
+        Parameters
+        ----------
+        before : datetime
+            Logs with a timestamp before this date are archived.
+        batch_size : int, optional
+            The number of logs moved per transaction.
+
+        Returns
+        -------
+        int
+            The number of archived logs.
+        """
+
+        logs = QueueManagerLogORM.__table__
+        where = logs.c.timestamp < before
+
+        with self.session_scope(read_only=True) as session:
+            oldest = session.query(func.min(logs.c.timestamp)).filter(where).scalar()
+
+        if oldest is None:
+            return 0
+
+        # Logs keep their timestamp, which may fall in any month
+        self.create_archive_partitions(oldest, before)
+        n = self._move_rows(logs, QueueManagerLogArchiveORM.__table__, where, batch_size)
+
+        if n:
+            self.logger.info(f"QUEUE: Archived {n} manager logs from before {before}.")
+
+        return n
+
     ### QueueManagerORMs
 
     def manager_update(self, name, **kwargs):
@@ -3071,7 +4214,7 @@ class SQLAlchemySocket:
 
     def get_total_count(self, className, **kwargs):
 
-        with self.session_scope() as session:
+        with self.session_scope(read_only=True) as session:
             query = session.query(className).filter(**kwargs)
             count = get_count_fast(query)
 
@@ -3098,9 +4241,15 @@ class SQLAlchemySocket:
         result_states = {}
 
         counts = {}
-        for table in ["collection", "molecule", "base_result", "kv_store", "access_log"]:
+        for table in ["collection", "molecule", "base_result", "kv_store"]:
             counts[table] = self.custom_query("database_stats", "table_count", table_name=table)["data"][0]
 
+        # Raw access rows are only estimated, most accesses are counted in the rollups
+        raw_accesses = sum(max(row[1], 0) for row in table_info["rows"] if row[0] == "access_log")
+        with self.session_scope(read_only=True) as session:
+            rolled_accesses = session.query(func.sum(AccessLogRollupORM.count)).scalar() or 0
+        counts["access_log"] = int(raw_accesses + rolled_accesses)
+
         # Build out final data
         data = {
             "collection_count": counts["collection"],
@@ -3122,6 +4271,39 @@ class SQLAlchemySocket:
 
         return data
 
+    def rollup_server_stats_log(self, before: dt) -> int:
+        """
+        Keeps only the last server stats row of each day before `before`.
+
+        Parameters
+        ----------
+        before : datetime
+            Days before this date are thinned out.
+
+        Returns
+        -------
+        int
+            The number of deleted rows.
+        """
+
+        sql = """
+            DELETE FROM server_stats_log
+            WHERE timestamp < :before AND id NOT IN (
+                SELECT DISTINCT ON (date_trunc('day', timestamp)) id
+                FROM server_stats_log
+                WHERE timestamp < :before
+                ORDER BY date_trunc('day', timestamp), timestamp DESC
+            )
+        """
+
+        with self.session_scope() as session:
+            n = session.execute(text(sql), {"before": before}).rowcount
+
+        if n:
+            self.logger.info(f"SQL: Removed {n} server stats rows from before {before}, keeping one per day.")
+
+        return n
+
     def get_server_stats_log(self, before=None, after=None, limit=None, skip=0):
 
         meta = get_metadata_template()
@@ -3133,7 +4315,7 @@ class SQLAlchemySocket:
         if after:
             query.append(ServerStatsLogORM.timestamp >= after)
 
-        with self.session_scope() as session:
+        with self.session_scope(read_only=True) as session:
             pose = session.query(ServerStatsLogORM).filter(*query).order_by(desc("timestamp"))
             meta["n_found"] = get_count_fast(pose)
 
@@ -1,23 +1,174 @@
 import io
 import pathlib
-from typing import Any, Dict, Union
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple, Union
 
 import numpy as np
 import pandas as pd
+import pyarrow as pa
 from qcelemental.util.serialization import serialize
 
 from ..interface.collections import HDF5View
+from ..interface.collections.dataset_view import ARROW_NDARRAY_METADATA
+from ..interface.models import ViewDataFormatEnum
+
+# Number of rows per record batch of the Arrow IPC stream
+_ARROW_BATCH_ROWS = 16384
+
+
+def _ndarray_column_to_arrow(column: pd.Series) -> Optional[pa.Array]:
+    """
+    Converts a column of numeric ndarrays of equal rank into nested Arrow lists, one nesting level
+    per dimension. The innermost level is a fixed-size list when all cells agree on its length.
+    Returns None if the column cannot be represented this way.
+    """
+
+    cells = column.tolist()
+    if not all(isinstance(cell, np.ndarray) and cell.dtype.kind in "biuf" for cell in cells):
+        return None
+
+    ndim = cells[0].ndim
+    if ndim == 0 or any(cell.ndim != ndim for cell in cells):
+        return None
+
+    flat = pa.array(np.concatenate([cell.ravel() for cell in cells]))
+    shapes = np.array([cell.shape for cell in cells], dtype=np.int64)
+
+    def _offsets(dim: int) -> pa.Array:
+        # Each cell holds prod(shape[:dim]) lists of length shape[dim] at this level
+        counts = np.repeat(shapes[:, dim], np.prod(shapes[:, :dim], axis=1))
+        return pa.array(np.concatenate([[0], np.cumsum(counts)]).astype(np.int32))
+
+    inner = shapes[:, -1]
+    if inner[0] > 0 and (inner == inner[0]).all():
+        values = pa.FixedSizeListArray.from_arrays(flat, int(inner[0]))
+    else:
+        values = pa.ListArray.from_arrays(_offsets(ndim - 1), flat)
+
+    for dim in range(ndim - 2, -1, -1):
+        values = pa.ListArray.from_arrays(_offsets(dim), values)
+
+    return values
+
+
+def _prepare_object_columns(
+    df: pd.DataFrame, meta: Dict[str, Any], native_ndarrays: bool
+) -> Tuple[pd.DataFrame, Dict[str, pa.Array]]:
+    """
+    Prepares the object columns of a DataFrame which pyarrow does not support. With ``native_ndarrays``,
+    ndarray columns are converted to nested Arrow lists where possible. All other such columns (lists, ...)
+    are msgpacked cell by cell. Returns the DataFrame without the converted columns, and the converted columns.
+    """
+
+    arrays = {}
+    pack_columns: List[str] = []
+    for col in df.columns:
+        if len(df) == 0 or df[col].dtype != object:
+            continue
+
+        sample = df[col].iloc[0]
+        if isinstance(sample, np.ndarray):
+            array = _ndarray_column_to_arrow(df[col]) if native_ndarrays else None
+            if array is None:
+                pack_columns.append(col)
+            else:
+                arrays[col] = array
+        elif isinstance(sample, list):
+            pack_columns.append(col)
+            # Add any other datatypes that need to be handled specially go here
+
+    df = df.drop(columns=list(arrays))
+    for col in pack_columns:
+        df[col] = df[col].apply(lambda x: serialize(x, "msgpack-ext"))
+    meta["msgpacked_cols"] += pack_columns
+
+    return df, arrays
+
+
+def _to_arrow_stream(df: pd.DataFrame, meta: Dict[str, Any]) -> bytes:
+    """
+    Serializes a DataFrame to an Arrow IPC stream written in record batches. ndarray columns are sent as
+    native nested lists, other unsupported object columns (lists, ...) are msgpacked cell by cell.
+    """
+
+    columns = list(df.columns)
+    df, arrays = _prepare_object_columns(df, meta, native_ndarrays=True)
+
+    # Reassemble in the original column order, ndarray columns are tagged for the client
+    others = pa.Table.from_pandas(df, preserve_index=False)
+    fields, data = [], []
+    for col in columns:
+        if col in arrays:
+            fields.append(pa.field(col, arrays[col].type, metadata=ARROW_NDARRAY_METADATA))
+            data.append(arrays[col])
+        else:
+            index = others.schema.get_field_index(col)
+            fields.append(others.schema.field(index))
+            data.append(others.column(index))
+    table = pa.Table.from_arrays(data, schema=pa.schema(fields))
+
+    sink = pa.BufferOutputStream()
+    writer = pa.ipc.new_stream(sink, table.schema)
+    for batch in table.to_batches(max_chunksize=_ARROW_BATCH_ROWS):
+        writer.write_batch(batch)
+    writer.close()
+
+    return sink.getvalue().to_pybytes()
+
+
+def _to_feather(df: pd.DataFrame, meta: Dict[str, Any]) -> bytes:
+    """
+    Serializes a DataFrame to a Feather file, the format read by all clients. Object columns unsupported
+    by pyarrow (ndarrays, lists, ...) are msgpacked cell by cell.
+    """
+
+    df, _ = _prepare_object_columns(df, meta, native_ndarrays=False)
+
+    f = io.BytesIO()
+    df.to_feather(f)
+    return f.getvalue()
+
+
+# Serializers of the view data formats a client may request
+_DATA_FORMATS = {ViewDataFormatEnum.feather: _to_feather, ViewDataFormatEnum.arrow_stream: _to_arrow_stream}
 
 
 class ViewHandler:
-    def __init__(self, path: Union[str, pathlib.Path]) -> None:
+    def __init__(
+        self,
+        path: Union[str, pathlib.Path],
+        max_cache_bytes: int = 512 * 1024 ** 2,
+        validation: str = "mtime",
+        mmap: bool = False,
+    ) -> None:
         """
         Parameters
         ----------
         path: Union[str, Path]
             Directory containing dataset views
+        max_cache_bytes: int, optional
+            Approximate memory budget of the open views. Least recently used views are closed
+            and dropped once it is exceeded; the most recently used view is always kept.
+        validation: str, optional
+            How a cached view is checked against its file on every request. "mtime" reopens the
+            view whenever the file's modification time or size changes, "checksum" additionally
+            keeps the cached view if the changed file has an identical checksum.
+        mmap: bool, optional
+            Memory-map contiguous value columns of the views
+
+        Notes
+        -----
+        Views are kept open between requests, so a view must be regenerated by writing a new file and
+        renaming it over the old one rather than by overwriting the file in place.
         """
-        self._view_cache: Dict[int, HDF5View] = {}
+        if validation not in {"mtime", "checksum"}:
+            raise ValueError(f"View cache validation must be 'mtime' or 'checksum', got: {validation}")
+
+        # collection_id -> {"view", "signature", "checksum", "nbytes"}, in least recently used order
+        self._view_cache: "OrderedDict[int, Dict[str, Any]]" = OrderedDict()
+        self._max_cache_bytes = max_cache_bytes
+        self._validation = validation
+        self._mmap = mmap
         self._path = pathlib.Path(path)
         if not self._path.is_dir():
             raise ValueError(f"Path in ViewHandler must be a directory, got: {self._path}")
@@ -56,14 +207,85 @@ class ViewHandler:
 
         return self.view_path(collection_id).is_file()
 
-    def _get_view(self, collection_id: int):
-        if collection_id not in self._view_cache:
-            if not self.view_exists(collection_id):
-                raise IOError
-            self._view_cache[collection_id] = HDF5View(self.view_path(collection_id))
-        return self._view_cache[collection_id]
+    def cache_info(self) -> Dict[str, int]:
+        """
+        Returns the number of cached views and their approximate memory usage.
+        """
+
+        return {
+            "n_views": len(self._view_cache),
+            "nbytes": sum(entry["nbytes"] for entry in self._view_cache.values()),
+            "max_nbytes": self._max_cache_bytes,
+        }
+
+    def clear_cache(self) -> None:
+        """
+        Closes and drops all cached views.
+        """
+
+        for collection_id in list(self._view_cache):
+            self._evict(collection_id)
+
+    def _evict(self, collection_id: int) -> None:
+        entry = self._view_cache.pop(collection_id, None)
+        if entry is not None:
+            entry["view"].close()
+
+    @staticmethod
+    def _signature(path: pathlib.Path) -> Tuple[int, int]:
+        stat = path.stat()
+        return stat.st_mtime_ns, stat.st_size
+
+    def _get_view(self, collection_id: int) -> HDF5View:
+        path = self.view_path(collection_id)
+        try:
+            signature = self._signature(path)
+        except FileNotFoundError:
+            self._evict(collection_id)
+            raise IOError
+
+        entry = self._view_cache.get(collection_id, None)
+        if (entry is not None) and (entry["signature"] != signature):
+            view = entry["view"]
+            if (self._validation == "checksum") and (entry["checksum"] == view.hash()):
+                # Same contents, only the open handle may point to a replaced file
+                view.close()
+                entry["signature"] = signature
+            else:
+                self._evict(collection_id)
+                entry = None
+
+        if entry is None:
+            view = HDF5View(path, keep_open=True, mmap=self._mmap)
+            checksum = view.hash() if self._validation == "checksum" else None
+            entry = {"view": view, "signature": signature, "checksum": checksum, "nbytes": 0}
+            self._view_cache[collection_id] = entry
+
+        self._view_cache.move_to_end(collection_id)
+        return entry["view"]
+
+    def _update_cache_usage(self, collection_id: int) -> None:
+        """
+        Refreshes the footprint of a view after it was used and evicts least recently used views over budget.
+        """
+
+        entry = self._view_cache.get(collection_id, None)
+        if entry is not None:
+            entry["nbytes"] = entry["view"].memory_usage()
 
-    def handle_request(self, collection_id: int, request: str, model: Dict[str, Any]) -> Dict[str, Any]:
+        total = sum(entry["nbytes"] for entry in self._view_cache.values())
+        while (total > self._max_cache_bytes) and (len(self._view_cache) > 1):
+            lru_id = next(iter(self._view_cache))
+            total -= self._view_cache[lru_id]["nbytes"]
+            self._evict(lru_id)
+
+    def handle_request(
+        self,
+        collection_id: int,
+        request: str,
+        model: Dict[str, Any],
+        data_format: Union[str, ViewDataFormatEnum] = ViewDataFormatEnum.feather,
+    ) -> Dict[str, Any]:
         """
         Handles REST requests related to views. This function implements the GET endpoint
         /collections/[collection_id]/view/[request]
@@ -80,13 +302,27 @@ class ViewHandler:
             - entry: get_entries
         model:
             REST model containing input options.
+        data_format: Union[str, ViewDataFormatEnum], optional
+            Serialization of the returned DataFrame, "feather" (default) or "arrow-stream".
 
         Returns
         -------
         Dict[str, Any]:
             Dictionary corresponding to requested REST model
         """
-        meta = {"errors": [], "success": False, "error_description": False, "msgpacked_cols": []}
+        meta = {
+            "errors": [],
+            "success": False,
+            "error_description": False,
+            "msgpacked_cols": [],
+            "data_format": ViewDataFormatEnum.feather,
+        }
+
+        try:
+            meta["data_format"] = ViewDataFormatEnum(data_format)
+        except ValueError:
+            meta["error_description"] = f"Unknown view data format: {data_format}."
+            return {"meta": meta, "data": None}
 
         try:
             view = self._get_view(collection_id)
@@ -95,6 +331,15 @@ class ViewHandler:
             meta["error_description"] = f"View not available for collection #{collection_id}"
             return {"meta": meta, "data": None}
 
+        try:
+            return self._handle_view_request(view, request, model, meta)
+        finally:
+            self._update_cache_usage(collection_id)
+
+    def _handle_view_request(
+        self, view: HDF5View, request: str, model: Dict[str, Any], meta: Dict[str, Any]
+    ) -> Dict[str, Any]:
+
         if request == "entry":
             try:
                 df = view.get_entries(subset=model["subset"])
@@ -117,30 +362,12 @@ class ViewHandler:
             meta["error_description"] = f"Unknown view request: {request}."
             return {"meta": meta, "data": None}
 
-        # msgpack columns not supported by pyarrow
-        pack_columns = []
-        for col in df.columns:
-            if len(df) > 0:
-                sample = df[col].iloc[0]
-                if isinstance(sample, np.ndarray):
-                    pack_columns.append(col)
-                elif isinstance(sample, list):
-                    pack_columns.append(col)
-                # Add any other datatypes that need to be handled specially go here
-
-        for col in pack_columns:
-            df[col] = df[col].apply(lambda x: serialize(x, "msgpack-ext"))
-        meta["msgpacked_cols"] += pack_columns
-
-        # serialize
-        f = io.BytesIO()
-        df.to_feather(f)
-        df_feather = f.getvalue()
+        df_bytes = _DATA_FORMATS[meta["data_format"]](df, meta)
 
         if request == "value":
-            data = {"values": df_feather, "units": units}
+            data = {"values": df_bytes, "units": units}
         else:
-            data = df_feather
+            data = df_bytes
 
         meta["success"] = True
 
@@ -11,6 +11,7 @@ import pytest
 import qcfractal.interface as ptl
 from qcfractal import QueueManager, testing
 from qcfractal.queue import build_queue_adapter
+from qcfractal.queue.executor_adapter import DaskAdapter, ExecutorAdapter
 from qcfractal.testing import (
     adapter_client_fixture,
     build_adapter_clients,
@@ -28,6 +29,52 @@ def test_adapter_client_active_task_slots(adapter_client_fixture):
         pytest.xfail("Active task slot counting is not yet available.")
 
 
+def test_adapter_completion_callbacks(adapter_client_fixture):
+
+    queue = build_queue_adapter(adapter_client_fixture)
+    if not queue._completion_callbacks:
+        pytest.skip("Adapter does not track completions through callbacks.")
+
+    queue.completion_batch = 2
+    tasks = [
+        {"id": "good", "spec": {"function": "operator.truediv", "args": [1, 2], "kwargs": {}}},
+        {"id": "bad", "spec": {"function": "operator.truediv", "args": [1, 0], "kwargs": {}}},
+    ]
+    queue.submit_tasks(tasks)
+
+    assert queue.wait_for_completions(30)
+    queue.await_results()
+    ret = queue.acquire_complete()
+    assert ret.keys() == {"good", "bad"}
+    assert ret["good"] == 0.5
+    assert ret["bad"].error.error_type == "ZeroDivisionError"
+
+    # Only newly completed tasks are returned
+    assert queue.task_count() == 0
+    assert queue.acquire_complete() == {}
+    assert queue.wait_for_completions(0.01) is False
+
+
+def test_adapter_cancel_unstarted(adapter_client_fixture):
+
+    queue = build_queue_adapter(adapter_client_fixture)
+    if not isinstance(queue, ExecutorAdapter) or isinstance(queue, DaskAdapter):
+        pytest.skip("Adapter cannot cancel unstarted tasks.")
+
+    slots = queue.count_active_task_slots()
+
+    # Process pools hand some tasks to their workers ahead of time, those can no longer be cancelled
+    n_tasks = 4 * slots + 4
+    tasks = [{"id": str(i), "spec": {"function": "time.sleep", "args": [0.2], "kwargs": {}}} for i in range(n_tasks)]
+    queue.submit_tasks(tasks)
+
+    assert queue.cancel_unstarted(2) == [str(n_tasks - 1), str(n_tasks - 2)]
+    assert queue.task_count() == n_tasks - 2
+
+    queue.await_results()
+    assert queue.acquire_complete().keys() == {str(i) for i in range(n_tasks - 2)}
+
+
 @testing.using_rdkit
 def test_adapter_single(managed_compute_server):
     client, server, manager = managed_compute_server
@@ -136,3 +136,39 @@ def test_security_auth_allow_read_block_add(sec_server_allow_read):
     with pytest.raises(IOError) as excinfo:
         client.add_molecules([ptl.Molecule.from_data("He 0 0 0")])
     assert "user not found" in str(excinfo.value).lower()
+
+
+def test_security_update_views(sec_server, postgres_server, tmp_path):
+    pytest.importorskip("h5py")
+
+    server = qcfractal.FractalServer(
+        name="qcf_server_views",
+        port=testing.find_open_port(),
+        storage_project_name=sec_server.storage.get_project_name(),
+        storage_uri=postgres_server.database_uri(),
+        loop=sec_server.loop,
+        security="local",
+        view_enabled=True,
+        view_path=str(tmp_path),
+    )
+
+    client = ptl.FractalClient(sec_server, username="admin", password=_users["admin"]["pw"], verify=False)
+    ds = ptl.collections.Dataset("sec_view_update", client)
+    ds.add_entry("He1", ptl.Molecule.from_data("He 0 0 0\n--\nHe 0 0 1.0"))
+    ds.save()
+    ptl.collections.HDF5View(server.view_handler.view_path(ds.data.id)).write(ds)
+
+    ds.add_entry("He2", ptl.Molecule.from_data("He 0 0 0\n--\nHe 0 0 1.1"))
+    ds.save()
+
+    # The background view updates authenticate as an internal read-only user
+    assert server.update_views() == 1
+    assert len(ptl.collections.HDF5View(server.view_handler.view_path(ds.data.id)).get_entries()) == 2
+    assert server.storage.get_user_permissions("qcfractal_server") == ["read"]
+
+    # The internal user is created once, its stored password is reused by later calls and restarts
+    assert (tmp_path / ".qcfractal_server_password").is_file()
+    assert server.update_views() == 0
+
+    server._internal_password = None
+    assert server.update_views() == 0
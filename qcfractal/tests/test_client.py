@@ -6,6 +6,7 @@ import numpy as np
 import pytest
 
 import qcfractal.interface as ptl
+from qcfractal.interface.record_cache import RecordCache
 from qcfractal.testing import test_server
 
 # All tests should import test_server, but not use it
@@ -54,6 +55,105 @@ def test_client_keywords(test_server, encoding):
     assert opt == get_kw[0]
 
 
+@pytest.mark.parametrize("encoding", valid_encodings)
+def test_client_etag_cache(test_server, encoding):
+
+    client = ptl.FractalClient(test_server)
+    client._set_encoding(encoding)
+
+    water = ptl.data.get_molecule("water_dimer_minima.psimol")
+    water.geometry[:] += np.random.random(water.geometry.shape)
+    mol_id = client.add_molecules([water])[0]
+
+    # Immutable responses are revalidated with a 304
+    get_mol = client.query_molecules(id=mol_id)
+    assert len(client._response_cache) == 1
+    assert client._response_cache_hits == 0
+
+    get_mol2 = client.query_molecules(id=mol_id)
+    assert client._response_cache_hits == 1
+    assert get_mol[0].compare(get_mol2[0])
+
+    # Queries which may match new data are not cached
+    client.query_molecules(molecular_formula="H4O2")
+    client.query_molecules(id=[mol_id, "99999000"])
+    assert len(client._response_cache) == 1
+
+    client.clear_cache()
+    assert len(client._response_cache) == 0
+
+    client = ptl.FractalClient(test_server, cache_size=0)
+    client.query_molecules(id=mol_id)
+    assert len(client._response_cache) == 0
+
+
+def test_client_record_cache(test_server, tmp_path):
+
+    cache_path = tmp_path / "records.sqlite"
+    client = ptl.FractalClient(test_server, record_cache=cache_path)
+
+    water = ptl.data.get_molecule("water_dimer_minima.psimol")
+    water.geometry[:] += np.random.random(water.geometry.shape)
+    mol_id = client.add_molecules([water])[0]
+    assert client.query_molecules(id=mol_id)[0].compare(water)
+
+    ret = client.add_compute("psi4", "hf", "sto-3g", "energy", None, [mol_id])
+    records = client.query_results(id=ret.ids, status=None)
+    assert records[0].status == "INCOMPLETE"
+    assert len(client.record_cache) == 2
+
+    # New sessions only fetch records which are not cached or were modified
+    client = ptl.FractalClient(test_server, record_cache=cache_path)
+    assert client.query_molecules(id=[mol_id])[0].compare(water)
+    records2 = client.query_results(id=ret.ids, status=None)
+    assert records2[0].id == records[0].id
+    assert records2[0].client is client
+    assert client.record_cache.stats()["hits"] == 2
+
+    # Projections are not answered from the cache
+    assert client.query_results(id=ret.ids, status=None, include=["id", "method"]) == [
+        {"id": records[0].id, "method": "hf"}
+    ]
+    assert client.record_cache.stats()["hits"] == 2
+
+    # Incomplete records are revalidated
+    client.record_cache._conn.execute("UPDATE records SET modified_on = 'stale' WHERE kind = 'result'")
+    assert client.query_results(id=ret.ids, status=None)[0].id == records[0].id
+    assert client.record_cache._conn.execute("SELECT modified_on FROM records WHERE kind = 'result'").fetchone() != (
+        "stale",
+    )
+
+    client.record_cache.clear()
+    assert len(client.record_cache) == 0
+
+
+def test_record_cache_servers_and_eviction(tmp_path):
+
+    cache_path = tmp_path / "records.sqlite"
+    cache1 = RecordCache(cache_path, max_size=1, server="https://server1/")
+    cache2 = RecordCache(cache_path, max_size=1, server="https://server2/")
+
+    # Ids are only unique within a server
+    cache1.set_many("molecule", [("1", None, None, {"name": "server1"})])
+    cache2.set_many("molecule", [("1", None, None, {"name": "server2"})])
+    assert cache1.get_many("molecule", ["1"])["1"][2] == {"name": "server1"}
+    assert cache2.get_many("molecule", ["1"])["1"][2] == {"name": "server2"}
+
+    cache2.clear()
+    assert (len(cache1), len(cache2)) == (1, 0)
+
+    # Eviction frees just enough space, oldest first, and keeps the records just inserted
+    record = {"data": "x" * (300 * 1024)}
+    cache1.set_many("result", [("1", None, None, record), ("2", None, None, record)])
+    cache1.set_many("result", [("3", None, None, record), ("4", None, None, record)])
+    assert set(cache1.get_many("result", ["1", "2", "3", "4"])) == {"2", "3", "4"}
+    assert len(cache1.get_many("molecule", ["1"])) == 0
+
+    # A single batch larger than the cache is kept whole
+    cache1.set_many("result", [(str(i), None, None, record) for i in range(5, 10)])
+    assert set(cache1.get_many("result", [str(i) for i in range(10)])) == {str(i) for i in range(5, 10)}
+
+
 @pytest.mark.parametrize("encoding", valid_encodings)
 def test_client_duplicate_keywords(test_server, encoding):
 
@@ -1,6 +1,7 @@
 """
 Tests the server collection compute capabilities.
 """
+import datetime
 import itertools
 import pathlib
 from contextlib import contextmanager
@@ -1135,6 +1136,273 @@ def test_s22_view_identical(s22_fixture):
     assert_view_identical(ds)
 
 
+def test_hdf5view_read_rows(tmp_path):
+    h5py = pytest.importorskip("h5py")
+
+    vlen_double_t = h5py.vlen_dtype(np.dtype("float64"))
+    grads = [np.arange(3 * (i % 4), dtype=np.float64) for i in range(50)]
+    with h5py.File(tmp_path / "rows.hdf5", "w") as f:
+        energy = f.create_dataset("energy", data=np.arange(50, dtype=np.float64))
+        gradient = f.create_dataset("gradient", shape=(50,), dtype=vlen_double_t)
+        for i, grad in enumerate(grads):
+            gradient[i] = grad
+
+        read_rows = ptl.collections.HDF5View._read_rows
+
+        # Sparse, contiguous, dense, unordered and repeated selections
+        for indexes in [[3, 40], [7, 8, 9], list(range(2, 45)), [30, 2, 30, 11], []]:
+            assert np.array_equal(read_rows(energy, indexes), np.arange(50)[indexes])
+
+        indexes = [45, 3, 4, 45, 0]
+        rows = ptl.collections.HDF5View._reshape_vlen(read_rows(gradient, indexes), lambda n: (-1, 3))
+        for row, i in zip(rows, indexes):
+            assert row.shape == (i % 4, 3)
+            assert np.array_equal(row.ravel(), grads[i])
+
+
+def test_hdf5view_update(fractal_compute_server, tmp_path):
+    pytest.importorskip("h5py")
+    client = ptl.FractalClient(fractal_compute_server)
+
+    ds = ptl.collections.Dataset("ds_view_update", client, default_units="hartree")
+    ds.add_entry("He1", ptl.Molecule.from_data("He 0 0 0\n--\nHe 0 0 1.0"))
+    ds.add_entry("He2", ptl.Molecule.from_data("He 0 0 0\n--\nHe 0 0 1.1"))
+    ds.save()
+
+    def contributed(energies):
+        return {
+            "name": "energy",
+            "theory_level": "fake",
+            "values": energies,
+            "index": [f"He{i + 1}" for i in range(len(energies))],
+            "theory_level_details": {"driver": "energy"},
+            "units": "hartree",
+        }
+
+    ds.add_contributed_values(contributed([1.0, 2.0]))
+    ds.save()
+
+    # No view yet, written from scratch
+    view = ptl.collections.HDF5View(tmp_path / "view.hdf5")
+    assert view.update(ds) is False
+
+    ds.add_entry("He3", ptl.Molecule.from_data("He 0 0 0\n--\nHe 0 0 1.2"))
+    ds.add_contributed_values(contributed([1.0, 2.0, 3.0]), overwrite=True)
+    ds.save()
+    ds = client.get_collection("dataset", "ds_view_update")
+
+    assert view.update(ds) is True
+    entries = view.get_entries()
+    assert len(entries) == 3
+    molecules = view.get_molecules(entries["molecule_id"].tolist())
+    assert [mol.id for mol in molecules] == ds.get_entries(force=True)["molecule_id"].tolist()
+    values, _ = view.get_values([{"name": "energy", "native": False}])
+    assert values["energy"].tolist() == [1.0, 2.0, 3.0]
+
+    # Nothing changed since
+    assert view.update(ds) is None
+
+    # Views updated with mmap store fixed-size columns contiguous, so that they are memory-mapped
+    mapped = ptl.collections.HDF5View(tmp_path / "view.hdf5", mmap=True)
+    assert mapped.update(ds) is True
+    values, _ = mapped.get_values([{"name": "energy", "driver": "energy", "native": False}])
+    assert values["energy"].tolist() == [1.0, 2.0, 3.0]
+    assert list(mapped._mmaps) == ["/contributed_value/energy"]
+
+    # Views of other collections are rewritten
+    other = ptl.collections.HDF5View(tmp_path / "other.hdf5")
+    other.write(ds)
+    ds.data.__dict__["id"] = "-1"
+    assert other.update(ds) is False
+
+
+@testing.using_rdkit
+def test_hdf5view_update_records(fractal_compute_server, tmp_path, monkeypatch):
+    pytest.importorskip("h5py")
+    from qcfractal.storage_sockets.models import BaseResultORM, ResultORM
+
+    client = ptl.FractalClient(fractal_compute_server)
+
+    ds = ptl.collections.Dataset("ds_view_update_records", client, default_units="hartree")
+    ds.add_entry("He1", ptl.Molecule.from_data("He 0 0 0\n--\nHe 0 0 1.0"))
+    ds.add_entry("He2", ptl.Molecule.from_data("He 0 0 0\n--\nHe 0 0 1.1"))
+    ds.save()
+    ds.compute("UFF", program="rdkit")
+    fractal_compute_server.await_results()
+    ds = client.get_collection("dataset", "ds_view_update_records")
+
+    view = ptl.collections.HDF5View(tmp_path / "view.hdf5")
+    view.write(ds)
+    name = ds.list_values(native=True).reset_index()["name"][0]
+    before, _ = view.get_values([{"name": name, "driver": "energy", "native": True}])
+
+    # Up to date views are left untouched
+    copy = tmp_path / "copy.hdf5"
+    assert view.update(ds, copy_to=copy) is None
+    assert not copy.exists()
+
+    # Modify a record behind the view
+    record_id = int(ds.get_records("UFF", program="rdkit", include=["id"]).loc["He2", "id"])
+    with fractal_compute_server.storage.session_scope() as session:
+        session.query(ResultORM).filter_by(id=record_id).update({"return_result": 5.0}, synchronize_session=False)
+        session.query(BaseResultORM).filter_by(id=record_id).update(
+            {"modified_on": datetime.datetime.utcnow()}, synchronize_session=False
+        )
+    ds = client.get_collection("dataset", "ds_view_update_records")
+
+    subsets = []
+    get_values = ds.get_values
+
+    def spy(*args, **kwargs):
+        subsets.append(kwargs.get("subset"))
+        return get_values(*args, **kwargs)
+
+    monkeypatch.setattr(ds, "get_values", spy)
+
+    # Only the modified record is downloaded and patched, on a copy of the view
+    assert view.update(ds, copy_to=copy) is True
+    assert subsets == [["He2"]]
+    after, _ = ptl.collections.HDF5View(copy).get_values([{"name": name, "driver": "energy", "native": True}])
+    assert after.loc["He2", name] == 5.0
+    assert after.loc["He1", name] == before.loc["He1", name]
+
+    # The view itself is left untouched
+    values, _ = view.get_values([{"name": name, "driver": "energy", "native": True}])
+    assert values.loc["He2", name] == before.loc["He2", name]
+
+
+def test_hdf5view_mmap_layout(tmp_path):
+    h5py = pytest.importorskip("h5py")
+    HDF5View = ptl.collections.HDF5View
+
+    path = tmp_path / "view.hdf5"
+    with h5py.File(path, "w") as f:
+        for name in ["contiguous", "chunked"]:
+            dataset = HDF5View._create_dataset(f, name, data=np.arange(3.0))
+            dataset.attrs["units"] = '"hartree"'
+            assert dataset.chunks is not None
+
+        # Columns are copied into the requested layout, keeping their rows and attributes
+        dataset = HDF5View._rebuild_dataset(f, "contiguous", 5, contiguous=True)
+        assert dataset.chunks is None and not dataset.fletcher32
+        assert dataset[:3].tolist() == [0.0, 1.0, 2.0]
+        assert dataset.attrs["units"] == '"hartree"'
+
+        dataset = HDF5View._rebuild_dataset(f, "chunked", 5, contiguous=False)
+        assert dataset.chunks is not None and dataset.maxshape == (None,)
+        assert dataset[:3].tolist() == [0.0, 1.0, 2.0]
+
+    view = HDF5View(path, mmap=True)
+    assert view._contiguous(np.dtype("float64")) is True
+    assert view._contiguous(h5py.vlen_dtype(np.dtype("float64"))) is False
+    assert HDF5View(path)._contiguous(np.dtype("float64")) is False
+
+    with h5py.File(path, "r") as f:
+        assert isinstance(view._mmap_dataset(f["contiguous"]), np.memmap)
+        assert view._mmap_dataset(f["contiguous"])[:3].tolist() == [0.0, 1.0, 2.0]
+        assert isinstance(view._mmap_dataset(f["chunked"]), h5py.Dataset)
+
+
+def test_view_handler_cache(tmp_path):
+    import io
+    import os
+
+    h5py = pytest.importorskip("h5py")
+    from qcfractal.storage_sockets import ViewHandler
+
+    def write_view(collection_id, energies):
+        # Views are replaced atomically, the handler may hold the old file open
+        with h5py.File(tmp_path / "tmp.hdf5", "w") as f:
+            f.attrs["history_keys"] = '["driver"]'
+            f.create_dataset("entry/entry", data=[f"e{i}" for i in range(len(energies))], dtype=h5py.string_dtype())
+            f.create_dataset("value/energy", data=np.asarray(energies, dtype=np.float64))
+            f["value/energy"].attrs["units"] = '"hartree"'
+        os.replace(tmp_path / "tmp.hdf5", tmp_path / f"{collection_id}.hdf5")
+
+    def get_energies(handler, collection_id):
+        queries = [{"name": "energy", "driver": "energy", "native": True}]
+        ret = handler.handle_request(collection_id, "value", {"queries": queries, "subset": None})
+        assert ret["meta"]["success"], ret["meta"]["error_description"]
+        meta = ptl.models.rest_models.CollectionSubresourceGETResponseMeta(**ret["meta"])
+        return ptl.collections.RemoteView._deserialize(ret["data"]["values"], meta)["energy"].tolist()
+
+    write_view(1, [1.0, 2.0, 3.0])
+    write_view(2, [4.0, 5.0])
+
+    for mmap in [False, True]:
+        handler = ViewHandler(tmp_path, mmap=mmap)
+        assert get_energies(handler, 1) == [1.0, 2.0, 3.0]
+        assert get_energies(handler, 2) == [4.0, 5.0]
+        assert handler.cache_info()["n_views"] == 2
+        assert handler.cache_info()["nbytes"] > 0
+        assert bool(handler._view_cache[1]["view"]._mmaps) is mmap
+        handler.clear_cache()
+
+    # Regenerated views are reloaded
+    handler = ViewHandler(tmp_path, validation="checksum")
+    assert get_energies(handler, 1) == [1.0, 2.0, 3.0]
+    write_view(1, [7.0, 8.0, 9.0])
+    os.utime(tmp_path / "1.hdf5", ns=(0, 10 ** 9))
+    assert get_energies(handler, 1) == [7.0, 8.0, 9.0]
+
+    # Views over budget are evicted, least recently used first
+    handler = ViewHandler(tmp_path, max_cache_bytes=1)
+    get_energies(handler, 1)
+    get_energies(handler, 2)
+    assert handler.cache_info()["n_views"] == 1
+    assert list(handler._view_cache) == [2]
+
+    os.remove(tmp_path / "2.hdf5")
+    assert handler.handle_request(2, "list", {})["meta"]["success"] is False
+    assert handler.cache_info()["n_views"] == 0
+
+    # Feather files are sent unless Arrow streams are requested, as released clients only read Feather
+    model = {"queries": [{"name": "energy", "driver": "energy", "native": True}], "subset": None}
+    ret = handler.handle_request(1, "value", model)
+    assert ret["meta"]["data_format"] == "feather"
+    assert pd.read_feather(io.BytesIO(ret["data"]["values"]))["energy"].tolist() == [7.0, 8.0, 9.0]
+
+    ret = handler.handle_request(1, "value", model, data_format="arrow-stream")
+    assert ret["meta"]["data_format"] == "arrow-stream"
+    meta = ptl.models.rest_models.CollectionSubresourceGETResponseMeta(**ret["meta"])
+    assert ptl.collections.RemoteView._deserialize(ret["data"]["values"], meta)["energy"].tolist() == [7.0, 8.0, 9.0]
+
+    assert handler.handle_request(1, "value", model, data_format="csv")["meta"]["success"] is False
+
+
+def test_view_arrow_stream_roundtrip():
+    pytest.importorskip("pyarrow")
+    from qcfractal.storage_sockets.view import _to_arrow_stream
+
+    df = pd.DataFrame(
+        {
+            "index": ["a", "b", "c"],
+            "energy": [1.0, 2.0, np.nan],
+            "gradient": [np.random.rand(2, 3), np.random.rand(0, 3), np.random.rand(4, 3)],
+            "hessian": [np.random.rand(6, 6), np.random.rand(3, 3), np.random.rand(0, 0)],
+            "dipole": [np.random.rand(3) for _ in range(3)],
+            "other": [[1, 2], [3], []],
+        }
+    )
+
+    meta = {"errors": [], "success": True, "error_description": False, "msgpacked_cols": []}
+    data = _to_arrow_stream(df.copy(), meta)
+
+    # Arrays are sent as native lists, only other objects are msgpacked
+    assert meta["msgpacked_cols"] == ["other"]
+
+    meta = ptl.models.rest_models.CollectionSubresourceGETResponseMeta(**meta, data_format="arrow-stream")
+    ret = ptl.collections.RemoteView._deserialize(data, meta)
+    assert list(ret.columns) == ["energy", "gradient", "hessian", "dipole", "other"]
+    assert list(ret.index) == ["a", "b", "c"]
+    assert np.allclose(ret["energy"], df["energy"], equal_nan=True)
+    assert ret["other"].tolist() == df["other"].tolist()
+    for col in ["gradient", "hessian", "dipole"]:
+        for expected, found in zip(df[col], ret[col]):
+            assert expected.shape == found.shape
+            assert np.array_equal(expected, found)
+
+
 @pytest.mark.slow
 def test_view_download_remote(s22_fixture):
     _, ds = s22_fixture
@@ -1471,10 +1739,8 @@ def test_gradient_dataset_lazy_entries_values(gradient_dataset_fixture):
 
     ds.get_values(subset=["He1"], basis="3-21g")
     assert (~ds.df.isna()).sum().sum() == 1
-    if not ds._use_view():
-        assert ds.data.records is not None
-    else:
-        assert ds.data.records is None
+    # Only the entries of the subset are fetched
+    assert ds.data.records is None
 
 
 def test_get_collection_no_records_ds(fractal_compute_server):
@@ -1490,6 +1756,125 @@ def test_get_collection_no_records_ds(fractal_compute_server):
     assert ds.data.records[0].name == "He1"
 
 
+def test_collection_entries_paginated(fractal_compute_server):
+    client = ptl.FractalClient(fractal_compute_server)
+    ds = ptl.collections.Dataset("entries_paginated", client=client)
+    for i in range(5):
+        ds.add_entry(f"He{i}", ptl.Molecule.from_data(f"He 0 0 {i}\n--\nHe 0 0 {i + 2}"))
+    ds.add_entry("Ne_1", ptl.Molecule.from_data("Ne 0 0 0"))
+    ds.save()
+
+    ret = client.query_collection_entries(ds.data.id, limit=2, skip=2, full_return=True)
+    assert ret.meta.n_found == 6
+    assert [x["name"] for x in ret.data] == ["He2", "He3"]
+
+    assert len(client.query_collection_entries(ds.data.id, pattern="he*")) == 5
+    assert [x["name"] for x in client.query_collection_entries(ds.data.id, pattern="?e_1")] == ["Ne_1"]
+    assert client.query_collection_entries(ds.data.id, pattern="?e_") == []
+
+    # Subsets are fetched on their own
+    ds = client.get_collection("dataset", ds.name)
+    entries = ds.get_entries(subset=["He4", "He1"])
+    assert entries["name"].tolist() == ["He4", "He1"]
+    assert ds.data.records is None
+
+    assert len(ds.get_entries()) == 6
+    assert len(ds.data.records) == 6
+
+    # Procedure datasets are opened without their entries
+    opt_ds = ptl.collections.OptimizationDataset("entries_paginated", client=client)
+    qc_spec = {"driver": "gradient", "method": "UFF", "program": "rdkit"}
+    opt_ds.add_specification("test", {"program": "geometric"}, qc_spec)
+    hooh = ptl.data.get_molecule("hooh.json")
+    opt_ds.add_entry("hooh1", hooh)
+    opt_ds.add_entry("hooh2", hooh)
+
+    opt_ds = client.get_collection("optimizationdataset", opt_ds.name)
+    assert opt_ds.data.records is None
+    assert opt_ds.get_entry("HOOH2").name == "hooh2"
+    assert opt_ds.data.records is None
+    assert [x["name"] for x in client.query_collection_entries(opt_ds.data.id, subset="HOOH1")] == ["hooh1"]
+
+    ret = client.query_collection_entries(opt_ds.data.id, pattern="HOOH*", limit=1, skip=1, full_return=True)
+    assert ret.meta.n_found == 2
+    assert [x["name"] for x in ret.data] == ["hooh2"]
+
+    opt_ds.add_entry("hooh3", hooh)
+    assert list(client.get_collection("optimizationdataset", opt_ds.name).df.index) == ["hooh1", "hooh2", "hooh3"]
+
+
+def test_collection_entries_delta(fractal_compute_server):
+    client = ptl.FractalClient(fractal_compute_server)
+    ds = ptl.collections.Dataset("entries_delta", client=client)
+    ds.add_entry("He1", ptl.Molecule.from_data("He 0 0 0\n--\nHe 0 0 2"))
+    ds.save()
+
+    # Saving an existing dataset only sends the new entries
+    ds = client.get_collection("dataset", ds.name)
+    ds.add_entry("He2", ptl.Molecule.from_data("He 0 0 0\n--\nHe 0 0 3"))
+    ds.save()
+    assert ds.data.records is None
+    assert ds.get_index() == ["He1", "He2"]
+
+    ret = client.update_collection_entries(ds.data.id, remove_entries=["He1", "He3"])
+    assert (ret.n_added, ret.n_removed, ret.n_updated) == (0, 1, 0)
+    assert [x["name"] for x in client.query_collection_entries(ds.data.id)] == ["He2"]
+
+    with pytest.raises(IOError, match="object map"):
+        client.update_collection_entries(ds.data.id, object_map={"He2": {"spec": "1"}})
+
+    # Procedure datasets submit their computations in a single request and only send the object map cells
+    opt_ds = ptl.collections.OptimizationDataset("entries_delta", client=client)
+    qc_spec = {"driver": "gradient", "method": "UFF", "program": "rdkit"}
+    opt_ds.add_specification("test", {"program": "geometric"}, qc_spec)
+    hooh = ptl.data.get_molecule("hooh.json")
+    for i in range(3):
+        opt_ds.add_entry(f"hooh{i}", hooh.copy(update={"geometry": hooh.geometry + i * 0.1}), save=False)
+    opt_ds.save()
+
+    opt_ds = client.get_collection("optimizationdataset", opt_ds.name)
+    n_submit = client._request_counter[("task_queue", "post")]
+    assert opt_ds.compute("test", subset=["hooh0", "hooh2"]) == 2
+    assert client._request_counter[("task_queue", "post")] == n_submit + 1
+    assert opt_ds.data.records is None
+
+    opt_ds = client.get_collection("optimizationdataset", opt_ds.name)
+    assert opt_ds.data.history == {"test"}
+    assert opt_ds.compute("test") == 1
+    object_maps = {x["name"]: x["object_map"] for x in client.query_collection_entries(opt_ds.data.id)}
+    assert all("test" in x for x in object_maps.values())
+    assert len({x["test"] for x in object_maps.values()}) == 3
+
+    with pytest.raises(IOError, match="not found"):
+        client.update_collection_entries(opt_ds.data.id, object_map={"hooh9": {"test": "1"}})
+
+
+def test_procedure_dataset_compute_unsaved_entries(fractal_compute_server):
+    client = ptl.FractalClient(fractal_compute_server)
+
+    opt_ds = ptl.collections.OptimizationDataset("compute_unsaved_entries", client=client)
+    qc_spec = {"driver": "gradient", "method": "UFF", "program": "rdkit"}
+    opt_ds.add_specification("test", {"program": "geometric"}, qc_spec)
+    hooh = ptl.data.get_molecule("hooh.json")
+    opt_ds.add_entry("hooh0", hooh, save=False)
+    opt_ds.save()
+
+    # Entries are not loaded
+    opt_ds = client.get_collection("optimizationdataset", opt_ds.name)
+    opt_ds.add_entry("hooh1", hooh.copy(update={"geometry": hooh.geometry + 0.1}), save=False)
+    assert opt_ds.compute("test") == 2
+
+    # Entries are loaded
+    opt_ds = client.get_collection("optimizationdataset", opt_ds.name)
+    assert list(opt_ds.df.index) == ["hooh0", "hooh1"]
+    opt_ds.add_entry("hooh2", hooh.copy(update={"geometry": hooh.geometry + 0.2}), save=False)
+    assert opt_ds.compute("test") == 1
+
+    object_maps = {x["name"]: x["object_map"] for x in client.query_collection_entries(opt_ds.data.id)}
+    assert object_maps.keys() == {"hooh0", "hooh1", "hooh2"}
+    assert all("test" in x for x in object_maps.values())
+
+
 def test_list_collection_group(fractal_compute_server):
     client = ptl.FractalClient(fractal_compute_server)
 
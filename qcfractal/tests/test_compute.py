@@ -163,15 +163,14 @@ def test_task_regenerate(fractal_compute_server):
         assert old_task.modified_on < new_task.modified_on  # New task must be newer
         assert old_task.created_on < new_task.created_on  # New task must be newer
 
+    # Task specs reference the stored molecules
     assert old_tasks[0].spec.args[0]["molecule"]["id"] == new_tasks[0].spec.args[0]["molecule"]["id"]
-    assert (
-        old_tasks[0].spec.args[0]["molecule"]["identifiers"]["molecule_hash"]
-        == new_tasks[0].spec.args[0]["molecule"]["identifiers"]["molecule_hash"]
+    assert old_tasks[0].spec.args[0]["molecule"] == ptl.models.spec_reference(
+        "molecule", old_tasks[0].spec.args[0]["molecule"]["id"]
     )
     assert old_tasks[1].spec.args[0]["initial_molecule"]["id"] == new_tasks[1].spec.args[0]["initial_molecule"]["id"]
-    assert (
-        old_tasks[1].spec.args[0]["initial_molecule"]["identifiers"]["molecule_hash"]
-        == new_tasks[1].spec.args[0]["initial_molecule"]["identifiers"]["molecule_hash"]
+    assert old_tasks[1].spec.args[0]["initial_molecule"] == ptl.models.spec_reference(
+        "molecule", old_tasks[1].spec.args[0]["initial_molecule"]["id"]
     )
 
     # The status of the result should be reset to incomplete
@@ -10,6 +10,8 @@ import time
 from concurrent.futures import ProcessPoolExecutor
 
 import pytest
+from qcelemental.models import FailedOperation
+from qcelemental.util import deserialize
 
 import qcfractal.interface as ptl
 from qcfractal import FractalServer, queue, testing
@@ -52,6 +54,9 @@ def test_queue_manager_single_tags(compute_adapter_fixture):
     manager_stuff = queue.QueueManager(client, adapter, queue_tag="stuff", configuration=config)
     manager_other = queue.QueueManager(client, adapter, queue_tag="other", configuration=config)
 
+    claimed = server.metrics.tasks_claimed.get(tag="other")
+    completed = server.metrics.tasks_completed.get(tag="other", status="COMPLETE")
+
     # Add compute
     hooh = ptl.data.get_molecule("hooh.json")
     ret = client.add_compute("rdkit", "UFF", "", "energy", None, [hooh], tag="other")
@@ -66,6 +71,10 @@ def test_queue_manager_single_tags(compute_adapter_fixture):
     ret = client.query_results()
     assert len(ret) == 1
 
+    assert server.metrics.tasks_claimed.get(tag="other") == claimed + 1
+    assert server.metrics.tasks_completed.get(tag="other", status="COMPLETE") == completed + 1
+    assert server.metrics.ingest_duration.get(parser="single")[0] > 0
+
     # Check the logs to make sure
     managers = client.query_managers()
     assert len(managers) == 2
@@ -282,6 +291,261 @@ def test_queue_manager_server_delay(compute_adapter_fixture):
     assert manager.n_stale_jobs == 0
 
 
+@testing.using_rdkit
+def test_queue_manager_pipelined(compute_adapter_fixture):
+    """Tests the upload, fetch and submit stages of a pipelined manager"""
+    client, server, adapter = compute_adapter_fixture
+    reset_server_database(server)
+
+    manager = queue.QueueManager(client, adapter, queue_tag="other", pipelined=True)
+
+    hooh = ptl.data.get_molecule("hooh.json")
+    ret = client.add_compute("rdkit", "UFF", "", "energy", None, [hooh], tag="other")
+
+    manager._start_pipeline()
+    try:
+        # Tasks are fetched and submitted in the background
+        assert testing.await_true(10, lambda: len(manager.list_current_tasks()) == 1, period=0.1)
+
+        manager.queue_adapter.await_results()
+        manager._pipeline_update()
+        assert manager.active == 0
+
+        result_complete = lambda: client.query_results(id=ret.ids)[0].status == "COMPLETE"
+        assert testing.await_true(10, result_complete, period=0.1)
+    finally:
+        shutdown = manager.shutdown()
+
+    assert shutdown["nshutdown"] == 0
+    assert manager._pipeline_threads == []
+
+
+def test_queue_manager_adaptive_prefetch(compute_adapter_fixture):
+    client, server, adapter = compute_adapter_fixture
+    reset_server_database(server)
+
+    manager = queue.QueueManager(client, adapter, queue_tag="other", max_tasks=50, adaptive_prefetch=True)
+    manager.statistics.active_task_slots = 2
+
+    # Without completions, only the task slots are filled
+    assert manager._prefetch_limits() == (2, 2)
+    assert manager._open_slots() == 2
+
+    manager.statistics.completion_rate = 1.5
+    manager.statistics.fetch_round_trip = 0.5
+    assert manager._prefetch_limits() == (6, 10)
+    assert manager._open_slots(pending=1) == 5
+
+    manager.statistics.completion_rate = 100
+    assert manager._prefetch_limits() == (50, 50)
+
+    # Tasks claimed by the manager are handed back to the queue
+    mol_ids = client.add_molecules([ptl.data.get_molecule(x) for x in ["hooh.json", "water_dimer_minima.psimol"]])
+    client.add_compute("rdkit", "UFF", "", "energy", None, mol_ids, tag="other")
+
+    tasks = server.storage.queue_get_next(manager.name(), ["rdkit"], [], limit=2, tag="other")
+    assert len(tasks) == 2
+
+    assert manager._return_tasks([tasks[0].id]) == 1
+    assert manager._return_tasks([tasks[0].id]) == 0
+    statuses = {x.id: x.status for x in client.query_tasks(id=[x.id for x in tasks])}
+    assert statuses == {tasks[0].id: "WAITING", tasks[1].id: "RUNNING"}
+
+    assert client.query_managers(name=manager.name())[0]["returned"] == 1
+
+
+def test_queue_manager_chunked_upload(compute_adapter_fixture, monkeypatch):
+    client, server, adapter = compute_adapter_fixture
+
+    manager = queue.QueueManager(client, adapter, upload_chunk_size=2, upload_chunk_bytes=None)
+
+    error = FailedOperation(error={"error_type": "test_error", "error_message": "x" * 1000})
+    results = {str(i): error for i in range(1, 6)}
+    encoded = manager._encode_results(results)
+    assert [list(x) for x in manager._chunk_results(encoded)] == [["1", "2"], ["3", "4"], ["5"]]
+
+    manager.upload_chunk_size = None
+    manager.upload_chunk_bytes = int(2.5 * len(encoded["1"]))
+    assert [len(x) for x in manager._chunk_results(encoded)] == [2, 2, 1]
+
+    manager.upload_chunk_bytes = 1
+    assert [len(x) for x in manager._chunk_results(encoded)] == [1, 1, 1, 1, 1]
+
+    # The first chunk which fails stops the upload, the remaining chunks are not attempted
+    manager.upload_chunk_size = 2
+    manager.upload_chunk_bytes = None
+
+    posted = []
+    attempts = []
+    failing = {"3"}
+
+    def post_update(payload_data, allow_shutdown=True):
+        attempts.append(list(payload_data))
+        if failing & payload_data.keys():
+            raise IOError("Mock failure")
+        posted.append(list(payload_data))
+
+    monkeypatch.setattr(manager, "_post_update", post_update)
+
+    status = manager._upload_results(results)
+    assert status == {"1": "sent", "2": "sent", "3": "deferred", "4": "deferred", "5": "deferred"}
+    assert posted == [["1", "2"]]
+    assert attempts == [["1", "2"], ["3", "4"]]
+    assert manager._stale_payload_tracking == [[{"3": error, "4": error, "5": error}, 0]]
+
+    failing.clear()
+    manager._update_stale_jobs()
+    assert posted[-2:] == [["3", "4"], ["5"]]
+    assert manager._stale_payload_tracking == []
+    assert manager.n_stale_jobs == 0
+
+    # Only one chunk is attempted while the server is unreachable
+    attempts.clear()
+    failing.update(results)
+    status = manager._upload_results(results)
+    assert set(status.values()) == {"deferred"}
+    assert attempts == [["1", "2"]]
+    assert manager._stale_payload_tracking == [[results, 0]]
+
+    # Chunks are posted as a single body around the serialized tasks
+    monkeypatch.undo()
+    body = deserialize(manager._encode_payload(encoded), client.encoding)
+    assert body["data"]["1"] == error.dict()
+    assert body["meta"]["uuid"] == manager.name_data["uuid"]
+
+
+def test_queue_manager_upload_stage_error(compute_adapter_fixture, monkeypatch):
+    """Results of a failed upload stage are kept for the final update of the shutdown"""
+    from queue import Queue
+
+    client, server, adapter = compute_adapter_fixture
+
+    manager = queue.QueueManager(client, adapter, pipelined=True)
+    error = FailedOperation(error={"error_type": "test_error", "error_message": "Upload stage"})
+    results = {"1": error, "2": error}
+
+    def post_update(payload_data, allow_shutdown=True):
+        raise RuntimeError("Mock failure")
+
+    monkeypatch.setattr(manager, "_post_update", post_update)
+
+    manager._upload_queue = Queue()
+    manager._upload_queue.put(results)
+    manager._upload_queue.put(None)
+    manager._upload_stage()
+
+    assert str(manager._pipeline_error) == "Mock failure"
+    assert manager._stale_payload_tracking == [[results, 0]]
+    assert manager.n_stale_jobs == 0
+
+
+def test_queue_manager_spool(compute_adapter_fixture, monkeypatch, tmp_path):
+    client, server, adapter = compute_adapter_fixture
+
+    spool_path = str(tmp_path / "spool.db")
+    manager = queue.QueueManager(client, adapter, upload_chunk_size=2, spool_path=spool_path)
+
+    error = FailedOperation(error={"error_type": "test_error", "error_message": "Spooled"})
+    results = {str(i): error for i in range(1, 6)}
+
+    posted = []
+    failing = {"1", "3"}
+
+    def post_update(payload_data, allow_shutdown=True):
+        if failing & payload_data.keys():
+            raise IOError("Mock failure")
+        posted.append(payload_data)
+
+    monkeypatch.setattr(manager, "_post_update", post_update)
+
+    status = manager._upload_results(results)
+    assert status == {"1": "spooled", "2": "spooled", "3": "spooled", "4": "spooled", "5": "spooled"}
+    assert manager._stale_payload_tracking == []
+    assert len(manager.spool) == 5
+
+    # The spool is replayed until a post fails
+    failing = {"3"}
+    manager._update_stale_jobs()
+    assert list(posted[-1]) == ["1", "2"]
+    assert deserialize(posted[-1]["1"], client.encoding)["error"] == error.error.dict()
+    assert len(manager.spool) == 3
+
+    # A restarted manager resumes the identity of the undelivered tasks
+    manager.spool.close()
+    restarted = queue.QueueManager(client, adapter, spool_path=spool_path)
+    assert restarted.name() == manager.name()
+    assert restarted.spool.read(10).keys() == {"3", "4", "5"}
+
+    monkeypatch.setattr(restarted, "_post_update", post_update)
+    failing = set()
+    restarted._update_stale_jobs()
+    assert posted[-1].keys() == {"3", "4", "5"}
+    assert len(restarted.spool) == 0
+
+    # Managers cannot share a spool, they would resume the same identity
+    with pytest.raises(RuntimeError, match="held by another manager"):
+        queue.QueueManager(client, adapter, spool_path=spool_path)
+
+    restarted.spool.close()
+    assert queue.QueueManager(client, adapter, spool_path=spool_path).name() != manager.name()
+
+
+def test_queue_manager_spec_references(compute_adapter_fixture):
+    client, server, adapter = compute_adapter_fixture
+    reset_server_database(server)
+
+    hooh = ptl.data.get_molecule("hooh.json")
+    neon = ptl.Molecule(symbols=["Ne"], geometry=[0, 0, 0])
+    kw_id = client.add_keywords([ptl.models.KeywordSet(values={"e_convergence": 1.0e-8})])[0]
+    qc_spec = {"driver": "gradient", "method": "UFF", "keywords": kw_id, "program": "rdkit"}
+
+    client.add_compute("rdkit", "UFF", "", "energy", kw_id, [hooh, neon])
+    client.add_procedure("optimization", "geometric", {"keywords": None, "qc_spec": qc_spec}, [hooh])
+
+    # Stored specs only reference the molecules and keywords
+    mol_ids = client.add_molecules([hooh, neon])
+    references = ptl.models.find_spec_references([x.spec.args for x in client.query_tasks()])
+    assert references == {"molecule": set(mol_ids), "keywords": {kw_id}}
+
+    def check_resolved(tasks):
+        assert len(tasks) == 3
+        assert ptl.models.find_spec_references([x["spec"] for x in tasks]) == {}
+        for task in tasks:
+            args = task["spec"]["args"][0]
+            if task["parser"] == "single":
+                assert ptl.Molecule(**args["molecule"]).get_hash() in {hooh.get_hash(), neon.get_hash()}
+                assert args["keywords"] == {"e_convergence": 1.0e-8}
+            else:
+                assert ptl.Molecule(**args["initial_molecule"]).get_hash() == hooh.get_hash()
+                assert args["input_specification"]["keywords"] == {"e_convergence": 1.0e-8}
+
+    manager = queue.QueueManager(client, adapter, reference_cache_size=3)
+    manager.available_programs = ["rdkit"]
+    manager.available_procedures = ["geometric"]
+
+    tasks = manager._fetch_tasks(10)
+    check_resolved(tasks)
+    assert len(manager._reference_cache) == 3
+    assert manager._return_tasks([x["id"] for x in tasks]) == 3
+
+    # Cached objects are not fetched again
+    cached = dict(manager._reference_cache)
+    check_resolved(manager._fetch_tasks(10))
+    assert all(manager._reference_cache[k] is v for k, v in cached.items())
+    manager.shutdown()
+
+    # Without a cache, the server resolves the references
+    manager = queue.QueueManager(client, adapter, reference_cache_size=0)
+    manager.available_programs = ["rdkit"]
+    manager.available_procedures = ["geometric"]
+
+    check_resolved(manager._fetch_tasks(10))
+    assert len(manager._reference_cache) == 0
+    manager.shutdown()
+
+    reset_server_database(server)
+
+
 def test_queue_manager_heartbeat(compute_adapter_fixture):
     """Tests to ensure tasks are returned to queue when the manager shuts down"""
 
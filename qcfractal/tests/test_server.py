@@ -2,6 +2,7 @@
 Tests the DQM Server class
 """
 
+import datetime
 import json
 import os
 import threading
@@ -133,6 +134,52 @@ def test_bad_view_endpoints(test_server):
     assert requests.get(addr + "collection/S22").status_code == 404
 
 
+def test_server_metrics(test_server):
+
+    client = ptl.FractalClient(test_server)
+    client.server_information()
+    client.query_molecules(id=[])
+
+    r = requests.get(test_server.get_address("metrics"))
+    assert r.status_code == 200, r.reason
+    assert r.headers["Content-Type"].startswith("text/plain; version=0.0.4")
+
+    lines = r.text.splitlines()
+    assert "# TYPE qcfractal_http_request_duration_seconds histogram" in lines
+    bucket = 'qcfractal_http_request_duration_seconds_bucket{handler="MoleculeHandler",method="GET",le="+Inf"} 1'
+    assert bucket in lines
+    assert any(
+        x.startswith('qcfractal_http_request_duration_seconds_count{handler="InformationHandler"') for x in lines
+    )
+    assert any(x.startswith("qcfractal_db_pool_checked_out ") for x in lines)
+
+    count, total = test_server.metrics.db_checkout_wait.get()
+    assert count > 0
+    assert total >= 0
+
+    # Labels are checked and escaped
+    metrics = test_server.metrics
+    metrics.tasks_claimed.inc(2, tag='a"b')
+    assert metrics.tasks_claimed.get(tag='a"b') == 2
+    assert 'qcfractal_tasks_claimed_total{tag="a\\"b"} 2.0' in metrics.render().splitlines()
+    with pytest.raises(KeyError):
+        metrics.tasks_claimed.inc(parser="single")
+
+
+def test_server_access_summary(test_server):
+
+    client = ptl.FractalClient(test_server)
+
+    ret = client.query_access_summary(
+        after=datetime.datetime(2001, 1, 1), granularity="month", group_by=["access_type", "username"], full_return=True
+    )
+    assert ret.meta.success is True
+    assert isinstance(ret.data, list)
+
+    ret = client.query_access_summary(granularity="second", full_return=True)
+    assert ret.meta.success is False
+
+
 @pytest.mark.slow
 def test_snowflakehandler_restart():
 
@@ -4,7 +4,7 @@ Tests the database wrappers
 All tests should be atomic, that is create and cleanup their data
 """
 
-from datetime import datetime
+from datetime import datetime, timedelta
 from time import time
 
 import numpy as np
@@ -14,6 +14,8 @@ import sqlalchemy
 import qcfractal.interface as ptl
 from qcfractal.interface.models.task_models import TaskStatusEnum
 from qcfractal.services.services import TorsionDriveService
+from qcfractal.storage_sockets import storage_socket_factory
+from qcfractal.storage_sockets.sql_profiler import SQLProfiler
 from qcfractal.testing import sqlalchemy_socket_fixture as storage_socket
 
 bad_id1 = "99999000"
@@ -209,6 +211,156 @@ def test_keywords_mixed_add_get(storage_socket):
     assert 1 == storage_socket.del_keywords(id=opts[1].id)
 
 
+def test_molecules_keywords_cache(storage_socket):
+
+    water = ptl.data.get_molecule("water_dimer_minima.psimol")
+    kw = ptl.models.KeywordSet(values={"cache_test": True})
+
+    mol_id = storage_socket.get_add_molecules_mixed([water])["data"][0].id
+    kw_id = storage_socket.get_add_keywords_mixed([kw])["data"][0].id
+
+    before = storage_socket.get_cache_stats()
+
+    # Repeat submissions are resolved from the cache
+    assert storage_socket.get_add_molecules_mixed([water])["data"][0].id == mol_id
+    assert storage_socket.get_add_molecules_mixed([mol_id])["data"][0].id == mol_id
+
+    ret = storage_socket.get_add_keywords_mixed([kw, kw_id])
+    assert ret["data"][0].id == kw_id
+    assert ret["data"][1].id == kw_id
+
+    after = storage_socket.get_cache_stats()
+    for name in ["molecule_hash", "molecule", "keywords_hash", "keywords"]:
+        assert after[name]["hits"] > before[name]["hits"]
+        assert 0 < after[name]["hit_rate"] <= 1
+
+    # Cache hits skip the database, rows changed underneath the socket are only seen once the cache is cleared
+    with storage_socket.session_scope() as session:
+        session.execute(sqlalchemy.text("UPDATE molecule SET name = 'changed' WHERE id = :id"), {"id": int(mol_id)})
+        session.execute(
+            sqlalchemy.text('UPDATE keywords SET "values" = :values WHERE id = :id'),
+            {"values": '{"cache_test": false}', "id": int(kw_id)},
+        )
+
+    assert storage_socket.get_add_molecules_mixed([mol_id])["data"][0].name == water.name
+    assert storage_socket.get_add_keywords_mixed([kw_id])["data"][0].values == {"cache_test": True}
+
+    storage_socket.clear_caches()
+    assert storage_socket.get_add_molecules_mixed([mol_id])["data"][0].name == "changed"
+    assert storage_socket.get_add_keywords_mixed([kw_id])["data"][0].values == {"cache_test": False}
+
+    # Deletions invalidate the cache
+    assert 1 == storage_socket.del_molecules(id=mol_id)
+    assert 1 == storage_socket.del_keywords(id=kw_id)
+
+    assert storage_socket.get_add_molecules_mixed([mol_id])["data"][0] is None
+
+    mol_ret = storage_socket.add_molecules([water])
+    assert mol_ret["meta"]["n_inserted"] == 1
+
+    kw_ret = storage_socket.add_keywords([kw])
+    assert kw_ret["meta"]["n_inserted"] == 1
+
+    assert 1 == storage_socket.del_molecules(id=mol_ret["data"])
+    assert 1 == storage_socket.del_keywords(id=kw_ret["data"][0])
+
+
+def test_sql_profile(storage_socket):
+
+    assert storage_socket.get_sql_profile() == {
+        "enabled": False,
+        "slow_threshold": 0.5,
+        "methods": {},
+        "slow_queries": [],
+    }
+
+    # Profile the fixture socket temporarily, logging every statement as slow
+    profiler = SQLProfiler(storage_socket.engine, storage_socket.logger, slow_threshold=0)
+    profiler.enable()
+    profiler.instrument(storage_socket, ["add_molecules", "get_add_molecules_mixed"])
+    try:
+        water = ptl.data.get_molecule("water_dimer_minima.psimol")
+        mol_id = storage_socket.add_molecules([water])["data"][0]
+        storage_socket.get_add_molecules_mixed([water, mol_id])
+
+        profile = profiler.report(reset=True)
+    finally:
+        profiler.disable()
+        del storage_socket.add_molecules
+        del storage_socket.get_add_molecules_mixed
+
+    assert profile["enabled"] is True
+    assert profile["methods"].keys() == {"add_molecules", "get_add_molecules_mixed"}
+
+    stats = profile["methods"]["add_molecules"]
+    assert stats["calls"] == 1
+    assert stats["statements"] > 0
+    assert stats["statements_per_call"] == stats["statements"]
+    assert stats["slow_statements"] == stats["statements"]
+    assert 0 < stats["statement_time"] <= stats["wall_time"]
+
+    # The nested add_molecules call of get_add_molecules_mixed is attributed to the outer method
+    assert profile["methods"]["get_add_molecules_mixed"]["calls"] == 1
+
+    selects = [x for x in profile["slow_queries"] if x["statement"].lstrip().startswith("SELECT")]
+    assert len(selects)
+    assert all(x["plan"] and not x["plan"].startswith("EXPLAIN failed") for x in selects)
+    assert profiler.report()["methods"] == {}
+
+    storage_socket.del_molecules(id=mol_id)
+
+
+def test_leadership(storage_socket):
+
+    other = storage_socket_factory(storage_socket.uri, project_name="", skip_version_check=True)
+    try:
+        assert storage_socket.acquire_leadership("test")
+        assert storage_socket.acquire_leadership("test")
+        assert other.acquire_leadership("test") is False
+
+        # Names are independent
+        assert other.acquire_leadership("test_other")
+
+        storage_socket.release_leadership("test")
+        assert other.acquire_leadership("test")
+        assert storage_socket.acquire_leadership("test") is False
+    finally:
+        other.release_leadership("test")
+        other.release_leadership("test_other")
+        storage_socket.release_leadership("test")
+
+
+def test_read_replica_routing(storage_socket):
+
+    # The primary doubles as its own replica
+    uri = storage_socket.uri
+    socket = storage_socket_factory(uri, project_name="", skip_version_check=True, read_replica_uris=[uri])
+    replica = socket.replica_engines[0]
+
+    with socket.session_scope(read_only=True) as session:
+        assert session.bind is replica
+    with socket.session_scope() as session:
+        assert session.bind is socket.engine
+
+    # Pinned reads go to the primary, pins nest
+    with socket.read_your_writes():
+        with socket.read_your_writes():
+            pass
+        with socket.session_scope(read_only=True) as session:
+            assert session.bind is socket.engine
+    with socket.session_scope(read_only=True) as session:
+        assert session.bind is replica
+
+    assert socket.get_molecules(molecule_hash=["not_a_hash"])["meta"]["success"]
+
+    # Unreachable replicas fall back to the primary
+    down = storage_socket_factory(
+        uri, project_name="", skip_version_check=True, read_replica_uris=["postgresql://localhost:1/"]
+    )
+    with down.session_scope(read_only=True) as session:
+        assert session.bind is down.engine
+
+
 def test_collections_add(storage_socket):
 
     collection = "TorsionDriveRecord"
@@ -365,6 +517,34 @@ def test_dataset_add_delete_cascade(storage_socket):
     ret = storage_socket.get_collections(collection=collection, name=name)
     assert ret["meta"]["success"] is True
     assert len(ret["data"][0]["contributed_values"].keys()) == 2
+    assert all(cv["values"] is None for cv in ret["data"][0]["contributed_values"].values())
+    collection_id = ret["data"][0]["id"]
+
+    # Values are only sent with the collection when explicitly included
+    ret = storage_socket.get_collections(collection=collection, name=name, include=["contributed_values"])
+    assert list(ret["data"][0].keys()) == ["contributed_values"]
+    assert ret["data"][0]["contributed_values"]["contrib1"]["index"] == ["He2", "He1"]
+    assert ret["data"][0]["contributed_values"]["contrib1"]["values"] == [5, 10]
+
+    # Values are stored per entry and may be fetched for a subset of entries
+    ret = storage_socket.get_contributed_values(collection_id, name="CONTRIB1", subset=["He1"])
+    assert len(ret["data"]) == 1
+    assert ret["data"][0]["index"] == ["He1"]
+    assert ret["data"][0]["values"] == [10]
+
+    ret = storage_socket.get_contributed_values(collection_id, include_values=False)
+    assert {cv["name"] for cv in ret["data"]} == {"contrib1", "contrib2"}
+    assert all(cv["values"] is None for cv in ret["data"])
+
+    # Metadata-only updates keep the stored values
+    db["contributed_values"]["contrib1"].update({"values": None, "index": None, "theory_level": "PBE0"})
+    ret = storage_socket.add_collection(db.copy(), overwrite=True)
+    assert ret["meta"]["n_inserted"] == 1
+
+    ret = storage_socket.get_contributed_values(collection_id, name="contrib1")
+    assert ret["data"][0]["theory_level"] == "PBE0"
+    assert ret["data"][0]["index"] == ["He2", "He1"]
+    db["contributed_values"]["contrib1"].update({"values": [5, 10], "index": ["He2", "He1"]})
 
     #  reactiondataset
 
@@ -785,6 +965,63 @@ def test_storage_queue_roundtrip(storage_results, status):
         assert js["error_type"] == "test_error"
 
 
+def test_queue_archive(storage_results):
+
+    results = storage_results.get_results()["data"]
+    tasks = [
+        ptl.models.TaskRecord(
+            spec={"function": "qcengine.compute", "args": [], "kwargs": {}},
+            program="archive_prog",
+            parser="",
+            base_result=results[i]["id"],
+        )
+        for i in [2, 3]
+    ]
+    ids = storage_results.queue_submit(tasks)["data"]
+
+    storage_results.manager_update("archive_manager", log=True)
+    claimed = storage_results.queue_get_next("archive_manager", ["archive_prog"], [], limit=2)
+    assert len(claimed) == 2
+    err = {"error_type": "test_error", "error_message": "Error msg"}
+    assert storage_results.queue_mark_error([(x.id, err) for x in claimed]) == 2
+
+    # Only errored tasks are archived
+    with pytest.raises(ValueError):
+        storage_results.archive_tasks(datetime.utcnow(), status=["WAITING"])
+
+    now = datetime.utcnow()
+    assert storage_results.archive_tasks(now + timedelta(seconds=1)) >= 2
+    assert len(storage_results.queue_get_by_id(ids)) == 0
+
+    partitions = {x["partition"]: x for x in storage_results.list_archive_partitions()}
+    assert {"task_queue_archive_default", "queue_manager_logs_archive_default"} <= partitions.keys()
+    assert partitions[f"task_queue_archive_{now:%Y_%m}"]["rows"] >= 2
+
+    # Resetting an archived task brings it back
+    assert storage_results.queue_reset_status(base_result=results[2]["id"], reset_error=True) == 1
+    assert storage_results.queue_get_by_id([ids[0]])[0].status == TaskStatusEnum.waiting
+
+    assert storage_results.restore_tasks(base_result=[results[3]["id"]]) == 1
+    assert storage_results.queue_get_by_id([ids[1]])[0].status == TaskStatusEnum.error
+
+    # Puts back the tasks of other tests
+    storage_results.restore_tasks(base_result=[x["id"] for x in results])
+
+    # Manager logs keep their timestamp
+    manager_id = storage_results.get_managers(name="archive_manager")["data"][0]["id"]
+    assert storage_results.archive_manager_logs(datetime.utcnow() + timedelta(seconds=1)) >= 1
+    assert storage_results.get_manager_logs(manager_id)["data"] == []
+
+    # Monthly partitions are dropped as a whole
+    assert storage_results.drop_archive_partitions(datetime(2000, 1, 1)) == []
+    created = storage_results.create_archive_partitions(datetime(2001, 1, 15))
+    assert created == ["task_queue_archive_2001_01", "queue_manager_logs_archive_2001_01"]
+    assert storage_results.create_archive_partitions(datetime(2001, 1, 1)) == []
+    assert sorted(storage_results.drop_archive_partitions(datetime(2001, 2, 1))) == sorted(created)
+
+    storage_results.del_tasks(ids)
+
+
 def test_queue_submit_many_order(storage_results):
 
     results = storage_results.get_results()["data"]
@@ -819,6 +1056,37 @@ def test_queue_submit_many_order(storage_results):
     # Todo: test more scenarios
 
 
+def test_queue_get_raw_msgpack(storage_results):
+    from qcelemental.util import msgpackext_loads
+
+    from qcfractal.storage_sockets.models import MsgpackExtBlob
+    from qcfractal.web_handlers import _msgpackext_passthrough_dumps
+
+    result = storage_results.get_results()["data"][0]
+
+    spec = {"function": "qcengine.compute_procedure", "args": [{"json_blob": "data"}], "kwargs": {}}
+    task = ptl.models.TaskRecord(spec=spec, tag=None, program="p1", parser="", base_result=result["id"])
+    task_id = storage_results.queue_submit([task])["data"][0]
+
+    ret = storage_results.get_queue(id=task_id, raw_msgpack=True)
+    assert ret["meta"]["n_found"] == 1
+    raw_task = ret["data"][0]
+    assert isinstance(raw_task["spec"], MsgpackExtBlob)
+    assert raw_task["spec"].value == spec
+    assert raw_task["program"] == "p1"
+
+    # The stored bytes are passed through untouched
+    loaded = msgpackext_loads(_msgpackext_passthrough_dumps(ret))
+    assert loaded["data"][0]["spec"] == spec
+    assert ptl.models.TaskRecord(**loaded["data"][0]).base_result == result["id"]
+
+    raw_result = storage_results.get_results(id=result["id"], raw_msgpack=True)["data"][0]
+    assert isinstance(raw_result["return_result"], MsgpackExtBlob)
+    assert raw_result["return_result"].value == result["return_result"]
+
+    storage_results.del_tasks(id=task_id)
+
+
 # User testing
 
 
@@ -1314,6 +1582,64 @@ def test_server_log(storage_results):
     assert ret["data"][0]["timestamp"] > now
 
 
+def test_access_log_rollup(storage_socket):
+    from qcfractal.storage_sockets.models import AccessLogORM, AccessLogRollupORM, ServerStatsLogORM
+
+    start = datetime(2001, 1, 1, 10)
+    for i, (access_type, username) in enumerate([("molecule", "alice"), ("molecule", "bob"), ("task_queue", None)]):
+        for j in range(2):
+            storage_socket.save_access(
+                {
+                    "access_date": start + timedelta(hours=j * 30, minutes=i),
+                    "access_type": access_type,
+                    "access_method": "GET",
+                    "username": username,
+                }
+            )
+
+    after = datetime(2000, 12, 31)
+    ret = storage_socket.get_access_summary(after=after, before=datetime(2001, 2, 1), granularity="day")
+    assert ret["meta"]["success"], ret["meta"]["error_description"]
+    expected = [
+        {"period": "2001-01-01T00:00:00", "access_type": "molecule", "count": 2},
+        {"period": "2001-01-01T00:00:00", "access_type": "task_queue", "count": 1},
+        {"period": "2001-01-02T00:00:00", "access_type": "molecule", "count": 2},
+        {"period": "2001-01-02T00:00:00", "access_type": "task_queue", "count": 1},
+    ]
+    assert ret["data"] == expected
+
+    # Only the first day is rolled up, the summary is unchanged
+    assert storage_socket.rollup_access_log(datetime(2001, 1, 2), granularity="hour", batch_size=2) == 3
+    ret = storage_socket.get_access_summary(after=after, before=datetime(2001, 2, 1), granularity="day")
+    assert ret["data"] == expected
+
+    ret = storage_socket.get_access_summary(after=after, before=datetime(2001, 2, 1), group_by=["username"])
+    assert ret["data"][0] == {"period": "2001-01-01T00:00:00", "username": "", "count": 1}
+    assert len(ret["data"]) == 6
+
+    ret = storage_socket.get_access_summary(after=after, granularity="month", access_type=["task_queue"])
+    assert ret["data"] == [{"period": "2001-01-01T00:00:00", "access_type": "task_queue", "count": 2}]
+
+    assert storage_socket.get_access_summary(granularity="second")["meta"]["success"] is False
+    assert storage_socket.get_access_summary(group_by=["ip_address"])["meta"]["success"] is False
+    with pytest.raises(ValueError):
+        storage_socket.rollup_access_log(datetime(2001, 1, 2), granularity="week")
+
+    # Server stats keep the last row of each day
+    for hours in [1, 2, 25]:
+        with storage_socket.session_scope() as session:
+            session.add(ServerStatsLogORM(timestamp=start + timedelta(hours=hours)))
+
+    assert storage_socket.rollup_server_stats_log(datetime(2001, 1, 3)) == 1
+    ret = storage_socket.get_server_stats_log(after=after, before=datetime(2001, 2, 1))
+    assert [x["timestamp"] for x in ret["data"]] == [start + timedelta(hours=25), start + timedelta(hours=2)]
+
+    with storage_socket.session_scope() as session:
+        session.query(AccessLogORM).filter(AccessLogORM.access_date < datetime(2001, 2, 1)).delete()
+        session.query(AccessLogRollupORM).delete()
+        session.query(ServerStatsLogORM).filter(ServerStatsLogORM.timestamp < datetime(2001, 2, 1)).delete()
+
+
 def test_collections_include_exclude(storage_socket):
 
     collection = "Dataset"
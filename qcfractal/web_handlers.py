@@ -3,11 +3,16 @@ Web handlers for the FractalServer.
 """
 import json
 
+import msgpack
 import tornado.web
-from pydantic import ValidationError
+from pydantic import BaseModel, ValidationError
 from qcelemental.util import deserialize, serialize
+from qcelemental.util.serialization import msgpackext_encode
 
+from .interface.models.records import RecordStatusEnum
 from .interface.models.rest_models import rest_model
+from .metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE
+from .storage_sockets.models import MsgpackExtBlob
 from .storage_sockets.storage_utils import add_metadata_template
 
 _valid_encodings = {
@@ -17,6 +22,59 @@ _valid_encodings = {
 }
 
 
+def _msgpackext_passthrough_dumps(data) -> bytes:
+    """
+    Serializes data to msgpack-ext, splicing the stored bytes of any MsgpackExtBlob
+    into the output without decoding them.
+    """
+
+    packer = msgpack.Packer(default=msgpackext_encode, use_bin_type=True)
+    chunks = []
+
+    def _pack(obj):
+        if isinstance(obj, MsgpackExtBlob):
+            chunks.append(obj.raw)
+        elif isinstance(obj, BaseModel):
+            _pack(obj.dict())
+        elif isinstance(obj, dict):
+            chunks.append(packer.pack_map_header(len(obj)))
+            for k, v in obj.items():
+                chunks.append(packer.pack(k))
+                _pack(v)
+        elif isinstance(obj, (list, tuple)):
+            chunks.append(packer.pack_array_header(len(obj)))
+            for v in obj:
+                _pack(v)
+        else:
+            chunks.append(packer.pack(obj))
+
+    _pack(data)
+    return b"".join(chunks)
+
+
+def _found_all(ids, response) -> bool:
+    """
+    True if the query was purely by id and every requested id was returned.
+    """
+
+    if not ids:
+        return False
+    if not isinstance(ids, list):
+        ids = [ids]
+
+    if isinstance(response, dict):
+        meta, data = response["meta"], response["data"]
+    else:
+        meta, data = response.meta.dict(), response.data
+
+    return meta["success"] and len(data) == len(set(ids))
+
+
+def _get_status(record):
+    status = record.get("status") if isinstance(record, dict) else getattr(record, "status", None)
+    return None if status is None else RecordStatusEnum(status)
+
+
 class APIHandler(tornado.web.RequestHandler):
     """
     A requests handler for API calls.
@@ -26,6 +84,9 @@ class APIHandler(tornado.web.RequestHandler):
     _required_auth = "admin"
     _logging_param_counts = {}
 
+    # Serve the reads of GET requests from the primary database as well, for GET requests which write
+    _read_your_writes = False
+
     def initialize(self, **objects):
         """
         Initializes the request to JSON, adds objects, and logging.
@@ -49,12 +110,30 @@ class APIHandler(tornado.web.RequestHandler):
         self.logger = objects["logger"]
         self.api_logger = objects["api_logger"]
         self.view_handler = objects["view_handler"]
+        self.metrics = objects["metrics"]
         self.username = None
 
+        # Uncompressed size of the response body, see write
+        self.response_nbytes = 0
+
+        # Set by handlers whose response may contain undecoded MsgpackExtBlobs
+        self.msgpack_passthrough = False
+
+        # Set by handlers whose response can never change, see compute_etag
+        self.immutable = False
+
+        # Whether the reads of this request are pinned to the primary database, see prepare
+        self.reads_pinned = False
+
     def prepare(self):
         if self._required_auth:
             self.authenticate(self._required_auth)
 
+        # Requests which write must read their own writes, so only plain GET requests may use read replicas
+        if self._read_your_writes or self.request.method != "GET":
+            self.storage.pin_reads()
+            self.reads_pinned = True
+
         try:
             if (self.encoding == "json") and isinstance(self.request.body, bytes):
                 blob = self.request.body.decode()
@@ -70,6 +149,15 @@ class APIHandler(tornado.web.RequestHandler):
 
     def on_finish(self):
 
+        if self.reads_pinned:
+            self.storage.unpin_reads()
+            self.reads_pinned = False
+
+        labels = {"handler": type(self).__name__, "method": self.request.method}
+        self.metrics.request_duration.observe(self.request.request_time(), **labels)
+        self.metrics.request_size.observe(len(self.request.body or b""), **labels)
+        self.metrics.response_size.observe(self.response_nbytes, **labels)
+
         exclude_uris = ["/task_queue", "/service_queue", "/queue_manager"]
 
         # No associated data, so skip all of this
@@ -91,6 +179,7 @@ class APIHandler(tornado.web.RequestHandler):
             extra_params = json.dumps(extra_params)
 
             log = self.api_logger.get_api_access_log(request=self.request, extra_params=extra_params)
+            log["username"] = self.username
             self.storage.save_access(log)
 
         # self.logger.info('Done saving API access to the database')
@@ -126,10 +215,26 @@ class APIHandler(tornado.web.RequestHandler):
         except ValidationError:
             raise tornado.web.HTTPError(status_code=401, reason="Invalid REST")
 
+    def compute_etag(self):
+        """
+        Content-hash ETags are only issued for immutable responses, so that clients only
+        keep and revalidate (If-None-Match) data which is worth caching. Tornado replies
+        with a 304 and no body on a matching If-None-Match header.
+        """
+
+        if not self.immutable:
+            return None
+
+        return super().compute_etag()
+
     def write(self, data):
         if not isinstance(data, (str, bytes)):
-            data = serialize(data, self.encoding)
+            if self.msgpack_passthrough:
+                data = _msgpackext_passthrough_dumps(data)
+            else:
+                data = serialize(data, self.encoding)
 
+        self.response_nbytes += len(data)
         return super().write(data)
 
 
@@ -148,6 +253,59 @@ class InformationHandler(APIHandler):
         self.write(self.objects["public_information"])
 
 
+class MetricsHandler(APIHandler):
+    """
+    Serves the server metrics in the Prometheus text format.
+    """
+
+    _required_auth = "read"
+
+    def get(self):
+
+        self.set_header("Content-Type", METRICS_CONTENT_TYPE)
+        self.write(self.metrics.render())
+
+
+class SQLProfileHandler(APIHandler):
+    """
+    Serves the SQL statement profile of the storage socket methods.
+    """
+
+    _required_auth = "admin"
+
+    def get(self):
+
+        body_model, response_model = rest_model("sql_profile", "get")
+        body = self.parse_bodymodel(body_model)
+
+        self.logger.info("GET: SQLProfile")
+
+        profile = self.storage.get_sql_profile(reset=body.data.reset)
+        response = response_model(meta={"errors": [], "success": True, "error_description": False}, data=profile)
+
+        self.write(response)
+
+
+class AccessSummaryHandler(APIHandler):
+    """
+    Serves the API access counts per period, from the access log rollups.
+    """
+
+    _required_auth = "admin"
+
+    def get(self):
+
+        body_model, response_model = rest_model("access/summary", "get")
+        body = self.parse_bodymodel(body_model)
+
+        self.logger.info("GET: AccessSummary")
+
+        ret = self.storage.get_access_summary(**body.data.dict())
+        response = response_model(**ret)
+
+        self.write(response)
+
+
 class KVStoreHandler(APIHandler):
     """
     A handler to push and get molecules.
@@ -181,6 +339,9 @@ class KVStoreHandler(APIHandler):
         ret = self.storage.get_kvstore(body.data.id)
         ret = response_model(**ret)
 
+        # KVStore entries are never modified once written
+        self.immutable = _found_all(body.data.id, ret)
+
         self.logger.info("GET: KVStore - {} pulls.".format(len(ret.data)))
         self.write(ret)
 
@@ -198,10 +359,12 @@ class WavefunctionStoreHandler(APIHandler):
         body_model, response_model = rest_model("wavefunctionstore", "get")
         body = self.parse_bodymodel(body_model)
 
-        ret = self.storage.get_wavefunction_store(body.data.id, include=body.meta.include)
+        raw = self.encoding == "msgpack-ext"
+        ret = self.storage.get_wavefunction_store(body.data.id, include=body.meta.include, raw_msgpack=raw)
         if len(ret["data"]):
             ret["data"] = ret["data"][0]
         ret = response_model(**ret)
+        self.msgpack_passthrough = raw
 
         self.logger.info("GET: WavefunctionStore - 1 pull.")
         self.write(ret)
@@ -242,6 +405,9 @@ class MoleculeHandler(APIHandler):
         molecules = self.storage.get_molecules(**{**body.data.dict(), **body.meta.dict()})
         ret = response_model(**molecules)
 
+        # Molecules are immutable, but a formula query may match molecules added later
+        self.immutable = _found_all(body.data.id, ret) and body.data.molecular_formula is None
+
         self.logger.info("GET: Molecule - {} pulls.".format(len(ret.data)))
         self.write(ret)
 
@@ -292,6 +458,8 @@ class KeywordHandler(APIHandler):
         ret = self.storage.get_keywords(**{**body.data.dict(), **body.meta.dict()}, with_ids=False)
         response = response_model(**ret)
 
+        self.immutable = _found_all(body.data.id, response)
+
         self.logger.info("GET: Keywords - {} pulls.".format(len(response.data)))
         self.write(response)
 
@@ -345,6 +513,32 @@ class CollectionHandler(APIHandler):
             self.write(response)
             return
 
+        # Pages of entries, so that collections can be opened without loading all of them
+        elif (collection_id is not None) and (view_function == "entries"):
+            body_model, response_model = rest_model(f"collection/{collection_id}/{view_function}", "get")
+            body = self.parse_bodymodel(body_model)
+
+            ret = self.storage.get_collection_entries(
+                int(collection_id), **body.data.dict(), limit=body.meta.limit, skip=body.meta.skip
+            )
+            response = response_model(**ret)
+
+            self.logger.info(f"GET: Collections - {collection_id} entries - {len(response.data)} pulls.")
+            self.write(response)
+            return
+
+        # Contributed values are stored per entry, so that subsets can be read without a view
+        elif (collection_id is not None) and (view_function == "contributed_values"):
+            body_model, response_model = rest_model(f"collection/{collection_id}/{view_function}", "get")
+            body = self.parse_bodymodel(body_model)
+
+            ret = self.storage.get_contributed_values(int(collection_id), **body.data.dict())
+            response = response_model(**ret)
+
+            self.logger.info(f"GET: Collections - {collection_id} contributed values - {len(response.data)} pulls.")
+            self.write(response)
+            return
+
         # View-backed function on collection
         elif (collection_id is not None) and (view_function is not None):
             body_model, response_model = rest_model(f"collection/{collection_id}/{view_function}", "get")
@@ -360,7 +554,9 @@ class CollectionHandler(APIHandler):
                 self.logger.info("GET: Collections - view request made, but server does not have a view_handler.")
                 return
 
-            result = self.view_handler.handle_request(collection_id, view_function, body.data.dict())
+            result = self.view_handler.handle_request(
+                collection_id, view_function, body.data.dict(), data_format=body.meta.data_format
+            )
             response = response_model(**result)
 
             self.logger.info(f"GET: Collections - {collection_id} view {view_function} pulls.")
@@ -400,6 +596,31 @@ class CollectionHandler(APIHandler):
         self.logger.info("POST: Collections - {} inserted.".format(response.meta.n_inserted))
         self.write(response)
 
+    def put(self, collection_id=None, view_function=None):
+        self.authenticate("write")
+
+        # Only the entries of a collection are updated incrementally
+        if collection_id is None or view_function != "entries":
+            raise tornado.web.HTTPError(
+                status_code=400, reason="PUT requests are only supported for the entries of a collection."
+            )
+
+        body_model, response_model = rest_model(f"collection/{collection_id}/{view_function}", "put")
+        body = self.parse_bodymodel(body_model)
+
+        try:
+            data = self.storage.update_collection_entries(int(collection_id), **body.data.dict())
+        except (KeyError, ValueError) as err:
+            raise tornado.web.HTTPError(status_code=400, reason=str(err.args[0]))
+
+        response = response_model(data=data, meta={"errors": [], "success": True, "error_description": False})
+
+        self.logger.info(
+            f"PUT: Collections - {collection_id} entries - {data['n_added']} added, {data['n_removed']} removed, "
+            f"{data['n_updated']} updated."
+        )
+        self.write(response)
+
     def delete(self, collection_id, _):
         self.authenticate("write")
 
@@ -426,8 +647,19 @@ class ResultHandler(APIHandler):
         body_model, response_model = rest_model("result", "get")
         body = self.parse_bodymodel(body_model)
 
-        ret = self.storage.get_results(**{**body.data.dict(), **body.meta.dict()})
+        raw = self.encoding == "msgpack-ext"
+        ret = self.storage.get_results(**{**body.data.dict(), **body.meta.dict()}, raw_msgpack=raw)
+
+        # Only COMPLETE results are final, and only a pure id query cannot match new results
+        query = body.data.dict(exclude={"id"}, exclude_none=True)
+        self.immutable = (
+            not query
+            and _found_all(body.data.id, ret)
+            and all(_get_status(r) == RecordStatusEnum.complete for r in ret["data"])
+        )
+
         result = response_model(**ret)
+        self.msgpack_passthrough = raw
 
         self.logger.info("GET: Results - {} pulls.".format(len(result.data)))
         self.write(result)
@@ -446,15 +678,18 @@ class ProcedureHandler(APIHandler):
         body_model, response_model = rest_model("procedure", query_type)
         body = self.parse_bodymodel(body_model)
 
+        raw = False
         try:
             if query_type == "get":
-                ret = self.storage.get_procedures(**{**body.data.dict(), **body.meta.dict()})
+                raw = self.encoding == "msgpack-ext"
+                ret = self.storage.get_procedures(**{**body.data.dict(), **body.meta.dict()}, raw_msgpack=raw)
             else:  # all other queries, like 'best_opt_results'
                 ret = self.storage.custom_query("procedure", query_type, **{**body.data.dict(), **body.meta.dict()})
         except KeyError as e:
             raise tornado.web.HTTPError(status_code=401, reason=str(e))
 
         response = response_model(**ret)
+        self.msgpack_passthrough = raw
 
         self.logger.info("GET: Procedures - {} pulls.".format(len(response.data)))
         self.write(response)